@@ -22,6 +22,8 @@ import numpy as np
 
 from libc.math cimport ceil, erfc, pow
 
+from ants.datatypes import TimeSource
+
 
 def manufactured_ss_03(angle_x):
     # One group, angle dependent boundary
@@ -87,28 +89,36 @@ def time_dependence_constant(boundary_x):
     return boundary_x[None,...]
 
 
-def time_dependence_decay_01(boundary_x, edges_t, off_time):
+def _time_steps(source, lazy):
+    # Evaluate each step on demand or stack into a (T, ...) array
+    if lazy:
+        return source
+    return np.array([source[tt] for tt in range(source.steps)])
+
+
+def time_dependence_decay_01(boundary_x, edges_t, off_time, lazy=False):
     # Turn off boundary at specific step
     steps = edges_t.shape[0] - 1
-    boundary_x = np.repeat(boundary_x[None,...], steps, axis=0)
-    loc = np.argwhere(edges_t[1:] > off_time).flatten()
-    boundary_x[loc,...] *= 0.0
-    return boundary_x
+    boundary_x = np.array(boundary_x, dtype=np.float64)
+    off = edges_t[1:] > off_time
+    def step(tt):
+        return boundary_x * 0.0 if off[tt] else boundary_x
+    return _time_steps(TimeSource(step, steps), lazy)
 
 
-def time_dependence_decay_02(boundary_x, edges_t):
+def time_dependence_decay_02(boundary_x, edges_t, lazy=False):
     # Turn off boundary by decay
     steps = edges_t.shape[0] - 1
+    boundary_x = np.array(boundary_x, dtype=np.float64)
     # Find where boundary != 0
     idx = tuple(np.argwhere(boundary_x != 0.0).flatten())
-    # Repeat over all groups
-    boundary_x = np.repeat(boundary_x[None,...], edges_t.shape[0] - 1, axis=0)
-    for tt in range(steps):
-        dt = edges_t[tt+1] - edges_t[tt]
+    def step(tt):
+        boundary_tt = boundary_x.copy()
         # Convert to microseconds
         t_us = np.round(edges_t[tt+1] * 1e6, 12)
         if t_us >= 0.2:
             k = ceil((t_us - 0.2) / 0.1)
             err_arg = (t_us - 0.1 * (1 + k)) / (0.01)
-            boundary_x[tt][idx] = pow(0.5, k) * (1 + 2 * erfc(err_arg))
-    return boundary_x
+            boundary_tt[idx] = pow(0.5, k) * (1 + 2 * erfc(err_arg))
+        return boundary_tt
+    return _time_steps(TimeSource(step, steps), lazy)
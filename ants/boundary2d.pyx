@@ -23,6 +23,8 @@ import numpy as np
 
 from libc.math cimport ceil, erfc, pow
 
+from ants.datatypes import TimeSource
+
 
 def manufactured_ss_01(x, y, angle_x, angle_y):
     boundary_x = 1.5 * np.ones((2, y.shape[0], angle_x.shape[0], 1))
@@ -156,43 +158,54 @@ def deuterium_tritium(loc_x, loc_y, edges_g):
     return boundary_x, boundary_y
 
 
-def time_dependence_decay_01(boundary, edges_t, off_time):
+def _time_steps(source, lazy):
+    # Evaluate each step on demand or stack into a (T, ...) array
+    if lazy:
+        return source
+    return np.array([source[tt] for tt in range(source.steps)])
+
+
+def time_dependence_decay_01(boundary, edges_t, off_time, lazy=False):
     # Turn off boundary at specific step
     steps = edges_t.shape[0] - 1
-    boundary = np.repeat(boundary[None,...], steps, axis=0)
-    loc = np.argwhere(edges_t[1:] > off_time).flatten()
-    boundary[loc,...] *= 0.0
-    return boundary
+    boundary = np.array(boundary, dtype=np.float64)
+    off = edges_t[1:] > off_time
+    def step(tt):
+        return boundary * 0.0 if off[tt] else boundary
+    return _time_steps(TimeSource(step, steps), lazy)
 
 
-def time_dependence_decay_02(boundary, edges_t):
+def time_dependence_decay_02(boundary, edges_t, lazy=False):
     # Turn off boundary by decay
     steps = edges_t.shape[0] - 1
-    boundary = np.repeat(boundary[None,...], edges_t.shape[0] - 1, axis=0)
-    for tt in range(steps):
-        dt = edges_t[tt+1] - edges_t[tt]
+    boundary = np.array(boundary, dtype=np.float64)
+    def step(tt):
         # Convert to microseconds
         t_us = edges_t[tt+1] * 1e6
         if t_us >= 0.2:
             k = ceil((t_us - 0.2) / 0.1)
             err_arg = (t_us - 0.1 * (1 + k)) / (0.01)
-            boundary[tt] = pow(0.5, k) * (1 + 2 * erfc(err_arg))
-    return boundary
+            return np.full(boundary.shape, pow(0.5, k) * (1 + 2 * erfc(err_arg)))
+        return boundary
+    return _time_steps(TimeSource(step, steps), lazy)
 
 
-def time_dependence_decay_03(boundary, edges_t):
+def time_dependence_decay_03(boundary, edges_t, lazy=False):
     # Turn on and decay away linearly
     steps = edges_t.shape[0] - 1
-    boundary = np.repeat(boundary[None,...], edges_t.shape[0] - 1, axis=0)
-    for tt in range(steps):
+    boundary = np.array(boundary, dtype=np.float64)
+    nonzero = boundary != 0.0
+    def step(tt):
+        boundary_tt = boundary.copy()
         # Convert to microseconds
         t_us = edges_t[tt+1] * 1e6
         if (t_us < 10):
-            boundary[tt][boundary[tt] != 0.0] = 0.1 * t_us
+            boundary_tt[nonzero] = 0.1 * t_us
         elif (t_us >= 10) and (t_us < 20):
-            boundary[tt][boundary[tt] != 0.0] = 1.0
+            boundary_tt[nonzero] = 1.0
         elif (t_us >= 20) and (t_us < 40):
-            boundary[tt][boundary[tt] != 0.0] = -0.05 * t_us + 2
+            boundary_tt[nonzero] = -0.05 * t_us + 2
         elif (t_us >= 40):
-            boundary[tt][boundary[tt] != 0.0] = 0.0
-    return boundary
+            boundary_tt[nonzero] = 0.0
+        return boundary_tt
+    return _time_steps(TimeSource(step, steps), lazy)
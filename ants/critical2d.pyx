@@ -19,9 +19,12 @@
 # distutils: language = c++
 # distutils: extra_compile_args = -O3 -march=native -ffast-math
 
+from libc.math cimport fmax, fmin
+
 import logging
 
 import numpy as np
+from scipy.sparse.linalg import LinearOperator, gmres
 
 from ants cimport cytools_2d as tools
 from ants cimport multi_group_2d as mg
@@ -29,9 +32,26 @@ from ants cimport parameters
 from ants.parameters cimport params
 
 from ants.datatypes import create_params
+from ants.utils.cmfd import CMFD
+from ants.utils.eigen import Chebyshev, Wielandt
+from ants.utils.pytools import initial_flux
 
 logger = logging.getLogger(__name__)
 
+# Adaptive inner tolerances: until the outer iteration is predicted to
+# converge, the inner solves stop at INNER_RATIO times the last change in
+# the fission source (at most INNER_LOOSE)
+cdef double INNER_RATIO = 0.01
+cdef double INNER_LOOSE = 1e-3
+
+# Newton-Krylov: power iteration tolerance of the initial guess, GMRES
+# relative tolerance and restart length of each Newton step, and most
+# step halvings of its line search
+cdef double NEWTON_GUESS = 1e-3
+cdef double NEWTON_FORCING = 1e-3
+cdef int NEWTON_RESTART = 30
+cdef int NEWTON_HALVINGS = 4
+
 
 def k_criticality(materials, geometry, quadrature, solver):
     # Unpack Python DataTypes to Cython memoryviews
@@ -50,30 +70,78 @@ def k_criticality(materials, geometry, quadrature, solver):
     info = parameters._to_params(params)
     parameters._check_critical2d_power_iteration(info)
 
+    # Fission matrix kept as chi x nu_fission when chi is given
+    cdef double[:,:] chi = None
+    cdef double[:,:] nu_fission = None
+    if materials.chi is not None:
+        chi = materials.chi
+        nu_fission = materials.fission
+
     # Initialize keff
-    cdef double[1] keff = [0.95]
+    cdef double[1] keff = [solver.keff_guess]
 
-    # Initialize and normalize flux
-    flux_old = np.random.rand(info.cells_x, info.cells_y, info.groups)
+    # Initialize and normalize flux, seeded random unless a guess is given
+    flux_old = initial_flux(solver, (info.cells_x, info.cells_y, info.groups), random=True)
     tools._normalize_flux(flux_old, info)
 
+    # Coarse mesh finite difference acceleration
+    coarse = None
+    if info.eigen_acceleration == 2:
+        coarse = CMFD(xs_total, xs_scatter, xs_fission, medium_map, delta_x, \
+                      delta_y, geometry.bc_x, geometry.bc_y, geometry.coarse_x, \
+                      geometry.coarse_y)
+
+    # Wielandt shift or Chebyshev extrapolation of the power iteration
+    outer = None
+    if info.eigen_acceleration == 3:
+        outer = Wielandt(xs_scatter, xs_fission, solver.wielandt_shift)
+    elif info.eigen_acceleration == 4:
+        outer = Chebyshev()
+
+    # Angular flux buffer filled by the last sweep, only when asked
+    cdef double[:,:,:,:] angular = None
+    if (info.flux_output == 2) and info.angular and (coarse is None) \
+            and (info.eigen_solver == 1) and mg.sweep_capture(info):
+        angular = tools.array_4d(info.cells_x, info.cells_y, \
+                                 info.angles * info.angles, info.groups)
+
+    # Newton-Krylov starts from a loosely converged power iteration
+    guess = info
+    if info.eigen_solver == 2:
+        guess.tol_keff = fmax(info.tol_keff, NEWTON_GUESS)
+
     # Solve using the power iteration
-    flux = power_iteration(flux_old, xs_total, xs_scatter, xs_fission, medium_map, \
-                        delta_x, delta_y, angle_x, angle_y, angle_w, info, keff)
+    flux = power_iteration(flux_old, xs_total, xs_scatter, xs_fission, chi, \
+                        nu_fission, medium_map, delta_x, delta_y, angle_x, \
+                        angle_y, angle_w, guess, keff, coarse, angular, \
+                        outer, solver.flux_guess is not None)
+
+    # Solve for the flux and keff together with Newton's method
+    if info.eigen_solver == 2:
+        flux = newton_krylov(flux, keff, xs_total, xs_scatter, xs_fission, \
+                        chi, nu_fission, medium_map, delta_x, delta_y, \
+                        angle_x, angle_y, angle_w, info)
 
     # Return scalar flux at cell centers and keff
     if (info.angular == False) and (info.flux_at_edges == 0):
         return np.asarray(flux), keff[0]
 
+    # Angular flux from the last sweep
+    if angular is not None:
+        return np.asarray(angular)
+
     # For returning angular flux or flux at cell edges
     return known_flux(flux, keff[0], materials, geometry, quadrature, params)
 
 
 cdef double[:,:,:] power_iteration(double[:,:,:]& flux_guess, \
         double[:,:]& xs_total, double[:,:,:]& xs_scatter, \
-        double[:,:,:]& xs_fission, int[:,:]& medium_map, double[:]& delta_x, \
-        double[:]& delta_y, double[:]& angle_x, double[:]& angle_y, \
-        double[:]& angle_w, params info, double[:]& keff):
+        double[:,:,:]& xs_fission, double[:,:] chi, double[:,:] nu_fission, \
+        int[:,:]& medium_map, double[:]& delta_x, double[:]& delta_y, \
+        double[:]& angle_x, double[:]& angle_y, double[:]& angle_w, \
+        params info, double[:]& keff, object coarse=None, \
+        double[:,:,:,:] angular=None, object outer=None, \
+        bint warm=False):
 
     # Initialize flux
     flux = tools.array_3d(info.cells_x, info.cells_y, info.groups)
@@ -86,41 +154,285 @@ cdef double[:,:,:] power_iteration(double[:,:,:]& flux_guess, \
     boundary_x = tools.array_4d(2, 1, 1, 1)
     boundary_y = tools.array_4d(2, 1, 1, 1)
 
+    # CMFD source (isotropic, one angle) and net currents at cell edges
+    cdef params isotropic = info
+    isotropic.angles = 1
+    if coarse is not None:
+        tally = tools.array_4d(info.cells_x, info.cells_y, 1, info.groups)
+        current_x = tools.array_3d(info.cells_x + 1, info.cells_y, info.groups)
+        current_y = tools.array_3d(info.cells_x, info.cells_y + 1, info.groups)
+    cmfd_keff = None
+
     # Set convergence limits
     cdef bint converged = False
     cdef int count = 1
     cdef double change = 0.0
+    cdef double last_change = 0.0
+
+    # The angular flux is kept from iterations expected to be the last
+    cdef bint capture = False
+
+    # Inner solve parameters of each outer iteration
+    cdef params inner = info
+    cdef bint final = False
+    cdef double loose
+
+    # Eigenvalue dividing the fission source and scatter of the inner
+    # solves, shifted by the Wielandt acceleration
+    cdef double shifted
+    cdef double[:,:,:] xs_inner = xs_scatter
 
     # Iterate until convergence
     while not (converged):
 
-        # Update power source term
-        tools._fission_source(flux_old, xs_fission, source, medium_map, \
-                              info, keff[0])
-
-        # Solve for scalar flux
-        flux = mg.multi_group(flux_old, xs_total, xs_scatter, source, \
+        # Accelerated outer iterations shift the eigenvalue and scatter
+        shifted = keff[0]
+        if outer is not None:
+            shifted = outer.eigenvalue(keff[0])
+            xs_inner = xs_scatter if outer.scatter() is None else outer.scatter()
+
+        # Update power source term (O(G) per cell for chi x nu_fission)
+        if chi is not None:
+            tools._fission_source_chi(flux_old, chi, nu_fission, source, \
+                                      medium_map, info, shifted)
+        else:
+            tools._fission_source(flux_old, xs_fission, source, medium_map, \
+                                  info, shifted)
+
+        # Iteration predicted (from the last two changes) to be the last,
+        # inner solves stay tight from then on
+        final = final or (count >= info.max_iter_keff) or ((count > 1) \
+                and (change < info.tol_keff)) or ((count > 2) \
+                and (change * change < info.tol_keff * last_change))
+
+        # Loose inner solves until then, following the source change (a
+        # warm started first outer is already close)
+        inner = info
+        if (info.inner_tolerance == 2) and not final:
+            loose = INNER_LOOSE if (count == 1) and not warm \
+                    else fmin(INNER_LOOSE, INNER_RATIO * change)
+            inner.tol_energy = fmax(info.tol_energy, loose)
+            inner.tol_angular = fmax(info.tol_angular, loose)
+
+        # Solve for scalar flux, keeping the angular flux in the last one
+        capture = (angular is not None) and final
+        if capture:
+            flux = mg.multi_group(flux_old, xs_total, xs_inner, source, \
                             boundary_x, boundary_y, medium_map, delta_x, \
-                            delta_y, angle_x, angle_y, angle_w, info)
+                            delta_y, angle_x, angle_y, angle_w, inner, angular)
+            # Same scaling as the flux normalization below
+            np.asarray(angular)[...] /= np.linalg.norm(np.asarray(flux))
+        else:
+            flux = mg.multi_group(flux_old, xs_total, xs_inner, source, \
+                            boundary_x, boundary_y, medium_map, delta_x, \
+                            delta_y, angle_x, angle_y, angle_w, inner)
+
+        # Rescale flux and keffective with the coarse mesh solution, from
+        # the net currents of a sweep with the converged source
+        if coarse is not None:
+            tools._source_total(tally, flux, xs_scatter, medium_map, source, \
+                                isotropic)
+            current_x[:,:,:] = 0.0
+            current_y[:,:,:] = 0.0
+            mg._known_source_current(current_x, current_y, xs_total, tally, \
+                                boundary_x, boundary_y, medium_map, delta_x, \
+                                delta_y, angle_x, angle_y, angle_w, info)
+            cmfd_keff = coarse.update(flux, current_x, current_y, keff[0])
 
         # Calculate k-effective
-        keff[0] = tools._update_keffective(flux, flux_old, xs_fission, \
-                                           medium_map, info, keff[0])
+        if cmfd_keff is not None:
+            keff[0] = cmfd_keff
+        elif chi is not None:
+            keff[0] = tools._update_keffective_chi(flux, flux_old, chi, \
+                                    nu_fission, medium_map, info, shifted)
+        else:
+            keff[0] = tools._update_keffective(flux, flux_old, xs_fission, \
+                                               medium_map, info, shifted)
+        if outer is not None:
+            keff[0] = outer.keffective(keff[0])
         tools._normalize_flux(flux, info)
 
         # Check for convergence
+        last_change = change
         change = tools.group_convergence(flux, flux_old, info)
-        logger.info("Count: %s\tKeff: %.8f", str(count).zfill(3), keff[0])
-        converged = (change < info.tol_keff) or (count >= info.max_iter_keff)
+        logger.info("Count: %s\tKeff: %.8f\tInner tolerance: %.1e", \
+                    str(count).zfill(3), keff[0], inner.tol_energy)
+        converged = ((change < info.tol_keff) and (final \
+                    or (info.inner_tolerance == 1))) or (count >= info.max_iter_keff)
         count += 1
 
+        # Move the Wielandt shift or extrapolate the flux
+        if (outer is not None) and not converged:
+            outer.update(flux, flux_old, keff[0], change)
+
         # Update old flux
         flux_old[:,:,:] = flux[:,:,:]
 
+    # Prediction missed: one sweep with the converged source
+    if (angular is not None) and not capture:
+        tools._source_total_critical(source, flux, xs_scatter, xs_fission, \
+                                     medium_map, keff[0], info)
+        angular[:,:,:,:] = mg._known_source_angular(xs_total, source, \
+                        boundary_x, boundary_y, medium_map, delta_x, delta_y, \
+                        angle_x, angle_y, angle_w, info)
+
     logger.info("Convergence: %2.6e", change)
     return flux[:,:,:]
 
 
+cdef class _NewtonOperator:
+    # Jacobian of the residual [phi - A^{-1} F phi / k, (1 - phi.phi) / 2]
+    # in (phi, k), with A = L - S. Each product is one multigroup solve.
+    cdef double[:,:] xs_total
+    cdef double[:,:,:] xs_scatter
+    cdef double[:,:,:] xs_fission
+    cdef double[:,:] chi
+    cdef double[:,:] nu_fission
+    cdef int[:,:] medium_map
+    cdef double[:] delta_x
+    cdef double[:] delta_y
+    cdef double[:] angle_x
+    cdef double[:] angle_y
+    cdef double[:] angle_w
+    cdef double[:,:,:,:] source
+    cdef double[:,:,:,:] boundary_x
+    cdef double[:,:,:,:] boundary_y
+    cdef double[:,:,:] zero
+    cdef double[:,:,:] flux
+    cdef double[:,:,:] power
+    cdef double keff
+    cdef int solves
+    cdef params info
+
+    cdef double[:,:,:] _power(self, double[:,:,:] flux, double[:,:,:] guess):
+        # A^{-1} F flux / keff, warm started from guess
+        if self.chi is not None:
+            tools._fission_source_chi(flux, self.chi, self.nu_fission, \
+                            self.source, self.medium_map, self.info, self.keff)
+        else:
+            tools._fission_source(flux, self.xs_fission, self.source, \
+                            self.medium_map, self.info, self.keff)
+        self.solves += 1
+        return mg.multi_group(guess, self.xs_total, self.xs_scatter, \
+                            self.source, self.boundary_x, self.boundary_y, \
+                            self.medium_map, self.delta_x, self.delta_y, \
+                            self.angle_x, self.angle_y, self.angle_w, self.info)
+
+    def residual(self, flux, double keff):
+        # Residual at (flux, keff), which becomes the Jacobian point
+        self.flux = flux
+        self.keff = keff
+        self.power = self._power(self.flux, self.flux)
+        return np.append((flux - np.asarray(self.power)).ravel(), \
+                         0.5 * (1.0 - np.sum(flux * flux)))
+
+    def matvec(self, vector):
+        # Jacobian times the direction (d_phi, d_k)
+        cdef int size = self.info.cells_x * self.info.cells_y * self.info.groups
+        cdef double[:,:,:] direction = np.ascontiguousarray(vector[:size]) \
+                .reshape(self.info.cells_x, self.info.cells_y, self.info.groups)
+        power = np.asarray(self._power(direction, self.zero)).ravel()
+        result = np.empty(size + 1)
+        result[:size] = vector[:size] - power \
+                        + np.asarray(self.power).ravel() * (vector[size] / self.keff)
+        result[size] = -np.dot(np.asarray(self.flux).ravel(), vector[:size])
+        return result
+
+
+cdef double[:,:,:] newton_krylov(double[:,:,:]& flux_guess, double[:]& keff, \
+        double[:,:]& xs_total, double[:,:,:]& xs_scatter, \
+        double[:,:,:]& xs_fission, double[:,:] chi, double[:,:] nu_fission, \
+        int[:,:]& medium_map, double[:]& delta_x, double[:]& delta_y, \
+        double[:]& angle_x, double[:]& angle_y, double[:]& angle_w, \
+        params info):
+
+    # Initialize Jacobian operator
+    cdef _NewtonOperator jacobian = _NewtonOperator.__new__(_NewtonOperator)
+    jacobian.xs_total = xs_total
+    jacobian.xs_scatter = xs_scatter
+    jacobian.xs_fission = xs_fission
+    jacobian.chi = chi
+    jacobian.nu_fission = nu_fission
+    jacobian.medium_map = medium_map
+    jacobian.delta_x = delta_x
+    jacobian.delta_y = delta_y
+    jacobian.angle_x = angle_x
+    jacobian.angle_y = angle_y
+    jacobian.angle_w = angle_w
+    jacobian.source = tools.array_4d(info.cells_x, info.cells_y, 1, info.groups)
+    jacobian.boundary_x = tools.array_4d(2, 1, 1, 1)
+    jacobian.boundary_y = tools.array_4d(2, 1, 1, 1)
+    jacobian.zero = tools.array_3d(info.cells_x, info.cells_y, info.groups)
+    jacobian.solves = 0
+    jacobian.info = info
+
+    # Initialize flux
+    flux = np.array(flux_guess, dtype=np.float64)
+    cdef int size = info.cells_x * info.cells_y * info.groups
+    matrix = LinearOperator((size + 1, size + 1), matvec=jacobian.matvec, \
+                            dtype=np.float64)
+
+    # Set convergence limits
+    cdef bint converged = False
+    cdef int count = 1
+    cdef double change = 0.0
+    cdef double norm, scale
+    cdef int status, halve
+    cdef bint decrease
+
+    # Residual of the power iteration guess
+    residual = jacobian.residual(flux, keff[0])
+    norm = np.linalg.norm(residual)
+
+    # Iterate until convergence
+    while not (converged):
+
+        # Check for convergence, with the change of a power iteration
+        change = tools.group_convergence(jacobian.power, jacobian.flux, info)
+        logger.info("Newton: %s\tKeff: %.8f\tChange: %.2e\tSolves: %d", \
+                    str(count).zfill(3), keff[0], change, jacobian.solves)
+        converged = (change < info.tol_keff) or (count >= info.max_iter_keff)
+        if converged:
+            break
+        count += 1
+
+        # Newton step from GMRES
+        step, status = gmres(matrix, -residual, rtol=NEWTON_FORCING, atol=0.0, \
+                             restart=NEWTON_RESTART, maxiter=info.max_iter_energy)
+        if status != 0:
+            logger.info("Newton GMRES: status %d", status)
+
+        # Halve the step until the residual drops
+        power = np.array(jacobian.power)
+        decrease = False
+        scale = 1.0
+        for halve in range(NEWTON_HALVINGS + 1):
+            trial = flux + scale * step[:size].reshape(info.cells_x, \
+                                    info.cells_y, info.groups)
+            residual = jacobian.residual(trial, keff[0] + scale * step[size])
+            if np.linalg.norm(residual) < (1.0 - 1e-4 * scale) * norm:
+                decrease = True
+                break
+            scale *= 0.5
+
+        # No sufficient decrease: keep the iterate and take a power step
+        if not decrease:
+            logger.info("Newton: line search failed, power iteration step")
+            scale = np.linalg.norm(power)
+            trial = power / scale
+            residual = jacobian.residual(trial, keff[0] * scale \
+                                         / np.linalg.norm(flux))
+        flux = trial
+        keff[0] = jacobian.keff
+        norm = np.linalg.norm(residual)
+
+    # Normalize flux
+    flux = jacobian.power
+    tools._normalize_flux(flux, info)
+    logger.info("Convergence: %2.6e", change)
+    return flux
+
+
 def known_flux(double[:,:,:] flux, keff,  materials, geometry, quadrature, params):
     # Unpack Python DataTypes to Cython memoryviews
     cdef double[:,:] xs_total = materials.total
@@ -180,7 +492,7 @@ def nearby_power_iteration(double[:,:,:,:] residual, double n_rate, materials, \
     parameters._check_critical2d_nearby_power(info)
 
     # Initialize flux
-    flux_old = np.random.rand(info.cells_x, info.cells_y, info.groups)
+    flux_old = initial_flux(solver, (info.cells_x, info.cells_y, info.groups), random=True)
     tools._normalize_flux(flux_old, info)
 
     # Initialize keffective
@@ -40,7 +40,8 @@ cdef double[:,:,:,:] array_4d(int dim1, int dim2, int dim3, int dim4)
 ################################################################################
 cdef double group_convergence(double[:,:]& arr1, double[:,:]& arr2, params info)
 
-cdef double angle_convergence(double[:]& arr1, double[:]& arr2, params info)
+cdef double angle_convergence(double[:]& arr1, double[:]& arr2, \
+        params info) noexcept nogil
 
 ################################################################################
 # Material Interface functions
@@ -53,9 +54,6 @@ cdef int[:] _material_index(int[:] medium_map, params info)
 cdef void _xs_matrix(double[:,:,:]& mat1, double[:,:,:]& mat2, \
         double[:,:,:]& mat3, params info)
 
-cdef void _dmd_subtraction(double[:,:,:]& y_minus, double[:,:,:]& y_plus, \
-        double[:,:]& flux, double[:,:]& flux_old, int kk, params info)
-
 cdef void _off_scatter(double[:,:]& flux, double[:,:]& flux_old, \
         int[:]& medium_map, double[:,:,:]& xs_matrix, \
         double[:]& off_scatter, params info, int group)
@@ -74,6 +72,27 @@ cdef void _angular_to_scalar(double[:,:,:]& angular_flux, \
 cdef void _angular_edge_to_scalar(double[:,:,:]& angular_flux, \
         double[:,:]& scalar_flux, double[:]& angle_w, params info)
 
+################################################################################
+# Diffusion Synthetic Acceleration
+################################################################################
+cdef bint dsa_factor(double[:]& xs_total, double[:]& xs_scatter, \
+        int[:]& medium_map, double[:]& delta_x, double[:]& angle_x, \
+        double[:]& angle_w, double* lower, double* diag, double* upper, \
+        params info) noexcept nogil
+
+cdef void dsa_correction(double[:]& flux, double[:]& flux_old, \
+        double[:]& xs_scatter, int[:]& medium_map, double[:]& delta_x, \
+        double* lower, double* diag, double* upper, double* edge, \
+        params info) noexcept nogil
+
+cdef void _dsa_solve(double* lower, double* diag, double* upper, \
+        double* edge, params info) noexcept nogil
+
+cdef void tgs_correction(double[:,:]& flux, double[:,:]& flux_old, \
+        double[:,:,:]& xs_scatter, double[:,:]& spectrum, int[:]& medium_map, \
+        double[:]& delta_x, double* lower, double* diag, double* upper, \
+        double* edge, int first, params info) noexcept nogil
+
 ################################################################################
 # Time Dependent functions
 ################################################################################
@@ -103,6 +122,9 @@ cdef void _time_right_side(double[:,:,:]& q_star, double[:,:]& flux, \
 cdef double[:,:,:] _expand_boundary_x(double[:,:,:]& half_bc, \
         double[:]& angle_x, params info)
 
+cdef void _expand_boundary_x_into(double[:,:,:]& full_bc, \
+        double[:,:,:]& half_bc, double[:]& angle_x, params info)
+
 ################################################################################
 # Criticality functions
 ################################################################################
@@ -116,6 +138,14 @@ cdef void _fission_source(double[:,:]& flux, double[:,:,:]& xs_fission, \
 cdef double _update_keffective(double[:,:] flux_new, double[:,:] flux_old, \
         double[:,:,:] xs_fission, int[:] medium_map, params info, double keff)
 
+cdef void _fission_source_chi(double[:,:]& flux, double[:,:]& chi, \
+        double[:,:]& nu_fission, double[:,:,:]& source, int[:]& medium_map, \
+        params info, double keff)
+
+cdef double _update_keffective_chi(double[:,:] flux_new, double[:,:] flux_old, \
+        double[:,:] chi, double[:,:] nu_fission, int[:] medium_map, \
+        params info, double keff)
+
 cdef void _source_total_critical(double[:,:,:]& source, double[:,:]& flux, \
         double[:,:,:]& xs_scatter, double[:,:,:]& xs_fission, \
         int[:]& medium_map, double keff, params info)
@@ -21,10 +21,15 @@
 # distutils: extra_compile_args = -O3 -march=native -ffast-math
 
 
+from libc.math cimport fabs, fmax
+from libc.stdlib cimport free, malloc
+
 from ants.cytools_shared cimport _fission_matrix as _shared_fission_matrix
 from ants.cytools_shared cimport _normalize_flux as _shared_normalize_flux
+from ants.cytools_shared cimport _scatter_band, _scatter_bands
 from ants.cytools_shared cimport _total_velocity as _shared_total_velocity
 from ants.cytools_shared cimport _update_keffective as _shared_update_keffective
+from ants.cytools_shared cimport _update_keffective_chi as _shared_update_keffective_chi
 from ants.cytools_shared cimport angle_convergence as _shared_angle_convergence
 from ants.cytools_shared cimport array_1d as _shared_array_1d
 from ants.cytools_shared cimport array_2d as _shared_array_2d
@@ -66,7 +71,8 @@ cdef double group_convergence(double[:,:]& arr1, double[:,:]& arr2, params info)
     return _shared_group_convergence(_arr1, _arr2, info)
 
 
-cdef double angle_convergence(double[:]& arr1, double[:]& arr2, params info):
+cdef double angle_convergence(double[:]& arr1, double[:]& arr2, \
+        params info) noexcept nogil:
     cdef double[:] _arr1 = arr1
     cdef double[:] _arr2 = arr2
     return _shared_angle_convergence(_arr1, _arr2, info)
@@ -108,19 +114,6 @@ cdef void _xs_matrix(double[:,:,:]& mat1, double[:,:,:]& mat2, \
                 mat1[mat,og,ig] = (mat2[mat,og,ig] + mat3[mat,og,ig])
 
 
-cdef void _dmd_subtraction(double[:,:,:]& y_minus, double[:,:,:]& y_plus, \
-        double[:,:]& flux, double[:,:]& flux_old, int kk, params info):
-    # Initialize iterables
-    cdef int ii, gg
-    for ii in range(info.cells_x):
-        for gg in range(info.groups):
-            if (kk < info.dmd_snapshots - 1):
-                y_minus[ii,gg,kk] = (flux[ii,gg] - flux_old[ii,gg])
-
-            if (kk > 0):
-                y_plus[ii,gg,kk-1] = (flux[ii,gg] - flux_old[ii,gg])
-
-
 cdef void _off_scatter(double[:,:]& flux, double[:,:]& flux_old, \
         int[:]& medium_map, double[:,:,:]& xs_matrix, \
         double[:]& off_scatter, params info, int group):
@@ -128,16 +121,22 @@ cdef void _off_scatter(double[:,:]& flux, double[:,:]& flux_old, \
     # Initialize iterables
     cdef int ii, mat, og
 
+    # Nonzero columns of the group row for each material
+    cdef int* band = <int*> malloc(2 * info.materials * sizeof(int))
+    _scatter_band(xs_matrix, group, band)
+
     # Zero out previous values
     off_scatter[:] = 0.0
 
     for ii in range(info.cells_x):
         mat = medium_map[ii]
-        for og in range(0, group):
+        for og in range(band[2 * mat], min(group, band[2 * mat + 1])):
             off_scatter[ii] += xs_matrix[mat,group,og] * flux[ii,og]
-        for og in range(group + 1, info.groups):
+        for og in range(max(group + 1, band[2 * mat]), band[2 * mat + 1]):
             off_scatter[ii] += xs_matrix[mat,group,og] * flux_old[ii,og]
 
+    free(band)
+
 
 cdef void _off_scatter_jacobi(double[:,:]& flux_old, int[:]& medium_map, \
         double[:,:,:]& xs_matrix, double[:,:]& off_scatter_all, \
@@ -147,22 +146,28 @@ cdef void _off_scatter_jacobi(double[:,:]& flux_old, int[:]& medium_map, \
     # removes the sequential Gauss-Seidel data dependency and allows groups
     # to be swept in parallel.  Both methods converge to the same fixed point.
     cdef int ii, mat, og
+    cdef int* band = <int*> malloc(2 * info.materials * sizeof(int))
+    _scatter_band(xs_matrix, group, band)
 
     for ii in range(info.cells_x):
         off_scatter_all[group, ii] = 0.0
         mat = medium_map[ii]
-        for og in range(info.groups):
+        for og in range(band[2 * mat], band[2 * mat + 1]):
             if og != group:
                 off_scatter_all[group, ii] += xs_matrix[mat, group, og] * flux_old[ii, og]
 
+    free(band)
+
 
 cdef void _source_total(double[:,:,:]& source, double[:,:]& flux, \
         double[:,:,:]& xs_matrix, int[:]& medium_map, \
         double[:,:,:]& external, params info):
     # Create (sigma_s + sigma_f) * phi + external function
     # Initialize iterables
-    cdef int ii, nn, ig, og, nn_q, og_q, mat
+    cdef int ii, nn, ig, og, nn_q, og_q, mat, loc
     cdef double one_group
+    # Nonzero columns of every row
+    cdef int* band = _scatter_bands(xs_matrix)
     # Zero out previous values
     source[:,:,:] = 0.0
     for ii in range(info.cells_x):
@@ -170,8 +175,9 @@ cdef void _source_total(double[:,:,:]& source, double[:,:]& flux, \
 
         for og in range(info.groups):
             og_q = 0 if external.shape[2] == 1 else og
+            loc = 2 * (og * info.materials + mat)
             one_group = 0.0
-            for ig in range(info.groups):
+            for ig in range(band[loc], band[loc + 1]):
                 one_group += flux[ii,ig] * xs_matrix[mat,og,ig]
 
             for nn in range(info.angles):
@@ -179,6 +185,8 @@ cdef void _source_total(double[:,:,:]& source, double[:,:]& flux, \
                 source[ii,nn,og] += one_group
                 source[ii,nn,og] += external[ii,nn_q,og_q]
 
+    free(band)
+
 
 cdef void _angular_to_scalar(double[:,:,:]& angular_flux, \
         double[:,:]& scalar_flux, double[:]& angle_w, params info):
@@ -207,6 +215,136 @@ cdef void _angular_edge_to_scalar(double[:,:,:]& angular_flux, \
                                         + angular_flux[ii+1,nn,gg])
 
 
+################################################################################
+# Diffusion Synthetic Acceleration
+#
+# The within-group error left by a source iteration sweep is estimated with
+#       -d/dx D df/dx + (sigma_t - sigma_s) f = sigma_s (phi^(l+1/2) - phi^l)
+# discretized on the cell edges in the diamond difference consistent form:
+# cell ii couples its edges with D / h for leakage and sigma_a h / 4 times
+# the edge sum for absorption, and a vacuum edge adds the Marshak term
+# sum_n w_n |mu_n| f.  The cell correction is the average of its edges.
+################################################################################
+
+cdef bint dsa_factor(double[:]& xs_total, double[:]& xs_scatter, \
+        int[:]& medium_map, double[:]& delta_x, double[:]& angle_x, \
+        double[:]& angle_w, double* lower, double* diag, double* upper, \
+        params info) noexcept nogil:
+    # Build the (I + 1) edge system and factor it in place: lower holds the
+    # elimination multipliers and diag the pivots.  Returns False if the
+    # system is singular (no absorption or leakage), so DSA is skipped.
+
+    # Initialize iterables
+    cdef int ii, nn, mat
+    cdef double coef, absorb, pivot
+    cdef double marshak = 0.0
+
+    for nn in range(info.angles):
+        marshak += angle_w[nn] * fabs(angle_x[nn])
+
+    for ii in range(info.cells_x + 1):
+        lower[ii] = 0.0
+        diag[ii] = 0.0
+        upper[ii] = 0.0
+
+    for ii in range(info.cells_x):
+        mat = medium_map[ii]
+        coef = 1.0 / (3.0 * fmax(xs_total[mat], 1e-8) * delta_x[ii])
+        absorb = 0.25 * fmax(xs_total[mat] - xs_scatter[mat], 0.0) * delta_x[ii]
+        diag[ii] += coef + absorb
+        diag[ii + 1] += coef + absorb
+        upper[ii] += absorb - coef
+        lower[ii + 1] += absorb - coef
+
+    # Vacuum boundaries
+    if info.bc_x[0] == 0:
+        diag[0] += marshak
+    if info.bc_x[1] == 0:
+        diag[info.cells_x] += marshak
+
+    # Tridiagonal LU factorization
+    for ii in range(1, info.cells_x + 1):
+        lower[ii] = lower[ii] / diag[ii - 1]
+        pivot = diag[ii]
+        diag[ii] = diag[ii] - lower[ii] * upper[ii - 1]
+        if diag[ii] <= 1e-12 * pivot:
+            return False
+    return True
+
+
+cdef void dsa_correction(double[:]& flux, double[:]& flux_old, \
+        double[:]& xs_scatter, int[:]& medium_map, double[:]& delta_x, \
+        double* lower, double* diag, double* upper, double* edge, \
+        params info) noexcept nogil:
+    # Add the diffusion estimate of the error in flux, the sweep of
+    # flux_old, to flux.  edge is (I + 1) scratch for the edge correction.
+
+    # Initialize iterables
+    cdef int ii, mat
+    cdef double residual
+
+    for ii in range(info.cells_x + 1):
+        edge[ii] = 0.0
+    for ii in range(info.cells_x):
+        mat = medium_map[ii]
+        residual = 0.5 * xs_scatter[mat] * delta_x[ii] * (flux[ii] - flux_old[ii])
+        edge[ii] += residual
+        edge[ii + 1] += residual
+
+    _dsa_solve(lower, diag, upper, edge, info)
+
+    for ii in range(info.cells_x):
+        flux[ii] += 0.5 * (edge[ii] + edge[ii + 1])
+
+
+cdef void _dsa_solve(double* lower, double* diag, double* upper, \
+        double* edge, params info) noexcept nogil:
+    # Solve the factored edge system in place, edge holds the right side
+    cdef int ii
+    # Forward elimination and back substitution
+    for ii in range(1, info.cells_x + 1):
+        edge[ii] -= lower[ii] * edge[ii - 1]
+    edge[info.cells_x] /= diag[info.cells_x]
+    for ii in range(info.cells_x - 1, -1, -1):
+        edge[ii] = (edge[ii] - upper[ii] * edge[ii + 1]) / diag[ii]
+
+
+cdef void tgs_correction(double[:,:]& flux, double[:,:]& flux_old, \
+        double[:,:,:]& xs_scatter, double[:,:]& spectrum, int[:]& medium_map, \
+        double[:]& delta_x, double* lower, double* diag, double* upper, \
+        double* edge, int first, params info) noexcept nogil:
+    # Two-grid correction of the upscatter groups [first, groups) after a
+    # Gauss-Seidel pass from flux_old to flux.  The error is driven by the
+    # upscatter residual sum_g sum_{g' > g} sigma_s(g' -> g) (phi^(l+1/2) -
+    # phi^l)_g', estimated with the collapsed one-group diffusion system
+    # (dsa_factor with the two-grid cross sections) and spread over the
+    # groups with the material spectrum.
+
+    # Initialize iterables
+    cdef int ii, gg, og, mat
+    cdef double residual, correction
+
+    for ii in range(info.cells_x + 1):
+        edge[ii] = 0.0
+    for ii in range(info.cells_x):
+        mat = medium_map[ii]
+        residual = 0.0
+        for gg in range(first, info.groups):
+            for og in range(gg + 1, info.groups):
+                residual += xs_scatter[mat, gg, og] * (flux[ii, og] - flux_old[ii, og])
+        residual = 0.5 * delta_x[ii] * residual
+        edge[ii] += residual
+        edge[ii + 1] += residual
+
+    _dsa_solve(lower, diag, upper, edge, info)
+
+    for ii in range(info.cells_x):
+        mat = medium_map[ii]
+        correction = 0.5 * (edge[ii] + edge[ii + 1])
+        for gg in range(first, info.groups):
+            flux[ii, gg] += spectrum[mat, gg - first] * correction
+
+
 ################################################################################
 # Time Dependent functions
 ################################################################################
@@ -316,18 +454,21 @@ cdef void _time_right_side(double[:,:,:]& q_star, double[:,:]& flux, \
         double[:,:,:]& xs_scatter, int[:]& medium_map, params info):
     # Create (sigma_s + sigma_f) * phi + external + 1/(v*dt) * psi function
     # Initialize iterables
-    cdef int ii, nn, ig, og, mat
+    cdef int ii, nn, ig, og, mat, loc
     cdef double one_group
+    # Nonzero columns of every row
+    cdef int* band = _scatter_bands(xs_scatter)
     # Iterate over dimensions
     for ii in range(info.cells_x):
         mat = medium_map[ii]
         for og in range(info.groups):
-            # loc = og + info.groups * (nn + ii * info.angles)
+            loc = 2 * (og * info.materials + mat)
             one_group = 0.0
-            for ig in range(info.groups):
+            for ig in range(band[loc], band[loc + 1]):
                 one_group += flux[ii,ig] * xs_scatter[mat,og,ig]
             for nn in range(info.angles):
                 q_star[ii,nn,og] += one_group
+    free(band)
 
 ################################################################################
 # Criticality functions
@@ -364,13 +505,42 @@ cdef double _update_keffective(double[:,:] flux_new, double[:,:] flux_old, \
     return _shared_update_keffective(flux_new, flux_old, xs_fission, medium_map, info, keff)
 
 
+cdef void _fission_source_chi(double[:,:]& flux, double[:,:]& chi, \
+        double[:,:]& nu_fission, double[:,:,:]& source, int[:]& medium_map, \
+        params info, double keff):
+    # Fission source (I x G) with the fission matrix chi x nu_fission:
+    # one fission rate per cell, spread over the groups by chi
+    # Initialize iterables
+    cdef int ii, mat, gg
+    cdef double rate
+    for ii in range(info.cells_x):
+        mat = medium_map[ii]
+        rate = 0.0
+        for gg in range(info.groups):
+            rate += nu_fission[mat,gg] * flux[ii,gg]
+        rate /= keff
+        for gg in range(info.groups):
+            source[ii,0,gg] = chi[mat,gg] * rate
+
+
+cdef double _update_keffective_chi(double[:,:] flux_new, double[:,:] flux_old, \
+        double[:,:] chi, double[:,:] nu_fission, int[:] medium_map, \
+        params info, double keff):
+    return _shared_update_keffective_chi(flux_new, flux_old, chi, nu_fission, \
+                                         medium_map, info, keff)
+
+
 cdef void _source_total_critical(double[:,:,:]& source, double[:,:]& flux, \
         double[:,:,:]& xs_scatter, double[:,:,:]& xs_fission, \
         int[:]& medium_map, double keff, params info):
     # Create (sigma_s + sigma_f) * phi + external function
 
     # Initialize iterables
-    cdef int ii, ig, og, mat#, loc
+    cdef int ii, ig, og, mat, loc
+
+    # Nonzero columns of every row
+    cdef int* scatter_band = _scatter_bands(xs_scatter)
+    cdef int* fission_band = _scatter_bands(xs_fission)
 
     # Zero out previous values
     source[:,:,:] = 0.0
@@ -379,10 +549,14 @@ cdef void _source_total_critical(double[:,:,:]& source, double[:,:]& flux, \
     for ii in range(info.cells_x):
         mat = medium_map[ii]
         for og in range(info.groups):
-            # loc = og + info.groups * ii
-            for ig in range(info.groups):
-                source[ii,0,og] += (flux[ii,ig] * xs_fission[mat,og,ig]) / keff \
-                                 + (flux[ii,ig] * xs_scatter[mat,og,ig])
+            loc = 2 * (og * info.materials + mat)
+            for ig in range(fission_band[loc], fission_band[loc + 1]):
+                source[ii,0,og] += (flux[ii,ig] * xs_fission[mat,og,ig]) / keff
+            for ig in range(scatter_band[loc], scatter_band[loc + 1]):
+                source[ii,0,og] += flux[ii,ig] * xs_scatter[mat,og,ig]
+
+    free(scatter_band)
+    free(fission_band)
 
 
 ################################################################################
@@ -691,6 +865,14 @@ cdef double[:,:,:] _expand_boundary_x(double[:,:,:]& half_bc,
     #   half_bc[1, ii, gg] = right boundary source for the ii-th incoming
     #                         angle (angle_x < 0), in traversal order
     full_bc = array_3d(2, info.angles, info.groups)
+    _expand_boundary_x_into(full_bc, half_bc, angle_x, info)
+    return full_bc
+
+
+cdef void _expand_boundary_x_into(double[:,:,:]& full_bc, \
+        double[:,:,:]& half_bc, double[:]& angle_x, params info):
+    # _expand_boundary_x into an existing (2, angles, groups) array. Only
+    # the incoming angles are written, so the others keep their zeros
     cdef int nn, gg, ii_pos, ii_neg
     cdef bint bc_angle = (half_bc.shape[1] > 1)
     cdef bint bc_group = (half_bc.shape[2] > 1)
@@ -707,4 +889,3 @@ cdef double[:,:,:] _expand_boundary_x(double[:,:,:]& half_bc,
                 full_bc[1, nn, gg] = half_bc[1, ii_neg if bc_angle else 0, gg if bc_group else 0]
             if bc_angle:
                 ii_neg += 1
-    return full_bc
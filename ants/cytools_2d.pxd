@@ -47,7 +47,8 @@ cdef float[:,:,:,:,:] farray_5d(int dim1, int dim2, int dim3, int dim4, \
 cdef double group_convergence(double[:,:,:]& arr1, double[:,:,:]& arr2, \
         params info)
 
-cdef double angle_convergence(double[:,:]& arr1, double[:,:]& arr2, params info)
+cdef double angle_convergence(double[:,:]& arr1, double[:,:]& arr2, \
+        params info) noexcept nogil
 
 ################################################################################
 # Multigroup functions
@@ -55,9 +56,6 @@ cdef double angle_convergence(double[:,:]& arr1, double[:,:]& arr2, params info)
 cdef void _xs_matrix(double[:,:,:]& mat1, double[:,:,:]& mat2, \
     double[:,:,:]& mat3, params info)
 
-cdef void _dmd_subtraction(double[:,:,:,:]& y_minus, double[:,:,:,:]& y_plus, \
-        double[:,:,:]& flux, double[:,:,:]& flux_old, int kk, params info)
-
 cdef void _off_scatter(double[:,:,:]& flux, double[:,:,:]& flux_old, \
         int[:,:]& medium_map, double[:,:,:]& xs_matrix, \
         double[:,:]& off_scatter, params info, int group)
@@ -85,14 +83,49 @@ cdef void _angular_edge_to_scalar(double[:,:,:,:]& psi_x, double[:,:,:,:]& psi_y
         double[:,:,:]& scalar_flux, double[:]& angle_w, params info)
 
 cdef void initialize_known_y(double[:]& known_y, double[:,:]& boundary_y, \
-        double[:,:,:]& reflected_y, double[:]& angle_y, int angle, params info)
+        double[:,:,:]& reflected_y, double[:]& angle_y, int angle, \
+        params info) noexcept nogil
 
 cdef void initialize_known_x(double[:]& known_x, double[:,:]& boundary_x, \
-        double[:,:,:]& reflected_x, double[:]& angle_x, int angle, params info)
+        double[:,:,:]& reflected_x, double[:]& angle_x, int angle, \
+        params info) noexcept nogil
 
 cdef void update_reflector(double[:]& known_x, double[:,:,:]& reflected_x, \
         double[:]& angle_x, double[:]& known_y, double[:,:,:]& reflected_y, \
-        double[:]& angle_y, int angle, params info)
+        double[:]& angle_y, int[:,:]& reflect, int angle, \
+        params info) noexcept nogil
+
+cdef int[:,:] reflection_map(double[:]& angle_x, double[:]& angle_y, \
+        params info)
+
+################################################################################
+# Diffusion Synthetic Acceleration
+################################################################################
+cdef bint dsa_setup(double[:]& xs_total, double[:]& xs_scatter, \
+        int[:,:]& medium_map, double[:]& delta_x, double[:]& delta_y, \
+        double[:]& angle_x, double[:]& angle_y, double[:]& angle_w, \
+        double* boundary, double* precond, params info) noexcept nogil
+
+cdef void _dsa_multiply(double* vector, double* product, double[:]& xs_total, \
+        double[:]& xs_scatter, int[:,:]& medium_map, double[:]& delta_x, \
+        double[:]& delta_y, double* boundary, params info) noexcept nogil
+
+cdef void dsa_correction(double[:,:]& flux, double[:,:]& flux_old, \
+        double[:]& xs_total, double[:]& xs_scatter, int[:,:]& medium_map, \
+        double[:]& delta_x, double[:]& delta_y, double* boundary, \
+        double* precond, double* work, params info) noexcept nogil
+
+cdef void _dsa_solve(double[:]& xs_total, double[:]& xs_scatter, \
+        int[:,:]& medium_map, double[:]& delta_x, double[:]& delta_y, \
+        double* boundary, double* precond, double* work, \
+        params info) noexcept nogil
+
+cdef void tgs_correction(double[:,:,:]& flux, double[:,:,:]& flux_old, \
+        double[:,:,:]& xs_scatter, double[:,:]& spectrum, \
+        double[:]& coarse_total, double[:]& coarse_scatter, \
+        int[:,:]& medium_map, double[:]& delta_x, double[:]& delta_y, \
+        double* boundary, double* precond, double* work, int first, \
+        params info) noexcept nogil
 
 ################################################################################
 # Time Dependent functions
@@ -142,6 +175,12 @@ cdef double[:,:,:,:] _expand_boundary_x(double[:,:,:,:]& half_bc, \
 cdef double[:,:,:,:] _expand_boundary_y(double[:,:,:,:]& half_bc, \
         double[:]& angle_y, params info)
 
+cdef void _expand_boundary_x_into(double[:,:,:,:]& full_bc, \
+        double[:,:,:,:]& half_bc, double[:]& angle_x, params info)
+
+cdef void _expand_boundary_y_into(double[:,:,:,:]& full_bc, \
+        double[:,:,:,:]& half_bc, double[:]& angle_y, params info)
+
 ################################################################################
 # Criticality functions
 ################################################################################
@@ -156,6 +195,14 @@ cdef void _fission_source(double[:,:,:]& flux, double[:,:,:]& xs_fission, \
 cdef double _update_keffective(double[:,:,:] flux_new, double[:,:,:] flux_old, \
         double[:,:,:] xs_fission, int[:,:] medium_map, params info, double keff)
 
+cdef void _fission_source_chi(double[:,:,:]& flux, double[:,:]& chi, \
+        double[:,:]& nu_fission, double[:,:,:,:]& source, \
+        int[:,:]& medium_map, params info, double keff)
+
+cdef double _update_keffective_chi(double[:,:,:] flux_new, \
+        double[:,:,:] flux_old, double[:,:] chi, double[:,:] nu_fission, \
+        int[:,:] medium_map, params info, double keff)
+
 cdef void _source_total_critical(double[:,:,:,:]& source, \
         double[:,:,:]& flux, double[:,:,:]& xs_scatter, \
         double[:,:,:]& xs_fission, int[:,:]& medium_map, double keff, \
@@ -22,11 +22,15 @@
 
 from cython.parallel import prange
 from cython.view cimport array as cvarray
+from libc.math cimport fabs, fmax
+from libc.stdlib cimport free, malloc
 
 from ants.cytools_shared cimport _fission_matrix as _shared_fission_matrix
 from ants.cytools_shared cimport _normalize_flux as _shared_normalize_flux
+from ants.cytools_shared cimport _scatter_band, _scatter_bands
 from ants.cytools_shared cimport _total_velocity as _shared_total_velocity
 from ants.cytools_shared cimport _update_keffective as _shared_update_keffective
+from ants.cytools_shared cimport _update_keffective_chi as _shared_update_keffective_chi
 from ants.cytools_shared cimport angle_convergence as _shared_angle_convergence
 from ants.cytools_shared cimport array_1d as _shared_array_1d
 from ants.cytools_shared cimport array_2d as _shared_array_2d
@@ -81,7 +85,8 @@ cdef double group_convergence(double[:,:,:]& arr1, double[:,:,:]& arr2, \
     return _shared_group_convergence(_arr1, _arr2, info)
 
 
-cdef double angle_convergence(double[:,:]& arr1, double[:,:]& arr2, params info):
+cdef double angle_convergence(double[:,:]& arr1, double[:,:]& arr2, \
+        params info) noexcept nogil:
     cdef double[:,:] _arr1 = arr1
     cdef double[:,:] _arr2 = arr2
     return _shared_angle_convergence(_arr1, _arr2, info)
@@ -100,33 +105,24 @@ cdef void _xs_matrix(double[:,:,:]& mat1, double[:,:,:]& mat2, \
                 mat1[mat,og,ig] = (mat2[mat,og,ig] + mat3[mat,og,ig])
 
 
-cdef void _dmd_subtraction(double[:,:,:,:]& y_minus, double[:,:,:,:]& y_plus, \
-        double[:,:,:]& flux, double[:,:,:]& flux_old, int kk, params info):
-    # Initialize iterables
-    cdef int ii, jj, gg
-    for ii in range(info.cells_x):
-        for jj in range(info.cells_y):
-            for gg in range(info.groups):
-                if (kk < info.dmd_snapshots - 1):
-                    y_minus[ii,jj,gg,kk] = (flux[ii,jj,gg] - flux_old[ii,jj,gg])
-                if (kk > 0):
-                    y_plus[ii,jj,gg,kk-1] = (flux[ii,jj,gg] - flux_old[ii,jj,gg])
-
-
 cdef void _off_scatter(double[:,:,:]& flux, double[:,:,:]& flux_old, \
         int[:,:]& medium_map, double[:,:,:]& xs_matrix, \
         double[:,:]& off_scatter, params info, int group):
     # Initialize iterables
     cdef int ii, jj, mat, og
+    # Nonzero columns of the group row for each material
+    cdef int* band = <int*> malloc(2 * info.materials * sizeof(int))
+    _scatter_band(xs_matrix, group, band)
     # Zero out previous values
     off_scatter[:,:] = 0.0
     for ii in range(info.cells_x):
         for jj in range(info.cells_y):
             mat = medium_map[ii,jj]
-            for og in range(0, group):
+            for og in range(band[2 * mat], min(group, band[2 * mat + 1])):
                 off_scatter[ii,jj] += xs_matrix[mat,group,og] * flux[ii,jj,og]
-            for og in range(group + 1, info.groups):
+            for og in range(max(group + 1, band[2 * mat]), band[2 * mat + 1]):
                 off_scatter[ii,jj] += xs_matrix[mat,group,og] * flux_old[ii,jj,og]
+    free(band)
 
 
 cdef void _off_scatter_jacobi(double[:,:,:]& flux_old, int[:,:]& medium_map, \
@@ -135,13 +131,16 @@ cdef void _off_scatter_jacobi(double[:,:,:]& flux_old, int[:,:]& medium_map, \
     # Jacobi variant: uses flux_old for ALL off-diagonal groups so that each
     # group's scattering source is independent of the sweep order.
     cdef int ii, jj, mat, og
+    cdef int* band = <int*> malloc(2 * info.materials * sizeof(int))
+    _scatter_band(xs_matrix, group, band)
     for ii in range(info.cells_x):
         for jj in range(info.cells_y):
             off_scatter_all[group, ii, jj] = 0.0
             mat = medium_map[ii, jj]
-            for og in range(info.groups):
+            for og in range(band[2 * mat], band[2 * mat + 1]):
                 if og != group:
                     off_scatter_all[group, ii, jj] += xs_matrix[mat, group, og] * flux_old[ii, jj, og]
+    free(band)
 
 
 cdef void _source_total(double[:,:,:,:]& source, double[:,:,:]& flux, \
@@ -149,9 +148,12 @@ cdef void _source_total(double[:,:,:,:]& source, double[:,:,:]& flux, \
         double[:,:,:,:]& external, params info):
     # Create (sigma_s + sigma_f) * phi + external function
     # Initialize iterables
-    cdef int ii, jj, nn, ig, og, mat, nn_q, og_q
+    cdef int ii, jj, nn, ig, og, mat, nn_q, og_q, loc
     cdef double one_group
 
+    # Nonzero columns of every row
+    cdef int* band = _scatter_bands(xs_matrix)
+
     # Zero out previous values
     source[:,:,:,:] = 0.0
 
@@ -161,9 +163,9 @@ cdef void _source_total(double[:,:,:,:]& source, double[:,:,:]& flux, \
 
             for og in range(info.groups):
                 og_q = 0 if external.shape[3] == 1 else og
-                # loc = og + info.groups * (nn + NN * (jj + ii * info.cells_y))
+                loc = 2 * (og * info.materials + mat)
                 one_group = 0.0
-                for ig in range(info.groups):
+                for ig in range(band[loc], band[loc + 1]):
                     one_group += flux[ii,jj,ig] * xs_matrix[mat,og,ig]
 
                 for nn in range(info.angles * info.angles):
@@ -171,6 +173,8 @@ cdef void _source_total(double[:,:,:,:]& source, double[:,:,:]& flux, \
                     source[ii,jj,nn,og] += one_group
                     source[ii,jj,nn,og] += external[ii,jj,nn_q,og_q]
 
+    free(band)
+
 
 cdef void _source_total_single(double[:,:,:,:]& source, \
         double[:,:,:]& flux, double[:,:,:]& xs_matrix, int[:,:]& medium_map, \
@@ -256,73 +260,89 @@ cdef void _angular_edge_to_scalar(double[:,:,:,:]& psi_x, double[:,:,:,:]& psi_y
 
 
 cdef void initialize_known_y(double[:]& known_y, double[:,:]& boundary_y, \
-        double[:,:,:]& reflected_y, double[:]& angle_y, int angle, params info):
-    # Initialize location
-    cdef int loc
-    # Zero out flux
-    known_y[:] = 0.0
+        double[:,:,:]& reflected_y, double[:]& angle_y, int angle, \
+        params info) noexcept nogil:
+    # Initialize location and iterable
+    cdef int loc, ii
+    # Pick bottom / top location
+    loc = 0 if angle_y[angle] > 0.0 else 1
     # Update with reflected array
-    if (info.bc_y[0] == 1) and (angle_y[angle] > 0.0):
-        known_y[...] = reflected_y[0,:,angle]
-    elif (info.bc_y[1] == 1) and (angle_y[angle] < 0.0):
-        known_y[...] = reflected_y[1,:,angle]
+    if (info.bc_y[loc] == 1):
+        for ii in range(info.cells_x):
+            known_y[ii] = reflected_y[loc,ii,angle]
+    # Boundary source may be constant along the edge
+    elif boundary_y.shape[1] == 1:
+        for ii in range(info.cells_x):
+            known_y[ii] = boundary_y[loc,0]
     else:
-        # Pick left / right location
-        loc = 0 if angle_y[angle] > 0.0 else 1
-        known_y[...] = boundary_y[loc,:]
+        for ii in range(info.cells_x):
+            known_y[ii] = boundary_y[loc,ii]
 
 
 cdef void initialize_known_x(double[:]& known_x, double[:,:]& boundary_x, \
-        double[:,:,:]& reflected_x, double[:]& angle_x, int angle, params info):
-    # Initialize location
-    cdef int loc
-    # Zero out flux
-    known_x[:] = 0.0
+        double[:,:,:]& reflected_x, double[:]& angle_x, int angle, \
+        params info) noexcept nogil:
+    # Initialize location and iterable
+    cdef int loc, jj
+    # Pick left / right location
+    loc = 0 if angle_x[angle] > 0.0 else 1
     # Update with reflected array
-    if (info.bc_x[0] == 1) and (angle_x[angle] > 0.0):
-        known_x[...] = reflected_x[0,:,angle]
-    elif (info.bc_x[1] == 1) and (angle_x[angle] < 0.0):
-        known_x[...] = reflected_x[1,:,angle]
+    if (info.bc_x[loc] == 1):
+        for jj in range(info.cells_y):
+            known_x[jj] = reflected_x[loc,jj,angle]
+    # Boundary source may be constant along the edge
+    elif boundary_x.shape[1] == 1:
+        for jj in range(info.cells_y):
+            known_x[jj] = boundary_x[loc,0]
     else:
-        # Pick left / right location
-        loc = 0 if angle_x[angle] > 0.0 else 1
-        known_x[...] = boundary_x[loc,:]
+        for jj in range(info.cells_y):
+            known_x[jj] = boundary_x[loc,jj]
 
 
 cdef void update_reflector(double[:]& known_x, double[:,:,:]& reflected_x, \
         double[:]& angle_x, double[:]& known_y, double[:,:,:]& reflected_y, \
-        double[:]& angle_y, int angle, params info):
+        double[:]& angle_y, int[:,:]& reflect, int angle, \
+        params info) noexcept nogil:
     # Initialize iterables
-    cdef int opp_idx
+    cdef int opp_idx, loc, ii, jj
     # Return nothing for 4 vacuum boundaries
-    if (info.bc_x == [0, 0]) and (info.bc_y == [0, 0]):
+    if (info.bc_x[0] == 0) and (info.bc_x[1] == 0) \
+            and (info.bc_y[0] == 0) and (info.bc_y[1] == 0):
         return
     # Update reflected_x
-    if (angle_x[angle] > 0.0) and (info.bc_x[1] == 1):
-        opp_idx = _reflected_index(angle_x, angle_y, angle, info)
-        reflected_x[1,:,opp_idx] = known_x[:]
-    elif (angle_x[angle] < 0.0) and (info.bc_x[0] == 1):
-        opp_idx = _reflected_index(angle_x, angle_y, angle, info)
-        reflected_x[0,:,opp_idx] = known_x[:]
+    if ((angle_x[angle] > 0.0) and (info.bc_x[1] == 1)) \
+            or ((angle_x[angle] < 0.0) and (info.bc_x[0] == 1)):
+        opp_idx = reflect[0, angle]
+        loc = 1 if angle_x[angle] > 0.0 else 0
+        for jj in range(info.cells_y):
+            reflected_x[loc,jj,opp_idx] = known_x[jj]
     # Update reflected_y
-    if (angle_y[angle] > 0.0) and (info.bc_y[1] == 1):
-        opp_idx = _reflected_index(angle_y, angle_x, angle, info)
-        reflected_y[1,:,opp_idx] = known_y[:]
-    elif (angle_y[angle] < 0.0) and (info.bc_y[0] == 1):
-        opp_idx = _reflected_index(angle_y, angle_x, angle, info)
-        reflected_y[0,:,opp_idx] = known_y[:]
+    if ((angle_y[angle] > 0.0) and (info.bc_y[1] == 1)) \
+            or ((angle_y[angle] < 0.0) and (info.bc_y[0] == 1)):
+        opp_idx = reflect[1, angle]
+        loc = 1 if angle_y[angle] > 0.0 else 0
+        for ii in range(info.cells_x):
+            reflected_y[loc,ii,opp_idx] = known_y[ii]
 
 
-cdef int _reflected_index(double[:]& angle_opp, double[:]& angle_sim, \
-        int angle, params info):
-    # Initialize iterable
+cdef int[:,:] reflection_map(double[:]& angle_x, double[:]& angle_y, \
+        params info):
+    # Mirror partner of every ordinate: reflect[0, nn] flips angle_x (x
+    # boundaries) and reflect[1, nn] flips angle_y (y boundaries). Built
+    # once per solve so update_reflector is a table lookup.
     cdef int nn
-    for nn in range(info.angles * info.angles):
-        if (angle_opp[nn] == -angle_opp[angle]) \
-                and (angle_sim[nn] == angle_sim[angle]):
-            return nn
-    # Returns error
-    return -1
+    cdef int N2 = info.angles * info.angles
+    dd2 = cvarray((2, N2), itemsize=sizeof(int), format="i")
+    cdef int[:,:] reflect = dd2
+    reflect[:,:] = -1
+    # Index ordinates by direction, keeping the first match
+    index = {}
+    for nn in range(N2):
+        index.setdefault((angle_x[nn], angle_y[nn]), nn)
+    for nn in range(N2):
+        reflect[0, nn] = index.get((-angle_x[nn], angle_y[nn]), -1)
+        reflect[1, nn] = index.get((angle_x[nn], -angle_y[nn]), -1)
+    return reflect
 
 
 ################################################################################
@@ -362,6 +382,272 @@ cdef double _angular_flux_change(double[:,:,:]& psi_new, double[:,:,:]& psi_old,
     return max_change
 
 
+################################################################################
+# Diffusion Synthetic Acceleration
+#
+# The within-group error left by a source iteration sweep is estimated with
+#       -div D grad f + (sigma_t - sigma_s) f = sigma_s (phi^(l+1/2) - phi^l)
+# discretized with bilinear elements on the (I + 1) x (J + 1) cell vertices.
+# Absorption uses the diamond difference consistent form sigma_a hx hy / 16
+# times the vertex sum, and a vacuum side adds the Marshak term
+# sum_n w_n |mu_n| f lumped onto its vertices.  The system is solved
+# matrix-free with Jacobi preconditioned conjugate gradients and the cell
+# correction is the average of its four vertices.
+################################################################################
+
+cdef bint dsa_setup(double[:]& xs_total, double[:]& xs_scatter, \
+        int[:,:]& medium_map, double[:]& delta_x, double[:]& delta_y, \
+        double[:]& angle_x, double[:]& angle_y, double[:]& angle_w, \
+        double* boundary, double* precond, params info) noexcept nogil:
+    # Fill the vertex boundary terms and the inverse of the matrix diagonal.
+    # Returns False if the system is singular (no absorption or leakage),
+    # so DSA is skipped.
+
+    # Initialize iterables
+    cdef int ii, jj, nn, mat, v00
+    cdef int ny = info.cells_y + 1
+    cdef int vertices = (info.cells_x + 1) * ny
+    cdef double coef, absorb
+    cdef double marshak_x = 0.0
+    cdef double marshak_y = 0.0
+    cdef bint singular = True
+
+    for nn in range(info.angles * info.angles):
+        marshak_x += angle_w[nn] * fabs(angle_x[nn])
+        marshak_y += angle_w[nn] * fabs(angle_y[nn])
+
+    for ii in range(vertices):
+        boundary[ii] = 0.0
+        precond[ii] = 0.0
+
+    # Vacuum boundaries
+    for jj in range(info.cells_y):
+        if info.bc_x[0] == 0:
+            boundary[jj] += 0.5 * marshak_x * delta_y[jj]
+            boundary[jj + 1] += 0.5 * marshak_x * delta_y[jj]
+        if info.bc_x[1] == 0:
+            boundary[info.cells_x * ny + jj] += 0.5 * marshak_x * delta_y[jj]
+            boundary[info.cells_x * ny + jj + 1] += 0.5 * marshak_x * delta_y[jj]
+    for ii in range(info.cells_x):
+        if info.bc_y[0] == 0:
+            boundary[ii * ny] += 0.5 * marshak_y * delta_x[ii]
+            boundary[(ii + 1) * ny] += 0.5 * marshak_y * delta_x[ii]
+        if info.bc_y[1] == 0:
+            boundary[ii * ny + info.cells_y] += 0.5 * marshak_y * delta_x[ii]
+            boundary[(ii + 1) * ny + info.cells_y] += 0.5 * marshak_y * delta_x[ii]
+
+    for ii in range(vertices):
+        precond[ii] = boundary[ii]
+        if boundary[ii] > 0.0:
+            singular = False
+
+    for ii in range(info.cells_x):
+        for jj in range(info.cells_y):
+            mat = medium_map[ii, jj]
+            coef = 1.0 / (3.0 * fmax(xs_total[mat], 1e-8))
+            coef = coef * (delta_y[jj] / delta_x[ii] + delta_x[ii] / delta_y[jj]) / 3.0
+            absorb = fmax(xs_total[mat] - xs_scatter[mat], 0.0) \
+                        * delta_x[ii] * delta_y[jj] / 16.0
+            if absorb > 0.0:
+                singular = False
+            v00 = ii * ny + jj
+            precond[v00] += coef + absorb
+            precond[v00 + 1] += coef + absorb
+            precond[v00 + ny] += coef + absorb
+            precond[v00 + ny + 1] += coef + absorb
+
+    if singular:
+        return False
+
+    for ii in range(vertices):
+        precond[ii] = 1.0 / precond[ii]
+    return True
+
+
+cdef void _dsa_multiply(double* vector, double* product, double[:]& xs_total, \
+        double[:]& xs_scatter, int[:,:]& medium_map, double[:]& delta_x, \
+        double[:]& delta_y, double* boundary, params info) noexcept nogil:
+    # product = A vector for the vertex diffusion matrix
+
+    # Initialize iterables
+    cdef int ii, jj, mat, v00
+    cdef int ny = info.cells_y + 1
+    cdef double coef, coef_x, coef_y, absorb
+    cdef double dx0, dx1, dy0, dy1
+
+    for ii in range((info.cells_x + 1) * ny):
+        product[ii] = boundary[ii] * vector[ii]
+
+    for ii in range(info.cells_x):
+        for jj in range(info.cells_y):
+            mat = medium_map[ii, jj]
+            coef = 1.0 / (3.0 * fmax(xs_total[mat], 1e-8))
+            coef_x = coef * delta_y[jj] / delta_x[ii]
+            coef_y = coef * delta_x[ii] / delta_y[jj]
+            v00 = ii * ny + jj
+            absorb = fmax(xs_total[mat] - xs_scatter[mat], 0.0) \
+                        * delta_x[ii] * delta_y[jj] / 16.0 * (vector[v00] \
+                        + vector[v00 + 1] + vector[v00 + ny] + vector[v00 + ny + 1])
+            # Vertex differences across the cell in x (dx) and y (dy)
+            dx0 = vector[v00] - vector[v00 + ny]
+            dx1 = vector[v00 + 1] - vector[v00 + ny + 1]
+            dy0 = vector[v00] - vector[v00 + 1]
+            dy1 = vector[v00 + ny] - vector[v00 + ny + 1]
+            product[v00] += coef_x * (dx0 / 3.0 + dx1 / 6.0) \
+                            + coef_y * (dy0 / 3.0 + dy1 / 6.0) + absorb
+            product[v00 + ny] += -coef_x * (dx0 / 3.0 + dx1 / 6.0) \
+                            + coef_y * (dy1 / 3.0 + dy0 / 6.0) + absorb
+            product[v00 + 1] += coef_x * (dx1 / 3.0 + dx0 / 6.0) \
+                            - coef_y * (dy0 / 3.0 + dy1 / 6.0) + absorb
+            product[v00 + ny + 1] += -coef_x * (dx1 / 3.0 + dx0 / 6.0) \
+                            - coef_y * (dy1 / 3.0 + dy0 / 6.0) + absorb
+
+
+cdef void dsa_correction(double[:,:]& flux, double[:,:]& flux_old, \
+        double[:]& xs_total, double[:]& xs_scatter, int[:,:]& medium_map, \
+        double[:]& delta_x, double[:]& delta_y, double* boundary, \
+        double* precond, double* work, params info) noexcept nogil:
+    # Add the diffusion estimate of the error in flux, the sweep of
+    # flux_old, to flux.  work is 5 (I + 1) (J + 1) conjugate gradient
+    # scratch (solution, residual, preconditioned residual, direction,
+    # matrix-direction product).
+
+    # Initialize iterables
+    cdef int ii, jj, mat, v00
+    cdef int ny = info.cells_y + 1
+    cdef int vertices = (info.cells_x + 1) * ny
+    cdef double* solution = work
+    cdef double* residual = work + vertices
+    cdef double source
+
+    for ii in range(vertices):
+        residual[ii] = 0.0
+    for ii in range(info.cells_x):
+        for jj in range(info.cells_y):
+            mat = medium_map[ii, jj]
+            source = 0.25 * xs_scatter[mat] * delta_x[ii] * delta_y[jj] \
+                        * (flux[ii, jj] - flux_old[ii, jj])
+            v00 = ii * ny + jj
+            residual[v00] += source
+            residual[v00 + 1] += source
+            residual[v00 + ny] += source
+            residual[v00 + ny + 1] += source
+
+    _dsa_solve(xs_total, xs_scatter, medium_map, delta_x, delta_y, \
+               boundary, precond, work, info)
+
+    for ii in range(info.cells_x):
+        for jj in range(info.cells_y):
+            v00 = ii * ny + jj
+            flux[ii, jj] += 0.25 * (solution[v00] + solution[v00 + 1] \
+                            + solution[v00 + ny] + solution[v00 + ny + 1])
+
+
+cdef void _dsa_solve(double[:]& xs_total, double[:]& xs_scatter, \
+        int[:,:]& medium_map, double[:]& delta_x, double[:]& delta_y, \
+        double* boundary, double* precond, double* work, \
+        params info) noexcept nogil:
+    # Solve the vertex system for the right side in the residual slot of
+    # work (the second block), leaving the vertex solution in the first
+
+    # Initialize iterables
+    cdef int ii, step
+    cdef int vertices = (info.cells_x + 1) * (info.cells_y + 1)
+    cdef double* solution = work
+    cdef double* residual = work + vertices
+    cdef double* prec_res = work + 2 * vertices
+    cdef double* direction = work + 3 * vertices
+    cdef double* product = work + 4 * vertices
+    cdef double rz, rz_new, alpha, norm_b, norm_r, denom
+
+    norm_b = 0.0
+    rz = 0.0
+    for ii in range(vertices):
+        solution[ii] = 0.0
+        prec_res[ii] = precond[ii] * residual[ii]
+        direction[ii] = prec_res[ii]
+        norm_b += residual[ii] * residual[ii]
+        rz += residual[ii] * prec_res[ii]
+    if norm_b == 0.0:
+        return
+
+    # Preconditioned conjugate gradients
+    for step in range(vertices):
+        _dsa_multiply(direction, product, xs_total, xs_scatter, medium_map, \
+                      delta_x, delta_y, boundary, info)
+        denom = 0.0
+        for ii in range(vertices):
+            denom += direction[ii] * product[ii]
+        if denom <= 0.0:
+            break
+        alpha = rz / denom
+        norm_r = 0.0
+        for ii in range(vertices):
+            solution[ii] += alpha * direction[ii]
+            residual[ii] -= alpha * product[ii]
+            norm_r += residual[ii] * residual[ii]
+        if norm_r < 1e-16 * norm_b:
+            break
+        rz_new = 0.0
+        for ii in range(vertices):
+            prec_res[ii] = precond[ii] * residual[ii]
+            rz_new += residual[ii] * prec_res[ii]
+        for ii in range(vertices):
+            direction[ii] = prec_res[ii] + (rz_new / rz) * direction[ii]
+        rz = rz_new
+
+
+cdef void tgs_correction(double[:,:,:]& flux, double[:,:,:]& flux_old, \
+        double[:,:,:]& xs_scatter, double[:,:]& spectrum, \
+        double[:]& coarse_total, double[:]& coarse_scatter, \
+        int[:,:]& medium_map, double[:]& delta_x, double[:]& delta_y, \
+        double* boundary, double* precond, double* work, int first, \
+        params info) noexcept nogil:
+    # Two-grid correction of the upscatter groups [first, groups) after a
+    # Gauss-Seidel pass from flux_old to flux.  The error is driven by the
+    # upscatter residual sum_g sum_{g' > g} sigma_s(g' -> g) (phi^(l+1/2) -
+    # phi^l)_g', estimated with the collapsed one-group diffusion system
+    # (dsa_setup with the two-grid cross sections) and spread over the
+    # groups with the material spectrum.
+
+    # Initialize iterables
+    cdef int ii, jj, gg, og, mat, v00
+    cdef int ny = info.cells_y + 1
+    cdef int vertices = (info.cells_x + 1) * ny
+    cdef double* solution = work
+    cdef double* residual = work + vertices
+    cdef double source, correction
+
+    for ii in range(vertices):
+        residual[ii] = 0.0
+    for ii in range(info.cells_x):
+        for jj in range(info.cells_y):
+            mat = medium_map[ii, jj]
+            source = 0.0
+            for gg in range(first, info.groups):
+                for og in range(gg + 1, info.groups):
+                    source += xs_scatter[mat, gg, og] \
+                            * (flux[ii, jj, og] - flux_old[ii, jj, og])
+            source = 0.25 * delta_x[ii] * delta_y[jj] * source
+            v00 = ii * ny + jj
+            residual[v00] += source
+            residual[v00 + 1] += source
+            residual[v00 + ny] += source
+            residual[v00 + ny + 1] += source
+
+    _dsa_solve(coarse_total, coarse_scatter, medium_map, delta_x, delta_y, \
+               boundary, precond, work, info)
+
+    for ii in range(info.cells_x):
+        for jj in range(info.cells_y):
+            mat = medium_map[ii, jj]
+            v00 = ii * ny + jj
+            correction = 0.25 * (solution[v00] + solution[v00 + 1] \
+                            + solution[v00 + ny] + solution[v00 + ny + 1])
+            for gg in range(first, info.groups):
+                flux[ii, jj, gg] += spectrum[mat, gg - first] * correction
+
+
 ################################################################################
 # Time Dependent functions
 ################################################################################
@@ -607,18 +893,22 @@ cdef void _time_right_side(double[:,:,:,:]& q_star, double[:,:,:]& flux, \
         double[:,:,:]& xs_scatter, int[:,:]& medium_map, params info):
     # Create (sigma_s + sigma_f) * phi + external + 1/(v*dt) * psi function
     # Initialize iterables
-    cdef int ii, jj, nn, ig, og, mat
+    cdef int ii, jj, nn, ig, og, mat, loc
     cdef double one_group
+    # Nonzero columns of every row
+    cdef int* band = _scatter_bands(xs_scatter)
     # Iterate over dimensions
     for ii in range(info.cells_x):
         for jj in range(info.cells_y):
             mat = medium_map[ii,jj]
             for og in range(info.groups):
+                loc = 2 * (og * info.materials + mat)
                 one_group = 0.0
-                for ig in range(info.groups):
+                for ig in range(band[loc], band[loc + 1]):
                     one_group += flux[ii,jj,ig] * xs_scatter[mat,og,ig]
                 for nn in range(info.angles * info.angles):
                     q_star[ii,jj,nn,og] += one_group
+    free(band)
 
 
 ################################################################################
@@ -659,23 +949,55 @@ cdef double _update_keffective(double[:,:,:] flux_new, double[:,:,:] flux_old, \
     return _shared_update_keffective(flux_new, flux_old, xs_fission, medium_map, info, keff)
 
 
+cdef void _fission_source_chi(double[:,:,:]& flux, double[:,:]& chi, \
+        double[:,:]& nu_fission, double[:,:,:,:]& source, \
+        int[:,:]& medium_map, params info, double keff):
+    # Fission source (I x J x G) with the fission matrix chi x nu_fission:
+    # one fission rate per cell, spread over the groups by chi
+    # Initialize iterables
+    cdef int ii, jj, mat, gg
+    cdef double rate
+    for ii in range(info.cells_x):
+        for jj in range(info.cells_y):
+            mat = medium_map[ii,jj]
+            rate = 0.0
+            for gg in range(info.groups):
+                rate += nu_fission[mat,gg] * flux[ii,jj,gg]
+            rate /= keff
+            for gg in range(info.groups):
+                source[ii,jj,0,gg] = chi[mat,gg] * rate
+
+
+cdef double _update_keffective_chi(double[:,:,:] flux_new, \
+        double[:,:,:] flux_old, double[:,:] chi, double[:,:] nu_fission, \
+        int[:,:] medium_map, params info, double keff):
+    return _shared_update_keffective_chi(flux_new, flux_old, chi, nu_fission, \
+                                         medium_map, info, keff)
+
+
 cdef void _source_total_critical(double[:,:,:,:]& source, \
         double[:,:,:]& flux, double[:,:,:]& xs_scatter, \
         double[:,:,:]& xs_fission, int[:,:]& medium_map, double keff, \
         params info):
     # Create (sigma_s + sigma_f) * phi + external function
     # Initialize iterables
-    cdef int ii, jj, ig, og, mat
+    cdef int ii, jj, ig, og, mat, loc
+    # Nonzero columns of every row
+    cdef int* scatter_band = _scatter_bands(xs_scatter)
+    cdef int* fission_band = _scatter_bands(xs_fission)
     # Zero out previous values
     source[:,:,:,:] = 0.0
     for ii in range(info.cells_x):
         for jj in range(info.cells_y):
             mat = medium_map[ii,jj]
             for og in range(info.groups):
-                # loc = og + info.groups * (jj + ii * info.cells_y)
-                for ig in range(info.groups):
-                    source[ii,jj,0,og] += (flux[ii,jj,ig] * xs_scatter[mat,og,ig]) \
-                               + (flux[ii,jj,ig] * xs_fission[mat,og,ig]) / keff
+                loc = 2 * (og * info.materials + mat)
+                for ig in range(scatter_band[loc], scatter_band[loc + 1]):
+                    source[ii,jj,0,og] += flux[ii,jj,ig] * xs_scatter[mat,og,ig]
+                for ig in range(fission_band[loc], fission_band[loc + 1]):
+                    source[ii,jj,0,og] += (flux[ii,jj,ig] * xs_fission[mat,og,ig]) / keff
+    free(scatter_band)
+    free(fission_band)
 
 
 ################################################################################
@@ -1227,8 +1549,16 @@ cdef double[:,:,:,:] _expand_boundary_x(double[:,:,:,:]& half_bc,
     #                             angle (angle_x > 0), in traversal order
     #   half_bc[1, jj, ii, gg] = right boundary for y-cell jj, ii-th incoming
     #                             angle (angle_x < 0), in traversal order
+    full_bc = array_4d(2, info.cells_y, info.angles * info.angles, info.groups)
+    _expand_boundary_x_into(full_bc, half_bc, angle_x, info)
+    return full_bc
+
+
+cdef void _expand_boundary_x_into(double[:,:,:,:]& full_bc, \
+        double[:,:,:,:]& half_bc, double[:]& angle_x, params info):
+    # _expand_boundary_x into an existing (2, cells_y, angles**2, groups)
+    # array. Only the incoming angles are written, so the others keep zeros
     cdef int N2 = info.angles * info.angles
-    full_bc = array_4d(2, info.cells_y, N2, info.groups)
     cdef int nn, jj, gg, ii_pos, ii_neg
     cdef bint bc_y     = (half_bc.shape[1] > 1)
     cdef bint bc_angle = (half_bc.shape[2] > 1)
@@ -1248,7 +1578,6 @@ cdef double[:,:,:,:] _expand_boundary_x(double[:,:,:,:]& half_bc,
                     full_bc[1, jj, nn, gg] = half_bc[1, jj if bc_y else 0, ii_neg if bc_angle else 0, gg if bc_group else 0]
             if bc_angle:
                 ii_neg += 1
-    return full_bc
 
 
 cdef double[:,:,:,:] _expand_boundary_y(double[:,:,:,:]& half_bc,
@@ -1264,8 +1593,16 @@ cdef double[:,:,:,:] _expand_boundary_y(double[:,:,:,:]& half_bc,
     #                             angle (angle_y > 0), in traversal order
     #   half_bc[1, ii, jj, gg] = top    boundary for x-cell ii, jj-th incoming
     #                             angle (angle_y < 0), in traversal order
+    full_bc = array_4d(2, info.cells_x, info.angles * info.angles, info.groups)
+    _expand_boundary_y_into(full_bc, half_bc, angle_y, info)
+    return full_bc
+
+
+cdef void _expand_boundary_y_into(double[:,:,:,:]& full_bc, \
+        double[:,:,:,:]& half_bc, double[:]& angle_y, params info):
+    # _expand_boundary_y into an existing (2, cells_x, angles**2, groups)
+    # array. Only the incoming angles are written, so the others keep zeros
     cdef int N2 = info.angles * info.angles
-    full_bc = array_4d(2, info.cells_x, N2, info.groups)
     cdef int nn, ii, gg, ii_pos, ii_neg
     cdef bint bc_x     = (half_bc.shape[1] > 1)
     cdef bint bc_angle = (half_bc.shape[2] > 1)
@@ -1285,4 +1622,3 @@ cdef double[:,:,:,:] _expand_boundary_y(double[:,:,:,:]& half_bc,
                     full_bc[1, ii, nn, gg] = half_bc[1, ii if bc_x else 0, ii_neg if bc_angle else 0, gg if bc_group else 0]
             if bc_angle:
                 ii_neg += 1
-    return full_bc
@@ -66,7 +66,13 @@ ctypedef fused medium_map_nd:
 cdef double group_convergence(scalar_flux_nd arr1, scalar_flux_nd arr2,
                                params info)
 
-cdef double angle_convergence(spatial_nd arr1, spatial_nd arr2, params info)
+cdef double angle_convergence(spatial_nd arr1, spatial_nd arr2, \
+        params info) noexcept nogil
+
+cdef void _scatter_band(double[:,:,:]& xs_matrix, int row, \
+        int* band) noexcept nogil
+
+cdef int* _scatter_bands(double[:,:,:]& xs_matrix) noexcept nogil
 
 cdef void _normalize_flux(scalar_flux_nd flux, params info)
 
@@ -75,6 +81,12 @@ cdef double _update_keffective(scalar_flux_nd flux_new, scalar_flux_nd flux_old,
                                 medium_map_nd medium_map,
                                 params info, double keff)
 
+cdef double _update_keffective_chi(scalar_flux_nd flux_new,
+                                    scalar_flux_nd flux_old, double[:,:] chi,
+                                    double[:,:] nu_fission,
+                                    medium_map_nd medium_map,
+                                    params info, double keff)
+
 cdef void _total_velocity(double[:,:]& xs_total, double[:]& velocity,
                            double constant, params info)
 
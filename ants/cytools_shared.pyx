@@ -23,6 +23,7 @@
 
 from cython.view cimport array as cvarray
 from libc.math cimport pow, sqrt
+from libc.stdlib cimport malloc
 
 from ants.parameters cimport params
 
@@ -124,7 +125,8 @@ cdef double group_convergence(scalar_flux_nd arr1, scalar_flux_nd arr2,
     return sqrt(change)
 
 
-cdef double angle_convergence(spatial_nd arr1, spatial_nd arr2, params info):
+cdef double angle_convergence(spatial_nd arr1, spatial_nd arr2, \
+        params info) noexcept nogil:
     """L2 relative convergence of a spatial array over the ordinate iteration.
 
     Dispatches at compile time to the 1D (cells_x,) or 2D (cells_x, cells_y)
@@ -155,6 +157,45 @@ cdef double angle_convergence(spatial_nd arr1, spatial_nd arr2, params info):
 
     return sqrt(change)
 
+################################################################################
+# Scattering matrix bands
+################################################################################
+
+cdef void _scatter_band(double[:,:,:]& xs_matrix, int row, \
+        int* band) noexcept nogil:
+    """Nonzero column range of one row of a (materials, groups, groups) matrix.
+
+    For every material, band[2 * mat] <= ig < band[2 * mat + 1] covers the
+    nonzeros of xs_matrix[mat, row, :] (an empty row gives 0, 0). Fine-group
+    scattering rows are narrow, so the source kernels loop over this range
+    instead of all groups.
+    """
+    cdef int mat, ig, lo, hi
+    for mat in range(xs_matrix.shape[0]):
+        lo = 0
+        hi = 0
+        for ig in range(xs_matrix.shape[2]):
+            if xs_matrix[mat, row, ig] != 0.0:
+                if hi == 0:
+                    lo = ig
+                hi = ig + 1
+        band[2 * mat] = lo
+        band[2 * mat + 1] = hi
+
+
+cdef int* _scatter_bands(double[:,:,:]& xs_matrix) noexcept nogil:
+    """Nonzero column ranges of every row of a (materials, groups, groups) matrix.
+
+    Row og of material mat covers band[2 * (og * materials + mat)] <= ig <
+    band[2 * (og * materials + mat) + 1]. The caller frees the array.
+    """
+    cdef int og
+    cdef int materials = xs_matrix.shape[0]
+    cdef int* band = <int*> malloc(2 * materials * xs_matrix.shape[1] * sizeof(int))
+    for og in range(xs_matrix.shape[1]):
+        _scatter_band(xs_matrix, og, band + 2 * og * materials)
+    return band
+
 ################################################################################
 # Criticality functions
 ################################################################################
@@ -222,6 +263,51 @@ cdef double _update_keffective(scalar_flux_nd flux_new, scalar_flux_nd flux_old,
 
     return (rate_new * keff) / rate_old
 
+cdef double _update_keffective_chi(scalar_flux_nd flux_new,
+                                    scalar_flux_nd flux_old, double[:,:] chi,
+                                    double[:,:] nu_fission,
+                                    medium_map_nd medium_map,
+                                    params info, double keff):
+    """Compute updated k-effective with the fission matrix chi x nu_fission.
+
+    Same ratio as _update_keffective in O(G) per cell: the fission rate
+    summed over outgoing groups is sum(chi) * (nu_fission . phi).
+    """
+    cdef int ii, jj, mat, gg
+    cdef double chi_sum, prod_new, prod_old
+    cdef double rate_new = 0.0
+    cdef double rate_old = 0.0
+
+    if scalar_flux_nd is double[:,:] and medium_map_nd is int[:]:
+        # 1D: flux is (cells_x, groups), medium_map is (cells_x,)
+        for ii in range(info.cells_x):
+            mat = medium_map[ii]
+            chi_sum = 0.0
+            prod_new = 0.0
+            prod_old = 0.0
+            for gg in range(info.groups):
+                chi_sum += chi[mat, gg]
+                prod_new += nu_fission[mat, gg] * flux_new[ii, gg]
+                prod_old += nu_fission[mat, gg] * flux_old[ii, gg]
+            rate_new += chi_sum * prod_new
+            rate_old += chi_sum * prod_old
+    elif scalar_flux_nd is double[:,:,:] and medium_map_nd is int[:,:]:
+        # 2D: flux is (cells_x, cells_y, groups), medium_map is (cells_x, cells_y)
+        for ii in range(info.cells_x):
+            for jj in range(info.cells_y):
+                mat = medium_map[ii, jj]
+                chi_sum = 0.0
+                prod_new = 0.0
+                prod_old = 0.0
+                for gg in range(info.groups):
+                    chi_sum += chi[mat, gg]
+                    prod_new += nu_fission[mat, gg] * flux_new[ii, jj, gg]
+                    prod_old += nu_fission[mat, gg] * flux_old[ii, jj, gg]
+                rate_new += chi_sum * prod_new
+                rate_old += chi_sum * prod_old
+
+    return (rate_new * keff) / rate_old
+
 ################################################################################
 # Time Dependent functions
 ################################################################################
@@ -103,10 +103,152 @@ class MultigroupSolver(IntEnum):
         Standard source-iteration solver.
     DMD : int
         Dynamic mode decomposition (DMD)-accelerated solver.
+    KRYLOV : int
+        Matrix-free GMRES on (I - DL^-1MS) phi = DL^-1 q with a transport
+        sweep as the operator. Groups without upscatter are solved one at
+        a time and the upscatter groups as a single block. Edge fluxes
+        entering through reflective boundaries are extra unknowns.
     """
 
     SOURCE_ITERATION = 1
     DMD = 2
+    KRYLOV = 3
+
+
+class InnerSolver(IntEnum):
+    """Supported within-group (inner) iteration schemes.
+
+    Attributes
+    ----------
+    SOURCE_ITERATION : int
+        Plain source iteration.
+    DSA : int
+        Source iteration with diffusion synthetic acceleration. After
+        each sweep a diffusion problem for the scattering error is solved
+        on the same spatial mesh and added to the scalar flux. Applies to
+        slab (cell-center flux) and 2D rectangular sweeps; sphere sweeps
+        fall back to ``SOURCE_ITERATION``. With reflective boundaries it
+        needs ``ReflectorUpdate.WAVES`` and no pair of opposite reflective
+        sides, since lagged reflected edges are not part of the diffusion
+        estimate.
+    """
+
+    SOURCE_ITERATION = 1
+    DSA = 2
+
+
+class EigenAcceleration(IntEnum):
+    """Supported k-eigenvalue (outer iteration) accelerations.
+
+    Attributes
+    ----------
+    NONE : int
+        Plain power iteration.
+    CMFD : int
+        Coarse mesh finite difference. After each outer iteration the
+        net currents are tallied on the coarse cell faces and a coarse
+        multigroup diffusion eigenproblem, corrected to reproduce them,
+        rescales the fine flux and updates keff. Slab geometries only.
+    WIELANDT : int
+        Wielandt shift. The fission source at a shifted eigenvalue
+        ``k_e`` is moved into the inner solves, shrinking the dominance
+        ratio of the outer iteration at the price of costlier inner
+        solves. ``k_e`` is ``SolverData.wielandt_shift`` when given, or
+        follows the Wynn epsilon extrapolation of the keff history. The
+        shifted inner problems have scattering ratios close to one and
+        need ``InnerSolver.DSA`` to converge in ``max_iter_angular``.
+    CHEBYSHEV : int
+        Chebyshev polynomial extrapolation of the fission source, with
+        the dominance ratio estimated from the outer iterations.
+    """
+
+    NONE = 1
+    CMFD = 2
+    WIELANDT = 3
+    CHEBYSHEV = 4
+
+
+class EigenSolver(IntEnum):
+    """Supported k-eigenvalue solvers.
+
+    Attributes
+    ----------
+    POWER_ITERATION : int
+        Power (outer) iteration, accelerated by ``EigenAcceleration``.
+    NEWTON_KRYLOV : int
+        Newton's method on the flux and keff together, started from a
+        loosely converged power iteration. Each Newton step solves its
+        linear system with GMRES, and each Jacobian product is one
+        multigroup solve, so no matrix is formed. Converges in a few
+        Newton steps when the dominance ratio is close to one, but slows
+        down on clusters of nearly equal eigenvalues (weakly coupled,
+        optically thick cells).
+    """
+
+    POWER_ITERATION = 1
+    NEWTON_KRYLOV = 2
+
+
+class UpscatterAcceleration(IntEnum):
+    """Supported accelerations of the energy (outer group) iteration.
+
+    Attributes
+    ----------
+    NONE : int
+        Plain Gauss-Seidel iteration over the energy groups.
+    TWO_GRID : int
+        Two-grid (TGS) acceleration of the thermal upscatter groups. After
+        each Gauss-Seidel pass the upscatter residual is collapsed with the
+        infinite-medium error spectrum of each material, a one-group
+        diffusion problem is solved for the error and the result is
+        spread back over the upscatter groups. Applies to source iteration
+        and DMD on slab and 2D rectangular sweeps; sphere sweeps fall back
+        to ``NONE``.
+    """
+
+    NONE = 1
+    TWO_GRID = 2
+
+
+class InnerTolerance(IntEnum):
+    """Inner (energy and within-group) tolerances during power iteration.
+
+    Attributes
+    ----------
+    FIXED : int
+        Every outer iteration solves to ``tol_energy`` and
+        ``tol_angular``.
+    ADAPTIVE : int
+        Early outer iterations solve loosely, with inner tolerances that
+        follow the change in the fission source. The outer iteration
+        expected to be the last, and any after it, uses ``tol_energy``
+        and ``tol_angular``. Convergence to ``tol_keff`` is only accepted
+        from such an outer iteration.
+    """
+
+    FIXED = 1
+    ADAPTIVE = 2
+
+
+class FluxOutput(IntEnum):
+    """How angular and cell-edge fluxes are returned from steady solves.
+
+    Attributes
+    ----------
+    SWEEP : int
+        Rebuild the total source from the converged scalar flux and run
+        one more transport sweep with it.
+    CAPTURE : int
+        Record the angular flux (or slab edge fluxes) while the last inner
+        sweep runs, so no extra sweep and no angular source array are
+        needed. Only the angular buffer that was asked for is allocated.
+        Applies to source iteration on slab and angle-batched 2D sweeps
+        (cell centers only in 2D) and to power iteration without CMFD;
+        other cases use ``SWEEP``.
+    """
+
+    SWEEP = 1
+    CAPTURE = 2
 
 
 class ParallelType(IntEnum):
@@ -129,11 +271,45 @@ class ParallelType(IntEnum):
         ``OMP_MAX_ACTIVE_LEVELS=2`` (or ``OMP_NESTED=TRUE``) in the
         environment for true nested parallelism; otherwise the inner
         prange is serialized by the OpenMP runtime.
+    SPACE : int
+        Parallelize each 2D angular sweep over spatial blocks with a
+        diagonal wavefront (KBA ordering). Angles are swept one at a
+        time, so this helps when ``num_threads`` is large compared with
+        the number of angles. One-dimensional sweeps fall back to
+        ``ANGLE``.
+    SPACE_ANGLE : int
+        Same wavefront as ``SPACE``, but all angles that share a sweep
+        direction (quadrant) go through the wavefront together. This
+        multiplies the work per diagonal by the number of angles in the
+        quadrant. One-dimensional sweeps fall back to ``ANGLE``.
     """
 
     ANGLE = 1
     GROUP = 2
     BOTH = 3
+    SPACE = 4
+    SPACE_ANGLE = 5
+
+
+class ReflectorUpdate(IntEnum):
+    """Update schedule for reflective boundaries in the inner iteration.
+
+    Attributes
+    ----------
+    LAGGED : int
+        Sweep all angles at once and update the reflected edges after the
+        sweep (default). Incoming reflected edges come from the previous
+        inner iteration.
+    WAVES : int
+        Sweep the angles in dependency waves. Directions that enter
+        through vacuum boundaries go first, then the directions that
+        reflect off them, and the reflected edges are updated between
+        waves. Angles within a wave still run in parallel. Only boundaries
+        that are reflective on both sides keep a one-iteration lag.
+    """
+
+    LAGGED = 1
+    WAVES = 2
 
 
 def _default_vacuum_bc():
@@ -160,11 +336,13 @@ class MaterialData:
     scatter : numpy.ndarray
         Scattering cross section, shape ``(materials, groups, groups)``.
     fission : numpy.ndarray
-        Fission cross section, shape ``(materials, groups)`` if ``chi`` is
-        ``None``, else
+        Fission cross section: nu-fission of shape ``(materials, groups)``
+        if ``chi`` is given, else the full matrix of shape
         ``(materials, groups, groups)``.
     chi : numpy.ndarray, optional
-        Fission spectrum, shape ``(materials, groups)``.
+        Fission spectrum, shape ``(materials, groups)``. Power iteration
+        keeps the fission matrix in this factored form, so the fission
+        source costs O(groups) per cell instead of O(groups**2).
     velocity : numpy.ndarray, optional
         Neutron velocity, shape ``(groups,)``.
     """
@@ -176,6 +354,110 @@ class MaterialData:
     velocity: Optional[np.ndarray] = None
 
 
+class TimeSource:
+    """Time-dependent source evaluated one step at a time.
+
+    Stands in for a dense ``(T, ...)`` source array in :class:`SourceData`
+    so that only the current step is held in memory.
+
+    Parameters
+    ----------
+    function : callable
+        Maps a step index ``0 <= qq < steps`` to the source of that step,
+        shaped like one slice of the dense array.
+    steps : int
+        Number of source steps ``T``. A single step is broadcast over all
+        time steps, as for dense arrays.
+    """
+
+    def __init__(self, function, steps):
+        assert steps > 0, "Need at least 1 source step"
+        self.function = function
+        self.steps = steps
+        self._step_shape = None
+
+    @classmethod
+    def separable(cls, source, profile):
+        """Source of a fixed shape scaled by a time profile.
+
+        Parameters
+        ----------
+        source : numpy.ndarray
+            Spatial, angular and energy shape of the source.
+        profile : numpy.ndarray
+            Scaling of each step, shape ``(T,)``.
+
+        Returns
+        -------
+        TimeSource
+            Step ``qq`` is ``profile[qq] * source``.
+        """
+
+        source = np.asarray(source, dtype=np.float64)
+        profile = np.asarray(profile, dtype=np.float64)
+        return cls(lambda qq: profile[qq] * source, profile.shape[0])
+
+    @property
+    def shape(self):
+        """Shape of the equivalent dense array, ``(T,) + step shape``."""
+        if self._step_shape is None:
+            self._step_shape = self[0].shape
+        return (self.steps,) + self._step_shape
+
+    def __len__(self):
+        return self.steps
+
+    def __getitem__(self, qq):
+        if not (0 <= qq < self.steps):
+            raise IndexError(f"source step {qq} out of range for {self.steps} steps")
+        return np.ascontiguousarray(self.function(qq), dtype=np.float64)
+
+
+class FactoredSource:
+    """External source stored as a sum of rank-1 terms.
+
+    Term ``r`` is the outer product ``space[r] x angle[r] x energy[r]``,
+    so the source takes ``R * (cells + angles + groups)`` values instead of
+    ``cells * angles * groups``. The fixed source solvers evaluate it one
+    energy group at a time.
+
+    Parameters
+    ----------
+    space : numpy.ndarray
+        Spatial factors, shape ``(R, I)`` in 1D and ``(R, I, J)`` in 2D.
+    angle : numpy.ndarray
+        Angular factors, shape ``(R, N)`` in 1D and ``(R, N**2)`` in 2D,
+        or ``(R, 1)`` for isotropic terms.
+    energy : numpy.ndarray
+        Energy factors, shape ``(R, G)``.
+    """
+
+    def __init__(self, space, angle, energy):
+        self.space = np.asarray(space, dtype=np.float64)
+        self.angle = np.asarray(angle, dtype=np.float64)
+        self.energy = np.asarray(energy, dtype=np.float64)
+        terms = {self.space.shape[0], self.angle.shape[0], self.energy.shape[0]}
+        if len(terms) > 1:
+            raise ValueError("Need the same number of terms")
+
+    @property
+    def shape(self):
+        """Shape of the equivalent dense source."""
+        return self.space.shape[1:] + (self.angle.shape[1], self.energy.shape[1])
+
+    def group(self, gg):
+        """Source of energy group ``gg``, shape ``shape[:-1]``."""
+        return np.einsum("r...,rn,r->...n", self.space, self.angle, self.energy[:, gg])
+
+    def fill(self, buffer, gg):
+        """Write the source of group ``gg`` into a ``(..., 1)`` buffer."""
+        np.asarray(buffer)[..., 0] = self.group(gg)
+
+    def dense(self):
+        """Materialize the dense source, shape ``shape``."""
+        return np.einsum("r...,rn,rg->...ng", self.space, self.angle, self.energy)
+
+
 @dataclass
 class SourceData:
     """Bundle of fixed source arrays.
@@ -186,14 +468,19 @@ class SourceData:
         External source. Full shape ``(I, N, G)`` in 1D and
         ``(I, J, N**2, G)`` in 2D, with a leading ``T`` (time) axis for
         time-dependent problems. Dimensions of size 1 are broadcast.
+        Time-dependent problems also accept a :class:`TimeSource` or a
+        callable of the step index returning one step, and fixed source
+        problems a :class:`FactoredSource`.
     boundary_x : numpy.ndarray
         Boundary source in x direction. Full shape ``(2, N, G)`` in 1D and
         ``(2, J, N**2, G)`` in 2D, with a leading ``T`` axis for
         time-dependent problems. The leading 2 is the [x(0), x(X)] sides.
+        Time-dependent problems also accept a :class:`TimeSource` or a
+        callable, as for ``external``.
     boundary_y : numpy.ndarray, optional
         Boundary source in y direction for 2D problems. Full shape
         ``(2, I, N**2, G)``, with a leading ``T`` axis for time-dependent
-        problems.
+        problems, or a :class:`TimeSource` or callable.
     initial_flux : numpy.ndarray, optional
         Cell-centered initial angular flux for time-dependent problems
         (BDF1/BDF2). Shape ``(I, N, G)`` in 1D and ``(I, J, N**2, G)`` in 2D.
@@ -263,6 +550,12 @@ class GeometryData:
         Geometry type.
     space_disc : SpatialDiscretization
         Spatial discretization type.
+    coarse_x : numpy.ndarray, optional
+        Coarse cell edges in x as fine cell indices ``(0, ..., cells_x)``
+        for CMFD. When ``None`` the ``medium_map`` material blocks are
+        split into cells about one mean free path wide.
+    coarse_y : numpy.ndarray, optional
+        Coarse cell edges in y as fine cell indices (2D only).
     """
 
     medium_map: np.ndarray
@@ -272,6 +565,8 @@ class GeometryData:
     bc_y: Optional[List[int]] = field(default_factory=_default_vacuum_bc)
     geometry: Geometry = Geometry.SLAB1D
     space_disc: SpatialDiscretization = SpatialDiscretization.DIAMOND
+    coarse_x: Optional[np.ndarray] = None
+    coarse_y: Optional[np.ndarray] = None
 
 
 @dataclass
@@ -330,6 +625,10 @@ class SolverData:
         If True, return angular flux instead of scalar flux.
     flux_at_edges : int
         Flux location: 0 = cell centers, 1 = cell edges.
+    flux_output : FluxOutput
+        How angular and cell-edge fluxes are computed. ``SWEEP`` (default)
+        runs an extra sweep after convergence, ``CAPTURE`` records them
+        during the last inner sweep.
     num_threads : int
         Number of OpenMP threads for angular sweeps.  Default is 1 (no
         parallelism).  Set to 0 to use all logical CPUs, or any positive
@@ -340,13 +639,55 @@ class SolverData:
         over energy groups with Jacobi iteration (single-threaded angle
         sweep per group).  ``BOTH`` runs Jacobi group prange and angle
         prange simultaneously. Requires ``OMP_MAX_ACTIVE_LEVELS=2`` for
-        true nested parallelism.
+        true nested parallelism.  ``SPACE`` and ``SPACE_ANGLE``
+        parallelize 2D sweeps over spatial blocks with a diagonal
+        wavefront.
+    reflector : ReflectorUpdate
+        Reflective boundary update schedule. ``LAGGED`` (default) uses
+        the reflected edges from the previous inner iteration. ``WAVES``
+        orders the angles so reflected edges are used in the same inner
+        iteration they are computed.
     mg_solver : MultigroupSolver
-        Multigroup solver type.
+        Multigroup solver type. ``KRYLOV`` uses ``tol_energy`` as the GMRES
+        relative residual and ``max_iter_energy`` restart cycles.
+    inner_solver : InnerSolver
+        Within-group iteration scheme. ``SOURCE_ITERATION`` (default) or
+        ``DSA`` for diffusion synthetic acceleration.
+    eigen_acceleration : EigenAcceleration
+        Outer iteration acceleration for k-eigenvalue problems. ``NONE``
+        (default), ``CMFD``, ``WIELANDT`` or ``CHEBYSHEV``.
+    eigen_solver : EigenSolver
+        k-eigenvalue solver. ``POWER_ITERATION`` (default) or
+        ``NEWTON_KRYLOV``.
+    upscatter_acceleration : UpscatterAcceleration
+        Energy iteration acceleration for groups with upscatter. ``NONE``
+        (default) or ``TWO_GRID``.
+    inner_tolerance : InnerTolerance
+        Inner tolerance schedule for k-eigenvalue problems. ``ADAPTIVE``
+        (default) loosens the inner solves of early outer iterations,
+        ``FIXED`` always uses ``tol_energy`` and ``tol_angular``.
+    wielandt_shift : float
+        Fixed shifted eigenvalue ``k_e`` of the ``WIELANDT`` acceleration,
+        above the expected keff. ``0.0`` (default) adapts the shift.
+    flux_guess : numpy.ndarray, optional
+        Starting cell-center scalar flux (``cells_x x groups`` or
+        ``cells_x x cells_y x groups``) of fixed source and k-eigenvalue
+        solves, e.g. the flux of a nearby converged problem. ``None``
+        (default) starts fixed source problems from zero and k-eigenvalue
+        problems from a random flux.
+    keff_guess : float
+        Starting k-effective of k-eigenvalue problems.
+    seed : int, optional
+        Seed of the random starting flux of k-eigenvalue problems. ``None``
+        draws a different starting flux on every call.
     dmd_snapshots : int
         Number of DMD snapshots.
     dmd_rank : int
         Number of DMD rank-1 updates before extrapolation.
+    dmd_recycle : bool
+        If True, time-dependent DMD solves start from the snapshots of the
+        previous time step and stop once two extrapolations agree within
+        ``tol_energy``.
     sigma_as : float
         Artificial scattering strength (0 disables).
     beta_as : float
@@ -367,11 +708,23 @@ class SolverData:
 
     angular: bool = False
     flux_at_edges: int = 0
+    flux_output: FluxOutput = FluxOutput.SWEEP
     num_threads: int = 1
     parallel: ParallelType = ParallelType.ANGLE
+    reflector: ReflectorUpdate = ReflectorUpdate.LAGGED
     mg_solver: MultigroupSolver = MultigroupSolver.SOURCE_ITERATION
+    inner_solver: InnerSolver = InnerSolver.SOURCE_ITERATION
+    eigen_acceleration: EigenAcceleration = EigenAcceleration.NONE
+    eigen_solver: EigenSolver = EigenSolver.POWER_ITERATION
+    upscatter_acceleration: UpscatterAcceleration = UpscatterAcceleration.NONE
+    inner_tolerance: InnerTolerance = InnerTolerance.ADAPTIVE
+    wielandt_shift: float = 0.0
+    flux_guess: Optional[np.ndarray] = None
+    keff_guess: float = 0.95
+    seed: Optional[int] = 0
     dmd_snapshots: int = 20
     dmd_rank: int = 2
+    dmd_recycle: bool = False
     sigma_as: float = 0.0
     beta_as: float = 4.5
     max_iter_angular: int = 100
@@ -417,16 +770,33 @@ class ProblemParameters:
         If True, return angular flux instead of scalar flux.
     flux_at_edges : int
         Flux location: 0 = cell centers, 1 = cell edges.
+    flux_output : FluxOutput
+        Angular and cell-edge flux output (SWEEP or CAPTURE).
     num_threads : int
         Number of OpenMP threads for angular sweeps.
     parallel_type : ParallelType
         Parallelism strategy (ANGLE, GROUP, or BOTH).
+    reflector : ReflectorUpdate
+        Reflective boundary update schedule (LAGGED or WAVES).
     mg_solver : MultigroupSolver
-        Multigroup solver type.
+        Multigroup solver type. ``KRYLOV`` uses ``tol_energy`` as the GMRES
+        relative residual and ``max_iter_energy`` restart cycles.
+    inner_solver : InnerSolver
+        Within-group iteration scheme.
+    eigen_acceleration : EigenAcceleration
+        Outer iteration acceleration for k-eigenvalue problems.
+    eigen_solver : EigenSolver
+        k-eigenvalue solver.
+    upscatter_acceleration : UpscatterAcceleration
+        Energy iteration acceleration for groups with upscatter.
+    inner_tolerance : InnerTolerance
+        Inner tolerance schedule for k-eigenvalue problems.
     dmd_snapshots : int
         Number of DMD snapshots.
     dmd_rank : int
         Number of DMD rank-1 updates before extrapolation.
+    dmd_recycle : bool
+        Carry DMD snapshots across time steps.
     sigma_as : float
         Artificial scattering strength (0 disables).
     beta_as : float
@@ -459,11 +829,19 @@ class ProblemParameters:
     time_disc: TemporalDiscretization
     angular: bool
     flux_at_edges: int
+    flux_output: FluxOutput
     num_threads: int
     parallel_type: ParallelType
+    reflector: ReflectorUpdate
     mg_solver: MultigroupSolver
+    inner_solver: InnerSolver
+    eigen_acceleration: EigenAcceleration
+    eigen_solver: EigenSolver
+    upscatter_acceleration: UpscatterAcceleration
+    inner_tolerance: InnerTolerance
     dmd_snapshots: int
     dmd_rank: int
+    dmd_recycle: bool
     sigma_as: float
     beta_as: float
     max_iter_angular: int
@@ -519,11 +897,19 @@ def create_params(materials, quadrature, geometry, solver, time=None):
         time_disc=time_data.time_disc,
         angular=solver.angular,
         flux_at_edges=solver.flux_at_edges,
+        flux_output=solver.flux_output,
         num_threads=solver.num_threads,
         parallel_type=solver.parallel,
+        reflector=solver.reflector,
         mg_solver=solver.mg_solver,
+        inner_solver=solver.inner_solver,
+        eigen_acceleration=solver.eigen_acceleration,
+        eigen_solver=solver.eigen_solver,
+        upscatter_acceleration=solver.upscatter_acceleration,
+        inner_tolerance=solver.inner_tolerance,
         dmd_snapshots=solver.dmd_snapshots,
         dmd_rank=solver.dmd_rank,
+        dmd_recycle=solver.dmd_recycle,
         sigma_as=solver.sigma_as,
         beta_as=solver.beta_as,
         max_iter_angular=solver.max_iter_angular,
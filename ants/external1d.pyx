@@ -23,6 +23,7 @@ from importlib.resources import files as _importlib_files
 
 import numpy as np
 
+from ants.datatypes import FactoredSource
 from ants.utils import pytools as tools
 
 DATA_PATH = str(_importlib_files("ants").joinpath("sources/"))
@@ -133,12 +134,15 @@ def reeds(edges_x, bc):
     return external
 
 
-def ambe(delta_x, loc_x, edges_g):
+def ambe(delta_x, loc_x, edges_g, factored=False):
     # AmBe source in middle of material
     if isinstance(loc_x, int):
         loc_x = [loc_x]
 
     external = np.zeros((delta_x.shape[0], 1, edges_g.shape[0] - 1))
+    # Isotropic source of one spectrum, 1 / dx in the source cells
+    space = np.zeros((1, delta_x.shape[0]))
+    spectrum = np.zeros((1, edges_g.shape[0] - 1))
 
     data = np.load(DATA_PATH + "external/AmBe_source_050G.npz")
     # Convert to MeV
@@ -150,9 +154,13 @@ def ambe(delta_x, loc_x, edges_g):
 
     for ii in range(len(data["magnitude"])):
         idx = loc_g(data["edges"][ii], data["edges"][ii+1])
+        spectrum[0, idx] = data["magnitude"][ii]
         for xx in loc_x:
             external[xx, 0, idx] = data["magnitude"][ii] / delta_x[xx]
+            space[0, xx] = 1.0 / delta_x[xx]
 
+    if factored:
+        return FactoredSource(space, np.ones((1, 1)), spectrum)
     return external
 
 
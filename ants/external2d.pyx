@@ -24,6 +24,7 @@ from importlib.resources import files as _importlib_files
 import numpy as np
 
 import ants
+from ants.datatypes import FactoredSource
 from ants.utils import pytools as tools
 
 DATA_PATH = str(_importlib_files("ants").joinpath("sources/"))
@@ -90,7 +91,7 @@ def manufactured_td_02(x, y, angle_x, angle_y, edges_t):
     return external
 
 
-def ambe(edges_x, edges_y, coordinates, edges_g):
+def ambe(edges_x, edges_y, coordinates, edges_g, factored=False):
     external = np.zeros((edges_x.shape[0] - 1, edges_y.shape[0] - 1, \
                          1, edges_g.shape[0] - 1))
 
@@ -100,6 +101,11 @@ def ambe(edges_x, edges_y, coordinates, edges_g):
         edges_g *= 1E-6
     # Get energy spectra of AmBe source
     value = tools.resize_array_1d(edges_g, data["edges"], data["magnitude"])
+    # Isotropic source of one spectrum in the source cells
+    if factored:
+        space = ants.spatial2d(np.zeros(external.shape[:2]), 1.0, \
+                               coordinates, edges_x, edges_y)
+        return FactoredSource(space[None], np.ones((1, 1)), value[None])
     # Put in location
     external = ants.spatial2d(external, value, coordinates, edges_x, edges_y)
     return external
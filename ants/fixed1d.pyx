@@ -26,6 +26,7 @@ from ants cimport multi_group_1d as mg
 from ants cimport parameters
 
 from ants.datatypes import MultigroupSolver, create_params
+from ants.utils.pytools import external_source, initial_flux
 
 
 def fixed_source(materials, sources, geometry, quadrature, solver):
@@ -33,7 +34,7 @@ def fixed_source(materials, sources, geometry, quadrature, solver):
     cdef double[:,:] xs_total = materials.total
     cdef double[:,:,:] xs_scatter = materials.scatter
     cdef double[:,:,:] xs_fission = tools._fission_matrix(materials.fission, materials.chi)
-    cdef double[:,:,:] external = sources.external
+    cdef double[:,:,:] external
     cdef double[:,:,:] boundary_x = sources.boundary_x
     cdef int[:] medium_map = geometry.medium_map
     cdef double[:] delta_x = geometry.delta_x
@@ -45,6 +46,9 @@ def fixed_source(materials, sources, geometry, quadrature, solver):
     info = parameters._to_params(params)
     parameters._check_fixed1d_source_iteration(info, xs_total.shape[0])
 
+    # Factored sources are evaluated one group at a time into external
+    external, factored = external_source(sources.external, params)
+
     # Add fission matrix to scattering
     xs_matrix = tools.array_3d(info.materials, info.groups, info.groups)
     tools._xs_matrix(xs_matrix, xs_scatter, xs_fission, info)
@@ -52,21 +56,39 @@ def fixed_source(materials, sources, geometry, quadrature, solver):
     # Solve for cell center first
     info.flux_at_edges = 0
 
-    # Initialize flux_old to zeros
-    flux_old = tools.array_2d(info.cells_x, info.groups)
+    # Initialize flux_old to zeros unless a guess is given
+    flux_old = initial_flux(solver, (info.cells_x, info.groups))
+
+    # Angular flux (or edge) buffer filled by the last sweep, only when asked
+    cdef double[:,:,:] angular = None
+    if (info.flux_output == 2) and (params.angular or params.flux_at_edges) \
+            and mg.sweep_capture(info):
+        angular = tools.array_3d(info.cells_x + params.flux_at_edges, \
+                                 info.angles, info.groups)
 
     # Multigroup solver
     if params.mg_solver == MultigroupSolver.SOURCE_ITERATION:
         flux = mg.source_iteration(flux_old, xs_total, xs_matrix, external, \
-                    boundary_x, medium_map, delta_x, angle_x, angle_w, info)
+                    boundary_x, medium_map, delta_x, angle_x, angle_w, info, \
+                    angular, factored)
     elif params.mg_solver == MultigroupSolver.DMD:
         flux = mg.dynamic_mode_decomp(flux_old, xs_total, xs_matrix, external, \
+                    boundary_x, medium_map, delta_x, angle_x, angle_w, info, \
+                    None, factored)
+    elif params.mg_solver == MultigroupSolver.KRYLOV:
+        flux = mg.krylov(flux_old, xs_total, xs_matrix, external, \
                     boundary_x, medium_map, delta_x, angle_x, angle_w, info)
 
     # Return scalar flux cell centers
     if (params.angular == False) and (params.flux_at_edges == 0):
         return np.asarray(flux)
 
+    # Angular flux or scalar flux edges from the last sweep
+    if (angular is not None) and params.angular:
+        return np.asarray(angular)
+    elif angular is not None:
+        return np.tensordot(angular, angle_w, axes=([1], [0]))
+
     # For angular flux or scalar flux edges
     return known_flux(flux, xs_total, xs_matrix, external, boundary_x, geometry, \
                     quadrature, params)
@@ -26,14 +26,16 @@ cdef double[:,:] multi_group(double[:,:]& flux_guess, \
         double[:,:]& xs_total, double[:,:,:]& xs_scatter, \
         double[:,:,:]& external, double[:,:,:]& boundary_x, \
         int[:]& medium_map, double[:]& delta_x, double[:]& angle_x, \
-        double[:]& angle_w, params info)
+        double[:]& angle_w, params info, double[:,:,:] angular=*, \
+        object dmd=*)
 
 
 cdef double[:,:] source_iteration(double[:,:]& flux_guess, \
         double[:,:]& xs_total, double[:,:,:]& xs_scatter, \
         double[:,:,:]& external, double[:,:,:]& boundary_x, \
         int[:]& medium_map, double[:]& delta_x, double[:]& angle_x, \
-        double[:]& angle_w, params info)
+        double[:]& angle_w, params info, double[:,:,:] angular=*, \
+        object factored=*)
 
 
 cdef double[:,:] variable_source_iteration(double[:,:]& flux_guess, \
@@ -48,7 +50,17 @@ cdef double[:,:] dynamic_mode_decomp(double[:,:]& flux_guess, \
         double[:,:]& xs_total, double[:,:,:]& xs_scatter, \
         double[:,:,:]& external, double[:,:,:]& boundary_x, \
         int[:]& medium_map, double[:]& delta_x, double[:]& angle_x, \
-        double[:]& angle_w, params info)
+        double[:]& angle_w, params info, object dmd=*, \
+        object factored=*)
+
+
+cdef double[:,:] krylov(double[:,:]& flux_guess, double[:,:]& xs_total, \
+        double[:,:,:]& xs_scatter, double[:,:,:]& external, \
+        double[:,:,:]& boundary_x, int[:]& medium_map, double[:]& delta_x, \
+        double[:]& angle_x, double[:]& angle_w, params info)
+
+
+cdef bint sweep_capture(params info)
 
 
 cdef double[:,:,:] _known_source_angular(double[:,:]& xs_total, \
@@ -61,3 +73,9 @@ cdef double[:,:] _known_source_scalar(double[:,:]& xs_total, \
         double[:,:,:]& source, double[:,:,:]& boundary_x, \
         int[:]& medium_map, double[:]& delta_x, double[:]& angle_x, \
         double[:]& angle_w, params info)
+
+
+cdef void _known_source_current(double[:,:]& current, double[:,:]& xs_total, \
+        double[:,:,:]& source, double[:,:,:]& boundary_x, \
+        int[:]& medium_map, double[:]& delta_x, double[:]& angle_x, \
+        double[:]& angle_w, params info)
@@ -20,44 +20,105 @@
 # distutils: extra_compile_args = -O3 -march=native -ffast-math
 
 from libc.math cimport isinf, isnan
+from libc.stdlib cimport free, malloc
 
-from cython.parallel import prange
+from cython.parallel import prange, threadid
 
 from ants cimport cytools_1d as tools
 from ants.parameters cimport params
-from ants.spatial_sweep_1d cimport _known_sweep, discrete_ordinates
+from ants.spatial_sweep_1d cimport (
+    _known_current,
+    _known_slab_reflected,
+    _known_sweep,
+    discrete_ordinates,
+    discrete_ordinates_groups,
+    discrete_ordinates_work,
+)
 
-from ants.utils.pytools import dmd_1d
+import logging
+
+import numpy as np
+from scipy.sparse.linalg import LinearOperator, gmres
+
+from ants.utils.hybrid import two_grid_materials
+from ants.utils.pytools import StreamingDMD
+
+logger = logging.getLogger(__name__)
+
+# Largest number of energy groups swept together in the Jacobi iteration
+cdef int GROUP_BLOCK = 8
+
+# Krylov vectors kept between GMRES restarts
+cdef int KRYLOV_RESTART = 30
 
 
 cdef double[:,:] multi_group(double[:,:]& flux_guess, \
         double[:,:]& xs_total, double[:,:,:]& xs_scatter, \
         double[:,:,:]& external, double[:,:,:]& boundary_x, \
         int[:]& medium_map, double[:]& delta_x, double[:]& angle_x, \
-        double[:]& angle_w, params info):
-    # Source Iteration
+        double[:]& angle_w, params info, double[:,:,:] angular=None, \
+        object dmd=None):
+    # angular = [I x N x G] is filled with the angular flux of the solution
+    # when given, taken from the final sweep where the solver allows it
+
+    # Source Iteration (Jacobi when parallel_type == GROUP or BOTH)
     if info.mg_solver == 1:
-        # Activated when parallel_type == GROUP (2) or BOTH (3).
-        if info.parallel_type >= 2 and info.groups > 1:
-            return jacobi_iteration(flux_guess, xs_total, xs_scatter, external, \
-                        boundary_x, medium_map, delta_x, angle_x, angle_w, info)
         return source_iteration(flux_guess, xs_total, xs_scatter, external, \
-                    boundary_x, medium_map, delta_x, angle_x, angle_w, info)
+                    boundary_x, medium_map, delta_x, angle_x, angle_w, info, \
+                    angular)
     # Dynamic Mode Decomposition
     elif info.mg_solver == 2:
-        return dynamic_mode_decomp(flux_guess, xs_total, xs_scatter, external, \
-                    boundary_x, medium_map, delta_x, angle_x, angle_w, info)
+        flux = dynamic_mode_decomp(flux_guess, xs_total, xs_scatter, external, \
+                    boundary_x, medium_map, delta_x, angle_x, angle_w, info, dmd)
+    # Krylov (GMRES)
+    elif info.mg_solver == 3:
+        flux = krylov(flux_guess, xs_total, xs_scatter, external, boundary_x, \
+                    medium_map, delta_x, angle_x, angle_w, info)
+
+    # Extra sweep for the angular flux
+    if angular is not None:
+        _known_angular(angular, flux, xs_total, xs_scatter, external, \
+                       boundary_x, medium_map, delta_x, angle_x, angle_w, info)
+
+    return flux
 
 
 cdef double[:,:] source_iteration(double[:,:]& flux_guess, \
         double[:,:]& xs_total, double[:,:,:]& xs_scatter, \
         double[:,:,:]& external, double[:,:,:]& boundary_x, \
         int[:]& medium_map, double[:]& delta_x, double[:]& angle_x, \
-        double[:]& angle_w, params info):
+        double[:]& angle_w, params info, double[:,:,:] angular=None, \
+        object factored=None):
+    # factored = FactoredSource that fills the one group external buffer
+
+    # Group-parallel path: Jacobi iteration
+    if (info.parallel_type == 2 or info.parallel_type == 3) \
+                and info.groups > 1:
+        flux = jacobi_iteration(flux_guess, xs_total, xs_scatter, external, \
+                        boundary_x, medium_map, delta_x, angle_x, angle_w, info)
+        if angular is not None:
+            _known_angular(angular, flux, xs_total, xs_scatter, external, \
+                        boundary_x, medium_map, delta_x, angle_x, angle_w, info)
+        return flux
 
     # Initialize components
     cdef int gg, qq, bc
 
+    # Groups before the first upscatter group only depend on groups already
+    # swept, so the first pass solves them and later passes skip them
+    cdef int upscatter = _upscatter_group(xs_scatter, info)
+    cdef int first = 0
+
+    # Two-grid acceleration of the upscatter groups
+    cdef _TwoGrid two_grid = _two_grid(xs_total, xs_scatter, medium_map, \
+                                       delta_x, angle_x, angle_w, upscatter, info)
+
+    # Slab sweeps write the angular flux as they go. Only passes after the
+    # first write it, since their warm-started inner solves take few sweeps,
+    # except for the downscatter groups, which are swept once.
+    # A solve that stops on its first pass takes the extra sweep below.
+    cdef bint capture = (angular is not None) and (info.geometry == 1)
+
     # Initialize flux
     flux = tools.array_2d(info.cells_x, info.groups)
     flux_old = flux_guess.copy()
@@ -70,11 +131,16 @@ cdef double[:,:] source_iteration(double[:,:]& flux_guess, \
     cdef bint converged = False
     cdef int count = 1
     cdef double change = 0.0
+    cdef int sweeps = 0
 
     while not converged:
-        flux[:,:] = 0.0
+        flux[:,first:] = 0.0
 
-        for gg in range(info.groups):
+        for gg in range(first, info.groups):
+
+            # Evaluate a factored external source for this group
+            if factored is not None:
+                factored.fill(external, gg)
 
             qq = 0 if external.shape[2] == 1 else gg
             bc = 0 if boundary_x.shape[2] == 1 else gg
@@ -84,18 +150,39 @@ cdef double[:,:] source_iteration(double[:,:]& flux_guess, \
             tools._off_scatter(flux, flux_old, medium_map, xs_scatter, \
                                off_scatter, info, gg)
 
-            discrete_ordinates(flux[:,gg], flux_1g, xs_total[:,gg], xs_scatter[:,gg,gg], \
-                    off_scatter, external[:,:,qq], boundary_x[:,:,bc], medium_map, \
-                    delta_x, angle_x, angle_w, info)
+            if capture and ((count > 1) or (gg < upscatter)):
+                sweeps += discrete_ordinates(flux[:,gg], flux_1g, xs_total[:,gg], \
+                        xs_scatter[:,gg,gg], off_scatter, external[:,:,qq], \
+                        boundary_x[:,:,bc], medium_map, delta_x, angle_x, \
+                        angle_w, info, angular[:,:,gg])
+            else:
+                sweeps += discrete_ordinates(flux[:,gg], flux_1g, xs_total[:,gg], \
+                        xs_scatter[:,gg,gg], off_scatter, external[:,:,qq], \
+                        boundary_x[:,:,bc], medium_map, delta_x, angle_x, \
+                        angle_w, info)
+
+        if two_grid is not None:
+            two_grid.correct(flux, flux_old)
 
         change = tools.group_convergence(flux, flux_old, info)
         if isnan(change) or isinf(change):
             change = 0.5
-        converged = (change < info.tol_energy) or (count >= info.max_iter_energy)
+        converged = (change < info.tol_energy) or (count >= info.max_iter_energy) \
+                    or (upscatter == info.groups)
         count += 1
+        first = upscatter
 
         flux_old[:,:] = flux[:,:]
 
+    logger.info("Source iteration: %d passes, %d sweeps, change %.2e", \
+                count - 1, sweeps, change)
+
+    # Extra sweep for the angular flux
+    if (angular is not None) and not (capture \
+            and ((count > 2) or (upscatter == info.groups))):
+        _known_angular(angular, flux, xs_total, xs_scatter, external, \
+                       boundary_x, medium_map, delta_x, angle_x, angle_w, info)
+
     return flux[:,:]
 
 
@@ -105,9 +192,17 @@ cdef double[:,:] jacobi_iteration(double[:,:]& flux_guess, double[:,:]& xs_total
         double[:]& angle_w, params info):
 
     # Initialize components
-    cdef int gg, qq, bc
+    cdef int gg, qq, bc, tid, block
     cdef params info_1t
 
+    # Groups swept together per spatial pass; keep at least one block per
+    # thread so the group prange stays balanced.  The group-batched sweep
+    # covers slab cell-center fluxes without DSA only.
+    cdef int gb = max(1, min(GROUP_BLOCK, info.groups // info.num_threads))
+    if (info.geometry != 1) or info.flux_at_edges or (info.inner_solver == 2):
+        gb = 1
+    cdef int n_blocks = (info.groups + gb - 1) // gb
+
     # Initialize flux
     flux = tools.array_2d(info.cells_x, info.groups)
     flux_old = flux_guess.copy()
@@ -123,6 +218,22 @@ cdef double[:,:] jacobi_iteration(double[:,:]& flux_guess, double[:,:]& xs_total
     if info.parallel_type == 2:
         info_1t.num_threads = 1
 
+    # Sweep work arrays, one set per outer (group) thread so that the
+    # group prange never needs the GIL
+    cdef int priv_size = info.cells_x + 1 if info.flux_at_edges else info.cells_x
+    thread_flux = tools.array_3d(info.num_threads, info_1t.num_threads, priv_size)
+    edge_out = tools.array_2d(info.num_threads, info.angles)
+    reflector = tools.array_2d(info.num_threads, info.angles)
+    half_angle = tools.array_2d(info.num_threads, info.cells_x)
+    no_angular = tools.array_2d(1, 1)
+
+    # Group-block work arrays (indexed by group offset within the block)
+    if gb > 1:
+        block_flux = tools.array_4d(info.num_threads, info_1t.num_threads, \
+                                    info.cells_x, gb)
+        block_edge_out = tools.array_3d(info.num_threads, gb, info.angles)
+        block_reflector = tools.array_3d(info.num_threads, gb, info.angles)
+
     # Set convergence limits
     cdef bint converged = False
     cdef int count = 1
@@ -139,13 +250,28 @@ cdef double[:,:] jacobi_iteration(double[:,:]& flux_guess, double[:,:]& xs_total
         for gg in prange(info.groups, nogil=True, num_threads=info.num_threads):
             tools._off_scatter_jacobi(flux_old, medium_map, xs_scatter, off_scatter_all, info, gg)
 
-        for gg in prange(info.groups, nogil=True, num_threads=info.num_threads):
-            qq = 0 if external.shape[2] == 1 else gg
-            bc = 0 if boundary_x.shape[2] == 1 else gg
-            with gil:
-                discrete_ordinates(flux[:,gg], flux_old_snap[gg], xs_total[:,gg], \
+        # Sweep blocks of groups in parallel (nogil)
+        if gb > 1:
+            for block in prange(n_blocks, nogil=True, schedule="dynamic", \
+                                num_threads=info.num_threads):
+                tid = threadid()
+                discrete_ordinates_groups(flux, flux_old_snap, xs_total, \
+                        xs_scatter, off_scatter_all, external, boundary_x, \
+                        medium_map, delta_x, angle_x, angle_w, block * gb, \
+                        min(gb, info.groups - block * gb), block_flux[tid], \
+                        block_edge_out[tid], block_reflector[tid], info_1t)
+        else:
+            # Sweep all groups in parallel (nogil)
+            for gg in prange(info.groups, nogil=True, schedule="dynamic", \
+                             num_threads=info.num_threads):
+                qq = 0 if external.shape[2] == 1 else gg
+                bc = 0 if boundary_x.shape[2] == 1 else gg
+                tid = threadid()
+                discrete_ordinates_work(flux[:,gg], flux_old_snap[gg], xs_total[:,gg], \
                         xs_scatter[:,gg,gg], off_scatter_all[gg], external[:,:,qq], \
-                        boundary_x[:,:,bc], medium_map, delta_x, angle_x, angle_w, info_1t)
+                        boundary_x[:,:,bc], medium_map, delta_x, angle_x, angle_w, \
+                        thread_flux[tid], edge_out[tid], reflector[tid], \
+                        half_angle[tid], no_angular, False, info_1t)
 
         change = tools.group_convergence(flux, flux_old, info)
         if isnan(change) or isinf(change):
@@ -231,19 +357,32 @@ cdef double[:,:] dynamic_mode_decomp(double[:,:]& flux_guess, \
         double[:,:]& xs_total, double[:,:,:]& xs_scatter, \
         double[:,:,:]& external, double[:,:,:]& boundary_x, \
         int[:]& medium_map, double[:]& delta_x, double[:]& angle_x, \
-        double[:]& angle_w, params info):
+        double[:]& angle_w, params info, object dmd=None, \
+        object factored=None):
 
     # Initialize components
-    cdef int gg, rk, kk, qq, bc
+    cdef int gg, rk, qq, bc
+
+    # Two-grid acceleration of the upscatter groups
+    cdef _TwoGrid two_grid = _two_grid(xs_total, xs_scatter, medium_map, \
+                                       delta_x, angle_x, angle_w, \
+                                       _upscatter_group(xs_scatter, info), info)
 
     # Initialize flux
     flux = tools.array_2d(info.cells_x, info.groups)
     flux_old = flux_guess.copy()
     flux_1g = tools.array_1d(info.cells_x)
 
-    # Initialize Y_plus and Y_minus
-    y_plus = tools.array_3d(info.cells_x, info.groups, info.dmd_snapshots - 1)
-    y_minus = tools.array_3d(info.cells_x, info.groups, info.dmd_snapshots - 1)
+    # Thin SVD of the iteration differences, updated every iteration and
+    # continued from the last solve when recycled
+    if dmd is None:
+        dmd = StreamingDMD(info.dmd_snapshots)
+    else:
+        dmd.restart()
+
+    # Extrapolations from the recycled snapshots
+    cdef double[:,:] estimate = None
+    cdef double[:,:] last_estimate = None
 
     # Create off-scattering term
     off_scatter = tools.array_1d(info.cells_x)
@@ -257,6 +396,8 @@ cdef double[:,:] dynamic_mode_decomp(double[:,:]& flux_guess, \
 
         # Return flux if there is convergence
         if converged:
+            logger.info("DMD: %d snapshots, %d recycled pairs, converged", \
+                        dmd.count, dmd.recycled)
             return flux[:,:]
 
         # Zero out flux
@@ -265,6 +406,10 @@ cdef double[:,:] dynamic_mode_decomp(double[:,:]& flux_guess, \
         # Iterate over energy groups
         for gg in range(info.groups):
 
+            # Evaluate a factored external source for this group
+            if factored is not None:
+                factored.fill(external, gg)
+
             # Determine dimensions of external and boundary sources
             qq = 0 if external.shape[2] == 1 else gg
             bc = 0 if boundary_x.shape[2] == 1 else gg
@@ -282,6 +427,10 @@ cdef double[:,:] dynamic_mode_decomp(double[:,:]& flux_guess, \
                     boundary_x[:,:,bc], medium_map, delta_x, angle_x, \
                     angle_w, info)
 
+        # Two-grid correction of the upscatter groups
+        if two_grid is not None:
+            two_grid.correct(flux, flux_old)
+
         # Check for convergence
         change = tools.group_convergence(flux, flux_old, info)
         if isnan(change) or isinf(change):
@@ -290,19 +439,306 @@ cdef double[:,:] dynamic_mode_decomp(double[:,:]& flux_guess, \
 
         # Collect difference for DMD on K iterations
         if rk >= info.dmd_rank:
-            # Get indexing
-            kk = rk - info.dmd_rank
-            tools._dmd_subtraction(y_minus, y_plus, flux, flux_old, kk, info)
+            dmd.update(flux, flux_old)
+
+            # Recycled snapshots extrapolate after every iteration, until
+            # two extrapolations agree
+            if dmd.recycled > 0:
+                estimate = dmd.extrapolate(flux)
+                if (last_estimate is not None) and (tools.group_convergence( \
+                        estimate, last_estimate, info) < info.tol_energy):
+                    logger.info("DMD: %d snapshots, %d recycled pairs", \
+                                dmd.count, dmd.recycled)
+                    return estimate[:,:]
+                last_estimate = estimate
 
         # Update old flux
         flux_old[:,:] = flux[:,:]
 
     # Perform DMD
-    flux = dmd_1d(flux, y_minus, y_plus, info.dmd_snapshots)
+    logger.info("DMD: %d snapshots, %d recycled pairs", dmd.count, \
+                dmd.recycled)
+    return dmd.extrapolate(flux)
+
+
+cdef double[:,:] krylov(double[:,:]& flux_guess, double[:,:]& xs_total, \
+        double[:,:,:]& xs_scatter, double[:,:,:]& external, \
+        double[:,:,:]& boundary_x, int[:]& medium_map, double[:]& delta_x, \
+        double[:]& angle_x, double[:]& angle_w, params info):
+    # Solves (I - D L^-1 M S) phi = D L^-1 q with GMRES, one group at a
+    # time for groups without upscatter and as one block for the rest
+
+    # Initialize components
+    cdef int gg
+    cdef int upscatter = _upscatter_group(xs_scatter, info)
+
+    # Initialize flux
+    flux = flux_guess.copy()
+
+    # Downscatter groups only depend on the groups already solved
+    for gg in range(upscatter):
+        _krylov_block(flux, xs_total, xs_scatter, external, boundary_x, \
+                      medium_map, delta_x, angle_x, angle_w, gg, gg + 1, info)
+
+    # Groups coupled through upscatter
+    if upscatter < info.groups:
+        _krylov_block(flux, xs_total, xs_scatter, external, boundary_x, \
+                      medium_map, delta_x, angle_x, angle_w, upscatter, \
+                      info.groups, info)
 
     return flux[:,:]
 
 
+cdef int[:] _reflected_angles(double[:]& angle_x, params info):
+    # Slab ordinates entering through a reflective boundary, whose incoming
+    # edge fluxes are Krylov unknowns
+    incoming = [nn for nn in range(info.angles) if (info.geometry == 1) \
+                and (info.bc_x[0 if angle_x[nn] > 0.0 else 1] == 1)]
+    return np.array(incoming, dtype=np.int32)
+
+
+cdef int _upscatter_group(double[:,:,:]& xs_scatter, params info):
+    # First group receiving particles from a lower energy group
+    cdef int mat, og, ig
+    for og in range(info.groups):
+        for mat in range(info.materials):
+            for ig in range(og + 1, info.groups):
+                if xs_scatter[mat,og,ig] != 0.0:
+                    return og
+    return info.groups
+
+
+cdef class _TwoGrid:
+    # One-group diffusion correction of the upscatter groups [first, groups)
+    cdef double[:,:,:] xs_scatter
+    cdef double[:,:] spectrum
+    cdef int[:] medium_map
+    cdef double[:] delta_x
+    cdef double* work
+    cdef int first
+    cdef params info
+
+    def __dealloc__(self):
+        free(self.work)
+
+    cdef void correct(self, double[:,:]& flux, double[:,:]& flux_old):
+        # Add the two-grid error estimate of the last Gauss-Seidel pass
+        cdef int edges = self.info.cells_x + 1
+        tools.tgs_correction(flux, flux_old, self.xs_scatter, self.spectrum, \
+                self.medium_map, self.delta_x, self.work, self.work + edges, \
+                self.work + 2 * edges, self.work + 3 * edges, self.first, \
+                self.info)
+
+
+cdef _TwoGrid _two_grid(double[:,:]& xs_total, double[:,:,:]& xs_scatter, \
+        int[:]& medium_map, double[:]& delta_x, double[:]& angle_x, \
+        double[:]& angle_w, int first, params info):
+    # Collapsed cross sections and factored diffusion system for two-grid
+    # acceleration; None if it is off, there is no upscatter, the sweep
+    # is not a slab or the diffusion system is singular
+    if (info.upscatter_acceleration != 2) or (first >= info.groups) \
+            or (info.geometry != 1):
+        return None
+
+    cdef double[:] coarse_total, coarse_scatter
+    coarse_total, coarse_scatter, spectrum = two_grid_materials(xs_total, \
+                                                    xs_scatter, first)
+
+    cdef _TwoGrid two_grid = _TwoGrid.__new__(_TwoGrid)
+    two_grid.xs_scatter = xs_scatter
+    two_grid.spectrum = spectrum
+    two_grid.medium_map = medium_map
+    two_grid.delta_x = delta_x
+    two_grid.first = first
+    two_grid.info = info
+
+    cdef int edges = info.cells_x + 1
+    two_grid.work = <double*> malloc(4 * edges * sizeof(double))
+    if not tools.dsa_factor(coarse_total, coarse_scatter, medium_map, \
+            delta_x, angle_x, angle_w, two_grid.work, two_grid.work + edges, \
+            two_grid.work + 2 * edges, info):
+        return None
+    return two_grid
+
+
+cdef class _SweepOperator:
+    # Matrix-free (I - L^-1 S) for the energy groups [first, last), with
+    # the edge fluxes entering through reflective boundaries appended to
+    # the unknowns after the scalar flux
+    cdef double[:,:] xs_total
+    cdef double[:,:,:] xs_scatter
+    cdef int[:] medium_map
+    cdef double[:] delta_x
+    cdef double[:] angle_x
+    cdef double[:] angle_w
+    cdef double[:] zero
+    cdef double[:,:] source
+    cdef double[:,:] boundary
+    cdef double[:,:] flux_1g
+    cdef double[:] reflector
+    cdef int[:] incoming
+    cdef int first
+    cdef int last
+    cdef int matvecs
+    cdef int sweeps
+    cdef params info
+
+    def matvec(self, vector):
+        # Initialize components
+        cdef int ii, nn, gg, og, mat, idx
+        cdef int n_groups = self.last - self.first
+        cdef int n_reflect = self.incoming.shape[0]
+        cdef int offset = self.info.cells_x * n_groups
+        cdef double[:] x = np.ascontiguousarray(vector, dtype=np.float64).ravel()
+        result = tools.array_1d(x.shape[0])
+
+        for gg in range(self.first, self.last):
+            # Scattering source within the block
+            for ii in range(self.info.cells_x):
+                mat = self.medium_map[ii]
+                self.source[ii,0] = 0.0
+                for og in range(self.first, self.last):
+                    self.source[ii,0] += self.xs_scatter[mat,gg,og] \
+                                        * x[ii * n_groups + og - self.first]
+
+            # Sweep without external or boundary sources
+            self.flux_1g[:,:] = 0.0
+            if n_reflect == 0:
+                _known_sweep(self.flux_1g, self.xs_total[:,gg], self.zero, \
+                             self.source, self.boundary, self.medium_map, \
+                             self.delta_x, self.angle_x, self.angle_w, self.info)
+            else:
+                idx = offset + (gg - self.first) * n_reflect
+                for nn in range(n_reflect):
+                    self.reflector[self.incoming[nn]] = x[idx + nn]
+                _known_slab_reflected(self.flux_1g, self.xs_total[:,gg], \
+                        self.zero, self.source, self.boundary, self.reflector, \
+                        self.medium_map, self.delta_x, self.angle_x, \
+                        self.angle_w, self.info)
+                for nn in range(n_reflect):
+                    result[idx + nn] = x[idx + nn] \
+                                    - self.reflector[self.incoming[nn]]
+
+            for ii in range(self.info.cells_x):
+                result[ii * n_groups + gg - self.first] = \
+                    x[ii * n_groups + gg - self.first] - self.flux_1g[ii,0]
+
+        self.matvecs += 1
+        self.sweeps += n_groups
+        return np.asarray(result)
+
+
+cdef void _krylov_block(double[:,:]& flux, double[:,:]& xs_total, \
+        double[:,:,:]& xs_scatter, double[:,:,:]& external, \
+        double[:,:,:]& boundary_x, int[:]& medium_map, double[:]& delta_x, \
+        double[:]& angle_x, double[:]& angle_w, int first, int last, \
+        params info):
+    # Solve groups [first, last) with the other groups fixed
+
+    # Initialize components
+    cdef int ii, nn, gg, og, mat, qq, bc
+    cdef int n_groups = last - first
+    cdef double off_scatter
+    cdef int[:] incoming = _reflected_angles(angle_x, info)
+    cdef int n_reflect = incoming.shape[0]
+
+    # Initialize sweep operator
+    cdef _SweepOperator sweeper = _SweepOperator.__new__(_SweepOperator)
+    sweeper.xs_total = xs_total
+    sweeper.xs_scatter = xs_scatter
+    sweeper.medium_map = medium_map
+    sweeper.delta_x = delta_x
+    sweeper.angle_x = angle_x
+    sweeper.angle_w = angle_w
+    sweeper.first = first
+    sweeper.last = last
+    sweeper.matvecs = 0
+    # One sweep per group for the right hand side
+    sweeper.sweeps = n_groups
+    sweeper.info = info
+    sweeper.zero = tools.array_1d(info.cells_x)
+    sweeper.source = tools.array_2d(info.cells_x, 1)
+    sweeper.boundary = tools.array_2d(2, 1)
+    sweeper.flux_1g = tools.array_2d(info.cells_x, 1)
+    sweeper.reflector = tools.array_1d(info.angles)
+    sweeper.incoming = incoming
+
+    # Right hand side: uncollided flux from the fixed sources
+    rhs = tools.array_2d(info.cells_x, n_groups)
+    cdef double[:,:] rhs_reflect = np.zeros((n_groups, n_reflect))
+    source = tools.array_2d(info.cells_x, external.shape[1])
+    flux_1g = tools.array_2d(info.cells_x, 1)
+    for gg in range(first, last):
+
+        # Determine dimensions of external and boundary sources
+        qq = 0 if external.shape[2] == 1 else gg
+        bc = 0 if boundary_x.shape[2] == 1 else gg
+
+        # Add scattering from the groups outside the block
+        for ii in range(info.cells_x):
+            mat = medium_map[ii]
+            off_scatter = 0.0
+            for og in range(info.groups):
+                if (og < first) or (og >= last):
+                    off_scatter += xs_scatter[mat,gg,og] * flux[ii,og]
+            for nn in range(external.shape[1]):
+                source[ii,nn] = external[ii,nn,qq] + off_scatter
+
+        # Reflected edge fluxes start from zero
+        flux_1g[:,:] = 0.0
+        sweeper.reflector[:] = 0.0
+        if n_reflect == 0:
+            _known_sweep(flux_1g, xs_total[:,gg], sweeper.zero, source, \
+                         boundary_x[:,:,bc], medium_map, delta_x, angle_x, \
+                         angle_w, info)
+        else:
+            _known_slab_reflected(flux_1g, xs_total[:,gg], sweeper.zero, \
+                        source, boundary_x[:,:,bc], sweeper.reflector, \
+                        medium_map, delta_x, angle_x, angle_w, info)
+        rhs[:,gg-first] = flux_1g[:,0]
+        for nn in range(n_reflect):
+            rhs_reflect[gg-first,nn] = sweeper.reflector[incoming[nn]]
+
+    # Matrix-free GMRES
+    size = info.cells_x * n_groups
+    total = size + n_groups * n_reflect
+    matrix = LinearOperator((total, total), matvec=sweeper.matvec, \
+                            dtype=np.float64)
+    guess = np.zeros((total,))
+    guess[:size] = np.asarray(flux[:,first:last]).flatten()
+    solution, status = gmres(matrix, np.append(np.asarray(rhs).flatten(), \
+                             np.asarray(rhs_reflect).flatten()), x0=guess, \
+                             rtol=info.tol_energy, atol=0.0, \
+                             restart=KRYLOV_RESTART, maxiter=info.max_iter_energy)
+    cdef double[:,:] solved = solution[:size].reshape(info.cells_x, n_groups)
+    flux[:,first:last] = solved
+
+    logger.info("Krylov groups %d-%d: %d matvecs, %d sweeps, status %d", \
+                first, last - 1, sweeper.matvecs, sweeper.sweeps, status)
+
+
+cdef bint sweep_capture(params info):
+    # The multigroup solve records the angular flux in its last sweep:
+    # source iteration, slab sweeps, Gauss-Seidel over groups
+    return (info.mg_solver == 1) and (info.geometry == 1) \
+            and not ((info.parallel_type == 2 or info.parallel_type == 3) \
+                     and info.groups > 1)
+
+
+cdef void _known_angular(double[:,:,:]& angular, double[:,:]& flux, \
+        double[:,:]& xs_total, double[:,:,:]& xs_scatter, \
+        double[:,:,:]& external, double[:,:,:]& boundary_x, \
+        int[:]& medium_map, double[:]& delta_x, double[:]& angle_x, \
+        double[:]& angle_w, params info):
+    # Angular flux from one sweep with the scattering source of flux
+    source = tools.array_3d(info.cells_x, info.angles, info.groups)
+    tools._source_total(source, flux, xs_scatter, medium_map, external, info)
+    # Cell edges when the buffer has cells_x + 1 rows
+    info.flux_at_edges = angular.shape[0] > info.cells_x
+    angular[:,:,:] = _known_source_angular(xs_total, source, boundary_x, \
+                            medium_map, delta_x, angle_x, angle_w, info)
+
+
 cdef double[:,:,:] _known_source_angular(double[:,:]& xs_total, \
         double[:,:,:]& source, double[:,:,:]& boundary_x, \
         int[:]& medium_map, double[:]& delta_x, double[:]& angle_x, \
@@ -361,3 +797,26 @@ cdef double[:,:] _known_source_scalar(double[:,:]& xs_total, \
                      delta_x, angle_x, angle_w, info)
 
     return scalar_flux[:,:,0]
+
+
+cdef void _known_source_current(double[:,:]& current, double[:,:]& xs_total, \
+        double[:,:,:]& source, double[:,:,:]& boundary_x, \
+        int[:]& medium_map, double[:]& delta_x, double[:]& angle_x, \
+        double[:]& angle_w, params info):
+    # source = flux * xs_scatter + external source
+    # current = [(I+1) x G] net current at the cell edges
+
+    # Initialize components
+    cdef int gg, qq, bc
+
+    # Iterate over groups
+    for gg in range(info.groups):
+
+        # Determine dimensions of external and boundary sources
+        qq = 0 if source.shape[2] == 1 else gg
+        bc = 0 if boundary_x.shape[2] == 1 else gg
+
+        # Perform angular sweep
+        _known_current(current[:,gg], xs_total[:,gg], source[:,:,qq], \
+                       boundary_x[:,:,bc], medium_map, delta_x, angle_x, \
+                       angle_w, info)
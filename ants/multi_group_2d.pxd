@@ -27,7 +27,8 @@ cdef double[:,:,:] multi_group(double[:,:,:]& flux_guess, \
         double[:,:,:,:]& external, double[:,:,:,:]& boundary_x, \
         double[:,:,:,:]& boundary_y, int[:,:]& medium_map, \
         double[:]& delta_x, double[:]& delta_y, double[:]& angle_x, \
-        double[:]& angle_y, double[:]& angle_w, params info)
+        double[:]& angle_y, double[:]& angle_w, params info, \
+        double[:,:,:,:] angular=*, object dmd=*)
 
 
 cdef double[:,:,:] source_iteration(double[:,:,:]& flux_guess, \
@@ -35,7 +36,8 @@ cdef double[:,:,:] source_iteration(double[:,:,:]& flux_guess, \
         double[:,:,:,:]& external, double[:,:,:,:]& boundary_x, \
         double[:,:,:,:]& boundary_y, int[:,:]& medium_map, \
         double[:]& delta_x, double[:]& delta_y, double[:]& angle_x, \
-        double[:]& angle_y, double[:]& angle_w, params info)
+        double[:]& angle_y, double[:]& angle_w, params info, \
+        double[:,:,:,:] angular=*, object factored=*)
 
 
 cdef double[:,:,:] dynamic_mode_decomp(double[:,:,:]& flux_guess, \
@@ -43,7 +45,8 @@ cdef double[:,:,:] dynamic_mode_decomp(double[:,:,:]& flux_guess, \
         double[:,:,:,:]& external, double[:,:,:,:]& boundary_x, \
         double[:,:,:,:]& boundary_y, int[:,:]& medium_map, \
         double[:]& delta_x, double[:]& delta_y, double[:]& angle_x, \
-        double[:]& angle_y, double[:]& angle_w, params info)
+        double[:]& angle_y, double[:]& angle_w, params info, \
+        object dmd=*, object factored=*)
 
 
 cdef double[:,:,:] variable_source_iteration(double[:,:,:]& flux_guess, \
@@ -55,6 +58,17 @@ cdef double[:,:,:] variable_source_iteration(double[:,:,:]& flux_guess, \
         double[:]& edges_g, int[:]& edges_gidx_c, params info)
 
 
+cdef double[:,:,:] krylov(double[:,:,:]& flux_guess, double[:,:]& xs_total, \
+        double[:,:,:]& xs_scatter, double[:,:,:,:]& external, \
+        double[:,:,:,:]& boundary_x, double[:,:,:,:]& boundary_y, \
+        int[:,:]& medium_map, double[:]& delta_x, double[:]& delta_y, \
+        double[:]& angle_x, double[:]& angle_y, double[:]& angle_w, \
+        params info)
+
+
+cdef bint sweep_capture(params info)
+
+
 cdef double[:,:,:,:] _known_source_angular(double[:,:]& xs_total, \
         double[:,:,:,:]& source, double[:,:,:,:]& boundary_x, \
         double[:,:,:,:]& boundary_y, int[:,:]& medium_map, \
@@ -90,3 +104,11 @@ cdef void _interface_scalar(double[:,:,:,:]& flux_edge_x, \
         double[:,:,:,:]& boundary_y, int[:,:]& medium_map, \
         double[:]& delta_x, double[:]& delta_y, double[:]& angle_x, \
         double[:]& angle_y, double[:]& angle_w, params info)
+
+
+cdef void _known_source_current(double[:,:,:]& current_x, \
+        double[:,:,:]& current_y, double[:,:]& xs_total, \
+        double[:,:,:,:]& source, double[:,:,:,:]& boundary_x, \
+        double[:,:,:,:]& boundary_y, int[:,:]& medium_map, \
+        double[:]& delta_x, double[:]& delta_y, double[:]& angle_x, \
+        double[:]& angle_y, double[:]& angle_w, params info)
@@ -20,19 +20,39 @@
 # distutils: extra_compile_args = -O3 -march=native -ffast-math
 
 from libc.math cimport isinf, isnan
+from libc.stdlib cimport free, malloc
 
-from cython.parallel import prange
+from cython.parallel import prange, threadid
 
 from ants cimport cytools_2d as tools
 from ants.cytools_1d cimport _variable_cross_sections
 from ants.parameters cimport params
 from ants.spatial_sweep_2d cimport (
     _known_center_sweep,
+    _known_current_sweep,
     _known_interface_sweep,
+    _known_square_reflected,
     discrete_ordinates,
+    discrete_ordinates_groups,
+    discrete_ordinates_work,
+    use_coef_table,
 )
 
-from ants.utils.pytools import dmd_2d
+import logging
+
+import numpy as np
+from scipy.sparse.linalg import LinearOperator, gmres
+
+from ants.utils.hybrid import two_grid_materials
+from ants.utils.pytools import StreamingDMD
+
+logger = logging.getLogger(__name__)
+
+# Largest number of energy groups swept together in the Jacobi iteration
+cdef int GROUP_BLOCK = 8
+
+# Krylov vectors kept between GMRES restarts
+cdef int KRYLOV_RESTART = 30
 
 
 cdef double[:,:,:] multi_group(double[:,:,:]& flux_guess, \
@@ -40,22 +60,36 @@ cdef double[:,:,:] multi_group(double[:,:,:]& flux_guess, \
         double[:,:,:,:]& external, double[:,:,:,:]& boundary_x, \
         double[:,:,:,:]& boundary_y, int[:,:]& medium_map, \
         double[:]& delta_x, double[:]& delta_y, double[:]& angle_x, \
-        double[:]& angle_y, double[:]& angle_w, params info):
-    # Source Iteration
+        double[:]& angle_y, double[:]& angle_w, params info, \
+        double[:,:,:,:] angular=None, object dmd=None):
+    # angular = [I x J x N^2 x G] is filled with the angular flux of the
+    # solution when given, taken from the final sweep where the solver
+    # allows it
+
+    # Source Iteration (Jacobi when parallel_type == GROUP or BOTH)
     if info.mg_solver == 1:
-        # Activated when parallel_type == GROUP (2) or BOTH (3).
-        if info.parallel_type >= 2 and info.groups > 1:
-            return jacobi_iteration(flux_guess, xs_total, xs_scatter, external, \
-                            boundary_x, boundary_y, medium_map, delta_x, delta_y, \
-                            angle_x, angle_y, angle_w, info)
         return source_iteration(flux_guess, xs_total, xs_scatter, \
                     external, boundary_x, boundary_y, medium_map, \
-                    delta_x, delta_y, angle_x, angle_y, angle_w, info)
+                    delta_x, delta_y, angle_x, angle_y, angle_w, info, \
+                    angular)
     # Dynamic Mode Decomposition
     elif info.mg_solver == 2:
-        return dynamic_mode_decomp(flux_guess, xs_total, xs_scatter, \
+        flux = dynamic_mode_decomp(flux_guess, xs_total, xs_scatter, \
                     external, boundary_x, boundary_y, medium_map, \
-                    delta_x, delta_y, angle_x, angle_y, angle_w, info)
+                    delta_x, delta_y, angle_x, angle_y, angle_w, info, dmd)
+    # Krylov (GMRES)
+    elif info.mg_solver == 3:
+        flux = krylov(flux_guess, xs_total, xs_scatter, external, \
+                    boundary_x, boundary_y, medium_map, delta_x, delta_y, \
+                    angle_x, angle_y, angle_w, info)
+
+    # Extra sweep for the angular flux
+    if angular is not None:
+        _known_angular(angular, flux, xs_total, xs_scatter, external, \
+                       boundary_x, boundary_y, medium_map, delta_x, delta_y, \
+                       angle_x, angle_y, angle_w, info)
+
+    return flux
 
 
 cdef double[:,:,:] source_iteration(double[:,:,:]& flux_guess, \
@@ -63,11 +97,45 @@ cdef double[:,:,:] source_iteration(double[:,:,:]& flux_guess, \
         double[:,:,:,:]& external, double[:,:,:,:]& boundary_x, \
         double[:,:,:,:]& boundary_y, int[:,:]& medium_map, \
         double[:]& delta_x, double[:]& delta_y, double[:]& angle_x, \
-        double[:]& angle_y, double[:]& angle_w, params info):
+        double[:]& angle_y, double[:]& angle_w, params info, \
+        double[:,:,:,:] angular=None, object factored=None):
+    # factored = FactoredSource that fills the one group external buffer
+
+    # Group-parallel path: Jacobi iteration
+    if (info.parallel_type == 2 or info.parallel_type == 3) \
+                and info.groups > 1:
+        flux = jacobi_iteration(flux_guess, xs_total, xs_scatter, external, \
+                        boundary_x, boundary_y, medium_map, delta_x, delta_y, \
+                        angle_x, angle_y, angle_w, info)
+        if angular is not None:
+            _known_angular(angular, flux, xs_total, xs_scatter, external, \
+                        boundary_x, boundary_y, medium_map, delta_x, delta_y, \
+                        angle_x, angle_y, angle_w, info)
+        return flux
 
     # Initialize components
     cdef int gg, qq, bcx, bcy
-    cdef params info_1t
+
+    # Groups before the first upscatter group only depend on groups already
+    # swept, so the first pass solves them and later passes skip them
+    cdef int upscatter = _upscatter_group(xs_scatter, info)
+    cdef int first = 0
+
+    # Two-grid acceleration of the upscatter groups
+    cdef _TwoGrid two_grid = _two_grid(xs_total, xs_scatter, medium_map, \
+                                       delta_x, delta_y, angle_x, angle_y, \
+                                       angle_w, upscatter, info)
+
+    # Angle-batched sweeps write the angular flux as they go; the spatial
+    # wavefront sweeps (SPACE, SPACE_ANGLE) do not. Only passes after the
+    # first write it, since their warm-started inner solves take few sweeps,
+    # except for the downscatter groups, which are swept once.
+    # A solve that stops on its first pass takes the extra sweep below.
+    cdef bint capture = (angular is not None) \
+            and (info.parallel_type != 4) and (info.parallel_type != 5)
+
+    # Reflected ordinate partners, shared by every group sweep
+    cdef int[:,:] reflect = tools.reflection_map(angle_x, angle_y, info)
 
     # Initialize flux
     flux = tools.array_3d(info.cells_x, info.cells_y, info.groups)
@@ -77,61 +145,7 @@ cdef double[:,:,:] source_iteration(double[:,:,:]& flux_guess, \
     cdef bint converged = False
     cdef int count = 1
     cdef double change = 0.0
-
-
-    if info.parallel_type >= 2 and info.groups > 1:
-
-        # Per-group off-scatter buffer: off_scatter_all[gg, ii, jj]
-        off_scatter_all = tools.array_3d(info.groups, info.cells_x, info.cells_y)
-
-        # Row-major snapshot: flux_old_snap[gg, ii, jj].
-        # square_ordinates writes flux_old[:,:] = flux[:,:] at the end of
-        # each angular inner iteration.  Passing flux_old[:,:,gg] directly
-        # would corrupt the outer flux_old and make group_convergence() report
-        # zero change after the first sweep, causing premature exit.
-        flux_old_snap = tools.array_3d(info.groups, info.cells_x, info.cells_y)
-
-        info_1t = info
-        if info.parallel_type == 2:   # GROUP only
-            info_1t.num_threads = 1
-
-        while not converged:
-
-            flux[:,:,:] = 0.0
-
-            # Refresh per-group snapshot from the current flux_old
-            for gg in range(info.groups):
-                flux_old_snap[gg, :, :] = flux_old[:, :, gg]
-
-            # Compute Jacobi off-scatter for every group in parallel (nogil)
-            for gg in prange(info.groups, nogil=True, \
-                             num_threads=info.num_threads):
-                tools._off_scatter_jacobi(flux_old, medium_map, xs_scatter, \
-                                          off_scatter_all, info, gg)
-
-            # Sweep all groups in parallel
-            for gg in prange(info.groups, nogil=True, \
-                             num_threads=info.num_threads):
-                qq  = 0 if external.shape[3]   == 1 else gg
-                bcx = 0 if boundary_x.shape[3]  == 1 else gg
-                bcy = 0 if boundary_y.shape[3]  == 1 else gg
-                with gil:
-                    discrete_ordinates(flux[:,:,gg], flux_old_snap[gg], \
-                            xs_total[:,gg], xs_scatter[:,gg,gg], \
-                            off_scatter_all[gg], external[:,:,:,qq], \
-                            boundary_x[:,:,:,bcx], boundary_y[:,:,:,bcy], \
-                            medium_map, delta_x, delta_y, angle_x, angle_y, \
-                            angle_w, info_1t)
-
-            change = tools.group_convergence(flux, flux_old, info)
-            if isnan(change) or isinf(change):
-                change = 0.5
-            converged = (change < info.tol_energy) \
-                        or (count >= info.max_iter_energy)
-            count += 1
-            flux_old[:,:,:] = flux[:,:,:]
-
-        return flux[:,:,:]
+    cdef int sweeps = 0
 
     # -----------------------------------------------------------------------
     # Sequential path: Gauss-Seidel iteration
@@ -141,9 +155,13 @@ cdef double[:,:,:] source_iteration(double[:,:,:]& flux_guess, \
 
     while not converged:
 
-        flux[:,:,:] = 0.0
+        flux[:,:,first:] = 0.0
 
-        for gg in range(info.groups):
+        for gg in range(first, info.groups):
+
+            # Evaluate a factored external source for this group
+            if factored is not None:
+                factored.fill(external, gg)
 
             qq  = 0 if external.shape[3]  == 1 else gg
             bcx = 0 if boundary_x.shape[3] == 1 else gg
@@ -154,19 +172,42 @@ cdef double[:,:,:] source_iteration(double[:,:,:]& flux_guess, \
             tools._off_scatter(flux, flux_old, medium_map, xs_scatter, \
                                off_scatter, info, gg)
 
-            discrete_ordinates(flux[:,:,gg], flux_1g, xs_total[:,gg], \
-                    xs_scatter[:,gg,gg], off_scatter, external[:,:,:,qq], \
-                    boundary_x[:,:,:,bcx], boundary_y[:,:,:,bcy], medium_map, \
-                    delta_x, delta_y, angle_x, angle_y, angle_w, info)
+            if capture and ((count > 1) or (gg < upscatter)):
+                sweeps += discrete_ordinates(flux[:,:,gg], flux_1g, xs_total[:,gg], \
+                        xs_scatter[:,gg,gg], off_scatter, external[:,:,:,qq], \
+                        boundary_x[:,:,:,bcx], boundary_y[:,:,:,bcy], \
+                        medium_map, delta_x, delta_y, angle_x, angle_y, \
+                        angle_w, reflect, info, angular[:,:,:,gg])
+            else:
+                sweeps += discrete_ordinates(flux[:,:,gg], flux_1g, xs_total[:,gg], \
+                        xs_scatter[:,gg,gg], off_scatter, external[:,:,:,qq], \
+                        boundary_x[:,:,:,bcx], boundary_y[:,:,:,bcy], \
+                        medium_map, delta_x, delta_y, angle_x, angle_y, \
+                        angle_w, reflect, info)
+
+        if two_grid is not None:
+            two_grid.correct(flux, flux_old)
 
         change = tools.group_convergence(flux, flux_old, info)
         if isnan(change) or isinf(change):
             change = 0.5
-        converged = (change < info.tol_energy) or (count >= info.max_iter_energy)
+        converged = (change < info.tol_energy) or (count >= info.max_iter_energy) \
+                    or (upscatter == info.groups)
         count += 1
+        first = upscatter
 
         flux_old[:,:,:] = flux[:,:,:]
 
+    logger.info("Source iteration: %d passes, %d sweeps, change %.2e", \
+                count - 1, sweeps, change)
+
+    # Extra sweep for the angular flux
+    if (angular is not None) and not (capture \
+            and ((count > 2) or (upscatter == info.groups))):
+        _known_angular(angular, flux, xs_total, xs_scatter, external, \
+                       boundary_x, boundary_y, medium_map, delta_x, delta_y, \
+                       angle_x, angle_y, angle_w, info)
+
     return flux[:,:,:]
 
 
@@ -177,8 +218,22 @@ cdef double[:,:,:] jacobi_iteration(double[:,:,:]& flux_guess, \
         double[:]& delta_x, double[:]& delta_y, double[:]& angle_x, \
         double[:]& angle_y, double[:]& angle_w, params info):
     # Initialize components
-    cdef int gg, qq, bcx, bcy
+    cdef int gg, qq, bcx, bcy, tid, block
     cdef params info_1t
+    cdef int N2 = info.angles * info.angles
+
+    # Groups swept together per spatial pass; keep at least one block per
+    # thread so the group prange stays balanced
+    cdef int gb = max(1, min(GROUP_BLOCK, info.groups // info.num_threads))
+    # Step characteristic weights depend on the group, so the per-group
+    # sweep with its coefficient tables is faster there.  DSA runs in the
+    # per-group sweep only.
+    if (info.spatial == 3) or (info.inner_solver == 2):
+        gb = 1
+    cdef int n_blocks = (info.groups + gb - 1) // gb
+
+    # Reflected ordinate partners, shared by every group sweep
+    cdef int[:,:] reflect = tools.reflection_map(angle_x, angle_y, info)
 
     # Initialize flux
     flux = tools.array_3d(info.cells_x, info.cells_y, info.groups)
@@ -196,6 +251,35 @@ cdef double[:,:,:] jacobi_iteration(double[:,:,:]& flux_guess, \
     if info.parallel_type == 2:
         info_1t.num_threads = 1
 
+    # Sweep work arrays, one set per outer (group) thread so that the
+    # group prange never needs the GIL
+    thread_flux = tools.array_4d(info.num_threads, info_1t.num_threads, \
+                                 info.cells_x, info.cells_y)
+    known_x_work = tools.array_3d(info.num_threads, N2, info.cells_y)
+    known_y_work = tools.array_3d(info.num_threads, N2, info.cells_x)
+    no_angular = tools.array_3d(1, 1, 1)
+    reflected_x = tools.array_4d(info.num_threads, 2, info.cells_y, N2)
+    reflected_y = tools.array_4d(info.num_threads, 2, info.cells_x, N2)
+    if use_coef_table(info) and (gb == 1):
+        coef_x_table = tools.array_5d(info.num_threads, N2, info.cells_x, \
+                                      info.materials, 3)
+        coef_y_table = tools.array_5d(info.num_threads, N2, info.cells_y, \
+                                      info.materials, 3)
+    else:
+        coef_x_table = tools.array_5d(info.num_threads, 1, 1, 1, 3)
+        coef_y_table = tools.array_5d(info.num_threads, 1, 1, 1, 3)
+
+    # Group-block work arrays (indexed by group offset within the block)
+    if gb > 1:
+        block_flux = tools.array_5d(info.num_threads, info_1t.num_threads, \
+                                    info.cells_x, info.cells_y, gb)
+        block_known_x = tools.array_4d(info.num_threads, gb, N2, info.cells_y)
+        block_known_y = tools.array_4d(info.num_threads, gb, N2, info.cells_x)
+        block_reflected_x = tools.array_5d(info.num_threads, gb, 2, \
+                                           info.cells_y, N2)
+        block_reflected_y = tools.array_5d(info.num_threads, gb, 2, \
+                                           info.cells_x, N2)
+
     # Set convergence limits
     cdef bint converged = False
     cdef int count = 1
@@ -213,16 +297,34 @@ cdef double[:,:,:] jacobi_iteration(double[:,:,:]& flux_guess, \
             tools._off_scatter_jacobi(flux_old, medium_map, xs_scatter, \
                                     off_scatter_all, info, gg)
 
-        # Sweep all groups in parallel
-        for gg in prange(info.groups, nogil=True, num_threads=info.num_threads):
-            qq  = 0 if external.shape[3]   == 1 else gg
-            bcx = 0 if boundary_x.shape[3]  == 1 else gg
-            bcy = 0 if boundary_y.shape[3]  == 1 else gg
-            with gil:
-                discrete_ordinates(flux[:,:,gg], flux_old_snap[gg], xs_total[:,gg], \
-                        xs_scatter[:,gg,gg], off_scatter_all[gg], external[:,:,:,qq], \
-                        boundary_x[:,:,:,bcx], boundary_y[:,:,:,bcy], medium_map, \
-                        delta_x, delta_y, angle_x, angle_y, angle_w, info_1t)
+        # Sweep blocks of groups in parallel (nogil)
+        if gb > 1:
+            for block in prange(n_blocks, nogil=True, schedule="dynamic", \
+                                num_threads=info.num_threads):
+                tid = threadid()
+                discrete_ordinates_groups(flux, flux_old_snap, xs_total, \
+                        xs_scatter, off_scatter_all, external, boundary_x, \
+                        boundary_y, medium_map, delta_x, delta_y, angle_x, \
+                        angle_y, angle_w, reflect, block * gb, \
+                        min(gb, info.groups - block * gb), block_flux[tid], \
+                        block_known_x[tid], block_known_y[tid], \
+                        block_reflected_x[tid], block_reflected_y[tid], info_1t)
+        else:
+            # Sweep all groups in parallel (nogil)
+            for gg in prange(info.groups, nogil=True, schedule="dynamic", \
+                             num_threads=info.num_threads):
+                qq  = 0 if external.shape[3]   == 1 else gg
+                bcx = 0 if boundary_x.shape[3]  == 1 else gg
+                bcy = 0 if boundary_y.shape[3]  == 1 else gg
+                tid = threadid()
+                discrete_ordinates_work(flux[:,:,gg], flux_old_snap[gg], \
+                        xs_total[:,gg], xs_scatter[:,gg,gg], off_scatter_all[gg], \
+                        external[:,:,:,qq], boundary_x[:,:,:,bcx], \
+                        boundary_y[:,:,:,bcy], medium_map, delta_x, delta_y, \
+                        angle_x, angle_y, angle_w, reflect, thread_flux[tid], \
+                        known_x_work[tid], known_y_work[tid], reflected_x[tid], \
+                        reflected_y[tid], coef_x_table[tid], coef_y_table[tid], \
+                        no_angular, False, info_1t)
 
         change = tools.group_convergence(flux, flux_old, info)
         if isnan(change) or isinf(change):
@@ -245,6 +347,9 @@ cdef double[:,:,:] variable_source_iteration(double[:,:,:]& flux_guess, \
     # Initialize components
     cdef int gg, qq, bcx, bcy, idx1, idx2
 
+    # Reflected ordinate partners, shared by every group sweep
+    cdef int[:,:] reflect = tools.reflection_map(angle_x, angle_y, info)
+
     # Initialize flux
     flux = tools.array_3d(info.cells_x, info.cells_y, info.groups)
     flux_old = flux_guess.copy()
@@ -283,7 +388,7 @@ cdef double[:,:,:] variable_source_iteration(double[:,:,:]& flux_guess, \
             discrete_ordinates(flux[:,:,gg], flux_old[:,:,gg].copy(), xs_total_c, xs_scatter_c, \
                     off_scatter, external[:,:,:,qq], boundary_x[:,:,bcx], \
                     boundary_y[:,:,bcy], medium_map, delta_x, delta_y, angle_x, \
-                    angle_y, angle_w, info)
+                    angle_y, angle_w, reflect, info)
 
         # Check for convergence
         change = tools.group_convergence(flux, flux_old, info)
@@ -303,19 +408,36 @@ cdef double[:,:,:] dynamic_mode_decomp(double[:,:,:]& flux_guess, \
         double[:,:,:,:]& external, double[:,:,:,:]& boundary_x, \
         double[:,:,:,:]& boundary_y, int[:,:]& medium_map, \
         double[:]& delta_x, double[:]& delta_y, double[:]& angle_x, \
-        double[:]& angle_y, double[:]& angle_w, params info):
+        double[:]& angle_y, double[:]& angle_w, params info, \
+        object dmd=None, object factored=None):
 
     # Initialize components
-    cdef int gg, rk, kk, qq, bcx, bcy
+    cdef int gg, rk, qq, bcx, bcy
+
+    # Two-grid acceleration of the upscatter groups
+    cdef _TwoGrid two_grid = _two_grid(xs_total, xs_scatter, medium_map, \
+                                       delta_x, delta_y, angle_x, angle_y, \
+                                       angle_w, _upscatter_group(xs_scatter, info), \
+                                       info)
+
+    # Reflected ordinate partners, shared by every group sweep
+    cdef int[:,:] reflect = tools.reflection_map(angle_x, angle_y, info)
 
     # Initialize flux
     flux = tools.array_3d(info.cells_x, info.cells_y, info.groups)
     flux_old = flux_guess.copy()
     flux_1g = tools.array_2d(info.cells_x, info.cells_y)
 
-    # Initialize Y_plus and Y_minus
-    y_plus = tools.array_4d(info.cells_x, info.cells_y, info.groups, info.dmd_snapshots - 1)
-    y_minus = tools.array_4d(info.cells_x, info.cells_y, info.groups, info.dmd_snapshots - 1)
+    # Thin SVD of the iteration differences, updated every iteration and
+    # continued from the last solve when recycled
+    if dmd is None:
+        dmd = StreamingDMD(info.dmd_snapshots)
+    else:
+        dmd.restart()
+
+    # Extrapolations from the recycled snapshots
+    cdef double[:,:,:] estimate = None
+    cdef double[:,:,:] last_estimate = None
 
     # Create off-scattering term
     off_scatter = tools.array_2d(info.cells_x, info.cells_y)
@@ -329,6 +451,8 @@ cdef double[:,:,:] dynamic_mode_decomp(double[:,:,:]& flux_guess, \
 
         # Return flux if there is convergence
         if converged:
+            logger.info("DMD: %d snapshots, %d recycled pairs, converged", \
+                        dmd.count, dmd.recycled)
             return flux[:,:,:]
 
         # Zero out flux
@@ -337,6 +461,10 @@ cdef double[:,:,:] dynamic_mode_decomp(double[:,:,:]& flux_guess, \
         # Iterate over energy groups
         for gg in range(info.groups):
 
+            # Evaluate a factored external source for this group
+            if factored is not None:
+                factored.fill(external, gg)
+
             # Determine dimensions of external and boundary sources
             qq = 0 if external.shape[3] == 1 else gg
             bcx = 0 if boundary_x.shape[3] == 1 else gg
@@ -353,7 +481,11 @@ cdef double[:,:,:] dynamic_mode_decomp(double[:,:,:]& flux_guess, \
             discrete_ordinates(flux[:,:,gg], flux_1g, xs_total[:,gg], \
                     xs_scatter[:,gg,gg], off_scatter, external[:,:,:,qq], \
                     boundary_x[:,:,:,bcx], boundary_y[:,:,:,bcy], medium_map, \
-                    delta_x, delta_y, angle_x, angle_y, angle_w, info)
+                    delta_x, delta_y, angle_x, angle_y, angle_w, reflect, info)
+
+        # Two-grid correction of the upscatter groups
+        if two_grid is not None:
+            two_grid.correct(flux, flux_old)
 
         # Check for convergence
         change = tools.group_convergence(flux, flux_old, info)
@@ -363,19 +495,369 @@ cdef double[:,:,:] dynamic_mode_decomp(double[:,:,:]& flux_guess, \
 
         # Collect difference for DMD on K iterations
         if rk >= info.dmd_rank:
-            # Get indexing
-            kk = rk - info.dmd_rank
-            tools._dmd_subtraction(y_minus, y_plus, flux, flux_old, kk, info)
+            dmd.update(flux, flux_old)
+
+            # Recycled snapshots extrapolate after every iteration, until
+            # two extrapolations agree
+            if dmd.recycled > 0:
+                estimate = dmd.extrapolate(flux)
+                if (last_estimate is not None) and (tools.group_convergence( \
+                        estimate, last_estimate, info) < info.tol_energy):
+                    logger.info("DMD: %d snapshots, %d recycled pairs", \
+                                dmd.count, dmd.recycled)
+                    return estimate[:,:,:]
+                last_estimate = estimate
 
         # Update old flux
         flux_old[:,:,:] = flux[:,:,:]
 
     # Perform DMD
-    flux = dmd_2d(flux, y_minus, y_plus, info.dmd_snapshots)
+    logger.info("DMD: %d snapshots, %d recycled pairs", dmd.count, \
+                dmd.recycled)
+    return dmd.extrapolate(flux)
+
+
+cdef double[:,:,:] krylov(double[:,:,:]& flux_guess, double[:,:]& xs_total, \
+        double[:,:,:]& xs_scatter, double[:,:,:,:]& external, \
+        double[:,:,:,:]& boundary_x, double[:,:,:,:]& boundary_y, \
+        int[:,:]& medium_map, double[:]& delta_x, double[:]& delta_y, \
+        double[:]& angle_x, double[:]& angle_y, double[:]& angle_w, \
+        params info):
+    # Solves (I - D L^-1 M S) phi = D L^-1 q with GMRES, one group at a
+    # time for groups without upscatter and as one block for the rest
+
+    # Initialize components
+    cdef int gg
+    cdef int upscatter = _upscatter_group(xs_scatter, info)
+
+    # Initialize flux
+    flux = flux_guess.copy()
+
+    # Downscatter groups only depend on the groups already solved
+    for gg in range(upscatter):
+        _krylov_block(flux, xs_total, xs_scatter, external, boundary_x, \
+                      boundary_y, medium_map, delta_x, delta_y, angle_x, \
+                      angle_y, angle_w, gg, gg + 1, info)
+
+    # Groups coupled through upscatter
+    if upscatter < info.groups:
+        _krylov_block(flux, xs_total, xs_scatter, external, boundary_x, \
+                      boundary_y, medium_map, delta_x, delta_y, angle_x, \
+                      angle_y, angle_w, upscatter, info.groups, info)
 
     return flux[:,:,:]
 
 
+cdef int _upscatter_group(double[:,:,:]& xs_scatter, params info):
+    # First group receiving particles from a lower energy group
+    cdef int mat, og, ig
+    for og in range(info.groups):
+        for mat in range(info.materials):
+            for ig in range(og + 1, info.groups):
+                if xs_scatter[mat,og,ig] != 0.0:
+                    return og
+    return info.groups
+
+
+cdef class _TwoGrid:
+    # One-group diffusion correction of the upscatter groups [first, groups)
+    cdef double[:,:,:] xs_scatter
+    cdef double[:,:] spectrum
+    cdef double[:] coarse_total
+    cdef double[:] coarse_scatter
+    cdef int[:,:] medium_map
+    cdef double[:] delta_x
+    cdef double[:] delta_y
+    cdef double* work
+    cdef int first
+    cdef params info
+
+    def __dealloc__(self):
+        free(self.work)
+
+    cdef void correct(self, double[:,:,:]& flux, double[:,:,:]& flux_old):
+        # Add the two-grid error estimate of the last Gauss-Seidel pass
+        cdef int vertices = (self.info.cells_x + 1) * (self.info.cells_y + 1)
+        tools.tgs_correction(flux, flux_old, self.xs_scatter, self.spectrum, \
+                self.coarse_total, self.coarse_scatter, self.medium_map, \
+                self.delta_x, self.delta_y, self.work, self.work + vertices, \
+                self.work + 2 * vertices, self.first, self.info)
+
+
+cdef _TwoGrid _two_grid(double[:,:]& xs_total, double[:,:,:]& xs_scatter, \
+        int[:,:]& medium_map, double[:]& delta_x, double[:]& delta_y, \
+        double[:]& angle_x, double[:]& angle_y, double[:]& angle_w, \
+        int first, params info):
+    # Collapsed cross sections and diffusion boundary terms for two-grid
+    # acceleration; None if it is off, there is no upscatter or the
+    # diffusion system is singular
+    if (info.upscatter_acceleration != 2) or (first >= info.groups):
+        return None
+
+    coarse_total, coarse_scatter, spectrum = two_grid_materials(xs_total, \
+                                                    xs_scatter, first)
+
+    cdef _TwoGrid two_grid = _TwoGrid.__new__(_TwoGrid)
+    two_grid.xs_scatter = xs_scatter
+    two_grid.spectrum = spectrum
+    two_grid.coarse_total = coarse_total
+    two_grid.coarse_scatter = coarse_scatter
+    two_grid.medium_map = medium_map
+    two_grid.delta_x = delta_x
+    two_grid.delta_y = delta_y
+    two_grid.first = first
+    two_grid.info = info
+
+    # Boundary terms, preconditioner and conjugate gradient scratch
+    cdef int vertices = (info.cells_x + 1) * (info.cells_y + 1)
+    two_grid.work = <double*> malloc(7 * vertices * sizeof(double))
+    if not tools.dsa_setup(two_grid.coarse_total, two_grid.coarse_scatter, \
+            medium_map, delta_x, delta_y, angle_x, angle_y, angle_w, \
+            two_grid.work, two_grid.work + vertices, info):
+        return None
+    return two_grid
+
+
+cdef class _SweepOperator:
+    # Matrix-free (I - L^-1 S) for the energy groups [first, last), with
+    # the edge fluxes entering through reflective boundaries appended to
+    # the unknowns after the scalar flux
+    cdef double[:,:] xs_total
+    cdef double[:,:,:] xs_scatter
+    cdef int[:,:] medium_map
+    cdef double[:] delta_x
+    cdef double[:] delta_y
+    cdef double[:] angle_x
+    cdef double[:] angle_y
+    cdef double[:] angle_w
+    cdef double[:,:] zero
+    cdef double[:,:,:] source
+    cdef double[:,:,:] boundary_x
+    cdef double[:,:,:] boundary_y
+    cdef double[:,:,:] flux_1g
+    cdef double[:,:,:] reflected_x
+    cdef double[:,:,:] reflected_y
+    cdef int[:] incoming_x
+    cdef int[:] incoming_y
+    cdef int n_edge
+    cdef int first
+    cdef int last
+    cdef int matvecs
+    cdef int sweeps
+    cdef params info
+
+    cdef void load(self, double[:] x, int idx):
+        # Incoming reflected edge fluxes from x[idx:idx+n_edge]
+        cdef int kk, nn, loc, ii, jj
+        for kk in range(self.incoming_x.shape[0]):
+            nn = self.incoming_x[kk]
+            loc = 0 if self.angle_x[nn] > 0.0 else 1
+            for jj in range(self.info.cells_y):
+                self.reflected_x[loc,jj,nn] = x[idx]
+                idx += 1
+        for kk in range(self.incoming_y.shape[0]):
+            nn = self.incoming_y[kk]
+            loc = 0 if self.angle_y[nn] > 0.0 else 1
+            for ii in range(self.info.cells_x):
+                self.reflected_y[loc,ii,nn] = x[idx]
+                idx += 1
+
+    cdef void store(self, double[:] y, int idx):
+        # Edge fluxes reflected in the last sweep into y[idx:idx+n_edge]
+        cdef int kk, nn, loc, ii, jj
+        for kk in range(self.incoming_x.shape[0]):
+            nn = self.incoming_x[kk]
+            loc = 0 if self.angle_x[nn] > 0.0 else 1
+            for jj in range(self.info.cells_y):
+                y[idx] = self.reflected_x[loc,jj,nn]
+                idx += 1
+        for kk in range(self.incoming_y.shape[0]):
+            nn = self.incoming_y[kk]
+            loc = 0 if self.angle_y[nn] > 0.0 else 1
+            for ii in range(self.info.cells_x):
+                y[idx] = self.reflected_y[loc,ii,nn]
+                idx += 1
+
+    def matvec(self, vector):
+        # Initialize components
+        cdef int ii, jj, kk, gg, og, mat, idx
+        cdef int n_groups = self.last - self.first
+        cdef int offset = self.info.cells_x * self.info.cells_y * n_groups
+        cdef double[:] x = np.ascontiguousarray(vector, dtype=np.float64).ravel()
+        cdef double[:] result = tools.array_1d(x.shape[0])
+
+        for gg in range(self.first, self.last):
+            # Scattering source within the block
+            for ii in range(self.info.cells_x):
+                for jj in range(self.info.cells_y):
+                    mat = self.medium_map[ii,jj]
+                    idx = (ii * self.info.cells_y + jj) * n_groups - self.first
+                    self.source[ii,jj,0] = 0.0
+                    for og in range(self.first, self.last):
+                        self.source[ii,jj,0] += self.xs_scatter[mat,gg,og] \
+                                                * x[idx + og]
+
+            # Sweep without external or boundary sources
+            self.flux_1g[:,:,:] = 0.0
+            if self.n_edge == 0:
+                _known_center_sweep(self.flux_1g, self.xs_total[:,gg], \
+                        self.zero, self.source, self.boundary_x, \
+                        self.boundary_y, self.medium_map, self.delta_x, \
+                        self.delta_y, self.angle_x, self.angle_y, \
+                        self.angle_w, self.info)
+            else:
+                idx = offset + (gg - self.first) * self.n_edge
+                self.load(x, idx)
+                _known_square_reflected(self.flux_1g, self.xs_total[:,gg], \
+                        self.zero, self.source, self.boundary_x, \
+                        self.boundary_y, self.reflected_x, self.reflected_y, \
+                        self.medium_map, self.delta_x, self.delta_y, \
+                        self.angle_x, self.angle_y, self.angle_w, self.info)
+                self.store(result, idx)
+                for kk in range(idx, idx + self.n_edge):
+                    result[kk] = x[kk] - result[kk]
+
+            for ii in range(self.info.cells_x):
+                for jj in range(self.info.cells_y):
+                    idx = (ii * self.info.cells_y + jj) * n_groups - self.first
+                    result[idx + gg] = x[idx + gg] - self.flux_1g[ii,jj,0]
+
+        self.matvecs += 1
+        self.sweeps += n_groups
+        return np.asarray(result)
+
+
+cdef void _krylov_block(double[:,:,:]& flux, double[:,:]& xs_total, \
+        double[:,:,:]& xs_scatter, double[:,:,:,:]& external, \
+        double[:,:,:,:]& boundary_x, double[:,:,:,:]& boundary_y, \
+        int[:,:]& medium_map, double[:]& delta_x, double[:]& delta_y, \
+        double[:]& angle_x, double[:]& angle_y, double[:]& angle_w, \
+        int first, int last, params info):
+    # Solve groups [first, last) with the other groups fixed
+
+    # Initialize components
+    cdef int ii, jj, nn, gg, og, mat, qq, bcx, bcy
+    cdef int n_groups = last - first
+    cdef double off_scatter
+
+    # Initialize sweep operator
+    cdef _SweepOperator sweeper = _SweepOperator.__new__(_SweepOperator)
+    sweeper.xs_total = xs_total
+    sweeper.xs_scatter = xs_scatter
+    sweeper.medium_map = medium_map
+    sweeper.delta_x = delta_x
+    sweeper.delta_y = delta_y
+    sweeper.angle_x = angle_x
+    sweeper.angle_y = angle_y
+    sweeper.angle_w = angle_w
+    sweeper.first = first
+    sweeper.last = last
+    sweeper.matvecs = 0
+    # One sweep per group for the right hand side
+    sweeper.sweeps = n_groups
+    sweeper.info = info
+    sweeper.zero = tools.array_2d(info.cells_x, info.cells_y)
+    sweeper.source = tools.array_3d(info.cells_x, info.cells_y, 1)
+    sweeper.boundary_x = tools.array_3d(2, info.cells_y, 1)
+    sweeper.boundary_y = tools.array_3d(2, info.cells_x, 1)
+    sweeper.flux_1g = tools.array_3d(info.cells_x, info.cells_y, 1)
+    sweeper.reflected_x = tools.array_3d(2, info.cells_y, info.angles * info.angles)
+    sweeper.reflected_y = tools.array_3d(2, info.cells_x, info.angles * info.angles)
+    sweeper.incoming_x = _reflected_angles(angle_x, info.bc_x, info)
+    sweeper.incoming_y = _reflected_angles(angle_y, info.bc_y, info)
+    sweeper.n_edge = sweeper.incoming_x.shape[0] * info.cells_y \
+                     + sweeper.incoming_y.shape[0] * info.cells_x
+
+    # Right hand side: uncollided flux from the fixed sources
+    rhs = tools.array_3d(info.cells_x, info.cells_y, n_groups)
+    cdef double[:] rhs_reflect = np.zeros((n_groups * sweeper.n_edge,))
+    source = tools.array_3d(info.cells_x, info.cells_y, external.shape[2])
+    flux_1g = tools.array_3d(info.cells_x, info.cells_y, 1)
+    for gg in range(first, last):
+
+        # Determine dimensions of external and boundary sources
+        qq = 0 if external.shape[3] == 1 else gg
+        bcx = 0 if boundary_x.shape[3] == 1 else gg
+        bcy = 0 if boundary_y.shape[3] == 1 else gg
+
+        # Add scattering from the groups outside the block
+        for ii in range(info.cells_x):
+            for jj in range(info.cells_y):
+                mat = medium_map[ii,jj]
+                off_scatter = 0.0
+                for og in range(info.groups):
+                    if (og < first) or (og >= last):
+                        off_scatter += xs_scatter[mat,gg,og] * flux[ii,jj,og]
+                for nn in range(external.shape[2]):
+                    source[ii,jj,nn] = external[ii,jj,nn,qq] + off_scatter
+
+        # Reflected edge fluxes start from zero
+        flux_1g[:,:,:] = 0.0
+        if sweeper.n_edge == 0:
+            _known_center_sweep(flux_1g, xs_total[:,gg], sweeper.zero, source, \
+                    boundary_x[:,:,:,bcx], boundary_y[:,:,:,bcy], medium_map, \
+                    delta_x, delta_y, angle_x, angle_y, angle_w, info)
+        else:
+            sweeper.reflected_x[:,:,:] = 0.0
+            sweeper.reflected_y[:,:,:] = 0.0
+            _known_square_reflected(flux_1g, xs_total[:,gg], sweeper.zero, \
+                    source, boundary_x[:,:,:,bcx], boundary_y[:,:,:,bcy], \
+                    sweeper.reflected_x, sweeper.reflected_y, medium_map, \
+                    delta_x, delta_y, angle_x, angle_y, angle_w, info)
+            sweeper.store(rhs_reflect, (gg - first) * sweeper.n_edge)
+        rhs[:,:,gg-first] = flux_1g[:,:,0]
+
+    # Matrix-free GMRES
+    size = info.cells_x * info.cells_y * n_groups
+    total = size + n_groups * sweeper.n_edge
+    matrix = LinearOperator((total, total), matvec=sweeper.matvec, \
+                            dtype=np.float64)
+    guess = np.zeros((total,))
+    guess[:size] = np.asarray(flux[:,:,first:last]).flatten()
+    solution, status = gmres(matrix, np.append(np.asarray(rhs).flatten(), \
+                             np.asarray(rhs_reflect)), x0=guess, \
+                             rtol=info.tol_energy, atol=0.0, \
+                             restart=KRYLOV_RESTART, maxiter=info.max_iter_energy)
+    cdef double[:,:,:] solved = solution[:size].reshape(info.cells_x, \
+                                                info.cells_y, n_groups)
+    flux[:,:,first:last] = solved
+
+    logger.info("Krylov groups %d-%d: %d matvecs, %d sweeps, status %d", \
+                first, last - 1, sweeper.matvecs, sweeper.sweeps, status)
+
+
+cdef int[:] _reflected_angles(double[:]& angle, int[2] bc, params info):
+    # Ordinates entering through a reflective boundary along one axis,
+    # whose incoming edge fluxes are Krylov unknowns
+    incoming = [nn for nn in range(info.angles * info.angles) \
+                if bc[0 if angle[nn] > 0.0 else 1] == 1]
+    return np.array(incoming, dtype=np.int32)
+
+
+cdef bint sweep_capture(params info):
+    # The multigroup solve records the angular flux in its last sweep:
+    # source iteration, angle-batched sweeps, Gauss-Seidel over groups
+    return (info.mg_solver == 1) and (info.parallel_type != 4) \
+            and (info.parallel_type != 5) \
+            and not ((info.parallel_type == 2 or info.parallel_type == 3) \
+                     and info.groups > 1)
+
+
+cdef void _known_angular(double[:,:,:,:]& angular, double[:,:,:]& flux, \
+        double[:,:]& xs_total, double[:,:,:]& xs_scatter, \
+        double[:,:,:,:]& external, double[:,:,:,:]& boundary_x, \
+        double[:,:,:,:]& boundary_y, int[:,:]& medium_map, \
+        double[:]& delta_x, double[:]& delta_y, double[:]& angle_x, \
+        double[:]& angle_y, double[:]& angle_w, params info):
+    # Angular flux from one sweep with the scattering source of flux
+    source = tools.array_4d(info.cells_x, info.cells_y, \
+                            info.angles * info.angles, info.groups)
+    tools._source_total(source, flux, xs_scatter, medium_map, external, info)
+    angular[:,:,:,:] = _known_source_angular(xs_total, source, boundary_x, \
+                            boundary_y, medium_map, delta_x, delta_y, \
+                            angle_x, angle_y, angle_w, info)
+
+
 cdef double[:,:,:,:] _known_source_angular(double[:,:]& xs_total, \
         double[:,:,:,:]& source, double[:,:,:,:]& boundary_x, \
         double[:,:,:,:]& boundary_y, int[:,:]& medium_map, \
@@ -527,3 +1009,30 @@ cdef void _interface_scalar(double[:,:,:,:]& flux_edge_x, \
                 xs_total[:,gg], source[:,:,:,qq], boundary_x[:,:,:,bcx], \
                 boundary_y[:,:,:,bcy], medium_map, delta_x, delta_y, \
                 angle_x, angle_y, angle_w, info)
+
+
+cdef void _known_source_current(double[:,:,:]& current_x, \
+        double[:,:,:]& current_y, double[:,:]& xs_total, \
+        double[:,:,:,:]& source, double[:,:,:,:]& boundary_x, \
+        double[:,:,:,:]& boundary_y, int[:,:]& medium_map, \
+        double[:]& delta_x, double[:]& delta_y, double[:]& angle_x, \
+        double[:]& angle_y, double[:]& angle_w, params info):
+    # source = flux * xs_scatter + external source
+    # current_x = [(I+1) x J x G], current_y = [I x (J+1) x G]
+
+    # Initialize components
+    cdef int gg, qq, bcx, bcy
+
+    # Iterate over groups
+    for gg in range(info.groups):
+
+        # Determine dimensions of external and boundary sources
+        qq = 0 if source.shape[3] == 1 else gg
+        bcx = 0 if boundary_x.shape[3] == 1 else gg
+        bcy = 0 if boundary_y.shape[3] == 1 else gg
+
+        # Perform angular sweep
+        _known_current_sweep(current_x[:,:,gg], current_y[:,:,gg], \
+                xs_total[:,gg], source[:,:,:,qq], boundary_x[:,:,:,bcx], \
+                boundary_y[:,:,:,bcy], medium_map, delta_x, delta_y, \
+                angle_x, angle_y, angle_w, info)
@@ -80,19 +80,44 @@ cdef struct params:
     # Flux at cell edges or centers
     int flux_at_edges
 
+    # Angular / edge flux output (1 = extra sweep, 2 = final sweep capture)
+    int flux_output
+
     # Number of OpenMP threads (0 = resolved to cpu_count in _to_params)
     int num_threads
 
     # Parallelism strategy (1 = angle, 2 = group, 3 = both)
     int parallel_type
 
+    # Reflector update schedule (1 = lagged, 2 = waves)
+    int reflector
+
     # Multigroup solver (1 = SI, 2 = DMD)
     int mg_solver
 
+    # Within-group solver (1 = SI, 2 = DSA)
+    int inner_solver
+
+    # Outer iteration acceleration (1 = none, 2 = CMFD, 3 = Wielandt,
+    # 4 = Chebyshev)
+    int eigen_acceleration
+
+    # Energy iteration acceleration (1 = none, 2 = two-grid)
+    int upscatter_acceleration
+
+    # Power iteration inner tolerances (1 = fixed, 2 = adaptive)
+    int inner_tolerance
+
+    # k-eigenvalue solver (1 = power iteration, 2 = Newton-Krylov)
+    int eigen_solver
+
     # DMD parameters
     int dmd_snapshots
     int dmd_rank
 
+    # Carry DMD snapshots across time steps
+    bint dmd_recycle
+
     # Convergence parameters - iterations
     int max_iter_angular
     int max_iter_energy
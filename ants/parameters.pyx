@@ -50,6 +50,9 @@ cdef params _to_params(object pydic):
     # Flux at cell edges or centers
     info.flux_at_edges = pydic.flux_at_edges
 
+    # Angular / edge flux output (1 = extra sweep, 2 = final sweep capture)
+    info.flux_output = pydic.flux_output
+
     # OpenMP thread count: 0 means "use all available CPUs"
     import os
     info.num_threads = pydic.num_threads if pydic.num_threads > 0 \
@@ -58,13 +61,35 @@ cdef params _to_params(object pydic):
     # Parallelism strategy (1 = angle, 2 = group, 3 = both)
     info.parallel_type = pydic.parallel_type
 
+    # Reflector update schedule (1 = lagged, 2 = waves)
+    info.reflector = pydic.reflector
+
     # Multigroup solver (1 = SI, 2 = DMD)
     info.mg_solver = pydic.mg_solver
 
+    # Within-group solver (1 = SI, 2 = DSA)
+    info.inner_solver = pydic.inner_solver
+
+    # Outer iteration acceleration (1 = none, 2 = CMFD, 3 = Wielandt,
+    # 4 = Chebyshev)
+    info.eigen_acceleration = pydic.eigen_acceleration
+
+    # Energy iteration acceleration (1 = none, 2 = two-grid)
+    info.upscatter_acceleration = pydic.upscatter_acceleration
+
+    # Power iteration inner tolerances (1 = fixed, 2 = adaptive)
+    info.inner_tolerance = pydic.inner_tolerance
+
+    # k-eigenvalue solver (1 = power iteration, 2 = Newton-Krylov)
+    info.eigen_solver = pydic.eigen_solver
+
     # DMD parameters
     info.dmd_snapshots = pydic.dmd_snapshots
     info.dmd_rank = pydic.dmd_rank
 
+    # Carry DMD snapshots across time steps
+    info.dmd_recycle = pydic.dmd_recycle
+
     # Artificial scattering parameters (ray effect mitigation)
     info.sigma_as = pydic.sigma_as
     info.beta_as = pydic.beta_as
@@ -158,6 +183,8 @@ cdef int _check_tr_bdf_timed1d(params info, int psi_shape, int q_shape, \
 
 cdef int _check_critical1d_power_iteration(params info) except -1:
     assert info.angles % 2 == 0, "Need an even number of angles"
+    assert (info.eigen_acceleration != 2) or (info.geometry == 1), \
+            "CMFD needs slab geometry"
     # assert info.flux_at_edges == 0, "Cannot currently use cell edges"
     return 0
 
@@ -22,14 +22,44 @@
 from ants.parameters cimport params
 
 
-cdef void discrete_ordinates(double[:]& flux, double[:]& flux_old, \
+cdef int discrete_ordinates(double[:]& flux, double[:]& flux_old, \
         double[:]& xs_total, double[:]& xs_scatter, double[:]& off_scatter, \
         double[:,:]& external, double[:,:]& boundary_x, int[:]& medium_map, \
         double[:]& delta_x, double[:]& angle_x, double[:]& angle_w, \
-        params info)
+        params info, double[:,:] angular=*)
+
+
+cdef int discrete_ordinates_work(double[:]& flux, double[:]& flux_old, \
+        double[:]& xs_total, double[:]& xs_scatter, double[:]& off_scatter, \
+        double[:,:]& external, double[:,:]& boundary_x, int[:]& medium_map, \
+        double[:]& delta_x, double[:]& angle_x, double[:]& angle_w, \
+        double[:,:]& thread_flux, double[:]& edge_out, double[:]& reflector, \
+        double[:]& half_angle, double[:,:]& angular, bint capture, \
+        params info) noexcept nogil
+
+
+cdef void discrete_ordinates_groups(double[:,:]& flux, double[:,:]& flux_old, \
+        double[:,:]& xs_total, double[:,:,:]& xs_scatter, \
+        double[:,:]& off_scatter, double[:,:,:]& external, \
+        double[:,:,:]& boundary_x, int[:]& medium_map, double[:]& delta_x, \
+        double[:]& angle_x, double[:]& angle_w, int g0, int gb, \
+        double[:,:,:]& thread_flux, double[:,:]& edge_out, \
+        double[:,:]& reflector, params info) noexcept nogil
 
 
 cdef void _known_sweep(double[:,:]& flux, double[:]& xs_total, \
         double[:]& zero, double[:,:]& source, double[:,:]& boundary_x, \
         int[:]& medium_map, double[:]& delta_x, double[:]& angle_x, \
         double[:]& angle_w, params info)
+
+
+cdef void _known_slab_reflected(double[:,:]& flux, double[:]& xs_total, \
+        double[:]& zero, double[:,:]& source, double[:,:]& boundary_x, \
+        double[:]& reflector, int[:]& medium_map, double[:]& delta_x, \
+        double[:]& angle_x, double[:]& angle_w, params info)
+
+
+cdef void _known_current(double[:]& current, double[:]& xs_total, \
+        double[:,:]& source, double[:,:]& boundary_x, int[:]& medium_map, \
+        double[:]& delta_x, double[:]& angle_x, double[:]& angle_w, \
+        params info)
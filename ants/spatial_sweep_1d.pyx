@@ -20,6 +20,7 @@
 # distutils: extra_compile_args = -O3 -march=native -ffast-math
 
 from libc.math cimport M_PI, fabs, tanh
+from libc.stdlib cimport free, malloc
 
 from cython.parallel import prange, threadid
 
@@ -29,9 +30,11 @@ from ants.parameters cimport params
 ########################################################################
 # Iterative Sweep - Slab Geometry
 #
-# The angle loop is parallelized with OpenMP via prange.  Each angle
-# writes to its own private row of flux_private (shape: angles * cells),
-# so there are no write-write races on the shared scalar flux.
+# The angle loop is parallelized with OpenMP via prange.  Angles with the
+# same direction are swept together in batches (slab_batch) with the
+# angle loop innermost, so the cell recurrence vectorizes over angles.
+# Each thread writes to its own row of thread_flux, so there are no
+# write-write races on the shared scalar flux.
 #
 # Reflector handling: the reflector array is READ inside prange (as the
 # incoming edge for reflective boundaries) and WRITTEN sequentially after
@@ -39,6 +42,17 @@ from ants.parameters cimport params
 # flux is self-consistent, the one-iteration lag on the reflector update
 # does not affect the converged solution.
 #
+# With ReflectorUpdate.WAVES the two directions are swept as separate
+# parallel blocks, starting with the direction that enters through a
+# vacuum boundary, and the reflector is updated in between.  The second
+# direction then reads edges from the same iteration, so a slab with one
+# reflective side has no lag at all.
+#
+# With InnerSolver.DSA every sweep is followed by a diffusion correction
+# (cytools_1d.dsa_correction) of the cell-center scalar flux.  The edge
+# diffusion matrix is factored once per call.  dsa_ready keeps it off
+# when reflected edges lag a sweep behind.
+#
 # Sphere Geometry - Jacobi Parallelization
 #
 # In the original sequential algorithm, each angle's sweep writes to
@@ -61,75 +75,313 @@ from ants.parameters cimport params
 # sequential version.
 ########################################################################
 
-cdef void discrete_ordinates(double[:]& flux, double[:]& flux_old, \
+cdef int discrete_ordinates(double[:]& flux, double[:]& flux_old, \
         double[:]& xs_total, double[:]& xs_scatter, double[:]& off_scatter, \
         double[:,:]& external, double[:,:]& boundary_x, int[:]& medium_map, \
         double[:]& delta_x, double[:]& angle_x, double[:]& angle_w, \
-        params info):
+        params info, double[:,:] angular=None):
+    # angular = [(I or I+1) x N] is overwritten with the angular flux of
+    # every slab sweep, so it holds the last one on return. Returns the
+    # number of source iterations (sweeps) taken
+
+    # Per-thread flux buffer
+    cdef int priv_size = info.cells_x + 1 if info.flux_at_edges else info.cells_x
+    thread_flux = tools.array_2d(info.num_threads, priv_size)
+
+    # Exit edges collected during prange. used to update the reflector
+    # sequentially after the parallel block.
+    edge_out = tools.array_1d(info.angles)
+
+    # Reflector: READ inside prange, WRITTEN sequentially below.
+    reflector = tools.array_1d(info.angles)
+
+    # Sphere half angle coefficients
+    half_angle = tools.array_1d(info.cells_x)
+
+    # Angular flux capture (mu = 0 is never swept)
+    cdef bint capture = angular is not None
+    if capture:
+        angular[:,:] = 0.0
+    else:
+        angular = tools.array_2d(1, 1)
+
+    cdef int sweeps
+    with nogil:
+        sweeps = discrete_ordinates_work(flux, flux_old, xs_total, \
+                xs_scatter, off_scatter, external, boundary_x, medium_map, \
+                delta_x, angle_x, angle_w, thread_flux, edge_out, reflector, \
+                half_angle, angular, capture, info)
+    return sweeps
+
+
+cdef int discrete_ordinates_work(double[:]& flux, double[:]& flux_old, \
+        double[:]& xs_total, double[:]& xs_scatter, double[:]& off_scatter, \
+        double[:,:]& external, double[:,:]& boundary_x, int[:]& medium_map, \
+        double[:]& delta_x, double[:]& angle_x, double[:]& angle_w, \
+        double[:,:]& thread_flux, double[:]& edge_out, double[:]& reflector, \
+        double[:]& half_angle, double[:,:]& angular, bint capture, \
+        params info) noexcept nogil:
     # One-dimensional slab
     if info.geometry == 1:
-        slab_ordinates(flux, flux_old, xs_total, xs_scatter, off_scatter, \
-                       external, boundary_x, medium_map, delta_x, angle_x, \
-                       angle_w, info)
+        return slab_ordinates(flux, flux_old, xs_total, xs_scatter, \
+                       off_scatter, external, boundary_x, medium_map, \
+                       delta_x, angle_x, angle_w, thread_flux, edge_out, \
+                       reflector, angular, capture, info)
     # One-dimensional sphere
     elif info.geometry == 2:
-        sphere_ordinates(flux, flux_old, xs_total, xs_scatter, off_scatter, \
-                         external, boundary_x, medium_map, delta_x, \
-                         angle_x, angle_w, info)
+        return sphere_ordinates(flux, flux_old, xs_total, xs_scatter, \
+                         off_scatter, external, boundary_x, medium_map, \
+                         delta_x, angle_x, angle_w, half_angle, info)
+    return 0
 
 
-cdef void slab_ordinates(double[:]& flux, double[:]& flux_old, \
+cdef int slab_ordinates(double[:]& flux, double[:]& flux_old, \
         double[:]& xs_total, double[:]& xs_scatter, double[:]& off_scatter, \
         double[:,:]& external, double[:,:]& boundary_x, int[:]& medium_map, \
         double[:]& delta_x, double[:]& angle_x, double[:]& angle_w, \
-        params info):
+        double[:,:]& thread_flux, double[:]& edge_out, double[:]& reflector, \
+        double[:,:]& angular, bint capture, params info) noexcept nogil:
 
     # Initialize iteration indices
-    cdef int nn, ii, qq, bc, tid
+    cdef int nn, ii, tt, tid, start, ww, kk
 
-    # Per-thread flux buffer
+    # Per-thread flux buffer size
     cdef int priv_size = info.cells_x + 1 if info.flux_at_edges else info.cells_x
-    thread_flux = tools.array_2d(info.num_threads, priv_size)
-
-    # Exit edges collected during prange. used to update the reflector
-    # sequentially after the parallel block.
-    edge_out = tools.array_1d(info.angles)
 
-    # Reflector: READ inside prange, WRITTEN sequentially below.
-    reflector = tools.array_1d(info.angles)
+    # Direction batches, grouped in reflector waves, and scratch buffers
+    cdef int wave_task[3]
+    cdef int* order = <int*> malloc(info.angles * sizeof(int))
+    cdef int* task_start = <int*> malloc((info.angles + 1) * sizeof(int))
+    cdef double* scratch = <double*> malloc(4 * info.angles * sizeof(double))
+    cdef int n_waves = direction_tasks(angle_x, order, task_start, \
+                                       wave_task, info)
+
+    # Diffusion synthetic acceleration: factored edge matrix and scratch
+    cdef bint dsa = (info.inner_solver == 2) and (not info.flux_at_edges) \
+            and dsa_ready(info)
+    cdef double* dsa_work = NULL
+    if dsa:
+        dsa_work = <double*> malloc(4 * (info.cells_x + 1) * sizeof(double))
+        dsa = tools.dsa_factor(xs_total, xs_scatter, medium_map, delta_x, \
+                angle_x, angle_w, dsa_work, dsa_work + info.cells_x + 1, \
+                dsa_work + 2 * (info.cells_x + 1), info)
+
+    # Reflectors start from zero incoming flux on every call
+    reflector[:] = 0.0
 
     # Convergence state
     cdef bint converged = False
     cdef int count = 1
     cdef double change = 0.0
+    cdef double last_change = 0.0
 
     while not converged:
 
         flux[:] = 0.0
         thread_flux[:, :] = 0.0
 
-        for nn in prange(info.angles, nogil=True, schedule="static", num_threads=info.num_threads):
-            qq = 0 if external.shape[1] == 1 else nn
-            bc = 0 if boundary_x.shape[1] == 1 else nn
-            tid = threadid()
-            edge_out[nn] = slab_sweep(thread_flux[tid, :], flux_old, xs_total, \
-                            xs_scatter, off_scatter, external[:, qq], \
-                            boundary_x[:, bc], medium_map, delta_x, angle_x[nn], \
-                            angle_w[nn], reflector[nn], info)
+        for ww in range(n_waves):
+            # Same-direction angle batches, swept angle innermost
+            for tt in prange(wave_task[ww], wave_task[ww + 1], \
+                             schedule="dynamic", num_threads=info.num_threads):
+                tid = threadid()
+                start = task_start[tt]
+                slab_batch(thread_flux[tid, :], flux_old, xs_total, \
+                        xs_scatter, off_scatter, external, boundary_x, \
+                        medium_map, delta_x, angle_x, angle_w, reflector, \
+                        edge_out, order + start, task_start[tt + 1] - start, \
+                        scratch + 4 * start, angular, capture, info)
+
+            # Sequential reflector update from the exit edges of the wave
+            for kk in range(task_start[wave_task[ww]], \
+                            task_start[wave_task[ww + 1]]):
+                nn = order[kk]
+                reflector_corrector(reflector, angle_x, edge_out[nn], nn, info)
 
         # Sequential reduction into scalar flux
         for nn in range(info.num_threads):
             for ii in range(priv_size):
                 flux[ii] += thread_flux[nn, ii]
 
-        # Sequential reflector update from exit edges
-        for nn in range(info.angles):
-            reflector_corrector(reflector, angle_x, edge_out[nn], nn, info)
+        # Diffusion correction of the scattering error
+        if dsa:
+            tools.dsa_correction(flux, flux_old, xs_scatter, medium_map, \
+                    delta_x, dsa_work, dsa_work + info.cells_x + 1, \
+                    dsa_work + 2 * (info.cells_x + 1), \
+                    dsa_work + 3 * (info.cells_x + 1), info)
 
         change = tools.angle_convergence(flux, flux_old, info)
+
+        # The edge diffusion form matches diamond difference; fall back to
+        # source iteration if the corrections stop converging (e.g. step
+        # method on optically thick cells)
+        if dsa and (count > 2) and (change > last_change):
+            dsa = False
+        last_change = change
         converged = (change < info.tol_angular) or (count >= info.max_iter_angular)
         count += 1
-        flux_old[:] = flux[:]
+        for ii in range(priv_size):
+            flux_old[ii] = flux[ii]
+
+    free(order)
+    free(task_start)
+    free(scratch)
+    free(dsa_work)
+    return count - 1
+
+
+cdef bint lag_free(params info) noexcept nogil:
+    # Sweep the directions in reflector waves (ReflectorUpdate.WAVES) when
+    # there is a reflective boundary to feed
+    return (info.reflector == 2) and ((info.bc_x[0] == 1) or (info.bc_x[1] == 1))
+
+
+cdef bint dsa_ready(params info) noexcept nogil:
+    # DSA only estimates the scattering error, so the reflected edges must
+    # be current: no reflector, or one side fed in the same wave
+    if (info.bc_x[0] == 1) and (info.bc_x[1] == 1):
+        return False
+    return ((info.bc_x[0] == 0) and (info.bc_x[1] == 0)) or lag_free(info)
+
+
+cdef int direction_tasks(double[:]& angle_x, int* order, int* task_start, \
+        int* wave_task, params info) noexcept nogil:
+    # Sort the angles by direction into order and split each direction
+    # into ceil(num_threads / 2) batches.  Angles with mu == 0 are never
+    # swept and are left out.  Batches wave_task[ww] to wave_task[ww + 1]
+    # form wave ww.  Returns the number of waves: two (one per direction,
+    # vacuum inflow first) for lag-free reflectors, otherwise one.
+
+    # Initialize iterables
+    cdef int kk, half, nn, na, chunk, n_chunks, first
+    cdef int n_tasks = 0
+    cdef int count = 0
+    cdef bint waves = lag_free(info)
+
+    # mu < 0 enters through the right boundary, so it goes first when
+    # only the left boundary reflects
+    cdef int lead = 1 if waves and (info.bc_x[0] == 1) \
+                            and (info.bc_x[1] == 0) else 0
+
+    task_start[0] = 0
+    wave_task[0] = 0
+    for kk in range(2):
+        half = (lead + kk) % 2
+        if waves and (kk == 1):
+            wave_task[1] = n_tasks
+        first = count
+        for nn in range(info.angles):
+            if ((half == 0) and (angle_x[nn] > 0.0)) \
+                    or ((half == 1) and (angle_x[nn] < 0.0)):
+                order[count] = nn
+                count += 1
+        na = count - first
+        if na == 0:
+            continue
+        n_chunks = min(na, (info.num_threads + 1) // 2)
+        for chunk in range(n_chunks):
+            n_tasks += 1
+            task_start[n_tasks] = first + (chunk + 1) * na // n_chunks
+    if waves:
+        wave_task[2] = n_tasks
+        return 2
+    wave_task[1] = n_tasks
+    return 1
+
+
+cdef void slab_batch(double[:]& flux, double[:]& flux_old, \
+        double[:]& xs_total, double[:]& xs_scatter, double[:]& off_scatter, \
+        double[:,:]& external, double[:,:]& boundary_x, int[:]& medium_map, \
+        double[:]& delta_x, double[:]& angle_x, double[:]& angle_w, \
+        double[:]& reflector, double[:]& edge_out, int* angles, int nb, \
+        double* scratch, double[:,:]& angular, bint capture, \
+        params info) noexcept nogil:
+    # Sweep nb angles of the same direction together, angle innermost.
+    # Same discretization as slab_forward / slab_backward. With capture
+    # the angular flux of each angle is written to angular[:, nn], at the
+    # cell edges when angular has cells_x + 1 rows.
+
+    # Initialize cell, material and angle iterables
+    cdef int ii, kk, mm, mat, nn, bc
+    cdef double source, total, scalar, coef, edge2, tau, W, psi
+    cdef double alpha1 = 0.5 * (1.0 - spatial_coef(info.spatial))
+    cdef double alpha2 = 0.5 * (1.0 + spatial_coef(info.spatial))
+
+    # Per-angle scratch (angle innermost)
+    cdef double* edge = scratch
+    cdef double* mu = scratch + nb
+    cdef double* ww = scratch + 2 * nb
+    cdef double* ext = scratch + 3 * nb
+
+    # Sweep direction and boundary side of the batch
+    cdef bint forward = angle_x[angles[0]] > 0.0
+    cdef int side = 0 if forward else 1
+
+    # Captured angular flux location
+    cdef bint at_edges = angular.shape[0] > info.cells_x
+
+    # Gather angles and incoming edges
+    scalar = 0.0
+    for mm in range(nb):
+        nn = angles[mm]
+        bc = 0 if boundary_x.shape[1] == 1 else nn
+        mu[mm] = angle_x[nn]
+        ww[mm] = angle_w[nn]
+        ext[mm] = 0.0
+        edge[mm] = reflector[nn] + boundary_x[side, bc]
+        scalar += ww[mm] * edge[mm]
+
+    # Flux at the incoming boundary edge
+    if info.flux_at_edges:
+        flux[0 if forward else info.cells_x] += scalar
+    if capture and at_edges:
+        for mm in range(nb):
+            angular[0 if forward else info.cells_x, angles[mm]] = edge[mm]
+
+    for kk in range(info.cells_x):
+        ii = kk if forward else info.cells_x - 1 - kk
+        mat = medium_map[ii]
+        total = xs_total[mat]
+        source = xs_scatter[mat] * flux_old[ii] + off_scatter[ii]
+
+        if external.shape[1] == 1:
+            source = source + external[ii, 0]
+        else:
+            for mm in range(nb):
+                ext[mm] = external[ii, angles[mm]]
+
+        # Angle-innermost update
+        scalar = 0.0
+        for mm in range(nb):
+            # Step Characteristic
+            if info.spatial == 3:
+                tau = total * delta_x[ii] / mu[mm]
+                W = 1.0 / tanh(0.5 * tau) - 2.0 / tau
+                alpha1 = 0.5 * (1.0 - W)
+                alpha2 = 0.5 * (1.0 + W)
+            coef = fabs(mu[mm]) / delta_x[ii]
+            edge2 = (source + ext[mm] + edge[mm] * (coef - alpha1 * total)) \
+                        / (coef + alpha2 * total)
+            if info.flux_at_edges:
+                psi = edge2
+            else:
+                psi = alpha1 * edge[mm] + alpha2 * edge2
+            scalar += ww[mm] * psi
+            if capture and at_edges:
+                angular[ii + 1 if forward else ii, angles[mm]] = edge2
+            elif capture:
+                angular[ii, angles[mm]] = psi
+            edge[mm] = edge2
+
+        # Update flux with cell edges or cell centers
+        if info.flux_at_edges:
+            flux[ii + 1 if forward else ii] += scalar
+        else:
+            flux[ii] += scalar
+
+    # Exit edges for the reflector update
+    for mm in range(nb):
+        edge_out[angles[mm]] = edge[mm]
 
 
 cdef void reflector_corrector(double[:]& reflector, double[:]& angle_x, \
@@ -245,6 +497,152 @@ cdef double slab_backward(double[:]& flux, double[:]& flux_old, double[:]& xs_to
     return edge1
 
 
+########################################################################
+# Group-Batched Sweep - Slab Geometry
+#
+# Used by the Jacobi (GROUP / BOTH) multigroup iteration.  A block of gb
+# energy groups is transported in one pass over the cells, with the
+# edges stored group innermost, so each cell visit loads the material
+# and cell width once for the whole block.  Cell-center fluxes only.
+########################################################################
+
+cdef void discrete_ordinates_groups(double[:,:]& flux, double[:,:]& flux_old, \
+        double[:,:]& xs_total, double[:,:,:]& xs_scatter, \
+        double[:,:]& off_scatter, double[:,:,:]& external, \
+        double[:,:,:]& boundary_x, int[:]& medium_map, double[:]& delta_x, \
+        double[:]& angle_x, double[:]& angle_w, int g0, int gb, \
+        double[:,:,:]& thread_flux, double[:,:]& edge_out, \
+        double[:,:]& reflector, params info) noexcept nogil:
+    # flux is (I x G) and receives groups g0 to g0 + gb - 1.  flux_old is
+    # the (G x I) within-group iterate, off_scatter the (G x I) Jacobi
+    # off-scatter source.  Work arrays are indexed by the group offset
+    # within the block.
+
+    # Initialize iterables
+    cdef int nn, ii, gg, tid, ww, kk, a0, a1
+
+    # Group-contiguous edges, one set per angle thread
+    cdef double* edges = <double*> malloc(info.num_threads * gb * sizeof(double))
+
+    # Angles sorted by direction, grouped in reflector waves
+    cdef int wave_task[3]
+    cdef int* order = <int*> malloc(info.angles * sizeof(int))
+    cdef int* task_start = <int*> malloc((info.angles + 1) * sizeof(int))
+    cdef int n_waves = direction_tasks(angle_x, order, task_start, \
+                                       wave_task, info)
+
+    # Reflectors start from zero incoming flux on every call
+    reflector[:, :] = 0.0
+
+    # Convergence state
+    cdef bint converged = False
+    cdef int count = 1
+    cdef double change = 0.0
+
+    while not converged:
+
+        thread_flux[:, :, :] = 0.0
+
+        for ww in range(n_waves):
+            a0 = task_start[wave_task[ww]]
+            a1 = task_start[wave_task[ww + 1]]
+            for kk in prange(a0, a1, schedule="static", \
+                             num_threads=info.num_threads):
+                nn = order[kk]
+                tid = threadid()
+                slab_group_sweep(thread_flux[tid], flux_old, xs_total, \
+                        xs_scatter, off_scatter, external, boundary_x, \
+                        medium_map, delta_x, angle_x[nn], angle_w[nn], nn, \
+                        g0, gb, reflector, edge_out, edges + tid * gb, info)
+
+            # Sequential reflector update from the exit edges of the wave
+            for gg in range(gb):
+                for kk in range(a0, a1):
+                    reflector_corrector(reflector[gg], angle_x, \
+                            edge_out[gg, order[kk]], order[kk], info)
+
+        # Sequential reduction into scalar flux
+        for ii in range(info.cells_x):
+            for gg in range(gb):
+                flux[ii, g0 + gg] = 0.0
+            for tid in range(info.num_threads):
+                for gg in range(gb):
+                    flux[ii, g0 + gg] += thread_flux[tid, ii, gg]
+
+        # The block converges with its slowest group
+        change = 0.0
+        for gg in range(gb):
+            change = max(change, tools.angle_convergence(flux[:, g0 + gg], \
+                                                flux_old[g0 + gg], info))
+        converged = (change < info.tol_angular) or (count >= info.max_iter_angular)
+        count += 1
+        for gg in range(gb):
+            for ii in range(info.cells_x):
+                flux_old[g0 + gg, ii] = flux[ii, g0 + gg]
+
+    free(edges)
+    free(order)
+    free(task_start)
+
+
+cdef void slab_group_sweep(double[:,:]& flux, double[:,:]& flux_old, \
+        double[:,:]& xs_total, double[:,:,:]& xs_scatter, \
+        double[:,:]& off_scatter, double[:,:,:]& external, \
+        double[:,:,:]& boundary_x, int[:]& medium_map, double[:]& delta_x, \
+        double angle_x, double angle_w, int nn, int g0, int gb, \
+        double[:,:]& reflector, double[:,:]& edge_out, double* edge, \
+        params info) noexcept nogil:
+    # Single-angle sweep of gb groups into flux (I x gb)
+
+    # Initialize cell, material and group iterables
+    cdef int ii, kk, gg, group, mat, qq, qg, bc, bg
+    cdef double coef, total, edge2, tau, W
+    cdef double alpha1 = 0.5 * (1.0 - spatial_coef(info.spatial))
+    cdef double alpha2 = 0.5 * (1.0 + spatial_coef(info.spatial))
+
+    # Angles that are never swept leave their exit edges untouched
+    if angle_x == 0.0:
+        return
+
+    # Sweep direction and boundary side
+    cdef bint forward = angle_x > 0.0
+    cdef int side = 0 if forward else 1
+
+    qq = 0 if external.shape[1] == 1 else nn
+    bc = 0 if boundary_x.shape[1] == 1 else nn
+
+    # Incoming edges
+    for gg in range(gb):
+        bg = 0 if boundary_x.shape[2] == 1 else g0 + gg
+        edge[gg] = reflector[gg, nn] + boundary_x[side, bc, bg]
+
+    for kk in range(info.cells_x):
+        ii = kk if forward else info.cells_x - 1 - kk
+        mat = medium_map[ii]
+        coef = fabs(angle_x) / delta_x[ii]
+
+        for gg in range(gb):
+            group = g0 + gg
+            qg = 0 if external.shape[2] == 1 else group
+            total = xs_total[mat, group]
+            # Step Characteristic
+            if info.spatial == 3:
+                tau = total * delta_x[ii] / angle_x
+                W = 1.0 / tanh(0.5 * tau) - 2.0 / tau
+                alpha1 = 0.5 * (1.0 - W)
+                alpha2 = 0.5 * (1.0 + W)
+            edge2 = (xs_scatter[mat, group, group] * flux_old[group, ii] \
+                    + external[ii, qq, qg] + off_scatter[group, ii] \
+                    + edge[gg] * (coef - alpha1 * total)) \
+                    / (coef + alpha2 * total)
+            flux[ii, gg] += angle_w * (alpha1 * edge[gg] + alpha2 * edge2)
+            edge[gg] = edge2
+
+    # Exit edges for the reflector update
+    for gg in range(gb):
+        edge_out[gg, nn] = edge[gg]
+
+
 ########################################################################
 # Sphere Geometry
 #
@@ -256,17 +654,16 @@ cdef double slab_backward(double[:]& flux, double[:]& flux_old, double[:]& xs_to
 # kept sequential.
 ########################################################################
 
-cdef void sphere_ordinates(double[:]& flux, double[:]& flux_old, double[:]& xs_total, \
+cdef int sphere_ordinates(double[:]& flux, double[:]& flux_old, double[:]& xs_total, \
         double[:]& xs_scatter, double[:]& off_scatter, double[:,:]& external, \
         double[:,:]& boundary_x, int[:]& medium_map, double[:]& delta_x, \
-        double[:]& angle_x, double[:]& angle_w, params info):
+        double[:]& angle_x, double[:]& angle_w, double[:]& half_angle, \
+        params info) noexcept nogil:
 
-    cdef int nn, qq, bc
+    cdef int nn, ii, qq, bc
     cdef double ang_minus = -1.0, ang_plus, tau
     cdef double alpha_m = 0.0, alpha_p
 
-    half_angle = tools.array_1d(info.cells_x)
-
     cdef bint converged = False
     cdef int count = 1
     cdef double change = 0.0
@@ -299,11 +696,13 @@ cdef void sphere_ordinates(double[:]& flux, double[:]& flux_old, double[:]& xs_t
         change = tools.angle_convergence(flux, flux_old, info)
         converged = (change < info.tol_angular) or (count >= info.max_iter_angular)
         count += 1
-        flux_old[:] = flux[:]
+        for ii in range(flux.shape[0]):
+            flux_old[ii] = flux[ii]
+    return count - 1
 
 
 cdef double angle_coef_corrector(double alpha_minus, double angle_x, \
-        double angle_w, int angle, params info):
+        double angle_w, int angle, params info) noexcept nogil:
     # For calculating angular differencing coefficient
     if angle != info.angles - 1:
         return alpha_minus - angle_x * angle_w
@@ -313,7 +712,7 @@ cdef double angle_coef_corrector(double alpha_minus, double angle_x, \
 cdef void initialize_half_angle(double[:]& flux, double[:]& half_angle, \
         double[:]& xs_total, double[:]& xs_scatter, double[:]& off_scatter, \
         double[:]& external, int[:]& medium_map, double[:]& delta_x, \
-        double angle_plus, params info):
+        double angle_plus, params info) noexcept nogil:
     # Initialize cell and material iteration index
     cdef int ii, mat
     # Zero out half angle
@@ -340,7 +739,7 @@ cdef void sphere_sweep(double[:]& flux, double[:]& flux_old, \
         double[:]& off_scatter, double[:]& external, double[:]& boundary_x, \
         int[:]& medium_map, double[:]& delta_x, double angle_x, \
         double angle_w, double weight, double tau, double alpha_plus, \
-        double alpha_minus, params info):
+        double alpha_minus, params info) noexcept nogil:
     if angle_x < 0.0:
         sphere_backward(flux, flux_old, half_angle, xs_total, xs_scatter, \
             off_scatter, external, boundary_x[1], medium_map, delta_x, \
@@ -355,7 +754,7 @@ cdef void sphere_forward(double[:]& flux, double[:]& flux_old, \
         double[:]& half_angle, double[:]& xs_total, double[:]& xs_scatter, \
         double[:]& off_scatter, double[:]& external, int[:]& medium_map, \
         double[:]& delta_x, double angle_x, double angle_w, double weight, \
-        double tau, double alpha_plus, double alpha_minus, params info):
+        double tau, double alpha_plus, double alpha_minus, params info) noexcept nogil:
     cdef int ii, mat
     cdef double edge1 = half_angle[0]
     cdef double area1, area2, center, volume
@@ -400,7 +799,7 @@ cdef void sphere_backward(double[:]& flux, double[:]& flux_old, \
         double[:]& off_scatter, double[:]& external, double boundary_x, \
         int[:]& medium_map, double[:]& delta_x, double angle_x, \
         double angle_w, double weight, double tau, double alpha_plus, \
-        double alpha_minus, params info):
+        double alpha_minus, params info) noexcept nogil:
     cdef int ii, mat
     cdef double edge1 = boundary_x
     cdef double area1, area2, center, volume
@@ -474,6 +873,19 @@ cdef void _known_slab(double[:,:]& flux, double[:]& xs_total, \
         int[:]& medium_map, double[:]& delta_x, double[:]& angle_x, \
         double[:]& angle_w, params info):
 
+    # Add reflector array initialized to zero
+    reflector = tools.array_1d(info.angles)
+    _known_slab_reflected(flux, xs_total, zero, source, boundary_x, \
+                          reflector, medium_map, delta_x, angle_x, angle_w, info)
+
+
+cdef void _known_slab_reflected(double[:,:]& flux, double[:]& xs_total, \
+        double[:]& zero, double[:,:]& source, double[:,:]& boundary_x, \
+        double[:]& reflector, int[:]& medium_map, double[:]& delta_x, \
+        double[:]& angle_x, double[:]& angle_w, params info):
+    # reflector holds the incoming edge flux of each ordinate and is
+    # overwritten with the edge fluxes reflected during the pass
+
     # Initialize external and boundary indices, iterables
     cdef int nn, qq, bc
 
@@ -483,9 +895,6 @@ cdef void _known_slab(double[:,:]& flux, double[:]& xs_total, \
     # Add dummy dimension to run both (I x N) and (I) fluxes
     cdef int xdim = flux.shape[1]
 
-    # Add reflector array initialized to zero
-    reflector = tools.array_1d(info.angles)
-
     # Iterate over all the discrete ordinates
     for nn in range(info.angles):
 
@@ -569,3 +978,42 @@ cdef void _known_sphere(double[:,:]& flux, double[:]& xs_total, \
 
         # Update the half angle
         angle_minus = angle_plus
+
+
+cdef void _known_current(double[:]& current, double[:]& xs_total, \
+        double[:,:]& source, double[:,:]& boundary_x, int[:]& medium_map, \
+        double[:]& delta_x, double[:]& angle_x, double[:]& angle_w, \
+        params info):
+    # Net current sum_n w_n mu_n psi_n at the (I + 1) cell edges of a
+    # slab, used for the CMFD coupling
+
+    # Initialize external and boundary indices, iterables
+    cdef int nn, ii, qq, bc
+    cdef double edge = 0.0
+
+    # Sweep for the angular flux at the cell edges
+    cdef params edges = info
+    edges.flux_at_edges = 1
+    psi = tools.array_1d(info.cells_x + 1)
+    zero = tools.array_1d(max(info.cells_x + 1, info.materials))
+
+    # Add reflector array initialized to zero
+    reflector = tools.array_1d(info.angles)
+
+    # Iterate over all the discrete ordinates
+    for nn in range(info.angles):
+
+        # Determine dimensions of external and boundary sources
+        qq = 0 if source.shape[1] == 1 else nn
+        bc = 0 if boundary_x.shape[1] == 1 else nn
+
+        psi[:] = 0.0
+        edge = slab_sweep(psi, zero, xs_total, zero, zero, source[:,qq], \
+                boundary_x[:,bc], medium_map, delta_x, angle_x[nn], 1.0, \
+                reflector[nn], edges)
+
+        # Update reflected direction
+        reflector_corrector(reflector, angle_x, edge, nn, info)
+
+        for ii in range(info.cells_x + 1):
+            current[ii] += angle_w[nn] * angle_x[nn] * psi[ii]
@@ -22,12 +22,41 @@
 from ants.parameters cimport params
 
 
-cdef void discrete_ordinates(double[:,:]& flux, double[:,:]& flux_old,
+cdef int discrete_ordinates(double[:,:]& flux, double[:,:]& flux_old,
         double[:]& xs_total, double[:]& xs_scatter, double[:,:]& off_scatter, \
         double[:,:,:]& external, double[:,:,:]& boundary_x, \
         double[:,:,:]& boundary_y, int[:,:]& medium_map, double[:]& delta_x, \
         double[:]& delta_y, double[:]& angle_x, double[:]& angle_y, \
-        double[:]& angle_w, params info)
+        double[:]& angle_w, int[:,:]& reflect, params info, \
+        double[:,:,:] angular=*)
+
+
+cdef int discrete_ordinates_work(double[:,:]& flux, double[:,:]& flux_old, \
+        double[:]& xs_total, double[:]& xs_scatter, double[:,:]& off_scatter, \
+        double[:,:,:]& external, double[:,:,:]& boundary_x, \
+        double[:,:,:]& boundary_y, int[:,:]& medium_map, double[:]& delta_x, \
+        double[:]& delta_y, double[:]& angle_x, double[:]& angle_y, \
+        double[:]& angle_w, int[:,:]& reflect, double[:,:,:]& thread_flux, \
+        double[:,:]& known_x_work, double[:,:]& known_y_work, \
+        double[:,:,:]& reflected_x, double[:,:,:]& reflected_y, \
+        double[:,:,:,:]& coef_x_table, double[:,:,:,:]& coef_y_table, \
+        double[:,:,:]& angular, bint capture, params info) noexcept nogil
+
+
+cdef bint use_coef_table(params info) noexcept nogil
+
+
+cdef void discrete_ordinates_groups(double[:,:,:]& flux, \
+        double[:,:,:]& flux_old, double[:,:]& xs_total, \
+        double[:,:,:]& xs_scatter, double[:,:,:]& off_scatter, \
+        double[:,:,:,:]& external, double[:,:,:,:]& boundary_x, \
+        double[:,:,:,:]& boundary_y, int[:,:]& medium_map, \
+        double[:]& delta_x, double[:]& delta_y, double[:]& angle_x, \
+        double[:]& angle_y, double[:]& angle_w, int[:,:]& reflect, \
+        int g0, int gb, \
+        double[:,:,:,:]& thread_flux, double[:,:,:]& known_x_work, \
+        double[:,:,:]& known_y_work, double[:,:,:,:]& reflected_x, \
+        double[:,:,:,:]& reflected_y, params info) noexcept nogil
 
 
 cdef void _known_center_sweep(double[:,:,:]& flux, double[:]& xs_total, \
@@ -38,9 +67,26 @@ cdef void _known_center_sweep(double[:,:,:]& flux, double[:]& xs_total, \
         params info)
 
 
+cdef void _known_square_reflected(double[:,:,:]& flux, double[:]& xs_total, \
+        double[:,:]& zero_2d, double[:,:,:]& source, \
+        double[:,:,:]& boundary_x, double[:,:,:]& boundary_y, \
+        double[:,:,:]& reflected_x, double[:,:,:]& reflected_y, \
+        int[:,:]& medium_map, double[:]& delta_x, double[:]& delta_y, \
+        double[:]& angle_x, double[:]& angle_y, double[:]& angle_w, \
+        params info)
+
+
 cdef void _known_interface_sweep(double[:,:,:]& flux_edge_x, \
         double[:,:,:]& flux_edge_y, double[:]& xs_total, \
         double[:,:,:]& source, double[:,:,:]& boundary_x, \
         double[:,:,:]& boundary_y, int[:,:]& medium_map, \
         double[:]& delta_x, double[:]& delta_y, double[:]& angle_x, \
         double[:]& angle_y, double[:]& angle_w, params info)
+
+
+cdef void _known_current_sweep(double[:,:]& current_x, \
+        double[:,:]& current_y, double[:]& xs_total, double[:,:,:]& source, \
+        double[:,:,:]& boundary_x, double[:,:,:]& boundary_y, \
+        int[:,:]& medium_map, double[:]& delta_x, double[:]& delta_y, \
+        double[:]& angle_x, double[:]& angle_y, double[:]& angle_w, \
+        params info)
@@ -19,7 +19,8 @@
 # distutils: language = c++
 # distutils: extra_compile_args = -O3 -march=native -ffast-math
 
-from libc.math cimport tanh
+from libc.math cimport fabs, tanh
+from libc.stdlib cimport free, malloc
 
 from cython.parallel import prange, threadid
 
@@ -35,34 +36,56 @@ from ants.parameters cimport params
 # arrays (reflected_x, reflected_y) are read-only inside prange and
 # updated sequentially afterward, exactly as in the 1D case.
 #
+# In ANGLE mode the angles are grouped by quadrant (quadrant_tasks) and
+# each batch is swept together by square_batch with the angle loop
+# innermost and the edges stored (cells, angles) so it vectorizes.
+#
+# With ReflectorUpdate.WAVES the quadrants are swept in dependency waves
+# (quadrant_waves): quadrants entering through vacuum boundaries first,
+# then the quadrants they reflect into.  The reflectors are updated and
+# the known edges initialized between waves, so reflected edges are used
+# in the iteration that computes them.  Only quadrants on a reflective
+# cycle (opposite reflective sides) still read lagged edges.
+#
+# With InnerSolver.DSA every sweep is followed by a diffusion correction
+# (cytools_2d.dsa_correction) of the cell-center scalar flux, solved on
+# the cell vertices with conjugate gradients from malloc'd scratch (dsa_ready:
+# only when no reflected edges lag).
+#
 # The square_forward_x / square_backward_x helpers update edge_y[:] in
 # place for a single column jj.  Inside prange each thread works on a
-# distinct angle nn and allocates its own local known_x / known_y on
-# entry to square_sweep, so there is no sharing of those arrays between
-# threads.
+# distinct angle nn and sweeps row nn of the caller-owned known_x_work /
+# known_y_work arrays, so no two threads share an edge row.  The rows are
+# initialized from the boundary and reflectors before the prange and
+# hold the exit edges for the reflector update after it.
+#
+# All work arrays are passed in by the caller of discrete_ordinates_work,
+# so the whole within-group iteration runs without the GIL.  This lets
+# the group prange in multi_group_2d.jacobi_iteration run groups
+# concurrently, each thread using its own slice of the work arrays.
+#
+# The cell coefficients (coef, 2 / (1 + W), (1 - W) / (1 + W)) depend only
+# on the angle, the cell width, and the material total cross section, so
+# they are tabulated once per call to discrete_ordinates_work in
+# coef_x_table[nn, ii, mat, :] and coef_y_table[nn, jj, mat, :] and
+# reused by every source iteration.  This removes the two tanh calls per
+# cell and angle of the step characteristic method from the inner loop.
+# Problems with many materials (e.g. one per cell) would make the tables
+# larger than the mesh, so use_coef_table falls back to computing the
+# coefficients in the sweep.
 ########################################################################
 
-cdef void discrete_ordinates(double[:,:]& flux, double[:,:]& flux_old,
+cdef int discrete_ordinates(double[:,:]& flux, double[:,:]& flux_old,
         double[:]& xs_total, double[:]& xs_scatter, double[:,:]& off_scatter, \
         double[:,:,:]& external, double[:,:,:]& boundary_x, \
         double[:,:,:]& boundary_y, int[:,:]& medium_map, double[:]& delta_x, \
         double[:]& delta_y, double[:]& angle_x, double[:]& angle_y, \
-        double[:]& angle_w, params info):
-    # Rectangular spatial cells (SLAB2D = 3)
-    if info.geometry == 3:
-        square_ordinates(flux, flux_old, xs_total, xs_scatter, off_scatter, \
-                         external, boundary_x, boundary_y, medium_map, \
-                         delta_x, delta_y, angle_x, angle_y, angle_w, info)
-
+        double[:]& angle_w, int[:,:]& reflect, params info, \
+        double[:,:,:] angular=None):
+    # angular = [I x J x N^2] is overwritten with the angular flux of every
+    # angle-batched sweep, so it holds the last one on return. Returns the
+    # number of source iterations (sweeps) taken
 
-cdef void square_ordinates(double[:,:]& flux, double[:,:]& flux_old, \
-        double[:]& xs_total, double[:]& xs_scatter, double[:,:]& off_scatter, \
-        double[:,:,:]& external, double[:,:,:]& boundary_x, \
-        double[:,:,:]& boundary_y, int[:,:]& medium_map, double[:]& delta_x, \
-        double[:]& delta_y, double[:]& angle_x, double[:]& angle_y, \
-        double[:]& angle_w, params info):
-
-    cdef int nn, ii, jj, qq, bcx, bcy, tid
     cdef int N2 = info.angles * info.angles
 
     # Per-thread scalar-flux buffer: each thread accumulates contributions
@@ -71,7 +94,7 @@ cdef void square_ordinates(double[:,:]& flux, double[:,:]& flux_old, \
     # thrashing that dominates runtime when N2 is large.
     thread_flux = tools.array_3d(info.num_threads, info.cells_x, info.cells_y)
 
-    # Reflector arrays - read-only inside prange, updated sequentially below.
+    # Reflector arrays - read-only inside prange, updated sequentially.
     reflected_y = tools.array_3d(2, info.cells_x, N2)
     reflected_x = tools.array_3d(2, info.cells_y, N2)
 
@@ -81,36 +104,149 @@ cdef void square_ordinates(double[:,:]& flux, double[:,:]& flux_old, \
     known_y_work = tools.array_2d(N2, info.cells_x)
     known_x_work = tools.array_2d(N2, info.cells_y)
 
+    # Cell coefficient tables, filled at the start of the call
+    if use_coef_table(info):
+        coef_x_table = tools.array_4d(N2, info.cells_x, info.materials, 3)
+        coef_y_table = tools.array_4d(N2, info.cells_y, info.materials, 3)
+    else:
+        coef_x_table = tools.array_4d(1, 1, 1, 3)
+        coef_y_table = tools.array_4d(1, 1, 1, 3)
+
+    # Angular flux capture
+    cdef bint capture = angular is not None
+    if not capture:
+        angular = tools.array_3d(1, 1, 1)
+
+    cdef int sweeps
+    with nogil:
+        sweeps = discrete_ordinates_work(flux, flux_old, xs_total, \
+                xs_scatter, off_scatter, external, boundary_x, boundary_y, \
+                medium_map, delta_x, delta_y, angle_x, angle_y, angle_w, \
+                reflect, thread_flux, known_x_work, known_y_work, \
+                reflected_x, reflected_y, coef_x_table, coef_y_table, \
+                angular, capture, info)
+    return sweeps
+
+
+cdef int discrete_ordinates_work(double[:,:]& flux, double[:,:]& flux_old, \
+        double[:]& xs_total, double[:]& xs_scatter, double[:,:]& off_scatter, \
+        double[:,:,:]& external, double[:,:,:]& boundary_x, \
+        double[:,:,:]& boundary_y, int[:,:]& medium_map, double[:]& delta_x, \
+        double[:]& delta_y, double[:]& angle_x, double[:]& angle_y, \
+        double[:]& angle_w, int[:,:]& reflect, double[:,:,:]& thread_flux, \
+        double[:,:]& known_x_work, double[:,:]& known_y_work, \
+        double[:,:,:]& reflected_x, double[:,:,:]& reflected_y, \
+        double[:,:,:,:]& coef_x_table, double[:,:,:,:]& coef_y_table, \
+        double[:,:,:]& angular, bint capture, params info) noexcept nogil:
+    # Rectangular spatial cells (SLAB2D = 3)
+    if info.geometry == 3:
+        return square_ordinates(flux, flux_old, xs_total, xs_scatter, \
+                         off_scatter, external, boundary_x, boundary_y, \
+                         medium_map, delta_x, delta_y, angle_x, angle_y, \
+                         angle_w, reflect, thread_flux, known_x_work, \
+                         known_y_work, reflected_x, reflected_y, \
+                         coef_x_table, coef_y_table, angular, capture, info)
+    return 0
+
+
+cdef int square_ordinates(double[:,:]& flux, double[:,:]& flux_old, \
+        double[:]& xs_total, double[:]& xs_scatter, double[:,:]& off_scatter, \
+        double[:,:,:]& external, double[:,:,:]& boundary_x, \
+        double[:,:,:]& boundary_y, int[:,:]& medium_map, double[:]& delta_x, \
+        double[:]& delta_y, double[:]& angle_x, double[:]& angle_y, \
+        double[:]& angle_w, int[:,:]& reflect, double[:,:,:]& thread_flux, \
+        double[:,:]& known_x_work, double[:,:]& known_y_work, \
+        double[:,:,:]& reflected_x, double[:,:,:]& reflected_y, \
+        double[:,:,:,:]& coef_x_table, double[:,:,:,:]& coef_y_table, \
+        double[:,:,:]& angular, bint capture, params info) noexcept nogil:
+
+    cdef int nn, ii, jj, bcx, bcy, ww, kk, t0, t1
+    cdef int N2 = info.angles * info.angles
+    cdef bint use_table = use_coef_table(info)
+
+    # Quadrant sweep order, grouped in reflector waves
+    cdef int quads[4]
+    cdef int wave_start[5]
+    cdef int quad_task[5]
+    cdef int n_waves = quadrant_waves(quads, wave_start, info)
+
+    # Quadrant batches and their edge / scratch buffers
+    cdef int* order = <int*> malloc(N2 * sizeof(int))
+    cdef int* task_start = <int*> malloc((N2 + 1) * sizeof(int))
+    cdef double* work = <double*> malloc((info.cells_x + info.cells_y + 11) \
+                                         * N2 * sizeof(double))
+    quadrant_tasks(angle_x, angle_y, quads, order, task_start, quad_task, info)
+
+    # Diffusion synthetic acceleration vertex system
+    cdef int vertices = (info.cells_x + 1) * (info.cells_y + 1)
+    cdef bint dsa = (info.inner_solver == 2) and dsa_ready(info)
+    cdef double* dsa_work = NULL
+    if dsa:
+        dsa_work = <double*> malloc(7 * vertices * sizeof(double))
+        dsa = tools.dsa_setup(xs_total, xs_scatter, medium_map, delta_x, \
+                delta_y, angle_x, angle_y, angle_w, dsa_work, \
+                dsa_work + vertices, info)
+
+    # Reflectors start from zero incoming flux on every call
+    reflected_x[:, :, :] = 0.0
+    reflected_y[:, :, :] = 0.0
+
+    # Cross sections are fixed within the call
+    if use_table:
+        build_coef_tables(xs_total, delta_x, delta_y, angle_x, angle_y, \
+                          coef_x_table, coef_y_table, info)
+
     cdef bint converged = False
     cdef int count = 1
     cdef double change = 0.0
+    cdef double last_change = 0.0
 
     while not converged:
 
         flux[:, :] = 0.0
         thread_flux[:, :, :] = 0.0
 
-        # Initialize per-angle known-edge work arrays from boundary/reflector
-        # arrays (sequential - reads reflected_x/y).
-        for nn in range(N2):
-            bcx = 0 if boundary_x.shape[2] == 1 else nn
-            bcy = 0 if boundary_y.shape[2] == 1 else nn
-            tools.initialize_known_y(known_y_work[nn, :], boundary_y[:, :, bcy], \
-                                     reflected_y, angle_y, nn, info)
-            tools.initialize_known_x(known_x_work[nn, :], boundary_x[:, :, bcx], \
-                                     reflected_x, angle_x, nn, info)
-
-        # Parallel angular sweep:
-        #   - Thread tid accumulates into thread_flux[tid, :, :].
-        #   - known_x_work[nn, :] and known_y_work[nn, :] belong to nn.
-        #   - reflected_x/y are not written here.
-        for nn in prange(N2, nogil=True, schedule="static", num_threads=info.num_threads):
-            qq = 0 if external.shape[2] == 1 else nn
-            tid = threadid()
-            square_sweep_private(thread_flux[tid, :, :], flux_old, xs_total, \
-                    xs_scatter, off_scatter, external[:, :, qq], known_x_work[nn, :], \
-                    known_y_work[nn, :], medium_map, delta_x, delta_y, angle_x[nn], \
-                    angle_y[nn], angle_w[nn], info)
+        for ww in range(n_waves):
+            t0 = quad_task[wave_start[ww]]
+            t1 = quad_task[wave_start[ww + 1]]
+
+            # Initialize per-angle known-edge work arrays from boundary/
+            # reflector arrays (sequential - reads reflected_x/y).
+            for kk in range(task_start[t0], task_start[t1]):
+                nn = order[kk]
+                bcx = 0 if boundary_x.shape[2] == 1 else nn
+                bcy = 0 if boundary_y.shape[2] == 1 else nn
+                tools.initialize_known_y(known_y_work[nn, :], \
+                        boundary_y[:, :, bcy], reflected_y, angle_y, nn, info)
+                tools.initialize_known_x(known_x_work[nn, :], \
+                        boundary_x[:, :, bcx], reflected_x, angle_x, nn, info)
+
+            # Spatial wavefront sweep (SPACE = 4, SPACE_ANGLE = 5)
+            if info.parallel_type == 4 or info.parallel_type == 5:
+                square_wavefront(thread_flux, flux_old, xs_total, xs_scatter, \
+                        off_scatter, external, known_x_work, known_y_work, \
+                        medium_map, delta_x, delta_y, angle_x, angle_y, \
+                        angle_w, coef_x_table, coef_y_table, use_table, \
+                        order, task_start, quad_task, wave_start[ww], \
+                        wave_start[ww + 1], info)
+
+            # Parallel angular sweep over same-quadrant batches:
+            #   - Thread tid accumulates into thread_flux[tid, :, :].
+            #   - known_x_work[nn, :] and known_y_work[nn, :] belong to nn.
+            #   - reflected_x/y are not written here.
+            else:
+                square_batched(thread_flux, flux_old, xs_total, xs_scatter, \
+                        off_scatter, external, known_x_work, known_y_work, \
+                        medium_map, delta_x, delta_y, angle_x, angle_y, \
+                        angle_w, coef_x_table, coef_y_table, use_table, \
+                        order, task_start, t0, t1, work, angular, capture, \
+                        info)
+
+            # Update reflectors from exit edges left in known_{x,y}_work.
+            for kk in range(task_start[t0], task_start[t1]):
+                tools.update_reflector(known_x_work[order[kk], :], \
+                        reflected_x, angle_x, known_y_work[order[kk], :], \
+                        reflected_y, angle_y, reflect, order[kk], info)
 
         # Sequential reduction into scalar flux
         for nn in range(info.num_threads):
@@ -118,31 +254,404 @@ cdef void square_ordinates(double[:,:]& flux, double[:,:]& flux_old, \
                 for jj in range(info.cells_y):
                     flux[ii, jj] += thread_flux[nn, ii, jj]
 
-        # Update reflectors from exit edges left in known_{x,y}_work.
-        for nn in range(N2):
-            tools.update_reflector(known_x_work[nn, :], reflected_x, angle_x, \
-                            known_y_work[nn, :], reflected_y, angle_y, nn, info)
+        # Diffusion correction of the scattering error
+        if dsa:
+            tools.dsa_correction(flux, flux_old, xs_total, xs_scatter, \
+                    medium_map, delta_x, delta_y, dsa_work, \
+                    dsa_work + vertices, dsa_work + 2 * vertices, info)
 
         change = tools.angle_convergence(flux, flux_old, info)
+
+        # Fall back to source iteration if the corrections stop converging
+        # (e.g. step method on optically thick cells)
+        if dsa and (count > 2) and (change > last_change):
+            dsa = False
+        last_change = change
         converged = (change < info.tol_angular) or (count >= info.max_iter_angular)
         count += 1
-        flux_old[:, :] = flux[:, :]
+        for ii in range(info.cells_x):
+            for jj in range(info.cells_y):
+                flux_old[ii, jj] = flux[ii, jj]
+
+    free(order)
+    free(task_start)
+    free(work)
+    free(dsa_work)
+    return count - 1
+
+
+cdef void square_batched(double[:,:,:]& thread_flux, double[:,:]& flux_old, \
+        double[:]& xs_total, double[:]& xs_scatter, double[:,:]& off_scatter, \
+        double[:,:,:]& external, double[:,:]& known_x_work, \
+        double[:,:]& known_y_work, int[:,:]& medium_map, double[:]& delta_x, \
+        double[:]& delta_y, double[:]& angle_x, double[:]& angle_y, \
+        double[:]& angle_w, double[:,:,:,:]& coef_x_table, \
+        double[:,:,:,:]& coef_y_table, bint use_table, int* order, \
+        int* task_start, int t0, int t1, double* work, \
+        double[:,:,:]& angular, bint capture, params info) noexcept nogil:
+    # Sweep each batch t0 <= tt < t1 of same-quadrant angles as one task.
+    # Task tt owns angles order[task_start[tt]:task_start[tt+1]] and the
+    # matching slices of the edge and scratch buffers in work.
+
+    # Initialize iterables
+    cdef int tt, tid, start
+    cdef int N2 = info.angles * info.angles
+    cdef double* edge_x = work
+    cdef double* edge_y = work + info.cells_y * N2
+    cdef double* scratch = work + (info.cells_x + info.cells_y) * N2
+
+    for tt in prange(t0, t1, schedule="dynamic", num_threads=info.num_threads):
+        tid = threadid()
+        start = task_start[tt]
+        square_batch(thread_flux[tid, :, :], flux_old, xs_total, xs_scatter, \
+                off_scatter, external, known_x_work, known_y_work, medium_map, \
+                delta_x, delta_y, angle_x, angle_y, angle_w, coef_x_table, \
+                coef_y_table, use_table, order + start, \
+                task_start[tt + 1] - start, edge_x + info.cells_y * start, \
+                edge_y + info.cells_x * start, scratch + 11 * start, \
+                angular, capture, info)
+
+
+cdef void square_batch(double[:,:]& flux, double[:,:]& flux_old, \
+        double[:]& xs_total, double[:]& xs_scatter, double[:,:]& off_scatter, \
+        double[:,:,:]& external, double[:,:]& known_x_work, \
+        double[:,:]& known_y_work, int[:,:]& medium_map, double[:]& delta_x, \
+        double[:]& delta_y, double[:]& angle_x, double[:]& angle_y, \
+        double[:]& angle_w, double[:,:,:,:]& coef_x_table, \
+        double[:,:,:,:]& coef_y_table, bint use_table, int* angles, int nb, \
+        double* edge_x, double* edge_y, double* scratch, \
+        double[:,:,:]& angular, bint capture, params info) noexcept nogil:
+    # All nb angles share the sweep direction, so the cell loops are shared
+    # and the innermost loop runs over angles.  Edges are stored angle
+    # innermost: edge_x[jj * nb + mm] and edge_y[ii * nb + mm].  With
+    # capture the cell-center angular flux goes to angular[:, :, nn].
+
+    # Initialize iterables
+    cdef int ii, jj, kk, ll, mm, mat, nn
+    cdef double center, source, total, scalar
+
+    # Per-angle scratch (angle innermost)
+    cdef double* cx = scratch
+    cdef double* wcx = scratch + nb
+    cdef double* wex = scratch + 2 * nb
+    cdef double* cy = scratch + 3 * nb
+    cdef double* wcy = scratch + 4 * nb
+    cdef double* wey = scratch + 5 * nb
+    cdef double* ext = scratch + 6 * nb
+    cdef double* mu = scratch + 7 * nb
+    cdef double* eta = scratch + 8 * nb
+    cdef double* ww = scratch + 9 * nb
+    cdef double* cc = scratch + 10 * nb
+    cdef double* ex
+    cdef double* ey
+    cdef double W
+
+    # Sweep direction of the batch
+    cdef bint forward_x = angle_x[angles[0]] > 0.0
+    cdef bint forward_y = angle_y[angles[0]] > 0.0
+
+    # Gather angles and incoming edges
+    for mm in range(nb):
+        nn = angles[mm]
+        mu[mm] = fabs(angle_x[nn])
+        eta[mm] = fabs(angle_y[nn])
+        ww[mm] = angle_w[nn]
+        for jj in range(info.cells_y):
+            edge_x[jj * nb + mm] = known_x_work[nn, jj]
+        for ii in range(info.cells_x):
+            edge_y[ii * nb + mm] = known_y_work[nn, ii]
+
+    # Constant external source over angles
+    if external.shape[2] == 1:
+        for mm in range(nb):
+            ext[mm] = 0.0
+
+    for kk in range(info.cells_y):
+        jj = kk if forward_y else info.cells_y - 1 - kk
+        ex = edge_x + jj * nb
+
+        for ll in range(info.cells_x):
+            ii = ll if forward_x else info.cells_x - 1 - ll
+            ey = edge_y + ii * nb
+            mat = medium_map[ii, jj]
+            total = xs_total[mat]
+            source = xs_scatter[mat] * flux_old[ii, jj] + off_scatter[ii, jj]
+
+            # Cell coefficients for every angle of the batch.  Only the
+            # step characteristic weights are worth a table lookup here.
+            if use_table and (info.spatial == 3):
+                for mm in range(nb):
+                    nn = angles[mm]
+                    cx[mm] = coef_x_table[nn, ii, mat, 0]
+                    wcx[mm] = coef_x_table[nn, ii, mat, 1]
+                    wex[mm] = coef_x_table[nn, ii, mat, 2]
+                    cy[mm] = coef_y_table[nn, jj, mat, 0]
+                    wcy[mm] = coef_y_table[nn, jj, mat, 1]
+                    wey[mm] = coef_y_table[nn, jj, mat, 2]
+            else:
+                for mm in range(nb):
+                    cx[mm] = mu[mm] / delta_x[ii]
+                    W = edge_weight(total, cx[mm], info.spatial)
+                    cx[mm] = 2.0 / (1.0 + W) * cx[mm]
+                    wcx[mm] = 2.0 / (1.0 + W)
+                    wex[mm] = (1.0 - W) / (1.0 + W)
+                    cy[mm] = eta[mm] / delta_y[jj]
+                    W = edge_weight(total, cy[mm], info.spatial)
+                    cy[mm] = 2.0 / (1.0 + W) * cy[mm]
+                    wcy[mm] = 2.0 / (1.0 + W)
+                    wey[mm] = (1.0 - W) / (1.0 + W)
+
+            if external.shape[2] == 1:
+                source = source + external[ii, jj, 0]
+            else:
+                for mm in range(nb):
+                    ext[mm] = external[ii, jj, angles[mm]]
+
+            # Angle-innermost update
+            scalar = 0.0
+            if capture:
+                for mm in range(nb):
+                    cc[mm] = (cx[mm] * ex[mm] + cy[mm] * ey[mm] + source \
+                                + ext[mm]) / (total + cx[mm] + cy[mm])
+                    scalar += ww[mm] * cc[mm]
+                    ex[mm] = wcx[mm] * cc[mm] - wex[mm] * ex[mm]
+                    ey[mm] = wcy[mm] * cc[mm] - wey[mm] * ey[mm]
+                for mm in range(nb):
+                    angular[ii, jj, angles[mm]] = cc[mm]
+            else:
+                for mm in range(nb):
+                    center = (cx[mm] * ex[mm] + cy[mm] * ey[mm] + source \
+                                + ext[mm]) / (total + cx[mm] + cy[mm])
+                    scalar += ww[mm] * center
+                    ex[mm] = wcx[mm] * center - wex[mm] * ex[mm]
+                    ey[mm] = wcy[mm] * center - wey[mm] * ey[mm]
+            flux[ii, jj] += scalar
+
+    # Scatter outgoing edges back for the reflector update
+    for mm in range(nb):
+        nn = angles[mm]
+        for jj in range(info.cells_y):
+            known_x_work[nn, jj] = edge_x[jj * nb + mm]
+        for ii in range(info.cells_x):
+            known_y_work[nn, ii] = edge_y[ii * nb + mm]
+
+
+cdef bint lag_free(params info) noexcept nogil:
+    # Sweep the quadrants in reflector waves (ReflectorUpdate.WAVES) when
+    # there is a reflective boundary to feed
+    return (info.reflector == 2) and ((info.bc_x[0] == 1) \
+            or (info.bc_x[1] == 1) or (info.bc_y[0] == 1) or (info.bc_y[1] == 1))
+
+
+cdef bint dsa_ready(params info) noexcept nogil:
+    # DSA only estimates the scattering error, so the reflected edges must
+    # be current: no reflector, or reflectors off a reflective cycle fed
+    # in the same wave
+    if ((info.bc_x[0] == 1) and (info.bc_x[1] == 1)) \
+            or ((info.bc_y[0] == 1) and (info.bc_y[1] == 1)):
+        return False
+    return ((info.bc_x[0] == 0) and (info.bc_x[1] == 0) and (info.bc_y[0] == 0) \
+            and (info.bc_y[1] == 0)) or lag_free(info)
+
+
+cdef int quadrant_waves(int* quads, int* wave_start, \
+        params info) noexcept nogil:
+    # Order the quadrants (0: +x+y, 1: -x+y, 2: +x-y, 3: -x-y) into quads
+    # and split them into waves quads[wave_start[ww]:wave_start[ww+1]].
+    # A quadrant is ready once the quadrants reflecting into it are done.
+    # A reflective cycle is broken by taking the quadrant with the fewest
+    # missing inputs, which then reads lagged edges.  Returns the number
+    # of waves (one, with all quadrants, unless lag_free).
+
+    # Initialize iterables
+    cdef int qq, kk, first, need, best, best_need
+    cdef int n_waves = 0
+    cdef int count = 0
+    cdef int feed_x[4]
+    cdef int feed_y[4]
+    cdef bint done[4]
+
+    wave_start[0] = 0
+    if not lag_free(info):
+        for qq in range(4):
+            quads[qq] = qq
+        wave_start[1] = 4
+        return 1
+
+    # Quadrant reflecting into each incoming edge (-1 for vacuum): x > 0
+    # enters through the left boundary, y > 0 through the bottom
+    for qq in range(4):
+        feed_x[qq] = qq ^ 1 if info.bc_x[qq % 2] == 1 else -1
+        feed_y[qq] = qq ^ 2 if info.bc_y[qq // 2] == 1 else -1
+        done[qq] = False
+
+    while count < 4:
+        first = count
+        for qq in range(4):
+            if (not done[qq]) and ((feed_x[qq] == -1) or done[feed_x[qq]]) \
+                    and ((feed_y[qq] == -1) or done[feed_y[qq]]):
+                quads[count] = qq
+                count += 1
+        # Reflective cycle
+        if count == first:
+            best = -1
+            best_need = 3
+            for qq in range(4):
+                if done[qq]:
+                    continue
+                need = 0
+                if (feed_x[qq] != -1) and (not done[feed_x[qq]]):
+                    need += 1
+                if (feed_y[qq] != -1) and (not done[feed_y[qq]]):
+                    need += 1
+                if need < best_need:
+                    best = qq
+                    best_need = need
+            quads[count] = best
+            count += 1
+        for kk in range(first, count):
+            done[quads[kk]] = True
+        n_waves += 1
+        wave_start[n_waves] = count
+    return n_waves
+
+
+cdef int quadrant_tasks(double[:]& angle_x, double[:]& angle_y, int* quads, \
+        int* order, int* task_start, int* quad_task, \
+        params info) noexcept nogil:
+    # Sort the angles by quadrant, in the quadrant order quads, into order
+    # and split every quadrant into ceil(num_threads / 4) batches so that
+    # all threads get work.  Angles with a zero direction cosine are never
+    # swept and are left out.  Batches quad_task[kk] to quad_task[kk + 1]
+    # belong to quadrant quads[kk].  Returns the number of batches.
+
+    # Initialize iterables
+    cdef int kk, quad, nn, na, chunk, n_chunks, first
+    cdef int N2 = info.angles * info.angles
+    cdef int n_tasks = 0
+    cdef int count = 0
+
+    task_start[0] = 0
+    for kk in range(4):
+        quad = quads[kk]
+        quad_task[kk] = n_tasks
+        first = count
+        for nn in range(N2):
+            if (angle_x[nn] == 0.0) or (angle_y[nn] == 0.0):
+                continue
+            if ((angle_x[nn] > 0.0) == (quad % 2 == 0)) \
+                    and ((angle_y[nn] > 0.0) == (quad < 2)):
+                order[count] = nn
+                count += 1
+        na = count - first
+        if na == 0:
+            continue
+        n_chunks = min(na, (info.num_threads + 3) // 4)
+        for chunk in range(n_chunks):
+            n_tasks += 1
+            task_start[n_tasks] = first + (chunk + 1) * na // n_chunks
+    quad_task[4] = n_tasks
+    return n_tasks
+
+
+cdef void square_wavefront(double[:,:,:]& thread_flux, double[:,:]& flux_old, \
+        double[:]& xs_total, double[:]& xs_scatter, double[:,:]& off_scatter, \
+        double[:,:,:]& external, double[:,:]& known_x_work, \
+        double[:,:]& known_y_work, int[:,:]& medium_map, double[:]& delta_x, \
+        double[:]& delta_y, double[:]& angle_x, double[:]& angle_y, \
+        double[:]& angle_w, double[:,:,:,:]& coef_x_table, \
+        double[:,:,:,:]& coef_y_table, bint use_table, int* order, \
+        int* task_start, int* quad_task, int k0, int k1, \
+        params info) noexcept nogil:
+    # KBA-style sweep of quadrants k0 <= kk < k1 from quadrant_tasks.
+    # The mesh is split into nb_x x nb_y blocks; block (bi, bj) only
+    # depends on its upstream neighbours, so all blocks on one
+    # anti-diagonal (counted from the upstream corner) are independent.
+    # They touch disjoint rows of known_x_work and columns of known_y_work,
+    # and each thread accumulates into thread_flux[tid].  SPACE sweeps one
+    # angle at a time, SPACE_ANGLE pipelines every angle of a quadrant
+    # through the same diagonals.
+
+    # Initialize iterables
+    cdef int quad, nn, na, first, last, batch, diag, lo, width, kk, bi, bj
+    cdef int qq, tid
+
+    # Two blocks per thread along each axis keeps the middle diagonals busy
+    cdef int nb_x = min(info.cells_x, 2 * info.num_threads)
+    cdef int nb_y = min(info.cells_y, 2 * info.num_threads)
+
+    for quad in range(k0, k1):
+        # Angles of the current quadrant
+        first = task_start[quad_task[quad]]
+        last = task_start[quad_task[quad + 1]]
+        na = last - first
+
+        batch = na if info.parallel_type == 5 else 1
+        while first < last:
+            for diag in range(nb_x + nb_y - 1):
+                lo = max(0, diag - nb_y + 1)
+                width = min(diag, nb_x - 1) - lo + 1
+                for kk in prange(width * batch, schedule="static", \
+                                 num_threads=info.num_threads):
+                    nn = order[first + kk // width]
+                    bi = lo + kk % width
+                    bj = diag - bi
+                    # Reverse block order for negative directions
+                    if angle_x[nn] < 0.0:
+                        bi = nb_x - 1 - bi
+                    if angle_y[nn] < 0.0:
+                        bj = nb_y - 1 - bj
+                    qq = 0 if external.shape[2] == 1 else nn
+                    tid = threadid()
+                    square_sweep_block(thread_flux[tid, :, :], flux_old, \
+                            xs_total, xs_scatter, off_scatter, \
+                            external[:, :, qq], known_x_work[nn, :], \
+                            known_y_work[nn, :], medium_map, delta_x, \
+                            delta_y, angle_x[nn], angle_y[nn], angle_w[nn], \
+                            coef_x_table, coef_y_table, nn, use_table, \
+                            bi * info.cells_x // nb_x, \
+                            (bi + 1) * info.cells_x // nb_x, \
+                            bj * info.cells_y // nb_y, \
+                            (bj + 1) * info.cells_y // nb_y, info)
+            first += batch
 
 
 cdef void square_sweep_private(double[:,:]& flux, double[:,:]& flux_old, \
         double[:]& xs_total, double[:]& xs_scatter, double[:,:]& off_scatter, \
         double[:,:]& external, double[:]& known_x, double[:]& known_y, \
         int[:,:]& medium_map, double[:]& delta_x, double[:]& delta_y, \
-        double angle_x, double angle_y, double angle_w, params info) noexcept nogil:
+        double angle_x, double angle_y, double angle_w, \
+        double[:,:,:,:]& coef_x_table, double[:,:,:,:]& coef_y_table, \
+        int nn, bint use_table, params info) noexcept nogil:
     # Single-angle sweep into a private flux array.  Thread-safe.
+    square_sweep_block(flux, flux_old, xs_total, xs_scatter, off_scatter, \
+                       external, known_x, known_y, medium_map, delta_x, \
+                       delta_y, angle_x, angle_y, angle_w, coef_x_table, \
+                       coef_y_table, nn, use_table, 0, info.cells_x, 0, \
+                       info.cells_y, info)
+
+
+cdef void square_sweep_block(double[:,:]& flux, double[:,:]& flux_old, \
+        double[:]& xs_total, double[:]& xs_scatter, double[:,:]& off_scatter, \
+        double[:,:]& external, double[:]& known_x, double[:]& known_y, \
+        int[:,:]& medium_map, double[:]& delta_x, double[:]& delta_y, \
+        double angle_x, double angle_y, double angle_w, \
+        double[:,:,:,:]& coef_x_table, double[:,:,:,:]& coef_y_table, \
+        int nn, bint use_table, int i0, int i1, int j0, int j1, \
+        params info) noexcept nogil:
+    # Sweep cells [i0, i1) x [j0, j1) for one angle.  known_x[j0:j1] and
+    # known_y[i0:i1] hold the incoming edges and are left holding the
+    # outgoing edges of the block.
     if angle_y > 0.0:
         square_forward_y(flux, flux_old, xs_total, xs_scatter, off_scatter, \
                          external, known_x, known_y, medium_map, delta_x, \
-                         delta_y, angle_x, angle_y, angle_w, info)
+                         delta_y, angle_x, angle_y, angle_w, coef_x_table, \
+                         coef_y_table, nn, use_table, i0, i1, j0, j1, info)
     elif angle_y < 0.0:
         square_backward_y(flux, flux_old, xs_total, xs_scatter, off_scatter, \
                           external, known_x, known_y, medium_map, delta_x, \
-                          delta_y, angle_x, angle_y, angle_w, info)
+                          delta_y, angle_x, angle_y, angle_w, coef_x_table, \
+                          coef_y_table, nn, use_table, i0, i1, j0, j1, info)
 
 
 # Keep the original name as an alias for callers outside prange.
@@ -150,15 +659,13 @@ cdef void square_sweep(double[:,:]& flux, double[:,:]& flux_old, \
         double[:]& xs_total, double[:]& xs_scatter, double[:,:]& off_scatter, \
         double[:,:]& external, double[:]& known_x, double[:]& known_y, \
         int[:,:]& medium_map, double[:]& delta_x, double[:]& delta_y, \
-        double angle_x, double angle_y, double angle_w, params info):
-    if angle_y > 0.0:
-        square_forward_y(flux, flux_old, xs_total, xs_scatter, off_scatter, \
+        double angle_x, double angle_y, double angle_w, \
+        double[:,:,:,:]& coef_x_table, double[:,:,:,:]& coef_y_table, \
+        int nn, bint use_table, params info):
+    square_sweep_private(flux, flux_old, xs_total, xs_scatter, off_scatter, \
                          external, known_x, known_y, medium_map, delta_x, \
-                         delta_y, angle_x, angle_y, angle_w, info)
-    elif angle_y < 0.0:
-        square_backward_y(flux, flux_old, xs_total, xs_scatter, off_scatter, \
-                          external, known_x, known_y, medium_map, delta_x, \
-                          delta_y, angle_x, angle_y, angle_w, info)
+                         delta_y, angle_x, angle_y, angle_w, coef_x_table, \
+                         coef_y_table, nn, use_table, info)
 
 
 cdef float spatial_coef(int spatial) noexcept nogil:
@@ -169,120 +676,168 @@ cdef float spatial_coef(int spatial) noexcept nogil:
     return 1.0
 
 
+cdef inline double edge_weight(double xs_total, double coef, \
+        int spatial) noexcept nogil:
+    # Weight W of the closure psi_edge = ((1 + W) psi_center - ...) / 2 for
+    # base coefficient coef = |angle| / delta
+    cdef double tau
+    if spatial == 3:
+        tau = xs_total / coef
+        return 1.0 / tanh(0.5 * tau) - 2.0 / tau
+    return spatial_coef(spatial)
+
+
+cdef bint use_coef_table(params info) noexcept nogil:
+    # Tabulating over (angle, cell, material) only pays off when there are
+    # fewer materials than cells along the other direction
+    return info.materials * (info.cells_x + info.cells_y) \
+                <= info.cells_x * info.cells_y
+
+
+cdef void build_coef_tables(double[:]& xs_total, double[:]& delta_x, \
+        double[:]& delta_y, double[:]& angle_x, double[:]& angle_y, \
+        double[:,:,:,:]& coef_x_table, double[:,:,:,:]& coef_y_table, \
+        params info) noexcept nogil:
+    # Table entries are [coef, 2 / (1 + W), (1 - W) / (1 + W)]
+
+    # Initialize iterables
+    cdef int nn, ii, jj, mat
+    cdef double base, W
+    cdef int N2 = info.angles * info.angles
+
+    for nn in prange(N2, schedule="static", num_threads=info.num_threads):
+        for mat in range(info.materials):
+            for ii in range(info.cells_x):
+                base = fabs(angle_x[nn]) / delta_x[ii]
+                W = edge_weight(xs_total[mat], base, info.spatial)
+                coef_x_table[nn, ii, mat, 0] = 2.0 / (1.0 + W) * base
+                coef_x_table[nn, ii, mat, 1] = 2.0 / (1.0 + W)
+                coef_x_table[nn, ii, mat, 2] = (1.0 - W) / (1.0 + W)
+            for jj in range(info.cells_y):
+                base = fabs(angle_y[nn]) / delta_y[jj]
+                W = edge_weight(xs_total[mat], base, info.spatial)
+                coef_y_table[nn, jj, mat, 0] = 2.0 / (1.0 + W) * base
+                coef_y_table[nn, jj, mat, 1] = 2.0 / (1.0 + W)
+                coef_y_table[nn, jj, mat, 2] = (1.0 - W) / (1.0 + W)
+
+
 cdef void square_forward_y(double[:,:]& flux, double[:,:]& flux_old, \
         double[:]& xs_total, double[:]& xs_scatter, double[:,:]& off_scatter, \
         double[:,:]& external, double[:]& known_x, double[:]& known_y, \
         int[:,:]& medium_map, double[:]& delta_x, double[:]& delta_y, \
         double angle_x, double angle_y, double angle_w, \
+        double[:,:,:,:]& coef_x_table, double[:,:,:,:]& coef_y_table, \
+        int nn, bint use_table, int i0, int i1, int j0, int j1, \
         params info) noexcept nogil:
 
     # Initialize iterables
     cdef int jj
-    cdef double coef_y
-
-    # Spatial discretization
-    cdef double alpha_y = 2.0 / (1.0 + spatial_coef(info.spatial))
 
     # Iterate over Y spatial cells
-    for jj in range(info.cells_y):
-
-        # Angular coefficient
-        coef_y = alpha_y * angle_y / delta_y[jj]
+    for jj in range(j0, j1):
 
         # Set direction of sweep
         if angle_x > 0.0:
             known_x[jj] = square_forward_x(flux, flux_old, xs_total, xs_scatter, \
                                     off_scatter, external, known_x[jj], known_y, \
-                                    medium_map, delta_x, angle_x, angle_w, \
-                                    coef_y, jj, info)
+                                    medium_map, delta_x, delta_y, angle_x, \
+                                    angle_y, angle_w, coef_x_table, \
+                                    coef_y_table, nn, jj, use_table, i0, \
+                                    i1, info)
         elif angle_x < 0.0:
             known_x[jj] = square_backward_x(flux, flux_old, xs_total, xs_scatter, \
                                     off_scatter, external, known_x[jj], known_y, \
-                                    medium_map, delta_x, angle_x, angle_w, \
-                                    coef_y, jj, info)
+                                    medium_map, delta_x, delta_y, angle_x, \
+                                    angle_y, angle_w, coef_x_table, \
+                                    coef_y_table, nn, jj, use_table, i0, \
+                                    i1, info)
 
 
 cdef void square_backward_y(double[:,:]& flux, double[:,:]& flux_old, \
         double[:]& xs_total, double[:]& xs_scatter, double[:,:]& off_scatter, \
         double[:,:]& external, double[:]& known_x, double[:]& known_y, \
         int[:,:]& medium_map, double[:]& delta_x, double[:]& delta_y, \
-        double angle_x, double angle_y, double angle_w, params info) noexcept nogil:
+        double angle_x, double angle_y, double angle_w, \
+        double[:,:,:,:]& coef_x_table, double[:,:,:,:]& coef_y_table, \
+        int nn, bint use_table, int i0, int i1, int j0, int j1, \
+        params info) noexcept nogil:
 
     # Initialize iterable
     cdef int jj
-    cdef double coef_y
-
-    # Spatial discretization
-    cdef double alpha_y = 2.0 / (1.0 + spatial_coef(info.spatial))
 
     # Iterate over Y spatial cells
-    for jj in range(info.cells_y-1, -1, -1):
-
-        # Angular coefficient
-        coef_y = -alpha_y * angle_y / delta_y[jj]
+    for jj in range(j1-1, j0-1, -1):
 
         # Set direction of sweep
         if angle_x > 0.0:
             known_x[jj] = square_forward_x(flux, flux_old, xs_total, xs_scatter, \
                                     off_scatter, external, known_x[jj], known_y, \
-                                    medium_map, delta_x, angle_x, angle_w, \
-                                    coef_y, jj, info)
+                                    medium_map, delta_x, delta_y, angle_x, \
+                                    angle_y, angle_w, coef_x_table, \
+                                    coef_y_table, nn, jj, use_table, i0, \
+                                    i1, info)
         elif angle_x < 0.0:
             known_x[jj] = square_backward_x(flux, flux_old, xs_total, xs_scatter, \
                                     off_scatter, external, known_x[jj], known_y, \
-                                    medium_map, delta_x, angle_x, angle_w, \
-                                    coef_y, jj, info)
+                                    medium_map, delta_x, delta_y, angle_x, \
+                                    angle_y, angle_w, coef_x_table, \
+                                    coef_y_table, nn, jj, use_table, i0, \
+                                    i1, info)
 
 
 cdef double square_forward_x(double[:,:]& flux, double[:,:]& flux_old, \
         double[:]& xs_total, double[:]& xs_scatter, double[:,:]& off_scatter, \
         double[:,:]& external, double edge_x, double[:]& edge_y, \
-        int[:,:]& medium_map, double[:]& delta_x, double angle_x, \
-        double angle_w, double coef_y, int jj, params info) noexcept nogil:
+        int[:,:]& medium_map, double[:]& delta_x, double[:]& delta_y, \
+        double angle_x, double angle_y, double angle_w, \
+        double[:,:,:,:]& coef_x_table, double[:,:,:,:]& coef_y_table, \
+        int nn, int jj, bint use_table, int i0, int i1, \
+        params info) noexcept nogil:
     # Takes full 2D arrays + column index jj instead of 1D column slices.
     # Element access (arr[ii, jj]) has no lock overhead; column-slice creation
     # (arr[:, jj]) acquires a per-object lock that serialises prange threads.
 
     # Initialize iterables
     cdef int ii, mat
-    cdef double center, coef_x
-
-    # Spatial discretization
-    cdef float alpha = spatial_coef(info.spatial)
-    cdef float alpha_x = 2.0 / (1.0 + alpha)
+    cdef double center
 
-    # Step Characteristic per-cell variables
-    cdef double tau_x, tau_y, W_x, W_y, coef_y_eff
+    # Cell coefficients and edge weights
+    cdef double coef_x, center_x, edge_w_x, coef_y, center_y, edge_w_y, W
 
     # Iterate over X spatial cells
-    for ii in range(info.cells_x):
+    for ii in range(i0, i1):
         mat = medium_map[ii, jj]
-        coef_x = (alpha_x * angle_x / delta_x[ii])
 
-        if info.spatial == 3:
-            # coef_x and coef_y are base coefficients (alpha==1) for spatial==3
-            tau_x = xs_total[mat] / coef_x
-            W_x = 1.0 / tanh(0.5 * tau_x) - 2.0 / tau_x
-            coef_x = 2.0 / (1.0 + W_x) * coef_x
-            tau_y = xs_total[mat] / coef_y
-            W_y = 1.0 / tanh(0.5 * tau_y) - 2.0 / tau_y
-            coef_y_eff = 2.0 / (1.0 + W_y) * coef_y
+        if use_table:
+            coef_x = coef_x_table[nn, ii, mat, 0]
+            center_x = coef_x_table[nn, ii, mat, 1]
+            edge_w_x = coef_x_table[nn, ii, mat, 2]
+            coef_y = coef_y_table[nn, jj, mat, 0]
+            center_y = coef_y_table[nn, jj, mat, 1]
+            edge_w_y = coef_y_table[nn, jj, mat, 2]
         else:
-            W_x = alpha
-            W_y = alpha
-            coef_y_eff = coef_y
+            coef_x = fabs(angle_x) / delta_x[ii]
+            W = edge_weight(xs_total[mat], coef_x, info.spatial)
+            coef_x = 2.0 / (1.0 + W) * coef_x
+            center_x = 2.0 / (1.0 + W)
+            edge_w_x = (1.0 - W) / (1.0 + W)
+            coef_y = fabs(angle_y) / delta_y[jj]
+            W = edge_weight(xs_total[mat], coef_y, info.spatial)
+            coef_y = 2.0 / (1.0 + W) * coef_y
+            center_y = 2.0 / (1.0 + W)
+            edge_w_y = (1.0 - W) / (1.0 + W)
 
         # Calculate flux center
-        center = (coef_x * edge_x + coef_y_eff * edge_y[ii] + xs_scatter[mat] \
+        center = (coef_x * edge_x + coef_y * edge_y[ii] + xs_scatter[mat] \
                     * flux_old[ii, jj] + external[ii, jj] + off_scatter[ii, jj]) \
-                    / (xs_total[mat] + coef_x + coef_y_eff)
+                    / (xs_total[mat] + coef_x + coef_y)
 
         # Update flux with cell centers
         flux[ii, jj] += angle_w * center
 
         # Update known flux
-        edge_x = (2.0 * center - (1.0 - W_x) * edge_x) / (1.0 + W_x)
-        edge_y[ii] = (2.0 * center - (1.0 - W_y) * edge_y[ii]) / (1.0 + W_y)
+        edge_x = center_x * center - edge_w_x * edge_x
+        edge_y[ii] = center_y * center - edge_w_y * edge_y[ii]
 
     return edge_x
 
@@ -290,54 +845,276 @@ cdef double square_forward_x(double[:,:]& flux, double[:,:]& flux_old, \
 cdef double square_backward_x(double[:,:]& flux, double[:,:]& flux_old, \
         double[:]& xs_total, double[:]& xs_scatter, double[:,:]& off_scatter, \
         double[:,:]& external, double edge_x, double[:]& edge_y, \
-        int[:,:]& medium_map, double[:]& delta_x, double angle_x, \
-        double angle_w, double coef_y, int jj, params info) noexcept nogil:
+        int[:,:]& medium_map, double[:]& delta_x, double[:]& delta_y, \
+        double angle_x, double angle_y, double angle_w, \
+        double[:,:,:,:]& coef_x_table, double[:,:,:,:]& coef_y_table, \
+        int nn, int jj, bint use_table, int i0, int i1, \
+        params info) noexcept nogil:
     # Same rationale as square_forward_x above.
 
     # Initialize iterables
     cdef int ii, mat
-    cdef double center, coef_x
+    cdef double center
 
-    # Spatial discretization
-    cdef double alpha = spatial_coef(info.spatial)
-    cdef double alpha_x = 2.0 / (1.0 + alpha)
-
-    # Step Characteristic per-cell variables
-    cdef double tau_x, tau_y, W_x, W_y, coef_y_eff
+    # Cell coefficients and edge weights
+    cdef double coef_x, center_x, edge_w_x, coef_y, center_y, edge_w_y, W
 
     # Iterate over X spatial cells
-    for ii in range(info.cells_x-1, -1, -1):
+    for ii in range(i1-1, i0-1, -1):
         mat = medium_map[ii, jj]
-        coef_x = (-alpha_x * angle_x / delta_x[ii])
 
-        if info.spatial == 3:
-            # coef_x = -angle_x/dx > 0 (angle_x < 0 in backward); coef_y is base
-            tau_x = xs_total[mat] / coef_x
-            W_x = 1.0 / tanh(0.5 * tau_x) - 2.0 / tau_x
-            coef_x = 2.0 / (1.0 + W_x) * coef_x
-            tau_y = xs_total[mat] / coef_y
-            W_y = 1.0 / tanh(0.5 * tau_y) - 2.0 / tau_y
-            coef_y_eff = 2.0 / (1.0 + W_y) * coef_y
+        if use_table:
+            coef_x = coef_x_table[nn, ii, mat, 0]
+            center_x = coef_x_table[nn, ii, mat, 1]
+            edge_w_x = coef_x_table[nn, ii, mat, 2]
+            coef_y = coef_y_table[nn, jj, mat, 0]
+            center_y = coef_y_table[nn, jj, mat, 1]
+            edge_w_y = coef_y_table[nn, jj, mat, 2]
         else:
-            W_x = alpha
-            W_y = alpha
-            coef_y_eff = coef_y
+            coef_x = fabs(angle_x) / delta_x[ii]
+            W = edge_weight(xs_total[mat], coef_x, info.spatial)
+            coef_x = 2.0 / (1.0 + W) * coef_x
+            center_x = 2.0 / (1.0 + W)
+            edge_w_x = (1.0 - W) / (1.0 + W)
+            coef_y = fabs(angle_y) / delta_y[jj]
+            W = edge_weight(xs_total[mat], coef_y, info.spatial)
+            coef_y = 2.0 / (1.0 + W) * coef_y
+            center_y = 2.0 / (1.0 + W)
+            edge_w_y = (1.0 - W) / (1.0 + W)
 
         # Calculate flux center
-        center = (coef_x * edge_x + coef_y_eff * edge_y[ii] + xs_scatter[mat] \
+        center = (coef_x * edge_x + coef_y * edge_y[ii] + xs_scatter[mat] \
                     * flux_old[ii, jj] + external[ii, jj] + off_scatter[ii, jj]) \
-                    / (xs_total[mat] + coef_x + coef_y_eff)
+                    / (xs_total[mat] + coef_x + coef_y)
 
         # Update flux with cell centers
         flux[ii, jj] += angle_w * center
 
         # Update known flux
-        edge_x = (2.0 * center - (1.0 - W_x) * edge_x) / (1.0 + W_x)
-        edge_y[ii] = (2.0 * center - (1.0 - W_y) * edge_y[ii]) / (1.0 + W_y)
+        edge_x = center_x * center - edge_w_x * edge_x
+        edge_y[ii] = center_y * center - edge_w_y * edge_y[ii]
 
     return edge_x
 
 
+########################################################################
+# Group-Batched Sweep - Square Geometry
+#
+# Used by the Jacobi (GROUP / BOTH) multigroup iteration.  A block of gb
+# energy groups is transported in one spatial pass: every cell visit
+# loads the material, cell widths and angle coefficients once and then
+# updates all gb groups, whose edges are stored group innermost.  The
+# block iterates until every group in it has converged.
+########################################################################
+
+cdef void discrete_ordinates_groups(double[:,:,:]& flux, \
+        double[:,:,:]& flux_old, double[:,:]& xs_total, \
+        double[:,:,:]& xs_scatter, double[:,:,:]& off_scatter, \
+        double[:,:,:,:]& external, double[:,:,:,:]& boundary_x, \
+        double[:,:,:,:]& boundary_y, int[:,:]& medium_map, \
+        double[:]& delta_x, double[:]& delta_y, double[:]& angle_x, \
+        double[:]& angle_y, double[:]& angle_w, int[:,:]& reflect, \
+        int g0, int gb, \
+        double[:,:,:,:]& thread_flux, double[:,:,:]& known_x_work, \
+        double[:,:,:]& known_y_work, double[:,:,:,:]& reflected_x, \
+        double[:,:,:,:]& reflected_y, params info) noexcept nogil:
+    # flux is (I x J x G) and receives groups g0 to g0 + gb - 1.  flux_old
+    # is the (G x I x J) within-group iterate, off_scatter the (G x I x J)
+    # Jacobi off-scatter source.  Work arrays are indexed by the group
+    # offset within the block.
+
+    # Initialize iterables
+    cdef int nn, ii, jj, gg, tid, bcx, bcy, gx, gy, ww, kk, a0, a1
+    cdef int N2 = info.angles * info.angles
+    cdef int edge_size = (info.cells_x + info.cells_y) * gb
+
+    # Group-contiguous edges, one set per angle thread
+    cdef double* edges = <double*> malloc(info.num_threads * edge_size \
+                                          * sizeof(double))
+
+    # Angles sorted by quadrant, grouped in reflector waves
+    cdef int quads[4]
+    cdef int wave_start[5]
+    cdef int quad_task[5]
+    cdef int n_waves = quadrant_waves(quads, wave_start, info)
+    cdef int* order = <int*> malloc(N2 * sizeof(int))
+    cdef int* task_start = <int*> malloc((N2 + 1) * sizeof(int))
+    quadrant_tasks(angle_x, angle_y, quads, order, task_start, quad_task, info)
+
+    # Reflectors start from zero incoming flux on every call
+    reflected_x[:, :, :, :] = 0.0
+    reflected_y[:, :, :, :] = 0.0
+
+    cdef bint converged = False
+    cdef int count = 1
+    cdef double change = 0.0
+
+    while not converged:
+
+        thread_flux[:, :, :, :] = 0.0
+
+        for ww in range(n_waves):
+            a0 = task_start[quad_task[wave_start[ww]]]
+            a1 = task_start[quad_task[wave_start[ww + 1]]]
+
+            # Initialize known edges from boundary/reflector arrays
+            for gg in range(gb):
+                gx = 0 if boundary_x.shape[3] == 1 else g0 + gg
+                gy = 0 if boundary_y.shape[3] == 1 else g0 + gg
+                for kk in range(a0, a1):
+                    nn = order[kk]
+                    bcx = 0 if boundary_x.shape[2] == 1 else nn
+                    bcy = 0 if boundary_y.shape[2] == 1 else nn
+                    tools.initialize_known_y(known_y_work[gg, nn, :], \
+                            boundary_y[:, :, bcy, gy], reflected_y[gg], \
+                            angle_y, nn, info)
+                    tools.initialize_known_x(known_x_work[gg, nn, :], \
+                            boundary_x[:, :, bcx, gx], reflected_x[gg], \
+                            angle_x, nn, info)
+
+            # Parallel angular sweep, thread tid accumulates into
+            # thread_flux[tid]
+            for kk in prange(a0, a1, schedule="static", \
+                             num_threads=info.num_threads):
+                nn = order[kk]
+                tid = threadid()
+                square_group_sweep(thread_flux[tid], flux_old, xs_total, \
+                        xs_scatter, off_scatter, external, known_x_work, \
+                        known_y_work, medium_map, delta_x, delta_y, \
+                        angle_x[nn], angle_y[nn], angle_w[nn], nn, g0, gb, \
+                        edges + tid * edge_size, info)
+
+            # Update reflectors from exit edges of the wave
+            for gg in range(gb):
+                for kk in range(a0, a1):
+                    tools.update_reflector(known_x_work[gg, order[kk], :], \
+                            reflected_x[gg], angle_x, \
+                            known_y_work[gg, order[kk], :], reflected_y[gg], \
+                            angle_y, reflect, order[kk], info)
+
+        # Sequential reduction into scalar flux
+        for ii in range(info.cells_x):
+            for jj in range(info.cells_y):
+                for gg in range(gb):
+                    flux[ii, jj, g0 + gg] = 0.0
+                for tid in range(info.num_threads):
+                    for gg in range(gb):
+                        flux[ii, jj, g0 + gg] += thread_flux[tid, ii, jj, gg]
+
+        # The block converges with its slowest group
+        change = 0.0
+        for gg in range(gb):
+            change = max(change, tools.angle_convergence(flux[:, :, g0 + gg], \
+                                                flux_old[g0 + gg], info))
+        converged = (change < info.tol_angular) or (count >= info.max_iter_angular)
+        count += 1
+        for gg in range(gb):
+            for ii in range(info.cells_x):
+                for jj in range(info.cells_y):
+                    flux_old[g0 + gg, ii, jj] = flux[ii, jj, g0 + gg]
+
+    free(edges)
+    free(order)
+    free(task_start)
+
+
+cdef void square_group_sweep(double[:,:,:]& flux, double[:,:,:]& flux_old, \
+        double[:,:]& xs_total, double[:,:,:]& xs_scatter, \
+        double[:,:,:]& off_scatter, double[:,:,:,:]& external, \
+        double[:,:,:]& known_x_work, double[:,:,:]& known_y_work, \
+        int[:,:]& medium_map, double[:]& delta_x, double[:]& delta_y, \
+        double angle_x, double angle_y, double angle_w, int nn, int g0, \
+        int gb, double* edges, params info) noexcept nogil:
+    # Single-angle sweep of gb groups into flux (I x J x gb)
+
+    # Initialize iterables
+    cdef int ii, jj, kk, ll, gg, group, mat, qq, qg
+    cdef double center, total, base_x, base_y, W
+    cdef double coef_x, center_x, edge_w_x, coef_y, center_y, edge_w_y
+    cdef double cx, wcx, wex, cy, wcy, wey
+    cdef double* ex
+    cdef double* ey
+
+    # Group-contiguous edges
+    cdef double* edge_x = edges
+    cdef double* edge_y = edges + info.cells_y * gb
+
+    # Angles that are never swept leave their edges untouched
+    if (angle_x == 0.0) or (angle_y == 0.0):
+        return
+
+    # Sweep direction
+    cdef bint forward_x = angle_x > 0.0
+    cdef bint forward_y = angle_y > 0.0
+
+    # Group-independent weights for step and diamond difference
+    W = spatial_coef(info.spatial)
+    center_x = 2.0 / (1.0 + W)
+    edge_w_x = (1.0 - W) / (1.0 + W)
+    center_y = center_x
+    edge_w_y = edge_w_x
+
+    # Gather incoming edges
+    for gg in range(gb):
+        for jj in range(info.cells_y):
+            edge_x[jj * gb + gg] = known_x_work[gg, nn, jj]
+        for ii in range(info.cells_x):
+            edge_y[ii * gb + gg] = known_y_work[gg, nn, ii]
+
+    qq = 0 if external.shape[2] == 1 else nn
+
+    for kk in range(info.cells_y):
+        jj = kk if forward_y else info.cells_y - 1 - kk
+        ex = edge_x + jj * gb
+        base_y = fabs(angle_y) / delta_y[jj]
+        coef_y = center_y * base_y
+
+        for ll in range(info.cells_x):
+            ii = ll if forward_x else info.cells_x - 1 - ll
+            ey = edge_y + ii * gb
+            mat = medium_map[ii, jj]
+            base_x = fabs(angle_x) / delta_x[ii]
+            coef_x = center_x * base_x
+
+            for gg in range(gb):
+                group = g0 + gg
+                qg = 0 if external.shape[3] == 1 else group
+                total = xs_total[mat, group]
+
+                # Step characteristic weights depend on the group
+                if info.spatial == 3:
+                    W = edge_weight(total, base_x, info.spatial)
+                    wcx = 2.0 / (1.0 + W)
+                    wex = (1.0 - W) / (1.0 + W)
+                    cx = wcx * base_x
+                    W = edge_weight(total, base_y, info.spatial)
+                    wcy = 2.0 / (1.0 + W)
+                    wey = (1.0 - W) / (1.0 + W)
+                    cy = wcy * base_y
+                else:
+                    cx = coef_x
+                    wcx = center_x
+                    wex = edge_w_x
+                    cy = coef_y
+                    wcy = center_y
+                    wey = edge_w_y
+
+                center = (cx * ex[gg] + cy * ey[gg] + xs_scatter[mat, group, group] \
+                            * flux_old[group, ii, jj] + off_scatter[group, ii, jj] \
+                            + external[ii, jj, qq, qg]) / (total + cx + cy)
+
+                flux[ii, jj, gg] += angle_w * center
+                ex[gg] = wcx * center - wex * ex[gg]
+                ey[gg] = wcy * center - wey * ey[gg]
+
+    # Scatter outgoing edges back for the reflector update
+    for gg in range(gb):
+        for jj in range(info.cells_y):
+            known_x_work[gg, nn, jj] = edge_x[jj * gb + gg]
+        for ii in range(info.cells_x):
+            known_y_work[gg, nn, ii] = edge_y[ii * gb + gg]
+
+
 ########################################################################
 # Known Source Spatial Sweeps
 #
@@ -364,21 +1141,51 @@ cdef void _known_square(double[:,:,:]& flux, double[:]& xs_total, \
         double[:]& angle_x, double[:]& angle_y, double[:]& angle_w, \
         params info):
 
+    # Add reflector arrays initialized to zero
+    reflected_x = tools.array_3d(2, info.cells_y, info.angles * info.angles)
+    reflected_y = tools.array_3d(2, info.cells_x, info.angles * info.angles)
+    _known_square_reflected(flux, xs_total, zero_2d, source, boundary_x, \
+                boundary_y, reflected_x, reflected_y, medium_map, delta_x, \
+                delta_y, angle_x, angle_y, angle_w, info)
+
+
+cdef void _known_square_reflected(double[:,:,:]& flux, double[:]& xs_total, \
+        double[:,:]& zero_2d, double[:,:,:]& source, \
+        double[:,:,:]& boundary_x, double[:,:,:]& boundary_y, \
+        double[:,:,:]& reflected_x, double[:,:,:]& reflected_y, \
+        int[:,:]& medium_map, double[:]& delta_x, double[:]& delta_y, \
+        double[:]& angle_x, double[:]& angle_y, double[:]& angle_w, \
+        params info):
+    # reflected_x and reflected_y hold the incoming edge fluxes and are
+    # overwritten with the edge fluxes reflected during the pass
+
     # Initialize indices etc
     cdef int nn, qq, bcx, bcy
 
     # Add dummy dimension to run both (I x J x N) and (I x J) fluxes
     cdef int xdim = flux.shape[2]
 
-    # Add reflector array
+    # Add known edge arrays
     known_y = tools.array_1d(info.cells_x)
-    reflected_y = tools.array_3d(2, info.cells_x, info.angles * info.angles)
     known_x = tools.array_1d(info.cells_y)
-    reflected_x = tools.array_3d(2, info.cells_y, info.angles * info.angles)
+    cdef int[:,:] reflect = tools.reflection_map(angle_x, angle_y, info)
 
     # Add zero placeholder
     zero_1d = tools.array_1d(info.materials)
 
+    # Cell coefficient tables
+    cdef bint use_table = use_coef_table(info)
+    if use_table:
+        coef_x_table = tools.array_4d(info.angles * info.angles, \
+                                      info.cells_x, info.materials, 3)
+        coef_y_table = tools.array_4d(info.angles * info.angles, \
+                                      info.cells_y, info.materials, 3)
+        build_coef_tables(xs_total, delta_x, delta_y, angle_x, angle_y, \
+                          coef_x_table, coef_y_table, info)
+    else:
+        coef_x_table = tools.array_4d(1, 1, 1, 3)
+        coef_y_table = tools.array_4d(1, 1, 1, 3)
+
     # Iterate over angles
     for nn in range(info.angles * info.angles):
 
@@ -397,16 +1204,18 @@ cdef void _known_square(double[:,:,:]& flux, double[:]& xs_total, \
             # Perform spatial sweep - scalar flux
             square_sweep(flux[:,:,0], zero_2d, xs_total, zero_1d, zero_2d, \
                     source[:,:,qq], known_x, known_y, medium_map, delta_x, \
-                    delta_y, angle_x[nn], angle_y[nn], angle_w[nn], info)
+                    delta_y, angle_x[nn], angle_y[nn], angle_w[nn], \
+                    coef_x_table, coef_y_table, nn, use_table, info)
         else:
             # Perform spatial sweep - angular flux
             square_sweep(flux[:,:,nn], zero_2d, xs_total, zero_1d, zero_2d, \
                     source[:,:,qq], known_x, known_y, medium_map, delta_x, \
-                    delta_y, angle_x[nn], angle_y[nn], 1.0, info)
+                    delta_y, angle_x[nn], angle_y[nn], 1.0, coef_x_table, \
+                    coef_y_table, nn, use_table, info)
 
         # Save known_x, known_y into reflected
         tools.update_reflector(known_x, reflected_x, angle_x, known_y, \
-                               reflected_y, angle_y, nn, info)
+                               reflected_y, angle_y, reflect, nn, info)
 
 
 cdef void _known_interface_sweep(double[:,:,:]& flux_edge_x, \
@@ -427,6 +1236,7 @@ cdef void _known_interface_sweep(double[:,:,:]& flux_edge_x, \
     reflected_y = tools.array_3d(2, info.cells_x, info.angles * info.angles)
     known_x = tools.array_1d(info.cells_y)
     reflected_x = tools.array_3d(2, info.cells_y, info.angles * info.angles)
+    cdef int[:,:] reflect = tools.reflection_map(angle_x, angle_y, info)
 
     # Iterate over angles
     for nn in range(info.angles * info.angles):
@@ -455,7 +1265,62 @@ cdef void _known_interface_sweep(double[:,:,:]& flux_edge_x, \
 
         # Save known_x, known_y into reflected
         tools.update_reflector(known_x, reflected_x, angle_x, known_y, \
-                               reflected_y, angle_y, nn, info)
+                               reflected_y, angle_y, reflect, nn, info)
+
+
+cdef void _known_current_sweep(double[:,:]& current_x, \
+        double[:,:]& current_y, double[:]& xs_total, double[:,:,:]& source, \
+        double[:,:,:]& boundary_x, double[:,:,:]& boundary_y, \
+        int[:,:]& medium_map, double[:]& delta_x, double[:]& delta_y, \
+        double[:]& angle_x, double[:]& angle_y, double[:]& angle_w, \
+        params info):
+    # Net currents sum_n w_n mu_n psi_n on the x edges [(I+1) x J] and
+    # sum_n w_n eta_n psi_n on the y edges [I x (J+1)], used for CMFD
+
+    # Initialize indices etc
+    cdef int nn, ii, jj, qq, bcx, bcy
+
+    # Angular flux on the cell edges for one direction
+    edge_x = tools.array_2d(info.cells_x + 1, info.cells_y)
+    edge_y = tools.array_2d(info.cells_x, info.cells_y + 1)
+
+    # Add reflector array
+    known_y = tools.array_1d(info.cells_x)
+    reflected_y = tools.array_3d(2, info.cells_x, info.angles * info.angles)
+    known_x = tools.array_1d(info.cells_y)
+    reflected_x = tools.array_3d(2, info.cells_y, info.angles * info.angles)
+    cdef int[:,:] reflect = tools.reflection_map(angle_x, angle_y, info)
+
+    # Iterate over angles
+    for nn in range(info.angles * info.angles):
+
+        # Determine dimensions of external and boundary sources
+        qq = 0 if source.shape[2] == 1 else nn
+        bcx = 0 if boundary_x.shape[2] == 1 else nn
+        bcy = 0 if boundary_y.shape[2] == 1 else nn
+
+        # Initialize known x and y
+        tools.initialize_known_y(known_y, boundary_y[:,:,bcy], reflected_y, \
+                                angle_y, nn, info)
+        tools.initialize_known_x(known_x, boundary_x[:,:,bcx], reflected_x, \
+                                angle_x, nn, info)
+
+        edge_x[:,:] = 0.0
+        edge_y[:,:] = 0.0
+        interface_sweep(edge_x, edge_y, xs_total, source[:,:,qq], known_x, \
+                known_y, medium_map, delta_x, delta_y, angle_x[nn], \
+                angle_y[nn], 1.0, info)
+
+        for ii in range(info.cells_x + 1):
+            for jj in range(info.cells_y):
+                current_x[ii,jj] += angle_w[nn] * angle_x[nn] * edge_x[ii,jj]
+        for ii in range(info.cells_x):
+            for jj in range(info.cells_y + 1):
+                current_y[ii,jj] += angle_w[nn] * angle_y[nn] * edge_y[ii,jj]
+
+        # Save known_x, known_y into reflected
+        tools.update_reflector(known_x, reflected_x, angle_x, known_y, \
+                               reflected_y, angle_y, reflect, nn, info)
 
 
 cdef void interface_sweep(double[:,:]& flux_edge_x, double[:,:]& flux_edge_y, \
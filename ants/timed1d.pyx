@@ -31,6 +31,7 @@ from ants.parameters cimport params
 
 from ants.datatypes import TemporalDiscretization, create_params
 from ants.fixed1d import known_flux as steady_state
+from ants.utils.pytools import StreamingDMD, source_steps, time_source
 
 
 def time_dependent(materials, sources, geometry, quadrature, solver, time_data):
@@ -40,8 +41,6 @@ def time_dependent(materials, sources, geometry, quadrature, solver, time_data):
     cdef double[:,:,:] xs_fission = tools._fission_matrix(materials.fission, materials.chi)
     cdef double[:] velocity = materials.velocity
     cdef double[:,:,:] initial_flux = sources.initial_flux
-    cdef double[:,:,:,:] external = sources.external
-    cdef double[:,:,:,:] boundary_x = sources.boundary_x
     cdef int[:] medium_map = geometry.medium_map
     cdef double[:] delta_x = geometry.delta_x
     cdef double[:] angle_x = quadrature.angle_x
@@ -51,6 +50,11 @@ def time_dependent(materials, sources, geometry, quadrature, solver, time_data):
     params = create_params(materials, quadrature, geometry, solver, time_data)
     info = parameters._to_params(params)
 
+    # Time-dependent sources, evaluated one step at a time when lazy
+    q_steps, bc_steps = source_steps(params.time_disc, info.steps)
+    external = time_source(sources.external, q_steps)
+    boundary_x = time_source(sources.boundary_x, bc_steps)
+
     # Add fission matrix to scattering
     xs_matrix = tools.array_3d(info.materials, info.groups, info.groups)
     tools._xs_matrix(xs_matrix, xs_scatter, xs_fission, info)
@@ -88,14 +92,14 @@ def time_dependent(materials, sources, geometry, quadrature, solver, time_data):
         info_edge = parameters._to_params(params)
         info_edge.flux_at_edges = 1
         flux_final = crank_nicolson(initial_flux.copy(), xs_total, xs_matrix, \
-                         velocity, external, boundary_x.copy(), medium_map, \
+                         velocity, external, boundary_x, medium_map, \
                          delta_x, angle_x, angle_w, flux_file, info, info_edge)
     elif params.time_disc == TemporalDiscretization.BDF2:
         # Run BDF2 method
         parameters._check_bdf_timed1d(info, initial_flux.shape[0], \
                     external.shape[0], boundary_x.shape[0], xs_total.shape[0])
         flux_final = bdf2(initial_flux.copy(), xs_total, xs_matrix, \
-                           velocity, external, boundary_x.copy(), \
+                           velocity, external, boundary_x, \
                            medium_map, delta_x, angle_x, angle_w, flux_file, info)
     elif params.time_disc == TemporalDiscretization.TR_BDF2:
         # Run TR-BDF2 method
@@ -107,7 +111,7 @@ def time_dependent(materials, sources, geometry, quadrature, solver, time_data):
         info_edge.flux_at_edges = 1
 
         flux_final = tr_bdf2(initial_flux.copy(), xs_total, xs_matrix, \
-                        velocity, external.copy(), boundary_x.copy(), medium_map, \
+                        velocity, external, boundary_x, medium_map, \
                         delta_x, angle_x, angle_w, flux_file, info, info_edge)
 
     return np.asarray(flux_final)
@@ -116,7 +120,7 @@ def time_dependent(materials, sources, geometry, quadrature, solver, time_data):
 
 cdef double[:,:] backward_euler(double[:,:,:]& flux_last, \
         double[:,:]& xs_total, double[:,:,:]& xs_scatter, double[:]& velocity, \
-        double[:,:,:,:]& external, double[:,:,:,:]& boundary_x, \
+        object external, object boundary_x, \
         int[:]& medium_map, double[:]& delta_x, double[:]& angle_x, \
         double[:]& angle_w, object flux_file, params info):
 
@@ -135,6 +139,13 @@ cdef double[:,:] backward_euler(double[:,:,:]& flux_last, \
     scalar_flux = tools.array_2d(info.cells_x, info.groups)
     tools._angular_to_scalar(flux_last, scalar_flux, angle_w, info)
 
+    # DMD snapshots carried across time steps
+    dmd = StreamingDMD(info.dmd_snapshots) if info.dmd_recycle \
+            and (info.mg_solver == 2) else None
+
+    # Full-angle boundaries, expanded again only when time-dependent
+    bc_full = tools.array_3d(2, info.angles, info.groups)
+
     # Iterate over time steps
     for step in tqdm(range(info.steps), desc="BDF1    ", ascii=True):
         # Determine dimensions of external and boundary sources
@@ -142,34 +153,27 @@ cdef double[:,:] backward_euler(double[:,:,:]& flux_last, \
         bc = 0 if boundary_x.shape[0] == 1 else step
 
         # Expand half-angle boundary to full-angle for sweep
-        bc_full = tools._expand_boundary_x(boundary_x[bc], angle_x, info)
+        if (step == 0) or (boundary_x.shape[0] > 1):
+            tools._expand_boundary_x_into(bc_full, boundary_x[bc], angle_x, info)
 
         # Update q_star as external + 1/(v*dt) * psi
         tools._time_source_star_bdf1(flux_last, q_star, external[qq], \
                                      velocity, info)
 
-        # Solve for the current time step
+        # Solve for the current time step, keeping the angular flux
         mg_result = mg.multi_group(scalar_flux, xs_total_v, xs_scatter, \
                                    q_star, bc_full, medium_map, \
-                                   delta_x, angle_x, angle_w, info)
+                                   delta_x, angle_x, angle_w, info, flux_last, dmd)
         scalar_flux[:,:] = mg_result[:,:]
         if flux_file is not None:
             flux_file[step] = np.asarray(scalar_flux)
 
-        # Create (sigma_s + sigma_f) * phi^{\ell} + Q*
-        tools._time_right_side(q_star, scalar_flux, xs_scatter, medium_map, info)
-
-        # Solve for angular flux of previous time step
-        flux_last[:,:,:] = mg._known_source_angular(xs_total_v, q_star, \
-                                    bc_full, medium_map, \
-                                    delta_x, angle_x, angle_w, info)
-
     return scalar_flux
 
 
 cdef double[:,:] crank_nicolson(double[:,:,:]& flux_last, \
         double[:,:]& xs_total, double[:,:,:]& xs_scatter, double[:]& velocity, \
-        double[:,:,:,:]& external, double[:,:,:,:]& boundary_x, \
+        object external, object boundary_x, \
         int[:]& medium_map, double[:]& delta_x, double[:]& angle_x, \
         double[:]& angle_w, object flux_file, params info, \
         params info_edge):
@@ -189,6 +193,13 @@ cdef double[:,:] crank_nicolson(double[:,:,:]& flux_last, \
     scalar_flux = tools.array_2d(info.cells_x, info.groups)
     tools._angular_edge_to_scalar(flux_last, scalar_flux, angle_w, info)
 
+    # DMD snapshots carried across time steps
+    dmd = StreamingDMD(info.dmd_snapshots) if info.dmd_recycle \
+            and (info.mg_solver == 2) else None
+
+    # Full-angle boundaries, expanded again only when time-dependent
+    bc_full = tools.array_3d(2, info.angles, info.groups)
+
     # Iterate over time steps
     for step in tqdm(range(info.steps), desc="CN      ", ascii=True):
 
@@ -198,7 +209,8 @@ cdef double[:,:] crank_nicolson(double[:,:,:]& flux_last, \
         bc = 0 if boundary_x.shape[0] == 1 else step
 
         # Expand half-angle boundary to full-angle for sweep
-        bc_full = tools._expand_boundary_x(boundary_x[bc], angle_x, info)
+        if (step == 0) or (boundary_x.shape[0] > 1):
+            tools._expand_boundary_x_into(bc_full, boundary_x[bc], angle_x, info)
 
         # Update q_star
         tools._time_source_star_cn(flux_last, scalar_flux, xs_total, \
@@ -208,7 +220,8 @@ cdef double[:,:] crank_nicolson(double[:,:,:]& flux_last, \
         # Solve for the current time step
         mg_result = mg.multi_group(scalar_flux, xs_total_v, \
                                 xs_scatter, q_star, bc_full, \
-                                medium_map, delta_x, angle_x, angle_w, info)
+                                medium_map, delta_x, angle_x, angle_w, \
+                                info, None, dmd)
         scalar_flux[:,:] = mg_result[:,:]
         if flux_file is not None:
             flux_file[step] = np.asarray(scalar_flux)
@@ -223,8 +236,8 @@ cdef double[:,:] crank_nicolson(double[:,:,:]& flux_last, \
 
 
 cdef double[:,:] bdf2(double[:,:,:]& flux_last_1, double[:,:]& xs_total, \
-        double[:,:,:]& xs_scatter, double[:]& velocity, double[:,:,:,:]& external, \
-        double[:,:,:,:]& boundary_x, int[:]& medium_map, double[:]& delta_x, \
+        double[:,:,:]& xs_scatter, double[:]& velocity, object external, \
+        object boundary_x, int[:]& medium_map, double[:]& delta_x, \
         double[:]& angle_x, double[:]& angle_w, object flux_file, \
         params info):
     # flux_last_1 is \ell - 1, flux_last_2 is \ell - 2
@@ -247,6 +260,13 @@ cdef double[:,:] bdf2(double[:,:,:]& flux_last_1, double[:,:]& xs_total, \
     # Create angular flux of previous time steps - Initialize with initial
     flux_last_2 = tools.array_3d(info.cells_x, info.angles, info.groups)
 
+    # DMD snapshots carried across time steps
+    dmd = StreamingDMD(info.dmd_snapshots) if info.dmd_recycle \
+            and (info.mg_solver == 2) else None
+
+    # Full-angle boundaries, expanded again only when time-dependent
+    bc_full = tools.array_3d(2, info.angles, info.groups)
+
     # Iterate over time steps
     for step in tqdm(range(info.steps), desc="BDF2    ", ascii=True):
 
@@ -255,7 +275,8 @@ cdef double[:,:] bdf2(double[:,:,:]& flux_last_1, double[:,:]& xs_total, \
         bc = 0 if boundary_x.shape[0] == 1 else step
 
         # Expand half-angle boundary to full-angle for sweep
-        bc_full = tools._expand_boundary_x(boundary_x[bc], angle_x, info)
+        if (step == 0) or (boundary_x.shape[0] > 1):
+            tools._expand_boundary_x_into(bc_full, boundary_x[bc], angle_x, info)
 
         # Update q_star
         if step == 0:
@@ -267,34 +288,29 @@ cdef double[:,:] bdf2(double[:,:,:]& flux_last_1, double[:,:]& xs_total, \
             tools._time_source_star_bdf2(flux_last_1, flux_last_2, q_star, \
                                         external[qq], velocity, info)
 
-        # Solve for the current time step
+        # Solve for the current time step, keeping the angular flux
+        flux_last_2[:,:,:] = flux_last_1[:,:,:]
         mg_result = mg.multi_group(scalar_flux, xs_total_v, \
-                                xs_scatter, q_star, bc_full, \
-                                medium_map, delta_x, angle_x, angle_w, info)
+                                xs_scatter, q_star, bc_full, medium_map, \
+                                delta_x, angle_x, angle_w, info, flux_last_1, dmd)
         scalar_flux[:,:] = mg_result[:,:]
         if flux_file is not None:
             flux_file[step] = np.asarray(scalar_flux)
 
-        # Create (sigma_s + sigma_f) * phi^{\ell} + Q*
-        tools._time_right_side(q_star, scalar_flux, xs_scatter, medium_map, info)
-
-        # Solve for angular flux of previous time step
-        flux_last_2[:,:,:] = flux_last_1[:,:,:]
-        flux_last_1[:,:,:] = mg._known_source_angular(xs_total_v, q_star, \
-                                        bc_full, medium_map, \
-                                        delta_x, angle_x, angle_w, info)
-
         # Create sigma_t + 3 / (2 * v * dt) (For BDF2 time steps)
         if step == 0:
             xs_total_v[:,:] = xs_total[:,:]
             tools._total_velocity(xs_total_v, velocity, 1.5, info)
+            # Snapshots of the BDF1 operator no longer apply
+            if dmd is not None:
+                dmd = StreamingDMD(info.dmd_snapshots)
 
     return scalar_flux
 
 
 cdef double[:,:] tr_bdf2(double[:,:,:]& flux_last_ell, double[:,:]& xs_total, \
-        double[:,:,:]& xs_scatter, double[:]& velocity, double[:,:,:,:]& external, \
-        double[:,:,:,:]& boundary_x, int[:]& medium_map, double[:]& delta_x, \
+        double[:,:,:]& xs_scatter, double[:]& velocity, object external, \
+        object boundary_x, int[:]& medium_map, double[:]& delta_x, \
         double[:]& angle_x, double[:]& angle_w, object flux_file, \
         params info, params info_edge):
 
@@ -326,6 +342,15 @@ cdef double[:,:] tr_bdf2(double[:,:,:]& flux_last_ell, double[:,:]& xs_total, \
     # Create angular flux of previous time steps
     flux_last_gamma = tools.array_3d(info.cells_x, info.angles, info.groups)
 
+    # DMD snapshots carried across time steps, one for each stage
+    recycle = info.dmd_recycle and (info.mg_solver == 2)
+    dmd_cn = StreamingDMD(info.dmd_snapshots) if recycle else None
+    dmd_bdf2 = StreamingDMD(info.dmd_snapshots) if recycle else None
+
+    # Full-angle boundaries, expanded again only when time-dependent
+    bc_full = tools.array_3d(2, info.angles, info.groups)
+    bca_full = tools.array_3d(2, info.angles, info.groups)
+
     # Iterate over time steps
     for step in tqdm(range(info.steps), desc="TR-BDF2 ", ascii=True):
 
@@ -338,8 +363,10 @@ cdef double[:,:] tr_bdf2(double[:,:,:]& flux_last_ell, double[:,:]& xs_total, \
         bca = 0 if boundary_x.shape[0] == 1 else step * 2 + 1 # Gamma Step
 
         # Expand half-angle boundaries to full-angle for sweep
-        bc_full = tools._expand_boundary_x(boundary_x[bc], angle_x, info)
-        bca_full = tools._expand_boundary_x(boundary_x[bca], angle_x, info)
+        if (step == 0) or (boundary_x.shape[0] > 1):
+            tools._expand_boundary_x_into(bc_full, boundary_x[bc], angle_x, info)
+        if (step == 0) or (boundary_x.shape[0] > 1):
+            tools._expand_boundary_x_into(bca_full, boundary_x[bca], angle_x, info)
 
         ################################################################
         # Crank Nicolson
@@ -350,7 +377,7 @@ cdef double[:,:] tr_bdf2(double[:,:,:]& flux_last_ell, double[:,:]& xs_total, \
                         external[qqa], medium_map, delta_x, angle_x, \
                         2.0 / gamma, info)
 
-        # Solve for the \ell + gamma time step
+        # Solve for the \ell + gamma time step and its angular flux
         scalar_flux_gamma[:,:] = mg.multi_group(
             scalar_flux_ell,
             xs_total_v_cn,
@@ -362,15 +389,10 @@ cdef double[:,:] tr_bdf2(double[:,:,:]& flux_last_ell, double[:,:]& xs_total, \
             angle_x,
             angle_w,
             info,
+            flux_last_gamma,
+            dmd_cn,
         )
 
-        # Create (sigma_s + sigma_f) * phi^{\ell} + Q*
-        tools._time_right_side(q_star, scalar_flux_gamma, xs_scatter, medium_map, info)
-
-        # Solve for angular flux of previous time step
-        flux_last_gamma = mg._known_source_angular(xs_total_v_cn, q_star, \
-                                        bc_full, medium_map, \
-                                        delta_x, angle_x, angle_w, info)
         ################################################################
         # BDF2
         ################################################################
@@ -390,6 +412,8 @@ cdef double[:,:] tr_bdf2(double[:,:,:]& flux_last_ell, double[:,:]& xs_total, \
             angle_x,
             angle_w,
             info,
+            None,
+            dmd_bdf2,
         )
         scalar_flux_ell[:,:] = mg_result[:,:]
         if flux_file is not None:
@@ -412,8 +436,6 @@ def known_source_calculation(double[:,:,:] flux, materials, sources, geometry, \
     cdef double[:,:] xs_total = materials.total
     cdef double[:,:,:] xs_scatter = materials.scatter
     cdef double[:,:,:] xs_fission = materials.fission
-    cdef double[:,:,:,:] external = sources.external
-    cdef double[:,:,:,:] boundary_x = sources.boundary_x
 
     # Initialize iterables
     cdef int step, qq, bc
@@ -422,6 +444,10 @@ def known_source_calculation(double[:,:,:] flux, materials, sources, geometry, \
     params = create_params(materials, quadrature, geometry, solver, time)
     info = parameters._to_params(params)
 
+    # Time-dependent sources, evaluated one step at a time when lazy
+    external = time_source(sources.external, info.steps)
+    boundary_x = time_source(sources.boundary_x, info.steps)
+
     # Add fission matrix to scattering
     xs_matrix = tools.array_3d(info.materials, info.groups, info.groups)
     tools._xs_matrix(xs_matrix, xs_scatter, xs_fission, info)
@@ -437,13 +463,17 @@ def known_source_calculation(double[:,:,:] flux, materials, sources, geometry, \
         f"boundary_x angle dimension must be 1 (broadcast) or {half_angles} " \
         f"(incoming angles only), got {boundary_x.shape[2]}"
 
+    # Full-angle boundaries, expanded again only when time-dependent
+    bc_full = tools.array_3d(2, info.angles, info.groups)
+
     for step in range(info.steps):
         # Determine dimensions of external and boundary sources
         qq = 0 if external.shape[0] == 1 else step
         bc = 0 if boundary_x.shape[0] == 1 else step
 
         # Expand half-angle boundary to full-angle
-        bc_full = tools._expand_boundary_x(boundary_x[bc], angle_x, info)
+        if (step == 0) or (boundary_x.shape[0] > 1):
+            tools._expand_boundary_x_into(bc_full, boundary_x[bc], angle_x, info)
 
         angular_flux[step] = steady_state(flux[step], xs_total, xs_matrix, \
                                             external[qq], bc_full, \
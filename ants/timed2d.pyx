@@ -30,6 +30,7 @@ from ants cimport parameters
 from ants.parameters cimport params
 
 from ants.datatypes import TemporalDiscretization, create_params
+from ants.utils.pytools import StreamingDMD, source_steps, time_source
 
 
 def time_dependent(materials, sources, geometry, quadrature, solver, time_data):
@@ -38,9 +39,6 @@ def time_dependent(materials, sources, geometry, quadrature, solver, time_data):
     cdef double[:,:,:] xs_scatter = materials.scatter
     cdef double[:,:,:] xs_fission = tools._fission_matrix(materials.fission, materials.chi)
     cdef double[:] velocity = materials.velocity
-    cdef double[:,:,:,:,:] external = sources.external
-    cdef double[:,:,:,:,:] boundary_x = sources.boundary_x
-    cdef double[:,:,:,:,:] boundary_y = sources.boundary_y
     cdef int[:,:] medium_map = geometry.medium_map
     cdef double[:] delta_x = geometry.delta_x
     cdef double[:] delta_y = geometry.delta_y
@@ -52,6 +50,12 @@ def time_dependent(materials, sources, geometry, quadrature, solver, time_data):
     params = create_params(materials, quadrature, geometry, solver, time_data)
     info = parameters._to_params(params)
 
+    # Time-dependent sources, evaluated one step at a time when lazy
+    q_steps, bc_steps = source_steps(params.time_disc, info.steps)
+    external = time_source(sources.external, q_steps)
+    boundary_x = time_source(sources.boundary_x, bc_steps)
+    boundary_y = time_source(sources.boundary_y, bc_steps)
+
     cdef double[:,:,:,:] initial_flux_x
     cdef double[:,:,:,:] initial_flux_y
     cdef double[:,:,:,:] initial_flux
@@ -92,7 +96,7 @@ def time_dependent(materials, sources, geometry, quadrature, solver, time_data):
                         boundary_x.shape[0], boundary_y.shape[0], xs_total.shape[0])
         # Run Backward Euler
         flux_final = backward_euler(initial_flux.copy(), xs_total, xs_matrix, velocity, \
-                    external, boundary_x.copy(), boundary_y.copy(), medium_map, \
+                    external, boundary_x, boundary_y, medium_map, \
                     delta_x, delta_y, angle_x, angle_y, angle_w, flux_file, info)
 
     elif params.time_disc == TemporalDiscretization.CN:
@@ -105,8 +109,8 @@ def time_dependent(materials, sources, geometry, quadrature, solver, time_data):
         info_edge.flux_at_edges = 1
 
         flux_final = crank_nicolson(initial_flux_x.copy(), initial_flux_y.copy(), \
-                    xs_total, xs_matrix, velocity, external, boundary_x.copy(), \
-                    boundary_y.copy(), medium_map, delta_x, delta_y, angle_x, \
+                    xs_total, xs_matrix, velocity, external, boundary_x, \
+                    boundary_y, medium_map, delta_x, delta_y, angle_x, \
                     angle_y, angle_w, flux_file, info, info_edge)
 
     elif params.time_disc == TemporalDiscretization.BDF2:
@@ -115,7 +119,7 @@ def time_dependent(materials, sources, geometry, quadrature, solver, time_data):
                                     boundary_y.shape[0], xs_total.shape[0])
         # Run BDF2
         flux_final = bdf2(initial_flux.copy(), xs_total, xs_matrix, velocity, external, \
-                    boundary_x.copy(), boundary_y.copy(), medium_map, delta_x, \
+                    boundary_x, boundary_y, medium_map, delta_x, \
                     delta_y, angle_x, angle_y, angle_w, flux_file, info)
 
     elif params.time_disc == TemporalDiscretization.TR_BDF2:
@@ -128,8 +132,8 @@ def time_dependent(materials, sources, geometry, quadrature, solver, time_data):
         info_edge.flux_at_edges = 1
 
         flux_final = tr_bdf2(initial_flux_x.copy(), initial_flux_y.copy(), xs_total, \
-                        xs_matrix, velocity, external, boundary_x.copy(), \
-                        boundary_y.copy(), medium_map, delta_x, delta_y, angle_x, \
+                        xs_matrix, velocity, external, boundary_x, \
+                        boundary_y, medium_map, delta_x, delta_y, angle_x, \
                         angle_y, angle_w, flux_file, info, info_edge)
 
     return np.asarray(flux_final)
@@ -137,8 +141,8 @@ def time_dependent(materials, sources, geometry, quadrature, solver, time_data):
 
 cdef double[:,:,:] backward_euler(double[:,:,:,:]& flux_last, \
         double[:,:]& xs_total, double[:,:,:]& xs_scatter, \
-        double[:]& velocity, double[:,:,:,:,:]& external, \
-        double[:,:,:,:,:]& boundary_x, double[:,:,:,:,:]& boundary_y, \
+        double[:]& velocity, object external, \
+        object boundary_x, object boundary_y, \
         int[:,:]& medium_map, double[:]& delta_x, double[:]& delta_y, \
         double[:]& angle_x, double[:]& angle_y, double[:]& angle_w, \
         object flux_file, params info):
@@ -159,6 +163,16 @@ cdef double[:,:,:] backward_euler(double[:,:,:,:]& flux_last, \
     scalar_flux = tools.array_3d(info.cells_x, info.cells_y, info.groups)
     tools._angular_to_scalar(flux_last, scalar_flux, angle_w, info)
 
+    # DMD snapshots carried across time steps
+    dmd = StreamingDMD(info.dmd_snapshots) if info.dmd_recycle \
+            and (info.mg_solver == 2) else None
+
+    # Full-angle boundaries, expanded again only when time-dependent
+    bc_x_full = tools.array_4d(2, info.cells_y, \
+                            info.angles * info.angles, info.groups)
+    bc_y_full = tools.array_4d(2, info.cells_x, \
+                            info.angles * info.angles, info.groups)
+
     # Iterate over time steps
     for step in tqdm(range(info.steps), desc="BDF1    ", ascii=True):
 
@@ -168,40 +182,33 @@ cdef double[:,:,:] backward_euler(double[:,:,:,:]& flux_last, \
         bcy = 0 if boundary_y.shape[0] == 1 else step
 
         # Expand half-angle boundaries to full-angle for sweep
-        bc_x_full = tools._expand_boundary_x(boundary_x[bcx], angle_x, info)
-        bc_y_full = tools._expand_boundary_y(boundary_y[bcy], angle_y, info)
+        if (step == 0) or (boundary_x.shape[0] > 1):
+            tools._expand_boundary_x_into(bc_x_full, boundary_x[bcx], angle_x, info)
+        if (step == 0) or (boundary_y.shape[0] > 1):
+            tools._expand_boundary_y_into(bc_y_full, boundary_y[bcy], angle_y, info)
 
         # Update q_star as external + 1/(v*dt) * psi
         tools._time_source_star_bdf1(flux_last, q_star, external[qq], \
                                      velocity, info)
 
-        # Run source iteration
+        # Run source iteration, keeping the angular flux
         mg_result = mg.multi_group(scalar_flux, xs_total_v, \
                                 xs_scatter, q_star, bc_x_full, \
                                 bc_y_full, medium_map, delta_x, \
-                                delta_y, angle_x, angle_y, angle_w, info)
+                                delta_y, angle_x, angle_y, angle_w, info, \
+                                flux_last, dmd)
         scalar_flux[:,:,:] = mg_result[:,:,:]
         if flux_file is not None:
             flux_file[step] = np.asarray(scalar_flux)
 
-        # Create (sigma_s + sigma_f) * phi^{\ell} + Q*
-        tools._time_right_side(q_star, scalar_flux, xs_scatter, \
-                               medium_map, info)
-
-        # Solve for angular flux of previous time step
-        flux_last[:,:,:,:] = mg._known_source_angular(xs_total_v, q_star,
-                                        bc_x_full, bc_y_full, \
-                                        medium_map, delta_x, delta_y, \
-                                        angle_x, angle_y, angle_w, info)
-
     return scalar_flux
 
 
 cdef double[:,:,:] crank_nicolson(double[:,:,:,:]& flux_last_x, \
         double[:,:,:,:]& flux_last_y, double[:,:]& xs_total, \
         double[:,:,:]& xs_scatter, double[:]& velocity, \
-        double[:,:,:,:,:]& external, double[:,:,:,:,:]& boundary_x, \
-        double[:,:,:,:,:]& boundary_y, int[:,:]& medium_map, \
+        object external, object boundary_x, \
+        object boundary_y, int[:,:]& medium_map, \
         double[:]& delta_x, double[:]& delta_y, double[:]& angle_x, \
         double[:]& angle_y, double[:]& angle_w, object flux_file, \
         params info, params info_edge):
@@ -225,6 +232,16 @@ cdef double[:,:,:] crank_nicolson(double[:,:,:,:]& flux_last_x, \
     tools._angular_edge_to_scalar(flux_last_x, flux_last_y, scalar_flux, \
                                   angle_w, info)
 
+    # DMD snapshots carried across time steps
+    dmd = StreamingDMD(info.dmd_snapshots) if info.dmd_recycle \
+            and (info.mg_solver == 2) else None
+
+    # Full-angle boundaries, expanded again only when time-dependent
+    bc_x_full = tools.array_4d(2, info.cells_y, \
+                            info.angles * info.angles, info.groups)
+    bc_y_full = tools.array_4d(2, info.cells_x, \
+                            info.angles * info.angles, info.groups)
+
     # Iterate over time steps
     for step in tqdm(range(info.steps), desc="CN      ", ascii=True):
 
@@ -235,8 +252,10 @@ cdef double[:,:,:] crank_nicolson(double[:,:,:,:]& flux_last_x, \
         bcy = 0 if boundary_y.shape[0] == 1 else step
 
         # Expand half-angle boundaries to full-angle for sweep
-        bc_x_full = tools._expand_boundary_x(boundary_x[bcx], angle_x, info)
-        bc_y_full = tools._expand_boundary_y(boundary_y[bcy], angle_y, info)
+        if (step == 0) or (boundary_x.shape[0] > 1):
+            tools._expand_boundary_x_into(bc_x_full, boundary_x[bcx], angle_x, info)
+        if (step == 0) or (boundary_y.shape[0] > 1):
+            tools._expand_boundary_y_into(bc_y_full, boundary_y[bcy], angle_y, info)
 
         # Update q_star
         tools._time_source_star_cn(flux_last_x, flux_last_y, scalar_flux, \
@@ -248,7 +267,8 @@ cdef double[:,:,:] crank_nicolson(double[:,:,:,:]& flux_last_x, \
         mg_result = mg.multi_group(scalar_flux, xs_total_v, \
                                     xs_scatter, q_star, bc_x_full, \
                                     bc_y_full, medium_map, delta_x, \
-                                    delta_y, angle_x, angle_y, angle_w, info)
+                                    delta_y, angle_x, angle_y, angle_w, \
+                                    info, None, dmd)
         scalar_flux[:,:,:] = mg_result[:,:,:]
         if flux_file is not None:
             flux_file[step] = np.asarray(scalar_flux)
@@ -263,8 +283,8 @@ cdef double[:,:,:] crank_nicolson(double[:,:,:,:]& flux_last_x, \
 
 
 cdef double[:,:,:] bdf2(double[:,:,:,:]& flux_last_1, double[:,:]& xs_total, \
-        double[:,:,:]& xs_scatter, double[:]& velocity, double[:,:,:,:,:]& external, \
-        double[:,:,:,:,:]& boundary_x, double[:,:,:,:,:]& boundary_y, \
+        double[:,:,:]& xs_scatter, double[:]& velocity, object external, \
+        object boundary_x, object boundary_y, \
         int[:,:]& medium_map, double[:]& delta_x, double[:]& delta_y, \
         double[:]& angle_x, double[:]& angle_y, double[:]& angle_w, \
         object flux_file, params info):
@@ -290,6 +310,16 @@ cdef double[:,:,:] bdf2(double[:,:,:,:]& flux_last_1, double[:,:]& xs_total, \
     flux_last_2 = tools.array_4d(info.cells_x, info.cells_y, \
                                info.angles * info.angles, info.groups)
 
+    # DMD snapshots carried across time steps
+    dmd = StreamingDMD(info.dmd_snapshots) if info.dmd_recycle \
+            and (info.mg_solver == 2) else None
+
+    # Full-angle boundaries, expanded again only when time-dependent
+    bc_x_full = tools.array_4d(2, info.cells_y, \
+                            info.angles * info.angles, info.groups)
+    bc_y_full = tools.array_4d(2, info.cells_x, \
+                            info.angles * info.angles, info.groups)
+
     # Iterate over time steps
     for step in tqdm(range(info.steps), desc="BDF2    ", ascii=True):
 
@@ -299,8 +329,10 @@ cdef double[:,:,:] bdf2(double[:,:,:,:]& flux_last_1, double[:,:]& xs_total, \
         bcy = 0 if boundary_y.shape[0] == 1 else step
 
         # Expand half-angle boundaries to full-angle for sweep
-        bc_x_full = tools._expand_boundary_x(boundary_x[bcx], angle_x, info)
-        bc_y_full = tools._expand_boundary_y(boundary_y[bcy], angle_y, info)
+        if (step == 0) or (boundary_x.shape[0] > 1):
+            tools._expand_boundary_x_into(bc_x_full, boundary_x[bcx], angle_x, info)
+        if (step == 0) or (boundary_y.shape[0] > 1):
+            tools._expand_boundary_y_into(bc_y_full, boundary_y[bcy], angle_y, info)
 
         # Update q_star
         if step == 0:
@@ -312,29 +344,24 @@ cdef double[:,:,:] bdf2(double[:,:,:,:]& flux_last_1, double[:,:]& xs_total, \
             tools._time_source_star_bdf2(flux_last_1, flux_last_2, q_star, \
                                          external[qq], velocity, info)
 
-        # Run source iteration
+        # Run source iteration, keeping the angular flux
+        flux_last_2[:,:,:,:] = flux_last_1[:,:,:,:]
         mg_result = mg.multi_group(scalar_flux, xs_total_v, \
                                 xs_scatter, q_star, bc_x_full, \
                                 bc_y_full, medium_map, delta_x, \
-                                delta_y, angle_x, angle_y, angle_w, info)
+                                delta_y, angle_x, angle_y, angle_w, info, \
+                                flux_last_1, dmd)
         scalar_flux[:,:,:] = mg_result[:,:,:]
         if flux_file is not None:
             flux_file[step] = np.asarray(scalar_flux)
 
-        # Create (sigma_s + sigma_f) * phi^{\ell} + external + 1/(v*dt) * psi^{\ell-1}
-        tools._time_right_side(q_star, scalar_flux, xs_scatter, medium_map, info)
-
-        # Solve for angular flux of previous time step
-        flux_last_2[:,:,:,:] = flux_last_1[:,:,:,:]
-        flux_last_1[:,:,:,:] = mg._known_source_angular(xs_total_v, q_star, \
-                                    bc_x_full, bc_y_full, \
-                                    medium_map, delta_x, delta_y, angle_x, \
-                                    angle_y, angle_w, info)
-
         # Create sigma_t + 3 / (2 * v * dt) (For BDF2 time steps)
         if step == 0:
             xs_total_v[:,:] = xs_total[:,:]
             tools._total_velocity(xs_total_v, velocity, 1.5, info)
+            # Snapshots of the BDF1 operator no longer apply
+            if dmd is not None:
+                dmd = StreamingDMD(info.dmd_snapshots)
 
     return scalar_flux
 
@@ -346,9 +373,6 @@ def restart_bdf2(double[:,:,:,:] flux_1, double[:,:,:,:] flux_2, materials, \
     cdef double[:,:,:] xs_scatter = materials.scatter
     cdef double[:,:,:] xs_fission = tools._fission_matrix(materials.fission, materials.chi)
     cdef double[:] velocity = materials.velocity
-    cdef double[:,:,:,:,:] external = sources.external
-    cdef double[:,:,:,:,:] boundary_x = sources.boundary_x
-    cdef double[:,:,:,:,:] boundary_y = sources.boundary_y
     cdef int[:,:] medium_map = geometry.medium_map
     cdef double[:] delta_x = geometry.delta_x
     cdef double[:] angle_x = quadrature.angle_x
@@ -359,6 +383,11 @@ def restart_bdf2(double[:,:,:,:] flux_1, double[:,:,:,:] flux_2, materials, \
     # Covert dictionary to type params
     params = create_params(materials, quadrature, geometry, solver, time_data)
     info = parameters._to_params(params)
+
+    # Time-dependent sources, evaluated one step at a time when lazy
+    external = time_source(sources.external, info.steps)
+    boundary_x = time_source(sources.boundary_x, info.steps)
+    boundary_y = time_source(sources.boundary_y, info.steps)
     parameters._check_bdf_timed2d(info, flux_1.shape[0], external.shape[0], \
             boundary_x.shape[0], boundary_y.shape[0], xs_total.shape[0])
 
@@ -386,8 +415,8 @@ def restart_bdf2(double[:,:,:,:] flux_1, double[:,:,:,:] flux_2, materials, \
 
     # Run BDF2 with 2 known fluxes
     flux_final = multi_group_bdf2_restart(flux_1.copy(), flux_2.copy(), xs_total, \
-                        xs_matrix, velocity, external, boundary_x.copy(), \
-                        boundary_y.copy(), medium_map, delta_x, delta_y, \
+                        xs_matrix, velocity, external, boundary_x, \
+                        boundary_y, medium_map, delta_x, delta_y, \
                         angle_x, angle_y, angle_w, flux_file, info)
 
     return np.asarray(flux_final)
@@ -396,8 +425,8 @@ def restart_bdf2(double[:,:,:,:] flux_1, double[:,:,:,:] flux_2, materials, \
 cdef double[:,:,:] multi_group_bdf2_restart(double[:,:,:,:]& flux_last_1, \
         double[:,:,:,:]& flux_last_2, double[:,:]& xs_total, \
         double[:,:,:]& xs_scatter, double[:]& velocity, \
-        double[:,:,:,:,:]& external, double[:,:,:,:,:]& boundary_x, \
-        double[:,:,:,:,:]& boundary_y, int[:,:]& medium_map, \
+        object external, object boundary_x, \
+        object boundary_y, int[:,:]& medium_map, \
         double[:]& delta_x, double[:]& delta_y, double[:]& angle_x, \
         double[:]& angle_y, double[:]& angle_w, object flux_file, \
         params info):
@@ -419,6 +448,16 @@ cdef double[:,:,:] multi_group_bdf2_restart(double[:,:,:,:]& flux_last_1, \
     scalar_flux = tools.array_3d(info.cells_x, info.cells_y, info.groups)
     tools._angular_to_scalar(flux_last_1, scalar_flux, angle_w, info)
 
+    # DMD snapshots carried across time steps
+    dmd = StreamingDMD(info.dmd_snapshots) if info.dmd_recycle \
+            and (info.mg_solver == 2) else None
+
+    # Full-angle boundaries, expanded again only when time-dependent
+    bc_x_full = tools.array_4d(2, info.cells_y, \
+                            info.angles * info.angles, info.groups)
+    bc_y_full = tools.array_4d(2, info.cells_x, \
+                            info.angles * info.angles, info.groups)
+
     # Iterate over time steps
     for step in tqdm(range(info.steps), desc="BDF2    ", ascii=True):
 
@@ -428,32 +467,26 @@ cdef double[:,:,:] multi_group_bdf2_restart(double[:,:,:,:]& flux_last_1, \
         bcy = 0 if boundary_y.shape[0] == 1 else step
 
         # Expand half-angle boundaries to full-angle for sweep
-        bc_x_full = tools._expand_boundary_x(boundary_x[bcx], angle_x, info)
-        bc_y_full = tools._expand_boundary_y(boundary_y[bcy], angle_y, info)
+        if (step == 0) or (boundary_x.shape[0] > 1):
+            tools._expand_boundary_x_into(bc_x_full, boundary_x[bcx], angle_x, info)
+        if (step == 0) or (boundary_y.shape[0] > 1):
+            tools._expand_boundary_y_into(bc_y_full, boundary_y[bcy], angle_y, info)
 
         # Run BDF2 on rest of time steps
         tools._time_source_star_bdf2(flux_last_1, flux_last_2, q_star, \
                                      external[qq], velocity, info)
 
-        # Run source iteration
+        # Run source iteration, keeping the angular flux
+        flux_last_2[:,:,:,:] = flux_last_1[:,:,:,:]
         mg_result = mg.multi_group(scalar_flux, xs_total_v, \
                                 xs_scatter, q_star, bc_x_full, \
                                 bc_y_full, medium_map, delta_x, \
-                                delta_y, angle_x, angle_y, angle_w, info)
+                                delta_y, angle_x, angle_y, angle_w, info, \
+                                flux_last_1, dmd)
         scalar_flux[:,:,:] = mg_result[:,:,:]
         if flux_file is not None:
             flux_file[step] = np.asarray(scalar_flux)
 
-        # Create (sigma_s + sigma_f) * phi^{\ell} + external + 1/(v*dt) * psi^{\ell-1}
-        tools._time_right_side(q_star, scalar_flux, xs_scatter, medium_map, info)
-
-        # Solve for angular flux of previous time step
-        flux_last_2[:,:,:,:] = flux_last_1[:,:,:,:]
-        flux_last_1[:,:,:,:] = mg._known_source_angular(xs_total_v, q_star, \
-                                    bc_x_full, bc_y_full, \
-                                    medium_map, delta_x, delta_y, angle_x, \
-                                    angle_y, angle_w, info)
-
     return scalar_flux
 
 
@@ -465,9 +498,6 @@ def angular_bdf2(int[:] time_steps, double[:,:,:,:] scalar_flux, \
     cdef double[:,:,:] xs_scatter = materials.scatter
     cdef double[:,:,:] xs_fission = tools._fission_matrix(materials.fission, materials.chi)
     cdef double[:] velocity = materials.velocity
-    cdef double[:,:,:,:,:] external = sources.external
-    cdef double[:,:,:,:,:] boundary_x = sources.boundary_x
-    cdef double[:,:,:,:,:] boundary_y = sources.boundary_y
     cdef int[:,:] medium_map = geometry.medium_map
     cdef double[:] delta_x = geometry.delta_x
     cdef double[:] angle_x = quadrature.angle_x
@@ -478,6 +508,11 @@ def angular_bdf2(int[:] time_steps, double[:,:,:,:] scalar_flux, \
     # Covert dictionary to type params
     params = create_params(materials, quadrature, geometry, solver, time_data)
     info = parameters._to_params(params)
+
+    # Time-dependent sources, evaluated one step at a time when lazy
+    external = time_source(sources.external, info.steps)
+    boundary_x = time_source(sources.boundary_x, info.steps)
+    boundary_y = time_source(sources.boundary_y, info.steps)
     parameters._check_bdf_timed2d(info, initial_flux.shape[0], \
                                   external.shape[0], boundary_x.shape[0], \
                                   boundary_y.shape[0], xs_total.shape[0])
@@ -498,8 +533,8 @@ def angular_bdf2(int[:] time_steps, double[:,:,:,:] scalar_flux, \
 
     # Run BDF2 with known scalar flux
     flux = multi_group_bdf2_angular(time_steps, scalar_flux.copy(), initial_flux.copy(), \
-                xs_total, xs_matrix, velocity, external, boundary_x.copy(), \
-                boundary_y.copy(), medium_map, delta_x, delta_y, angle_x, \
+                xs_total, xs_matrix, velocity, external, boundary_x, \
+                boundary_y, medium_map, delta_x, delta_y, angle_x, \
                 angle_y, angle_w, info, )
 
     return np.asarray(flux)
@@ -507,8 +542,8 @@ def angular_bdf2(int[:] time_steps, double[:,:,:,:] scalar_flux, \
 
 cdef double[:,:,:,:,:] multi_group_bdf2_angular(int[:]& time_steps, double[:,:,:,:]& scalar_flux, \
         double[:,:,:,:]& flux_last_1, double[:,:]& xs_total, double[:,:,:]& xs_scatter, \
-        double[:]& velocity, double[:,:,:,:,:]& external, double[:,:,:,:,:]& boundary_x, \
-        double[:,:,:,:,:]& boundary_y, int[:,:]& medium_map, double[:]& delta_x, \
+        double[:]& velocity, object external, object boundary_x, \
+        object boundary_y, int[:,:]& medium_map, double[:]& delta_x, \
         double[:]& delta_y, double[:]& angle_x, double[:]& angle_y, double[:]& angle_w, params info):
     # flux_last_1 is \ell - 1, flux_last_2 is \ell - 2
 
@@ -533,6 +568,12 @@ cdef double[:,:,:,:,:] multi_group_bdf2_angular(int[:]& time_steps, double[:,:,:
     flux_time = tools.array_5d(time_steps.shape[0], info.cells_x, info.cells_y, \
                             info.angles * info.angles, info.groups)
 
+    # Full-angle boundaries, expanded again only when time-dependent
+    bc_x_full = tools.array_4d(2, info.cells_y, \
+                            info.angles * info.angles, info.groups)
+    bc_y_full = tools.array_4d(2, info.cells_x, \
+                            info.angles * info.angles, info.groups)
+
     # Iterate over time steps
     for step in range(info.steps):
 
@@ -542,8 +583,10 @@ cdef double[:,:,:,:,:] multi_group_bdf2_angular(int[:]& time_steps, double[:,:,:
         bcy = 0 if boundary_y.shape[0] == 1 else step
 
         # Expand half-angle boundaries to full-angle for sweep
-        bc_x_full = tools._expand_boundary_x(boundary_x[bcx], angle_x, info)
-        bc_y_full = tools._expand_boundary_y(boundary_y[bcy], angle_y, info)
+        if (step == 0) or (boundary_x.shape[0] > 1):
+            tools._expand_boundary_x_into(bc_x_full, boundary_x[bcx], angle_x, info)
+        if (step == 0) or (boundary_y.shape[0] > 1):
+            tools._expand_boundary_y_into(bc_y_full, boundary_y[bcy], angle_y, info)
 
         # Update q_star
         if step == 0:
@@ -583,8 +626,8 @@ cdef double[:,:,:,:,:] multi_group_bdf2_angular(int[:]& time_steps, double[:,:,:
 
 cdef double[:,:,:] tr_bdf2(double[:,:,:,:]& flux_ell_x, double[:,:,:,:]& flux_ell_y, \
         double[:,:]& xs_total, double[:,:,:]& xs_scatter, double[:]& velocity, \
-        double[:,:,:,:,:]& external, double[:,:,:,:,:]& boundary_x, \
-        double[:,:,:,:,:]& boundary_y, int[:,:]& medium_map, \
+        object external, object boundary_x, \
+        object boundary_y, int[:,:]& medium_map, \
         double[:]& delta_x, double[:]& delta_y, double[:]& angle_x, \
         double[:]& angle_y, double[:]& angle_w, object flux_file, \
         params info, params info_edge):
@@ -625,6 +668,21 @@ cdef double[:,:,:] tr_bdf2(double[:,:,:,:]& flux_ell_x, double[:,:,:,:]& flux_el
     tools._angular_edge_to_scalar(flux_ell_x, flux_ell_y, \
                                   scalar_flux, angle_w, info)
 
+    # DMD snapshots carried across time steps, one for each stage
+    recycle = info.dmd_recycle and (info.mg_solver == 2)
+    dmd_cn = StreamingDMD(info.dmd_snapshots) if recycle else None
+    dmd_bdf2 = StreamingDMD(info.dmd_snapshots) if recycle else None
+
+    # Full-angle boundaries, expanded again only when time-dependent
+    bc_x_full = tools.array_4d(2, info.cells_y, \
+                            info.angles * info.angles, info.groups)
+    bc_y_full = tools.array_4d(2, info.cells_x, \
+                            info.angles * info.angles, info.groups)
+    bc_xa_full = tools.array_4d(2, info.cells_y, \
+                            info.angles * info.angles, info.groups)
+    bc_ya_full = tools.array_4d(2, info.cells_x, \
+                            info.angles * info.angles, info.groups)
+
     # Iterate over time steps
     for step in tqdm(range(info.steps), desc="TR-BDF2 ", ascii=True):
 
@@ -640,10 +698,14 @@ cdef double[:,:,:] tr_bdf2(double[:,:,:,:]& flux_ell_x, double[:,:,:,:]& flux_el
         bcya = 0 if boundary_y.shape[0] == 1 else step * 2 + 1 # Gamma Step
 
         # Expand half-angle boundaries to full-angle for sweep
-        bc_x_full = tools._expand_boundary_x(boundary_x[bcx], angle_x, info)
-        bc_y_full = tools._expand_boundary_y(boundary_y[bcy], angle_y, info)
-        bc_xa_full = tools._expand_boundary_x(boundary_x[bcxa], angle_x, info)
-        bc_ya_full = tools._expand_boundary_y(boundary_y[bcya], angle_y, info)
+        if (step == 0) or (boundary_x.shape[0] > 1):
+            tools._expand_boundary_x_into(bc_x_full, boundary_x[bcx], angle_x, info)
+        if (step == 0) or (boundary_y.shape[0] > 1):
+            tools._expand_boundary_y_into(bc_y_full, boundary_y[bcy], angle_y, info)
+        if (step == 0) or (boundary_x.shape[0] > 1):
+            tools._expand_boundary_x_into(bc_xa_full, boundary_x[bcxa], angle_x, info)
+        if (step == 0) or (boundary_y.shape[0] > 1):
+            tools._expand_boundary_y_into(bc_ya_full, boundary_y[bcya], angle_y, info)
 
         ################################################################
         # Crank Nicolson
@@ -654,18 +716,12 @@ cdef double[:,:,:] tr_bdf2(double[:,:,:,:]& flux_ell_x, double[:,:,:,:]& flux_el
                     external[qqa], medium_map, delta_x, delta_y, angle_x, \
                     angle_y, 2.0 / gamma, info)
 
-        # Solve for the \ell + gamma time step
+        # Solve for the \ell + gamma time step and its angular flux
         scalar_flux[:,:,:] = mg.multi_group(scalar_flux, xs_total_v_cn, \
                             xs_scatter, q_star, bc_x_full, \
                             bc_y_full, medium_map, delta_x, \
-                            delta_y, angle_x, angle_y, angle_w, info)
-
-        # Create (sigma_s + sigma_f) * phi^{\ell} + Q*
-        tools._time_right_side(q_star, scalar_flux, xs_scatter, medium_map, info)
-        # Solve for angular flux of \ell + gamma time step
-        flux_last_gamma = mg._known_source_angular(xs_total_v_cn, q_star, \
-                        bc_x_full, bc_y_full, medium_map, \
-                        delta_x, delta_y, angle_x, angle_y, angle_w, info)
+                            delta_y, angle_x, angle_y, angle_w, info, \
+                            flux_last_gamma, dmd_cn)
 
         ################################################################
         # BDF2
@@ -678,7 +734,8 @@ cdef double[:,:,:] tr_bdf2(double[:,:,:,:]& flux_ell_x, double[:,:,:,:]& flux_el
         mg_result = mg.multi_group(scalar_flux, xs_total_v_bdf2, \
                                 xs_scatter, q_star, bc_xa_full, \
                                 bc_ya_full, medium_map, delta_x, \
-                                delta_y, angle_x, angle_y, angle_w, info)
+                                delta_y, angle_x, angle_y, angle_w, info, \
+                                None, dmd_bdf2)
         scalar_flux[:,:,:] = mg_result[:,:,:]
         if flux_file is not None:
             flux_file[step] = np.asarray(scalar_flux)
@@ -0,0 +1,266 @@
+########################################################################
+#                        ___    _   _____________
+#                       /   |  / | / /_  __/ ___/
+#                      / /| | /  |/ / / /  \__ \
+#                     / ___ |/ /|  / / /  ___/ /
+#                    /_/  |_/_/ |_/ /_/  /____/
+#
+# Coarse Mesh Finite Difference (CMFD) acceleration for the power
+# iteration. After each outer iteration the fine flux and net currents
+# are collapsed onto coarse cells, a multigroup diffusion eigenproblem
+# with nonlinear current corrections (D-hat) is solved, and the fine
+# flux is rescaled by the coarse flux change.
+#
+########################################################################
+
+import numpy as np
+from scipy import sparse
+from scipy.sparse import linalg as splinalg
+
+from ants.utils.pytools import _to_block
+
+# Largest coarse system solved with a dense eigensolver
+DENSE_LIMIT = 200
+
+# Largest optical thickness (most penetrating group) of a derived coarse
+# cell; CMFD is unstable on optically thick coarse cells
+OPTICAL_LIMIT = 1.0
+
+
+def coarse_edges(medium_map, xs_total, delta_x, delta_y=None, coarse_x=None, \
+        coarse_y=None):
+    """Coarse cell edges for CMFD
+    Arguments:
+        medium_map (int [cells_x] or [cells_x, cells_y]): material map
+        xs_total (float [materials x groups]): total cross section
+        delta_x (float [cells_x]): fine cell widths in x
+        delta_y (float [cells_y]): fine cell widths in y (2D only)
+        coarse_x (int []): coarse cell edges in x as fine cell indices;
+            when None the medium_map blocks (pytools._to_block) are split
+            into cells at most OPTICAL_LIMIT mean free paths wide
+        coarse_y (int []): coarse cell edges in y (2D only)
+    Returns:
+        edges_x (int [coarse_x + 1]), edges_y (int [coarse_y + 1]); edges_y
+        is [0, 1] for one-dimensional problems
+    """
+    medium_map = np.asarray(medium_map)
+    # Smallest total cross section (longest mean free path) per cell
+    sigma = np.asarray(xs_total).min(axis=1)[medium_map]
+    if medium_map.ndim == 1:
+        blocks_x = _to_block(medium_map)
+        blocks_y = [0, 1]
+        sigma = sigma[:,None]
+        delta_y = np.ones(1)
+    else:
+        blocks_x, blocks_y = _to_block(medium_map)
+    if coarse_x is None:
+        coarse_x = _optical_split(blocks_x, sigma.max(axis=1) * np.asarray(delta_x))
+    if coarse_y is None:
+        coarse_y = _optical_split(blocks_y, sigma.max(axis=0) * np.asarray(delta_y))
+    edges_x = np.asarray(coarse_x, dtype=np.int32)
+    edges_y = np.asarray(coarse_y, dtype=np.int32)
+    assert edges_x[0] == 0 and edges_x[-1] == medium_map.shape[0], \
+        "Coarse x edges must cover the fine cells"
+    if medium_map.ndim == 2:
+        assert edges_y[0] == 0 and edges_y[-1] == medium_map.shape[1], \
+            "Coarse y edges must cover the fine cells"
+    return edges_x, edges_y
+
+
+def _optical_split(blocks, tau):
+    # Split each block [blocks[k], blocks[k+1]) into the fewest equal
+    # cells with optical thickness below OPTICAL_LIMIT
+    edges = [0]
+    for start, stop in zip(blocks[:-1], blocks[1:]):
+        pieces = int(np.ceil(tau[start:stop].sum() / OPTICAL_LIMIT))
+        pieces = min(max(pieces, 1), stop - start)
+        edges.extend(np.linspace(start, stop, pieces + 1).round().astype(int)[1:])
+    return np.unique(edges)
+
+
+class CMFD:
+    """Coarse mesh finite difference update for slab (1D) and 2D problems
+    Arguments:
+        xs_total (float [materials x groups]): total cross section
+        xs_scatter (float [materials x groups x groups]): scatter cross
+            section, xs_scatter[mat, og, ig] for ig -> og
+        xs_fission (float [materials x groups x groups]): fission matrix
+            (chi included), same ordering as xs_scatter
+        medium_map (int [cells_x] or [cells_x, cells_y]): material map
+        delta_x (float [cells_x]): fine cell widths in x
+        delta_y (float [cells_y]): fine cell widths in y (2D only)
+        bc_x, bc_y ([int, int]): boundary conditions (0 vacuum, 1 reflected)
+        coarse_x, coarse_y (int []): coarse cell edges, see coarse_edges
+    """
+
+    def __init__(self, xs_total, xs_scatter, xs_fission, medium_map, delta_x, \
+            delta_y=None, bc_x=[0, 0], bc_y=[1, 1], coarse_x=None, coarse_y=None):
+        self.xs_total = np.asarray(xs_total)
+        self.xs_scatter = np.asarray(xs_scatter)
+        self.xs_fission = np.asarray(xs_fission)
+        self.one_dim = np.asarray(medium_map).ndim == 1
+        medium_map = np.asarray(medium_map).reshape(len(delta_x), -1)
+        delta_x = np.asarray(delta_x, dtype=np.float64)
+        delta_y = np.ones(1) if delta_y is None \
+                else np.asarray(delta_y, dtype=np.float64)
+        self.bc_x = list(bc_x)
+        # A slab has no y faces
+        self.bc_y = [1, 1] if self.one_dim else list(bc_y)
+
+        self.edges_x, self.edges_y = coarse_edges(medium_map.squeeze(axis=1) \
+                        if self.one_dim else medium_map, xs_total, delta_x, \
+                        delta_y, coarse_x, coarse_y)
+        self.coarse_x = self.edges_x.size - 1
+        self.coarse_y = self.edges_y.size - 1
+        self.delta_x = delta_x
+        self.delta_y = delta_y
+        self.width_x = np.add.reduceat(delta_x, self.edges_x[:-1])
+        self.width_y = np.add.reduceat(delta_y, self.edges_y[:-1])
+        self.volume = (self.width_x[:,None] * self.width_y[None,:]).ravel()
+
+        # Fine cell -> (coarse cell, material) collapsing operator with
+        # the fine cell volumes as weights
+        index_x = np.repeat(np.arange(self.coarse_x), np.diff(self.edges_x))
+        index_y = np.repeat(np.arange(self.coarse_y), np.diff(self.edges_y))
+        self.index = (index_x[:,None] * self.coarse_y + index_y[None,:]).ravel()
+        materials = self.xs_total.shape[0]
+        rows = self.index * materials + medium_map.ravel()
+        weights = (delta_x[:,None] * delta_y[None,:]).ravel()
+        self.collapse = sparse.csr_matrix((weights, (rows, np.arange(rows.size))), \
+                        shape=(self.coarse_x * self.coarse_y * materials, rows.size))
+
+    def update(self, flux, current_x, current_y, keff):
+        """Rescale the fine flux in place with the CMFD solution
+        Arguments:
+            flux (float [cells_x, (cells_y,) groups]): fine scalar flux
+            current_x (float [cells_x + 1, (cells_y,) groups]): net current
+                on the x cell edges
+            current_y (float [cells_x, cells_y + 1, groups]): net current
+                on the y cell edges (None for 1D)
+            keff (float): current k-effective, starting guess
+        Returns:
+            CMFD k-effective, or None (flux untouched) if the coarse
+            problem cannot be solved
+        """
+        flux = np.asarray(flux)
+        groups = flux.shape[-1]
+        cells = self.coarse_x * self.coarse_y
+        materials = self.xs_total.shape[0]
+
+        # Coarse flux and reaction rates
+        rates = (self.collapse @ flux.reshape(-1, groups)).reshape(cells, \
+                        materials, groups)
+        coarse = rates.sum(axis=1) / self.volume[:,None]
+        if not (np.all(np.isfinite(coarse)) and np.all(coarse > 0.0)):
+            return None
+        total = np.einsum("cmg,mg->cg", rates, self.xs_total)
+        scatter = np.einsum("cmh,mgh->cgh", rates, self.xs_scatter)
+        fission = np.einsum("cmh,mgh->cgh", rates, self.xs_fission)
+        diffusion = coarse * self.volume[:,None] / (3.0 * total)
+
+        # Coarse face currents integrated over the face
+        current_x = np.asarray(current_x).reshape(self.delta_x.size + 1, -1, groups)
+        face_x = np.add.reduceat(current_x[self.edges_x] \
+                        * self.delta_y[None,:,None], self.edges_y[:-1], axis=1)
+        if self.one_dim:
+            face_y = np.zeros((self.coarse_x, 2, groups))
+        else:
+            current_y = np.asarray(current_y)
+            face_y = np.add.reduceat(current_y[:,self.edges_y] \
+                        * self.delta_x[:,None,None], self.edges_x[:-1], axis=0)
+
+        rows, cols, values = [], [], []
+        cell = np.arange(cells).reshape(self.coarse_x, self.coarse_y)
+        coarse_2d = coarse.reshape(self.coarse_x, self.coarse_y, groups)
+        diff_2d = diffusion.reshape(self.coarse_x, self.coarse_y, groups)
+        group = np.arange(groups)
+
+        def couple(left, right, flux_l, flux_r, dif_l, dif_r, wid_l, wid_r, \
+                area, net):
+            # Interior face: net = -D~ (phi_r - phi_l) - D^ (phi_r + phi_l)
+            d_tilde = 2.0 * dif_l * dif_r / (dif_l * wid_r + dif_r * wid_l)
+            d_hat = -(net / area + d_tilde * (flux_r - flux_l)) / (flux_r + flux_l)
+            coef_l = area * (d_tilde - d_hat)
+            coef_r = area * (d_tilde + d_hat)
+            left = left[...,None] * groups + group
+            right = right[...,None] * groups + group
+            for rr, cc, vv in ((left, left, coef_l), (left, right, -coef_r), \
+                    (right, left, -coef_l), (right, right, coef_r)):
+                rows.append(rr.ravel())
+                cols.append(cc.ravel())
+                values.append(vv.ravel())
+
+        def boundary(side, outward):
+            # Vacuum face: the transport leakage per unit coarse flux
+            side = side[...,None] * groups + group
+            rows.append(side.ravel())
+            cols.append(side.ravel())
+            values.append(outward.ravel())
+
+        # x faces
+        width_x = self.width_x[:,None,None]
+        area_x = self.width_y[None,:,None]
+        if self.coarse_x > 1:
+            couple(cell[:-1], cell[1:], coarse_2d[:-1], coarse_2d[1:], \
+                   diff_2d[:-1], diff_2d[1:], width_x[:-1], width_x[1:], \
+                   area_x, face_x[1:-1])
+        if self.bc_x[0] == 0:
+            boundary(cell[0], -face_x[0] / coarse_2d[0])
+        if self.bc_x[1] == 0:
+            boundary(cell[-1], face_x[-1] / coarse_2d[-1])
+
+        # y faces
+        width_y = self.width_y[None,:,None]
+        area_y = self.width_x[:,None,None]
+        if self.coarse_y > 1:
+            couple(cell[:,:-1], cell[:,1:], coarse_2d[:,:-1], coarse_2d[:,1:], \
+                   diff_2d[:,:-1], diff_2d[:,1:], width_y[:,:-1], width_y[:,1:], \
+                   area_y, face_y[:,1:-1])
+        if self.bc_y[0] == 0:
+            boundary(cell[:,0], -face_y[:,0] / coarse_2d[:,0])
+        if self.bc_y[1] == 0:
+            boundary(cell[:,-1], face_y[:,-1] / coarse_2d[:,-1])
+
+        # Removal and scattering per unit coarse flux
+        size = cells * groups
+        loss = sparse.coo_matrix((np.concatenate(values), (np.concatenate(rows), \
+                        np.concatenate(cols))), shape=(size, size)).tocsr()
+        loss = loss + sparse.diags((total / coarse).ravel())
+        loss = loss - sparse.block_diag(scatter / coarse[:,None,:], format="csr")
+        production = sparse.block_diag(fission / coarse[:,None,:], format="csr")
+
+        # Fundamental mode of loss^{-1} production
+        try:
+            keff_new, vector = _fundamental_mode(loss, production, \
+                                                 coarse.ravel(), keff)
+        except (RuntimeError, ValueError, np.linalg.LinAlgError, \
+                splinalg.ArpackError):
+            return None
+        vector = vector.reshape(cells, groups)
+        if not (np.isfinite(keff_new) and (keff_new > 0.0) \
+                and np.all(vector > 0.0)):
+            return None
+
+        # Prolong the coarse flux change onto the fine cells
+        ratio = vector / coarse
+        flux *= ratio[self.index].reshape(flux.shape)
+        return keff_new
+
+
+def _fundamental_mode(loss, production, guess, keff):
+    # Largest eigenvalue of loss^{-1} production and its positive vector
+    if loss.shape[0] <= DENSE_LIMIT:
+        matrix = np.linalg.solve(loss.toarray(), production.toarray())
+        values, vectors = np.linalg.eig(matrix)
+        index = np.argmax(values.real)
+        value, vector = values[index], vectors[:,index]
+    else:
+        factor = splinalg.splu(loss.tocsc())
+        operator = splinalg.LinearOperator(loss.shape, \
+                        matvec=lambda x: factor.solve(production @ x))
+        values, vectors = splinalg.eigs(operator, k=1, which="LM", \
+                        v0=guess, tol=1e-10)
+        value, vector = values[0], vectors[:,0]
+    vector = vector.real
+    vector *= np.sign(vector.sum())
+    return float(value.real), vector
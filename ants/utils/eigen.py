@@ -0,0 +1,185 @@
+########################################################################
+#                        ___    _   _____________
+#                       /   |  / | / /_  __/ ___/
+#                      / /| | /  |/ / / /  \__ \
+#                     / ___ |/ /|  / / /  ___/ /
+#                    /_/  |_/_/ |_/ /_/  /____/
+#
+# Outer (power) iteration accelerations for k-eigenvalue problems. The
+# Wielandt shift moves part of the fission source into the inner solves,
+# shrinking the dominance ratio of the outer iteration; the Chebyshev
+# extrapolation combines the last two fission source iterates with
+# Chebyshev polynomial weights.
+#
+########################################################################
+
+import numpy as np
+
+from ants.utils.pytools import wynn_epsilon
+
+# Outer iterations before the shift or extrapolation starts
+FREE_ITERATIONS = 4
+
+# Distance of the adaptive Wielandt shift above the estimated keff
+WIELANDT_DELTA = 0.1
+
+# Number of keff values in the Wynn epsilon extrapolation (2 * rank + 1)
+WYNN_RANK = 2
+
+# Chebyshev extrapolation steps before the dominance ratio is checked
+CHEBYSHEV_CYCLE = 6
+
+# Largest dominance ratio used by the Chebyshev extrapolation
+SIGMA_LIMIT = 0.995
+
+
+class Wielandt:
+    """Wielandt shifted power iteration
+    Each outer iteration solves (L - S - F / k_e) phi = (1 / k - 1 / k_e)
+    F phi_old, where k_e > k is the shift. The outer iteration then
+    converges at (1 / k_e - 1 / k_0) / (1 / k_e - 1 / k_1) rather than
+    k_1 / k_0, at the price of inner solves with the fission source.
+    Arguments:
+        xs_scatter (float [materials x groups x groups]): scatter cross
+            section, xs_scatter[mat, og, ig] for ig -> og
+        xs_fission (float [materials x groups x groups]): fission matrix
+            (chi included), same ordering as xs_scatter
+        shift (float): fixed k_e; when 0 k_e follows the Wynn epsilon
+            extrapolation of the keff history plus WIELANDT_DELTA
+    """
+
+    def __init__(self, xs_scatter, xs_fission, shift=0.0):
+        self.xs_scatter = np.asarray(xs_scatter)
+        self.xs_fission = np.asarray(xs_fission)
+        self.fixed = shift
+        # Current k_e, no shift until FREE_ITERATIONS have passed
+        self.shift = 0.0
+        self.history = []
+        self._scatter = self.xs_scatter
+
+    def eigenvalue(self, keff):
+        """Eigenvalue dividing the fission source of the next outer"""
+        if self.shift == 0.0:
+            return keff
+        return 1.0 / (1.0 / keff - 1.0 / self.shift)
+
+    def keffective(self, eigenvalue):
+        """keff from the updated eigenvalue of the shifted problem"""
+        if self.shift == 0.0:
+            return eigenvalue
+        return 1.0 / (1.0 / eigenvalue + 1.0 / self.shift)
+
+    def scatter(self):
+        """Scatter matrix of the inner solves, fission included"""
+        return self._scatter
+
+    def update(self, flux, flux_old, keff, change):
+        """Move the shift after an outer iteration
+        Arguments:
+            flux (float [cells_x, (cells_y,) groups]): normalized flux
+            flux_old (float [cells_x, (cells_y,) groups]): previous flux
+            keff (float): updated k-effective
+            change (float): flux change of the outer iteration
+        """
+        self.history.append(keff)
+        if len(self.history) < FREE_ITERATIONS:
+            return
+        if self.fixed > 0.0:
+            # A fixed shift below keff makes the inner problem supercritical
+            shift = self.fixed if self.fixed > keff else 0.0
+        else:
+            shift = keff + WIELANDT_DELTA
+            if len(self.history) >= 2 * WYNN_RANK + 1:
+                estimate = wynn_epsilon(self.history[-2 * WYNN_RANK - 1:], WYNN_RANK)
+                # Extrapolations are only trusted near the current keff
+                if np.isfinite(estimate) and (abs(estimate - keff) < WIELANDT_DELTA):
+                    shift = max(estimate, keff) + WIELANDT_DELTA
+        if shift != self.shift:
+            self.shift = shift
+            self._scatter = self.xs_scatter if shift == 0.0 \
+                            else self.xs_scatter + self.xs_fission / shift
+
+
+class Chebyshev:
+    """Chebyshev extrapolation of the power iteration
+    With T the (normalized) power iteration and sigma the dominance ratio,
+    phi_{p+1} = phi_p + alpha_p (T phi_p - phi_p) + beta_p (phi_p -
+    phi_{p-1}), with the Chebyshev weights of a cycle of length p.
+    sigma is first estimated from the free iterations and is raised when
+    a cycle reduces the change less than its polynomial predicts.
+    """
+
+    def __init__(self):
+        self.sigma = 0.0
+        # Position in the current cycle, 0 before a cycle starts
+        self.step = 0
+        self.start = 0.0
+        self.changes = []
+        self.previous = None
+
+    def eigenvalue(self, keff):
+        """Eigenvalue dividing the fission source of the next outer"""
+        return keff
+
+    def keffective(self, eigenvalue):
+        """keff from the updated eigenvalue"""
+        return eigenvalue
+
+    def scatter(self):
+        """Scatter matrix of the inner solves, None for unchanged"""
+        return None
+
+    def update(self, flux, flux_old, keff, change):
+        """Extrapolate the normalized flux in place
+        Arguments:
+            flux (float [cells_x, (cells_y,) groups]): normalized power
+                iteration of flux_old, overwritten with the extrapolation
+            flux_old (float [cells_x, (cells_y,) groups]): previous flux
+            keff (float): updated k-effective
+            change (float): flux change of the outer iteration
+        """
+        self.changes.append(change)
+        flux = np.asarray(flux)
+        flux_old = np.asarray(flux_old)
+
+        # Estimate the dominance ratio from the free iterations
+        if len(self.changes) < FREE_ITERATIONS:
+            self.previous = flux_old.copy()
+            return
+        if self.sigma == 0.0:
+            self.sigma = min(self.changes[-1] / self.changes[-2], SIGMA_LIMIT)
+            # Nothing to gain on quickly converging (or erratic) iterations
+            if not (self.sigma > 0.5):
+                self.sigma = -1.0
+        if self.sigma < 0.0:
+            return
+
+        # Raise sigma if the last cycle fell short of the polynomial
+        if self.step == CHEBYSHEV_CYCLE:
+            gamma = np.arccosh(2.0 / self.sigma - 1.0)
+            reduction = change / self.start
+            if reduction * np.cosh((self.step - 1) * gamma) > 1.0:
+                if reduction < 1.0:
+                    sigma = 2.0 / (1.0 + np.cosh(np.arccosh(1.0 / reduction) \
+                                                 / (self.step - 1)))
+                else:
+                    sigma = SIGMA_LIMIT
+                self.sigma = min(max(self.sigma, sigma), SIGMA_LIMIT)
+            self.step = 0
+
+        # Chebyshev weights of the next step in the cycle
+        self.step += 1
+        if self.step == 1:
+            self.start = change
+            alpha = 2.0 / (2.0 - self.sigma)
+            beta = 0.0
+        else:
+            gamma = np.arccosh(2.0 / self.sigma - 1.0)
+            alpha = 4.0 / self.sigma * np.cosh((self.step - 1) * gamma) \
+                    / np.cosh(self.step * gamma)
+            beta = (1.0 - 0.5 * self.sigma) * alpha - 1.0
+
+        extrapolated = flux_old + alpha * (flux - flux_old) \
+                        + beta * (flux_old - self.previous)
+        self.previous = flux_old.copy()
+        flux[...] = extrapolated / np.linalg.norm(extrapolated)
@@ -162,6 +162,47 @@ def coarsen_velocity(vector, edges_gidx):
     return coarse
 
 
+def two_grid_materials(xs_total, xs_scatter, first):
+    """Collapse the upscatter groups (first to groups - 1) to one group
+    with the infinite medium error spectrum for two-grid acceleration.
+    The spectrum is the dominant eigenvector of (T - L)^-1 U, where L is
+    the within-group and downscatter part of the block and U the
+    upscatter part, which is the shape the Gauss-Seidel error settles to
+    Arguments:
+        xs_total (float [materials x groups]): Total cross section
+        xs_scatter (float [materials x groups x groups]): scatter cross section
+        first (int): First group receiving upscatter
+    Returns:
+        coarse_total (float [materials]): Collapsed total cross section,
+                    set so that 1 / (3 coarse_total) is the collapsed
+                    diffusion coefficient
+        coarse_scatter (float [materials]): Collapsed scatter cross section,
+                    coarse_total minus the collapsed absorption
+        spectrum (float [materials x groups - first]): Error spectrum,
+                    summing to one for each material
+    """
+    xs_total = np.asarray(xs_total)[:, first:]
+    xs_scatter = np.asarray(xs_scatter)[:, first:, first:]
+    materials, groups = xs_total.shape
+    coarse_total = np.zeros((materials,))
+    coarse_scatter = np.zeros((materials,))
+    spectrum = np.full((materials, groups), 1.0 / groups)
+    for mat in range(materials):
+        lower = np.diag(xs_total[mat]) - np.tril(xs_scatter[mat])
+        upper = np.triu(xs_scatter[mat], 1)
+        # Materials without upscatter keep a flat spectrum
+        if upper.any():
+            values, vectors = np.linalg.eig(np.linalg.solve(lower, upper))
+            vector = np.fabs(np.real(vectors[:, np.argmax(np.abs(values))]))
+            spectrum[mat] = vector / np.sum(vector)
+        absorption = np.sum(xs_total[mat] * spectrum[mat]) - np.sum(
+            xs_scatter[mat] @ spectrum[mat]
+        )
+        coarse_total[mat] = 1.0 / np.sum(spectrum[mat] / xs_total[mat])
+        coarse_scatter[mat] = coarse_total[mat] - absorption
+    return coarse_total, coarse_scatter, spectrum
+
+
 ########################################################################
 # Indexing for Hybrid Methods
 ########################################################################
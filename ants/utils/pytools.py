@@ -12,9 +12,16 @@
 import logging
 
 import numpy as np
-from scipy.linalg import qr as scipy_qr
 from scipy.linalg import svd as scipy_svd
 
+from ants.datatypes import (
+    FactoredSource,
+    MultigroupSolver,
+    ParallelType,
+    TemporalDiscretization,
+    TimeSource,
+)
+
 logger = logging.getLogger(__name__)
 
 
@@ -60,6 +67,80 @@ def average_array(arr):
     return 0.5 * (arr[1:] + arr[:-1])
 
 
+def initial_flux(solver, shape, random=False):
+    """Starting scalar flux of an iterative solve
+    Arguments:
+        solver (SolverData): flux_guess and seed of the solve
+        shape (tuple): cell-center flux shape, (cells_x, (cells_y,) groups)
+        random (bool): start from a seeded random flux instead of zeros
+            when no flux_guess is given
+    Returns:
+        float array of the given shape, never the flux_guess itself
+    """
+    if solver.flux_guess is not None:
+        guess = np.array(solver.flux_guess, dtype=np.float64)
+        assert guess.shape == tuple(shape), \
+            f"flux_guess must have shape {tuple(shape)}, got {guess.shape}"
+        return guess
+    if random:
+        return np.random.default_rng(solver.seed).random(shape)
+    return np.zeros(shape)
+
+
+def external_source(source, params):
+    """External source of a fixed source solve
+    Arguments:
+        source (array or FactoredSource): external source
+        params (ProblemParameters): solver options of the problem
+    Returns:
+        (array, FactoredSource or None) the source array and, when it is
+        only a one group buffer, the factored source that fills it group
+        by group. Only the sequential source iteration and DMD for the
+        cell center scalar flux evaluate factored sources by group.
+    """
+    if not isinstance(source, FactoredSource):
+        return source, None
+    by_group = (params.mg_solver in (MultigroupSolver.SOURCE_ITERATION, \
+                                     MultigroupSolver.DMD)) \
+            and (params.parallel_type not in (ParallelType.GROUP, \
+                                              ParallelType.BOTH)) \
+            and not params.angular and not params.flux_at_edges
+    if by_group:
+        return np.zeros(source.shape[:-1] + (1,)), source
+    return source.dense(), None
+
+
+def source_steps(time_disc, steps):
+    """Number of external and boundary source steps of a time method
+    Arguments:
+        time_disc (TemporalDiscretization): time discretization
+        steps (int): number of time steps
+    Returns:
+        (int, int) external and boundary source steps
+    """
+    if time_disc == TemporalDiscretization.CN:
+        return steps + 1, steps
+    elif time_disc == TemporalDiscretization.TR_BDF2:
+        return 2 * steps + 1, 2 * steps
+    return steps, steps
+
+
+def time_source(source, steps):
+    """Source indexed by time step, without materializing lazy sources
+    Arguments:
+        source (array, TimeSource or callable): dense (T, ...) source, or
+            a function of the step index returning one step
+        steps (int): number of source steps of a callable
+    Returns:
+        TimeSource for lazy sources, else the float array
+    """
+    if isinstance(source, TimeSource):
+        return source
+    if callable(source):
+        return TimeSource(source, steps)
+    return np.asarray(source, dtype=np.float64)
+
+
 ########################################################################
 # Manufactured Solutions and Accuracy
 ########################################################################
@@ -385,140 +466,193 @@ def inscribed_circle(edges_x, edges_y, radii):
 
 
 ########################################################################
-# One Dimensional DMD
+# Dynamic Mode Decomposition
 ########################################################################
 
-
-def dmd_1d(flux_old, y_minus, y_plus, K):
-    # Convert from memoryview
-    flux_old = np.asarray(flux_old)
-    y_minus = np.asarray(y_minus)
-    y_plus = np.asarray(y_plus)
-
-    # Collect dimensions
-    cells_x, groups = flux_old.shape
-
-    # Flatten y_minus, y_plus
-    y_minus = y_minus.reshape(cells_x * groups, K - 1)
-    y_plus = y_plus.reshape(cells_x * groups, K - 1)
-
-    # Call SVD; s_inv is a 1-D vector of reciprocal singular values
-    U, s_inv, V = _svd_dmd(y_minus, K)
-
-    # Cache U.T @ y_plus once (shape r x K-1); reused for Atilde and RHS
-    UtYp = U.T @ y_plus
-
-    # Atilde = U.T @ y_plus @ V.T @ diag(s_inv)
-    # V.T * s_inv broadcasts diag(s_inv) without a full matrix multiply
-    Atilde = UtYp @ (V.T * s_inv)
-
-    # Solve (I - Atilde) delta_y = U.T @ y_plus[:, -1]
-    delta_y = np.linalg.solve(np.eye(Atilde.shape[0]) - Atilde, UtYp[:, -1])
-
-    # Estimate new flux
-    flux = flux_old.ravel() - y_plus[:, K - 2] + U @ delta_y
-    return flux.reshape(cells_x, groups)
-
-
-def dmd_2d(flux_old, y_minus, y_plus, K):
-    # Convert from memoryview
-    flux_old = np.asarray(flux_old)
-    y_minus = np.asarray(y_minus)
-    y_plus = np.asarray(y_plus)
-
-    # Collect dimensions
-    cells_x, cells_y, groups = flux_old.shape
-
-    # Flatten y_minus, y_plus
-    y_minus = y_minus.reshape(cells_x * cells_y * groups, K - 1)
-    y_plus = y_plus.reshape(cells_x * cells_y * groups, K - 1)
-
-    # Call SVD; s_inv is a 1-D vector of reciprocal singular values
-    U, s_inv, V = _svd_dmd(y_minus, K)
-
-    # Cache U.T @ y_plus once (shape r x K-1); reused for Atilde and RHS
-    UtYp = U.T @ y_plus
-
-    # Atilde = U.T @ y_plus @ V.T @ diag(s_inv)
-    # V.T * s_inv broadcasts diag(s_inv) without a full matrix multiply
-    Atilde = UtYp @ (V.T * s_inv)
-
-    # Solve (I - Atilde) delta_y = U.T @ y_plus[:, -1]
-    delta_y = np.linalg.solve(np.eye(Atilde.shape[0]) - Atilde, UtYp[:, -1])
-
-    # Estimate new flux
-    flux = flux_old.ravel() - y_plus[:, K - 2] + U @ delta_y
-    return flux.reshape(cells_x, cells_y, groups)
-
-
-# Row count above which the randomized range-finder replaces exact SVD.
-# Speedup vs exact SVD grows when the energy threshold truncates the rank
-# to r << K-1 (few dominant DMD modes), because then l = r + _RAND_OVERSAMPLING
-# << m = K-1 and both the sketch and back-projection operate on smaller matrices.
-_N_RAND_THRESHOLD = 1000
-_RAND_OVERSAMPLING = 10  # extra sketch columns; trade accuracy for speed by lowering
-_RAND_N_ITER = 2  # power iterations; 0=fastest, 2=balanced, 4+=most accurate
-_rng = np.random.default_rng(0)
-
-
-def _rand_svd(A, k):
-    """Randomized SVD: k leading singular triplets of tall matrix A (n, m).
-
-    Implements the randomized range-finder with power iterations from
-    Halko, Martinsson & Tropp (2011).
-
-    Complexity vs exact SVD (both O(n * m^2)):
-      - Equal cost when k == m (full rank target, sketch fills all columns).
-      - Speedup ~= m / (k + oversampling) when k << m, i.e. when the energy
-        threshold truncates most of the K-1 snapshot columns.
+# The extrapolation keeps the components holding all but DMD_RESIDUAL of
+# the singular value sum
+DMD_RESIDUAL = 1e-09
+
+# Directions below DMD_ROUNDOFF of the singular value sum are rounding
+# noise and are not kept in the streaming basis
+DMD_ROUNDOFF = 1e-14
+
+
+class StreamingDMD:
+    """DMD extrapolation of source iterations from a streaming thin SVD
+    The differences y_k = phi_{k+1} - phi_k of the source iterations are
+    folded into a thin SVD W diag(s) Z^T one at a time (Brand, 2006), so
+    only the rank r basis and the last difference are stored instead of
+    Y_- = [y_0, ..., y_{K-2}] and Y_+ = [y_1, ..., y_{K-1}]. W is kept as
+    vectors times a small rotation, which makes each update
+    O(cells * groups * r). A truncated direction folds the rotation into
+    the vectors at O(cells * groups * r^2), so the vectors are the first r
+    columns of a buffer preallocated with K + 1 columns (doubled if
+    recycled snapshots raise r further). Y_- and Y_+ are column selections
+    of the snapshots, so the DMD operator only needs a small SVD of the
+    coefficients diag(s) Z^T.
+    A restart keeps the last K snapshots, so solves with the same
+    operator (consecutive time steps) reuse the pairs (y_k, y_{k+1}) of
+    the previous solve.
+    Arguments:
+        snapshots (int): number of differences K
     """
-    n, m = A.shape
-    ll = min(k + _RAND_OVERSAMPLING, m)  # sketch size, capped at m
-
-    # Random projection: sketch A's column space down to l dimensions
-    Omega = _rng.standard_normal((m, ll))
-    Y = A @ Omega  # (n, l)
-
-    # Power iterations sharpen the range approximation at cost of two extra
-    # passes over A each; stabilized by intermediate QR orthonormalization
-    for _ in range(_RAND_N_ITER):
-        Q, _ = scipy_qr(Y, mode="economic", check_finite=False)
-        Z, _ = scipy_qr(A.T @ Q, mode="economic", check_finite=False)
-        Y = A @ Z  # (n, l)
-
-    Q, _ = scipy_qr(Y, mode="economic", check_finite=False)  # (n, l)
-
-    # Project A into the l-dimensional sketch, then exact SVD on (l, m)
-    B = Q.T @ A  # (l, m)
-    Uh, s, V = scipy_svd(B, full_matrices=False, check_finite=False)
-
-    return (Q @ Uh)[:, :k], s[:k], V[:k, :]
-
-
-def _svd_dmd(A, K):
-    residual = 1e-09
-    n, m = A.shape
-
-    if n < _N_RAND_THRESHOLD:
-        # Exact economy SVD for smaller matrices
-        U, s, V = scipy_svd(A, full_matrices=False, check_finite=False)
-    else:
-        # Randomized SVD for large spatial grids (n = cells * groups >> K-1).
-        # Targets all m = K-1 columns; the gain materialises after the energy
-        # truncation below reduces the working rank to r << K-1.
-        U, s, V = _rand_svd(A, m)
-
-    # Truncate to components capturing > (1 - residual) of total energy
-    s_sum = s.sum()
-    if s_sum > 0:
-        tail = 1.0 - np.cumsum(s) / s_sum
-        r = int(np.count_nonzero(tail > residual))
-        if r == 0:
-            r = int(np.count_nonzero(s > 0))
-    else:
-        r = int(np.count_nonzero(s > 0))
-    r = max(1, min(r, K))
 
-    # Return truncated bases and reciprocal singular values as a 1-D vector
-    return U[:, :r].copy(), 1.0 / s[:r], V[:r, :].copy()
-    return U[:, :r].copy(), 1.0 / s[:r], V[:r, :].copy()
+    def __init__(self, snapshots):
+        self.snapshots = snapshots
+        # Differences of the current solve
+        self.count = 0
+        # W = vectors[:, :width] @ rotation, Z = right
+        self.vectors = None
+        self.width = 0
+        self.rotation = np.zeros((0, 0))
+        self.sigma = np.zeros(0)
+        self.right = np.zeros((0, 0))
+        # Snapshot k is followed by snapshot k + 1 in the same solve
+        self.linked = np.zeros(0, dtype=bool)
+        # Pairs kept from earlier solves
+        self.recycled = 0
+        self.last = None
+
+    @property
+    def basis(self):
+        """Left singular vectors W of the snapshots"""
+        return self.vectors[:, : self.width] @ self.rotation
+
+    def restart(self):
+        """Start a new solve, keeping the last K snapshots"""
+        self.count = 0
+        self.last = None
+        drop = self.linked.size - self.snapshots
+        if drop > 0:
+            self._drop_columns(drop)
+        self.recycled = int(np.count_nonzero(self.linked))
+
+    def update(self, flux, flux_old):
+        """Add the difference of the last source iteration
+        Arguments:
+            flux (float [cells_x, (cells_y,) groups]): new iterate
+            flux_old (float [cells_x, (cells_y,) groups]): previous iterate
+        """
+        difference = (np.asarray(flux) - np.asarray(flux_old)).ravel()
+        if self.count > 0:
+            self.linked[-1] = True
+        self._add_column(difference)
+        self.linked = np.append(self.linked, False)
+        self.last = difference
+        self.count += 1
+
+    def _project(self, column):
+        # W^T c and c - W W^T c
+        vectors = self.vectors[:, : self.width]
+        projection = self.rotation.T @ (vectors.T @ column)
+        return projection, column - vectors @ (self.rotation @ projection)
+
+    def _fold(self):
+        # Store W = vectors @ rotation in the buffer, with an identity rotation
+        rank = self.rotation.shape[1]
+        self.vectors[:, :rank] = self.vectors[:, : self.width] @ self.rotation
+        self.width = rank
+        self.rotation = np.eye(rank)
+
+    def _add_column(self, column):
+        if self.vectors is None:
+            self.vectors = np.zeros((column.size, self.snapshots + 1))
+        rank = self.sigma.size
+
+        # Component outside the basis, orthogonalized twice
+        projection, residual = self._project(column)
+        correction, residual = self._project(residual)
+        projection += correction
+        norm = np.linalg.norm(residual)
+        grow = norm > DMD_ROUNDOFF * max(np.sum(self.sigma), np.linalg.norm(column))
+        if (rank == 0) and not grow:
+            self.right = np.zeros((self.right.shape[0] + 1, 0))
+            return
+
+        # Small core [[diag(s), W^T c], [0, |e|]] of the extended matrix
+        core = np.zeros((rank + grow, rank + 1))
+        core[:rank, :rank] = np.diag(self.sigma)
+        core[:rank, rank] = projection
+        if grow:
+            core[rank, rank] = norm
+        left, sigma, right = scipy_svd(core, full_matrices=False, check_finite=False)
+
+        # Drop directions lost in rounding
+        keep = max(1, int(np.count_nonzero(sigma > DMD_ROUNDOFF * np.sum(sigma))))
+        rotation = self.rotation
+        if grow:
+            # Recycled snapshots can raise the rank past K + 1
+            if self.width == self.vectors.shape[1]:
+                buffer = np.zeros((column.size, 2 * self.width))
+                buffer[:, : self.width] = self.vectors
+                self.vectors = buffer
+            self.vectors[:, self.width] = residual / norm
+            self.width += 1
+            rotation = np.zeros((rotation.shape[0] + 1, rank + 1))
+            rotation[:-1, :rank] = self.rotation
+            rotation[-1, rank] = 1.0
+        self.rotation = rotation @ left[:, :keep]
+        self.sigma = sigma[:keep]
+        extended = np.zeros((self.right.shape[0] + 1, rank + 1))
+        extended[:-1, :rank] = self.right
+        extended[-1, rank] = 1.0
+        self.right = extended @ right[:keep].T
+        if keep < rank + grow:
+            self._fold()
+
+    def _drop_columns(self, drop):
+        # Rediagonalize the coefficients of the remaining snapshots
+        coefficients = self.sigma[:, None] * self.right[drop:].T
+        self.linked = self.linked[drop:]
+        if self.sigma.size == 0:
+            self.right = self.right[drop:]
+            return
+        left, sigma, right = scipy_svd(coefficients, full_matrices=False, \
+                                       check_finite=False)
+        keep = max(1, int(np.count_nonzero(sigma > DMD_ROUNDOFF * np.sum(sigma))))
+        self.rotation = self.rotation @ left[:, :keep]
+        self.sigma = sigma[:keep]
+        self.right = right[:keep].T
+        self._fold()
+
+    def extrapolate(self, flux):
+        """Estimate the converged flux from the last iterate
+        Arguments:
+            flux (float [cells_x, (cells_y,) groups]): last iterate
+        Returns:
+            float [cells_x, (cells_y,) groups] extrapolated flux
+        """
+        flux = np.asarray(flux)
+        if (self.count == 0) or not np.any(self.linked) \
+                or not np.any(self.sigma > 0.0):
+            return flux
+
+        # Coefficients of Y_-, Y_+ and the last difference in W
+        coefficients = self.sigma[:, None] * self.right.T
+        minus = np.flatnonzero(self.linked)
+        c_minus = coefficients[:, minus]
+        c_plus = coefficients[:, minus + 1]
+        left, sigma, right = scipy_svd(c_minus, full_matrices=False, \
+                                       check_finite=False)
+
+        # Truncate to components capturing > (1 - residual) of the total
+        if not np.any(sigma > 0.0):
+            return flux
+        tail = 1.0 - np.cumsum(sigma) / np.sum(sigma)
+        rank = int(np.count_nonzero(tail > DMD_RESIDUAL))
+        if rank == 0:
+            rank = int(np.count_nonzero(sigma > 0))
+        left = left[:, :rank]
+
+        # Atilde = U^T Y_+ V diag(1 / s), with U = W left
+        Atilde = left.T @ c_plus @ (right[:rank].T / sigma[:rank])
+
+        # Solve (I - Atilde) delta_y = U^T y_{K-1}
+        delta_y = np.linalg.solve(np.eye(rank) - Atilde, \
+                                  left.T @ coefficients[:, -1])
+
+        # Estimate new flux
+        estimate = flux.ravel() - self.last \
+                    + self.vectors[:, : self.width] @ (self.rotation @ (left @ delta_y))
+        return estimate.reshape(flux.shape)
@@ -0,0 +1,87 @@
+########################################################################
+#                        ___    _   _____________
+#                       /   |  / | / /_  __/ ___/
+#                      / /| | /  |/ / / /  \__ \
+#                     / ___ |/ /|  / / /  ___/ /
+#                    /_/  |_/_/ |_/ /_/  /____/
+#
+# Outer (power) iteration counts of the k-eigenvalue accelerations on
+# the one dimensional Sood, Forster, and Parsons (1999) benchmarks, and
+# on a U-D2O slab five times the critical width (dominance ratio close
+# to one). Run from the repository root.
+#
+########################################################################
+
+import logging
+import time
+
+import numpy as np
+
+import ants
+from ants.critical1d import k_criticality
+from ants.datatypes import (
+    EigenAcceleration,
+    InnerSolver,
+    ReflectorUpdate,
+    SolverData,
+)
+from tests import criticality_benchmarks as benchmarks
+
+
+class OuterCount(logging.Handler):
+    """Count the outer iterations logged by the power iteration"""
+
+    def __init__(self):
+        super().__init__(logging.INFO)
+        self.count = 0
+
+    def emit(self, record):
+        self.count += record.getMessage().startswith("Count")
+
+
+def thick_ud2o(cells_x, bc_x, geometry_type):
+    materials, geometry = benchmarks.UD2O_1_0(cells_x, bc_x, geometry_type)
+    geometry.delta_x = 5 * geometry.delta_x
+    return materials, geometry
+
+
+problems = [
+    ("PUa-1-0 slab", benchmarks.PUa_1_0, (200, [0, 0])),
+    ("PUb-1-0 sphere", benchmarks.PUb_1_0, (150, [1, 0], 2)),
+    ("UD2O-1-0 slab", benchmarks.UD2O_1_0, (200, [0, 0], 1)),
+    ("PU-2-0 slab", benchmarks.PU_2_0, (200, [0, 0], 1)),
+    ("U-2-0 slab", benchmarks.U_2_0, (200, [0, 0], 1)),
+    ("URRa-2-0 slab", benchmarks.URRa_2_0, (200, [0, 0], 1)),
+    ("UD2O-1-0 x5 slab", thick_ud2o, (400, [0, 1], 1)),
+]
+
+# The Wielandt shifted inner problems need DSA
+solver_kwargs = dict(
+    inner_solver=InnerSolver.DSA,
+    reflector=ReflectorUpdate.WAVES,
+    max_iter_keff=2000,
+)
+
+counter = OuterCount()
+logger = logging.getLogger("ants.critical1d")
+logger.addHandler(counter)
+logger.setLevel(logging.INFO)
+
+print(f"{'Problem':18s} {'Acceleration':12s} {'Outers':>6s} {'keff':>10s} {'Time':>7s}")
+for name, problem, args in problems:
+    for acceleration in EigenAcceleration:
+        materials, geometry = problem(*args)
+        # CMFD is limited to slabs
+        if (acceleration == EigenAcceleration.CMFD) and (geometry.geometry != 1):
+            continue
+        quadrature = ants.angular_x(angles=16, bc_x=geometry.bc_x)
+        solver = SolverData(eigen_acceleration=acceleration, **solver_kwargs)
+        counter.count = 0
+        np.random.seed(42)
+        start = time.perf_counter()
+        _, keff = k_criticality(materials, geometry, quadrature, solver)
+        elapsed = time.perf_counter() - start
+        print(
+            f"{name:18s} {acceleration.name:12s} {counter.count:6d} "
+            f"{keff:10.6f} {elapsed:6.2f}s"
+        )
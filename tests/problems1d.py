@@ -129,6 +129,46 @@ def sphere_01(ptype):
     return mat_data, sources, geometry, quadrature, solver, time_data
 
 
+def thermal_materials(groups=12, thermal=6):
+    # Fast groups only downscatter, thermal groups share a dense kernel
+    # with strong upscatter (scattering ratios 0.99 and 0.9)
+    xs_total = np.ones((2, groups))
+    xs_scatter = np.zeros((2, groups, groups))
+    fast = groups - thermal
+    for mat, ratio in enumerate([0.99, 0.9]):
+        for gg in range(fast):
+            xs_scatter[mat, gg, gg] = 0.5
+            xs_scatter[mat, gg + 1 : gg + 3, gg] = 0.2
+        for gg in range(fast, groups):
+            kernel = np.exp(-0.3 * np.fabs(np.arange(fast, groups) - gg))
+            xs_scatter[mat, fast:, gg] = ratio * kernel / kernel.sum()
+    return MaterialData(
+        total=xs_total,
+        scatter=xs_scatter,
+        fission=np.zeros((2, groups, groups)),
+    )
+
+
+def thermal_upscatter(cells_x, angles):
+    mat_data = thermal_materials()
+    groups = mat_data.total.shape[1]
+
+    medium_map = np.zeros((cells_x,), dtype=np.int32)
+    medium_map[int(0.7 * cells_x) :] = 1
+    geometry = GeometryData(
+        medium_map=medium_map,
+        delta_x=np.repeat(50.0 / cells_x, cells_x),
+    )
+    quadrature = ants.angular_x(angles)
+    sources = SourceData(
+        external=np.ones((cells_x, 1, groups)),
+        boundary_x=np.zeros((2, 1, 1)),
+    )
+    solver = SolverData(max_iter_energy=10000)
+
+    return mat_data, sources, geometry, quadrature, solver
+
+
 def manufactured_ss_01(cells_x, angles):
     mat_data = MaterialData(
         total=np.array([[1.0]]),
@@ -21,6 +21,7 @@ from ants.datatypes import (
     TimeDependentData,
 )
 from ants.utils import manufactured_2d as mms
+from tests.problems1d import thermal_materials
 
 # Path for reference solutions
 PATH = "data/references_multigroup/"
@@ -210,6 +211,29 @@ def manufactured_ss_04(cells, angles):
     return mat_data, sources, geometry, quadrature, solver, edges_x, edges_y
 
 
+def thermal_upscatter(cells, angles):
+    mat_data = thermal_materials()
+    groups = mat_data.total.shape[1]
+
+    medium_map = np.zeros((cells, cells), dtype=np.int32)
+    medium_map[int(0.7 * cells) :, :] = 1
+    geometry = GeometryData(
+        medium_map=medium_map,
+        delta_x=np.repeat(20.0 / cells, cells),
+        delta_y=np.repeat(20.0 / cells, cells),
+        geometry=Geometry.SLAB2D,
+    )
+    quadrature = ants.angular_xy(angles)
+    sources = SourceData(
+        external=np.ones((cells, cells, 1, groups)),
+        boundary_x=np.zeros((2, 1, 1, 1)),
+        boundary_y=np.zeros((2, 1, 1, 1)),
+    )
+    solver = SolverData(max_iter_energy=10000)
+
+    return mat_data, sources, geometry, quadrature, solver
+
+
 def manufactured_td_01(cells, angles, edges_t, dt, temporal=1):
     # Spatial Dimensions
     length_x = 2.0
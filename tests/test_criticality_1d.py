@@ -10,6 +10,7 @@
 #
 ########################################################################
 
+import logging
 import os
 
 import numpy as np
@@ -17,7 +18,15 @@ import pytest
 
 import ants
 from ants.critical1d import k_criticality
-from ants.datatypes import SolverData
+from ants.datatypes import (
+    EigenAcceleration,
+    EigenSolver,
+    FluxOutput,
+    InnerSolver,
+    InnerTolerance,
+    ReflectorUpdate,
+    SolverData,
+)
 from tests import criticality_benchmarks as benchmarks
 from tests import problems1d
 
@@ -40,8 +49,17 @@ def normalize(flux, boundary):
 @pytest.mark.slab1d
 @pytest.mark.power_iteration
 @pytest.mark.parametrize(("boundary"), [[0, 0], [0, 1], [1, 0]])
-def test_pua_1_0_slab(boundary):
-    solver = SolverData()
+@pytest.mark.parametrize(
+    ("acceleration"),
+    [
+        EigenAcceleration.NONE,
+        EigenAcceleration.CMFD,
+        EigenAcceleration.WIELANDT,
+        EigenAcceleration.CHEBYSHEV,
+    ],
+)
+def test_pua_1_0_slab(boundary, acceleration):
+    solver = SolverData(eigen_acceleration=acceleration)
     quadrature = ants.angular_x(angles=16, bc_x=boundary)
     cells_x = 100 if np.sum(boundary) == 0 else 50
     materials, geometry = benchmarks.PUa_1_0(cells_x, boundary)
@@ -49,6 +67,18 @@ def test_pua_1_0_slab(boundary):
     assert abs(keff - 1.0) < 2e-3, str(keff) + " not critical"
 
 
+@pytest.mark.slab1d
+@pytest.mark.power_iteration
+def test_pua_1_0_slab_capture():
+    quadrature = ants.angular_x(angles=16, bc_x=[0, 0])
+    materials, geometry = benchmarks.PUa_1_0(100, [0, 0])
+    flux, _ = k_criticality(materials, geometry, quadrature, SolverData())
+    solver = SolverData(angular=True, flux_output=FluxOutput.CAPTURE)
+    angular = k_criticality(materials, geometry, quadrature, solver)
+    scalar = np.sum(angular * quadrature.angle_w[None, :, None], axis=1)
+    assert np.isclose(scalar, flux, atol=1e-4).all(), "Incorrect angular flux"
+
+
 @pytest.mark.smoke
 @pytest.mark.slab1d
 @pytest.mark.power_iteration
@@ -81,8 +111,17 @@ def test_pub_1_0_sphere():
 
 @pytest.mark.slab1d
 @pytest.mark.power_iteration
-def test_pua_h20_1_0_nonsymmetric_slab():
-    solver = SolverData()
+@pytest.mark.parametrize(
+    ("acceleration"),
+    [
+        EigenAcceleration.NONE,
+        EigenAcceleration.CMFD,
+        EigenAcceleration.WIELANDT,
+        EigenAcceleration.CHEBYSHEV,
+    ],
+)
+def test_pua_h20_1_0_nonsymmetric_slab(acceleration):
+    solver = SolverData(eigen_acceleration=acceleration)
     quadrature = ants.angular_x(angles=16, bc_x=[0, 0])
     materials, geometry = benchmarks.PUa_H20_1_0(500, nonsymmetric=True)
     _, keff = k_criticality(materials, geometry, quadrature, solver)
@@ -141,6 +180,54 @@ def test_ud2o_1_0_slab(boundary):
     assert abs(keff - 1.0) < 2e-3, str(keff) + " not critical"
 
 
+@pytest.mark.slab1d
+@pytest.mark.power_iteration
+@pytest.mark.parametrize(
+    ("acceleration"), [EigenAcceleration.WIELANDT, EigenAcceleration.CHEBYSHEV]
+)
+def test_ud2o_1_0_thick_slab_outers(acceleration, caplog):
+    # Five times the critical width, dominance ratio close to one
+    caplog.set_level(logging.INFO, logger="ants.critical1d")
+    quadrature = ants.angular_x(angles=16, bc_x=[0, 1])
+    outers = []
+    keffs = []
+    for eigen_acceleration in (EigenAcceleration.NONE, acceleration):
+        materials, geometry = benchmarks.UD2O_1_0(400, [0, 1], geometry_type=1)
+        geometry.delta_x = 5 * geometry.delta_x
+        solver = SolverData(
+            eigen_acceleration=eigen_acceleration,
+            inner_solver=InnerSolver.DSA,
+            reflector=ReflectorUpdate.WAVES,
+            max_iter_keff=500,
+        )
+        caplog.clear()
+        _, keff = k_criticality(materials, geometry, quadrature, solver)
+        outers.append(sum(rec.message.startswith("Count") for rec in caplog.records))
+        keffs.append(keff)
+    assert abs(keffs[1] - keffs[0]) < 1e-5, "accelerated keff differs"
+    assert 3 * outers[1] < outers[0], "outer iterations " + str(outers)
+
+
+@pytest.mark.slab1d
+@pytest.mark.power_iteration
+def test_ud2o_1_0_thick_slab_newton():
+    # Five times the critical width, dominance ratio close to one
+    quadrature = ants.angular_x(angles=16, bc_x=[0, 1])
+    fluxes = []
+    keffs = []
+    for solver in (
+        SolverData(eigen_acceleration=EigenAcceleration.CMFD),
+        SolverData(eigen_solver=EigenSolver.NEWTON_KRYLOV),
+    ):
+        materials, geometry = benchmarks.UD2O_1_0(400, [0, 1], geometry_type=1)
+        geometry.delta_x = 5 * geometry.delta_x
+        flux, keff = k_criticality(materials, geometry, quadrature, solver)
+        fluxes.append(flux)
+        keffs.append(keff)
+    assert abs(keffs[1] - keffs[0]) < 1e-5, "Newton-Krylov keff differs"
+    assert np.isclose(fluxes[1], fluxes[0], atol=1e-4).all(), "flux differs"
+
+
 @pytest.mark.sphere1d
 @pytest.mark.power_iteration
 def test_ud2o_1_0_sphere():
@@ -167,6 +254,65 @@ def test_pu_2_0_slab(boundary):
     assert abs(keff - 1.0) < 2e-3, str(keff) + " not critical"
 
 
+@pytest.mark.slab1d
+@pytest.mark.power_iteration
+def test_pu_2_0_slab_chi():
+    solver = SolverData()
+    quadrature = ants.angular_x(angles=20, bc_x=[0, 1])
+    materials, geometry = benchmarks.PU_2_0(100, [0, 1], 1)
+    materials.chi = np.array([[0.425, 0.575]])
+    materials.fission = np.array([[2.93 * 0.08544, 3.10 * 0.0936]])
+    _, keff = k_criticality(materials, geometry, quadrature, solver)
+    assert abs(keff - 1.0) < 2e-3, str(keff) + " not critical"
+
+
+@pytest.mark.slab1d
+@pytest.mark.power_iteration
+def test_pu_2_0_slab_inner_tolerance():
+    quadrature = ants.angular_x(angles=20, bc_x=[0, 1])
+    keffs = []
+    for inner_tolerance in (InnerTolerance.FIXED, InnerTolerance.ADAPTIVE):
+        materials, geometry = benchmarks.PU_2_0(100, [0, 1], 1)
+        solver = SolverData(inner_tolerance=inner_tolerance)
+        _, keff = k_criticality(materials, geometry, quadrature, solver)
+        keffs.append(keff)
+    assert abs(keffs[1] - 1.0) < 2e-3, str(keffs[1]) + " not critical"
+    assert abs(keffs[1] - keffs[0]) < 1e-5, "adaptive keff differs"
+
+
+@pytest.mark.slab1d
+@pytest.mark.power_iteration
+def test_pu_2_0_slab_warm_start(caplog):
+    caplog.set_level(logging.INFO, logger="ants.critical1d")
+    quadrature = ants.angular_x(angles=16, bc_x=[0, 1])
+    materials, geometry = benchmarks.PU_2_0(100, [0, 1], 1)
+    flux, keff = k_criticality(materials, geometry, quadrature, SolverData())
+    cold = sum(rec.message.startswith("Count") for rec in caplog.records)
+    # Restart from the converged flux and keff
+    caplog.clear()
+    solver = SolverData(flux_guess=flux, keff_guess=keff)
+    warm_flux, warm_keff = k_criticality(materials, geometry, quadrature, solver)
+    warm = sum(rec.message.startswith("Count") for rec in caplog.records)
+    assert abs(warm_keff - keff) < 1e-6, "warm started keff differs"
+    assert np.isclose(warm_flux, flux, atol=1e-5).all(), "warm started flux differs"
+    assert 3 * warm < cold, "outer iterations " + str([cold, warm])
+
+
+@pytest.mark.slab1d
+@pytest.mark.power_iteration
+def test_pu_2_0_slab_seed():
+    quadrature = ants.angular_x(angles=16, bc_x=[0, 1])
+    materials, geometry = benchmarks.PU_2_0(100, [0, 1], 1)
+    solver = SolverData(max_iter_keff=3)
+    fluxes = []
+    for seed in (7, 7, 8):
+        solver.seed = seed
+        flux, _ = k_criticality(materials, geometry, quadrature, solver)
+        fluxes.append(flux)
+    assert np.array_equal(fluxes[0], fluxes[1]), "seeded start not reproducible"
+    assert not np.array_equal(fluxes[0], fluxes[2]), "seed ignored"
+
+
 @pytest.mark.smoke
 @pytest.mark.sphere1d
 @pytest.mark.power_iteration
@@ -235,6 +381,18 @@ def test_urra_2_0_slab(boundary):
     assert abs(keff - 1.0) < 2e-3, str(keff) + " not critical"
 
 
+@pytest.mark.slab1d
+@pytest.mark.power_iteration
+@pytest.mark.parametrize(("boundary"), [[0, 1], [1, 0]])
+def test_urra_2_0_slab_reflector_waves(boundary):
+    # The lagged reflector runs out of inner iterations on this problem
+    solver = SolverData(reflector=ReflectorUpdate.WAVES)
+    quadrature = ants.angular_x(angles=16, bc_x=boundary)
+    materials, geometry = benchmarks.URRa_2_0(100, boundary, 1)
+    _, keff = k_criticality(materials, geometry, quadrature, solver)
+    assert abs(keff - 1.0) < 5e-4, str(keff) + " not critical"
+
+
 @pytest.mark.sphere1d
 @pytest.mark.power_iteration
 def test_urra_2_0_sphere():
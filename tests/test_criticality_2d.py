@@ -10,6 +10,7 @@
 ########################################################################
 
 
+import logging
 import os
 
 import numpy as np
@@ -17,7 +18,13 @@ import pytest
 
 import ants
 from ants.critical2d import k_criticality
-from ants.datatypes import GeometryData, MaterialData, SolverData
+from ants.datatypes import (
+    EigenAcceleration,
+    EigenSolver,
+    GeometryData,
+    MaterialData,
+    SolverData,
+)
 from tests import criticality_benchmarks as benchmarks
 
 PATH = "data/weight_matrix_2d/"
@@ -128,7 +135,80 @@ def test_pu_2_0_infinite_x(bc_y):
 
 @pytest.mark.slab2d
 @pytest.mark.power_iteration
-def test_two_group_twigl():
+def test_pu_2_0_square_newton():
+    cells = 40
+    length = 4.0
+    bc = [1, 0]
+    quadrature = ants.angular_xy(angles=6, bc_x=bc, bc_y=bc)
+    mat_data, _ = benchmarks.PU_2_0(cells, bc, 1)
+    geometry = GeometryData(
+        medium_map=np.zeros((cells, cells), dtype=np.int32),
+        delta_x=np.repeat(length / cells, cells),
+        delta_y=np.repeat(length / cells, cells),
+        bc_x=bc,
+        bc_y=bc,
+        geometry=3,
+    )
+    fluxes = []
+    keffs = []
+    for eigen_solver in (EigenSolver.POWER_ITERATION, EigenSolver.NEWTON_KRYLOV):
+        solver = SolverData(eigen_solver=eigen_solver, tol_keff=1e-8)
+        flux, keff = k_criticality(mat_data, geometry, quadrature, solver)
+        fluxes.append(flux)
+        keffs.append(keff)
+    assert abs(keffs[1] - keffs[0]) < 1e-6, "Newton-Krylov keff differs"
+    assert np.isclose(fluxes[1], fluxes[0], atol=1e-5).all(), "flux differs"
+
+
+@pytest.mark.slab2d
+@pytest.mark.power_iteration
+def test_pu_2_0_square_warm_start(caplog):
+    caplog.set_level(logging.INFO, logger="ants.critical2d")
+    cells = 40
+    length = 4.0
+    bc = [1, 0]
+    quadrature = ants.angular_xy(angles=6, bc_x=bc, bc_y=bc)
+    mat_data, _ = benchmarks.PU_2_0(cells, bc, 1)
+    geometry = GeometryData(
+        medium_map=np.zeros((cells, cells), dtype=np.int32),
+        delta_x=np.repeat(length / cells, cells),
+        delta_y=np.repeat(length / cells, cells),
+        bc_x=bc,
+        bc_y=bc,
+        geometry=3,
+    )
+    # Seeded starts are reproducible
+    fluxes = []
+    for _ in range(2):
+        solver = SolverData(seed=3, max_iter_keff=2)
+        flux, _ = k_criticality(mat_data, geometry, quadrature, solver)
+        fluxes.append(flux)
+    assert np.array_equal(fluxes[0], fluxes[1]), "seeded start not reproducible"
+    # Restart from the converged flux and keff
+    outers = []
+    keffs = []
+    solver = SolverData(tol_keff=1e-8)
+    for _ in range(2):
+        caplog.clear()
+        flux, keff = k_criticality(mat_data, geometry, quadrature, solver)
+        outers.append(sum(rec.message.startswith("Count") for rec in caplog.records))
+        keffs.append(keff)
+        solver = SolverData(flux_guess=flux, keff_guess=keff, tol_keff=1e-8)
+    assert abs(keffs[1] - keffs[0]) < 1e-6, "warm started keff differs"
+    assert 3 * outers[1] < outers[0], "outer iterations " + str(outers)
+
+
+@pytest.mark.slab2d
+@pytest.mark.power_iteration
+@pytest.mark.parametrize(
+    ("acceleration"),
+    [
+        EigenAcceleration.NONE,
+        EigenAcceleration.CMFD,
+        EigenAcceleration.CHEBYSHEV,
+    ],
+)
+def test_two_group_twigl(acceleration):
     # Material Properties
     cells_x = 80
     cells_y = 80
@@ -184,7 +264,7 @@ def test_two_group_twigl():
         geometry=3,
     )
     quadrature = ants.angular_xy(angles, bc_x=bc_x, bc_y=bc_y)
-    solver = SolverData()
+    solver = SolverData(eigen_acceleration=acceleration)
 
     _, keff = k_criticality(mat_data, geometry, quadrature, solver)
     reference_keff = 0.917507
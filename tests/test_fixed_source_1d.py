@@ -11,13 +11,22 @@
 # diamond difference and step method, and for calculating at cell edges.
 #
 ########################################################################
+import logging
 import os
 
 import numpy as np
 import pytest
 
+from ants.datatypes import (
+    FactoredSource,
+    FluxOutput,
+    InnerSolver,
+    MultigroupSolver,
+    UpscatterAcceleration,
+)
 from ants.fixed1d import fixed_source
 from ants.utils import manufactured_1d as mms
+from ants.utils.pytools import StreamingDMD
 from tests import problems1d
 
 ANGULAR = [True, False]
@@ -132,6 +141,64 @@ def test_manufactured_05(angular, edges, spatial):
     assert np.isclose(flux[(..., 0)], exact, atol=atol).all(), "Incorrect flux"
 
 
+@pytest.mark.slab1d
+@pytest.mark.source_iteration
+@pytest.mark.parametrize("spatial", SPATIAL)
+def test_manufactured_04_dsa(spatial):
+    mat_data, sources, geo, quadrature, solver = problems1d.manufactured_ss_04(400, 4)
+    geo.space_disc = spatial
+    solver.angular = False
+    solver.inner_solver = InnerSolver.DSA
+    flux = fixed_source(mat_data, sources, geo, quadrature, solver)
+
+    edges_x = np.concatenate(([0], np.cumsum(geo.delta_x)))
+    centers_x = 0.5 * (edges_x[1:] + edges_x[:-1])
+    exact = mms.solution_ss_04(centers_x, quadrature.angle_x)
+    exact = np.sum(exact * quadrature.angle_w[None, :], axis=1)
+    atol = 1e-4 if spatial == 2 else 1e-2
+    assert np.isclose(flux[(..., 0)], exact, atol=atol).all(), "Incorrect flux"
+
+
+@pytest.mark.slab1d
+@pytest.mark.source_iteration
+@pytest.mark.parametrize(("angular", "edges"), [(True, 0), (True, 1), (False, 1)])
+@pytest.mark.parametrize("spatial", SPATIAL)
+def test_manufactured_04_capture(angular, edges, spatial):
+    mat_data, sources, geo, quadrature, solver = problems1d.manufactured_ss_04(400, 4)
+    solver.angular = angular
+    geo.space_disc = spatial
+    solver.flux_at_edges = edges
+    solver.flux_output = FluxOutput.CAPTURE
+    flux = fixed_source(mat_data, sources, geo, quadrature, solver)
+
+    edges_x = np.concatenate(([0], np.cumsum(geo.delta_x)))
+    centers_x = 0.5 * (edges_x[1:] + edges_x[:-1])
+    space_x = edges_x.copy() if edges else centers_x.copy()
+    exact = mms.solution_ss_04(space_x, quadrature.angle_x)
+    if not angular:
+        exact = np.sum(exact * quadrature.angle_w[None, :], axis=1)
+    atol = 1e-4 if spatial == 2 else 1e-2
+    assert np.isclose(flux[(..., 0)], exact, atol=atol).all(), "Incorrect flux"
+
+
+@pytest.mark.slab1d
+@pytest.mark.source_iteration
+@pytest.mark.parametrize("spatial", SPATIAL)
+def test_manufactured_04_krylov(spatial):
+    mat_data, sources, geo, quadrature, solver = problems1d.manufactured_ss_04(400, 4)
+    geo.space_disc = spatial
+    solver.angular = False
+    solver.mg_solver = MultigroupSolver.KRYLOV
+    flux = fixed_source(mat_data, sources, geo, quadrature, solver)
+
+    edges_x = np.concatenate(([0], np.cumsum(geo.delta_x)))
+    centers_x = 0.5 * (edges_x[1:] + edges_x[:-1])
+    exact = mms.solution_ss_04(centers_x, quadrature.angle_x)
+    exact = np.sum(exact * quadrature.angle_w[None, :], axis=1)
+    atol = 1e-4 if spatial == 2 else 1e-2
+    assert np.isclose(flux[(..., 0)], exact, atol=atol).all(), "Incorrect flux"
+
+
 @pytest.mark.sphere1d
 @pytest.mark.source_iteration
 @pytest.mark.multigroup1d
@@ -142,3 +209,124 @@ def test_sphere_01_source_iteration():
     path = os.path.join(problems1d.PATH, "uranium_sphere_source_iteration_flux.npy")
     reference = np.load(path)
     assert np.isclose(flux, reference).all()
+
+
+@pytest.mark.slab1d
+@pytest.mark.source_iteration
+@pytest.mark.parametrize(("boundary"), [[0, 0], [0, 1]])
+def test_reeds_warm_start(boundary, caplog):
+    caplog.set_level(logging.INFO, logger="ants.multi_group_1d")
+    mat_data, sources, geometry, quadrature, solver = problems1d.reeds(boundary)
+    sweeps = []
+    fluxes = []
+    for flux_guess in (None, "reference"):
+        solver.flux_guess = fluxes[0] if flux_guess else None
+        caplog.clear()
+        fluxes.append(fixed_source(mat_data, sources, geometry, quadrature, solver))
+        sweeps.append(sum(rec.args[1] for rec in caplog.records
+                          if rec.msg.startswith("Source iteration")))
+    assert np.isclose(fluxes[1], fluxes[0], atol=1e-8).all(), "Incorrect flux"
+    assert 4 * sweeps[1] < sweeps[0], "warm started sweeps " + str(sweeps)
+
+
+@pytest.mark.sphere1d
+@pytest.mark.source_iteration
+@pytest.mark.multigroup1d
+def test_sphere_01_krylov():
+    mat_data, sources, geometry, quadrature, solver, _ = problems1d.sphere_01("fixed")
+    solver.mg_solver = MultigroupSolver.KRYLOV
+
+    flux = fixed_source(mat_data, sources, geometry, quadrature, solver)
+    path = os.path.join(problems1d.PATH, "uranium_sphere_source_iteration_flux.npy")
+    reference = np.load(path)
+    assert np.isclose(flux, reference).all()
+
+
+@pytest.mark.slab1d
+@pytest.mark.source_iteration
+@pytest.mark.parametrize(
+    ("mg_solver"), [MultigroupSolver.SOURCE_ITERATION, MultigroupSolver.DMD]
+)
+def test_thermal_upscatter_two_grid(mg_solver):
+    mat_data, sources, geometry, quadrature, solver = (
+        problems1d.thermal_upscatter(100, 4)
+    )
+    solver.tol_energy = 1e-13
+    reference = fixed_source(mat_data, sources, geometry, quadrature, solver)
+
+    solver.tol_energy = 1e-08
+    solver.mg_solver = mg_solver
+    solver.upscatter_acceleration = UpscatterAcceleration.TWO_GRID
+    flux = fixed_source(mat_data, sources, geometry, quadrature, solver)
+    assert np.isclose(flux, reference, rtol=1e-6, atol=0.0).all(), "Incorrect flux"
+
+
+@pytest.mark.slab1d
+@pytest.mark.source_iteration
+@pytest.mark.parametrize(
+    ("mg_solver"), [MultigroupSolver.SOURCE_ITERATION, MultigroupSolver.DMD]
+)
+def test_thermal_upscatter_factored_source(mg_solver):
+    mat_data, sources, geometry, quadrature, solver = (
+        problems1d.thermal_upscatter(100, 4)
+    )
+    solver.mg_solver = mg_solver
+    # Rank 2 source of space x angle x energy terms
+    rng = np.random.default_rng(0)
+    factored = FactoredSource(
+        rng.random((2,) + sources.external.shape[:-2]),
+        rng.random((2, quadrature.angle_x.size)),
+        rng.random((2, mat_data.total.shape[1])),
+    )
+    sources.external = factored.dense()
+    reference = fixed_source(mat_data, sources, geometry, quadrature, solver)
+    sources.external = factored
+    flux = fixed_source(mat_data, sources, geometry, quadrature, solver)
+    assert np.isclose(flux, reference, rtol=1e-12, atol=0.0).all(), "Incorrect flux"
+
+    # Angular flux takes the dense source
+    solver.angular = True
+    solver.mg_solver = MultigroupSolver.SOURCE_ITERATION
+    angular = fixed_source(mat_data, sources, geometry, quadrature, solver)
+    sources.external = factored.dense()
+    reference = fixed_source(mat_data, sources, geometry, quadrature, solver)
+    assert np.isclose(angular, reference).all(), "Incorrect angular flux"
+
+
+@pytest.mark.slab1d
+@pytest.mark.source_iteration
+@pytest.mark.parametrize(("bc_x"), [[1, 0], [0, 1], [1, 1]])
+def test_thermal_upscatter_krylov_reflected(bc_x):
+    mat_data, sources, geometry, quadrature, solver = (
+        problems1d.thermal_upscatter(100, 4)
+    )
+    geometry.bc_x = bc_x
+    solver.tol_energy = 1e-10
+    reference = fixed_source(mat_data, sources, geometry, quadrature, solver)
+
+    solver.mg_solver = MultigroupSolver.KRYLOV
+    flux = fixed_source(mat_data, sources, geometry, quadrature, solver)
+    assert np.isclose(flux, reference, rtol=1e-6, atol=0.0).all(), "Incorrect flux"
+
+
+@pytest.mark.slab1d
+@pytest.mark.source_iteration
+def test_streaming_dmd_linear_iteration():
+    # DMD of a linear fixed point iteration with more snapshots than
+    # unknowns recovers the fixed point, up to the energy truncation
+    rng = np.random.default_rng(0)
+    cells_x, groups = 4, 2
+    matrix = rng.random((cells_x * groups, cells_x * groups))
+    matrix *= 0.9 / np.max(np.abs(np.linalg.eigvals(matrix)))
+    source = rng.random(cells_x * groups)
+    reference = np.linalg.solve(np.eye(cells_x * groups) - matrix, source)
+
+    dmd = StreamingDMD(12)
+    flux_old = np.zeros((cells_x, groups))
+    for _ in range(12):
+        flux = (matrix @ flux_old.ravel() + source).reshape(cells_x, groups)
+        dmd.update(flux, flux_old)
+        flux_old = flux
+    assert dmd.basis.shape[1] <= cells_x * groups, "basis not truncated"
+    flux = dmd.extrapolate(flux_old)
+    assert np.isclose(flux.ravel(), reference, rtol=1e-5).all(), "Incorrect flux"
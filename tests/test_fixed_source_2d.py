@@ -13,6 +13,13 @@
 import numpy as np
 import pytest
 
+from ants.datatypes import (
+    FactoredSource,
+    FluxOutput,
+    InnerSolver,
+    MultigroupSolver,
+    UpscatterAcceleration,
+)
 from ants.fixed2d import fixed_source
 from ants.utils import manufactured_2d as mms
 from tests import problems2d
@@ -117,3 +124,157 @@ def test_manufactured_04(angular, spatial):
     assert np.isclose(
         flux[(..., 0)], exact[(..., 0)], atol=atol
     ).all(), "Incorrect flux"
+
+
+@pytest.mark.slab2d
+@pytest.mark.source_iteration
+@pytest.mark.parametrize("spatial", SPATIAL)
+def test_manufactured_04_capture(spatial):
+    mat_data, sources, geometry, quadrature, solver, edges_x, edges_y = (
+        problems2d.manufactured_ss_04(200, 4)
+    )
+    solver.angular = True
+    solver.flux_output = FluxOutput.CAPTURE
+    geometry.space_disc = spatial
+    flux = fixed_source(mat_data, sources, geometry, quadrature, solver)
+
+    centers_x = 0.5 * (edges_x[1:] + edges_x[:-1])
+    centers_y = 0.5 * (edges_y[1:] + edges_y[:-1])
+    exact = mms.solution_ss_04(
+        centers_x, centers_y, quadrature.angle_x, quadrature.angle_y
+    )
+    atol = 1e-5 if spatial == 2 else 5e-3
+    assert np.isclose(
+        flux[(..., 0)], exact[(..., 0)], atol=atol
+    ).all(), "Incorrect flux"
+
+
+@pytest.mark.slab2d
+@pytest.mark.source_iteration
+@pytest.mark.parametrize("spatial", SPATIAL)
+def test_manufactured_04_dsa(spatial):
+    mat_data, sources, geometry, quadrature, solver, edges_x, edges_y = (
+        problems2d.manufactured_ss_04(200, 4)
+    )
+    solver.angular = False
+    solver.inner_solver = InnerSolver.DSA
+    geometry.space_disc = spatial
+    flux = fixed_source(mat_data, sources, geometry, quadrature, solver)
+
+    centers_x = 0.5 * (edges_x[1:] + edges_x[:-1])
+    centers_y = 0.5 * (edges_y[1:] + edges_y[:-1])
+    exact = mms.solution_ss_04(
+        centers_x, centers_y, quadrature.angle_x, quadrature.angle_y
+    )
+    exact = np.sum(exact * quadrature.angle_w[None, None, :, None], axis=2)
+    atol = 1e-5 if spatial == 2 else 5e-3
+    assert np.isclose(
+        flux[(..., 0)], exact[(..., 0)], atol=atol
+    ).all(), "Incorrect flux"
+
+
+@pytest.mark.slab2d
+@pytest.mark.source_iteration
+@pytest.mark.parametrize("spatial", SPATIAL)
+def test_manufactured_04_krylov(spatial):
+    mat_data, sources, geometry, quadrature, solver, edges_x, edges_y = (
+        problems2d.manufactured_ss_04(200, 4)
+    )
+    solver.angular = False
+    solver.mg_solver = MultigroupSolver.KRYLOV
+    geometry.space_disc = spatial
+    flux = fixed_source(mat_data, sources, geometry, quadrature, solver)
+
+    centers_x = 0.5 * (edges_x[1:] + edges_x[:-1])
+    centers_y = 0.5 * (edges_y[1:] + edges_y[:-1])
+    exact = mms.solution_ss_04(
+        centers_x, centers_y, quadrature.angle_x, quadrature.angle_y
+    )
+    exact = np.sum(exact * quadrature.angle_w[None, None, :, None], axis=2)
+    atol = 1e-5 if spatial == 2 else 5e-3
+    assert np.isclose(
+        flux[(..., 0)], exact[(..., 0)], atol=atol
+    ).all(), "Incorrect flux"
+
+
+@pytest.mark.smoke
+@pytest.mark.slab2d
+@pytest.mark.source_iteration
+@pytest.mark.parametrize("spatial", SPATIAL)
+def test_cell_materials(spatial):
+    # One material per cell skips the sweep coefficient tables
+    mat_data, sources, geometry, quadrature, solver, _, _ = (
+        problems2d.manufactured_ss_01(20, 2)
+    )
+    geometry.space_disc = spatial
+    reference = fixed_source(mat_data, sources, geometry, quadrature, solver)
+
+    cells = geometry.medium_map.size
+    mat_data.total = np.repeat(mat_data.total, cells, axis=0)
+    mat_data.scatter = np.repeat(mat_data.scatter, cells, axis=0)
+    mat_data.fission = np.repeat(mat_data.fission, cells, axis=0)
+    geometry.medium_map = np.arange(cells, dtype=np.int32).reshape(20, 20)
+    flux = fixed_source(mat_data, sources, geometry, quadrature, solver)
+    assert np.allclose(flux, reference, atol=1e-12), "Incorrect flux"
+
+
+@pytest.mark.slab2d
+@pytest.mark.source_iteration
+@pytest.mark.parametrize(
+    ("mg_solver"), [MultigroupSolver.SOURCE_ITERATION, MultigroupSolver.DMD]
+)
+def test_thermal_upscatter_two_grid(mg_solver):
+    mat_data, sources, geometry, quadrature, solver = (
+        problems2d.thermal_upscatter(20, 4)
+    )
+    solver.tol_energy = 1e-13
+    reference = fixed_source(mat_data, sources, geometry, quadrature, solver)
+
+    solver.tol_energy = 1e-08
+    solver.mg_solver = mg_solver
+    solver.upscatter_acceleration = UpscatterAcceleration.TWO_GRID
+    flux = fixed_source(mat_data, sources, geometry, quadrature, solver)
+    assert np.isclose(flux, reference, rtol=1e-6, atol=0.0).all(), "Incorrect flux"
+
+
+@pytest.mark.slab2d
+@pytest.mark.source_iteration
+@pytest.mark.parametrize(
+    ("mg_solver"), [MultigroupSolver.SOURCE_ITERATION, MultigroupSolver.DMD]
+)
+def test_thermal_upscatter_factored_source(mg_solver):
+    mat_data, sources, geometry, quadrature, solver = (
+        problems2d.thermal_upscatter(20, 4)
+    )
+    solver.mg_solver = mg_solver
+    # Rank 2 source of space x angle x energy terms
+    rng = np.random.default_rng(0)
+    factored = FactoredSource(
+        rng.random((2,) + sources.external.shape[:-2]),
+        rng.random((2, quadrature.angle_x.size)),
+        rng.random((2, mat_data.total.shape[1])),
+    )
+    sources.external = factored.dense()
+    reference = fixed_source(mat_data, sources, geometry, quadrature, solver)
+    sources.external = factored
+    flux = fixed_source(mat_data, sources, geometry, quadrature, solver)
+    assert np.isclose(flux, reference, rtol=1e-12, atol=0.0).all(), "Incorrect flux"
+
+
+@pytest.mark.slab2d
+@pytest.mark.source_iteration
+@pytest.mark.parametrize(
+    ("bc_x", "bc_y"), [([1, 0], [0, 0]), ([0, 0], [0, 1]), ([1, 1], [1, 1])]
+)
+def test_thermal_upscatter_krylov_reflected(bc_x, bc_y):
+    mat_data, sources, geometry, quadrature, solver = (
+        problems2d.thermal_upscatter(10, 4)
+    )
+    geometry.bc_x = bc_x
+    geometry.bc_y = bc_y
+    solver.tol_energy = 1e-10
+    reference = fixed_source(mat_data, sources, geometry, quadrature, solver)
+
+    solver.mg_solver = MultigroupSolver.KRYLOV
+    flux = fixed_source(mat_data, sources, geometry, quadrature, solver)
+    assert np.isclose(flux, reference, rtol=1e-4, atol=0.0).all(), "Incorrect flux"
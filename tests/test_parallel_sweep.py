@@ -30,6 +30,7 @@ from ants.datatypes import (
     GeometryData,
     MaterialData,
     ParallelType,
+    ReflectorUpdate,
     SolverData,
     SourceData,
     TimeDependentData,
@@ -37,6 +38,7 @@ from ants.datatypes import (
 from ants.fixed1d import fixed_source as fixed_source_1d
 from ants.fixed2d import fixed_source as fixed_source_2d
 from ants.timed1d import time_dependent as timed_1d
+from ants.utils import mesh2d
 from tests import problems1d, problems2d
 
 N_CPUS = os.cpu_count()
@@ -419,6 +421,289 @@ def test_multigroup_1d_speedup():
     )
 
 
+def _multigroup_problem_2d(n_cells, n_angles, n_groups):
+    """Build a simple 2D fixed-source multigroup problem.
+
+    Single material with within-group scatter and downscatter into the next
+    group, so the Jacobi (GROUP/BOTH) and Gauss-Seidel (ANGLE) iterations
+    converge to the same flux. No fission, vacuum boundary conditions.
+    """
+    scatter = np.zeros((1, n_groups, n_groups))
+    for g in range(n_groups):
+        scatter[0, g, g] = 0.5
+        if g > 0:
+            scatter[0, g, g - 1] = 0.2
+
+    mat_data = MaterialData(
+        total=np.ones((1, n_groups)),
+        scatter=scatter,
+        fission=np.zeros((1, n_groups, n_groups)),
+    )
+    sources = SourceData(
+        external=np.ones((n_cells, n_cells, 1, n_groups)),
+        boundary_x=np.zeros((2, 1, 1, n_groups)),
+        boundary_y=np.zeros((2, 1, 1, n_groups)),
+    )
+    geo = GeometryData(
+        medium_map=np.zeros((n_cells, n_cells), dtype=np.int32),
+        delta_x=np.repeat(1.0 / n_cells, n_cells),
+        delta_y=np.repeat(1.0 / n_cells, n_cells),
+        geometry=ants.datatypes.Geometry.SLAB2D,
+    )
+    quadrature = ants.angular_xy(n_angles)
+    return mat_data, sources, geo, quadrature
+
+
+@pytest.mark.smoke
+@pytest.mark.parametrize("parallel", [ParallelType.GROUP, ParallelType.BOTH])
+def test_multigroup_2d_correctness(parallel):
+    """Group-parallel (Jacobi) 2D multigroup result matches serial Gauss-Seidel."""
+    mat_data, sources, geo, quadrature = _multigroup_problem_2d(
+        n_cells=20, n_angles=4, n_groups=8
+    )
+
+    solver_1 = SolverData(num_threads=1, tol_energy=1e-10, max_iter_energy=500)
+    solver_n = SolverData(
+        num_threads=max(N_CPUS, 2),
+        parallel=parallel,
+        tol_energy=1e-10,
+        max_iter_energy=500,
+    )
+
+    flux_1 = fixed_source_2d(mat_data, sources, geo, quadrature, solver_1)
+    flux_n = fixed_source_2d(mat_data, sources, geo, quadrature, solver_n)
+
+    assert np.allclose(flux_1, flux_n, atol=1e-8), (
+        f"2D multigroup {parallel.name} flux differs from serial Gauss-Seidel "
+        f"(max_diff={np.abs(flux_1 - flux_n).max():.2e})"
+    )
+
+
+@pytest.mark.smoke
+@pytest.mark.parametrize("spatial", [1, 2])
+def test_multigroup_group_block_correctness(spatial):
+    """Group-batched Jacobi sweeps match Gauss-Seidel with reflectors.
+
+    24 groups on two threads gives blocks of eight groups per sweep.
+    """
+    kwargs = dict(tol_energy=1e-12, max_iter_energy=500)
+    solver_1 = SolverData(num_threads=1, **kwargs)
+    solver_n = SolverData(num_threads=2, parallel=ParallelType.GROUP, **kwargs)
+
+    mat_data, sources, geo, quadrature = _multigroup_problem_1d(
+        n_cells=40, n_angles=8, n_groups=24
+    )
+    mat_data.total = mat_data.total * np.linspace(0.5, 2.0, 24)
+    geo.space_disc = spatial
+    geo.bc_x = [1, 0]
+    flux_1 = fixed_source_1d(mat_data, sources, geo, quadrature, solver_1)
+    flux_n = fixed_source_1d(mat_data, sources, geo, quadrature, solver_n)
+    assert np.allclose(flux_1, flux_n, atol=1e-9), "1D group block flux differs"
+
+    mat_data, sources, geo, quadrature = _multigroup_problem_2d(
+        n_cells=16, n_angles=4, n_groups=24
+    )
+    mat_data.total = mat_data.total * np.linspace(0.5, 2.0, 24)
+    geo.space_disc = spatial
+    geo.bc_y = [0, 1]
+    flux_1 = fixed_source_2d(mat_data, sources, geo, quadrature, solver_1)
+    flux_n = fixed_source_2d(mat_data, sources, geo, quadrature, solver_n)
+    assert np.allclose(flux_1, flux_n, atol=1e-9), "2D group block flux differs"
+
+
+@pytest.mark.smoke
+@pytest.mark.parametrize(
+    "parallel",
+    [
+        ParallelType.ANGLE,
+        ParallelType.GROUP,
+        ParallelType.SPACE,
+        ParallelType.SPACE_ANGLE,
+    ],
+)
+def test_reflector_waves_correctness(parallel):
+    """Reflector waves converge to the lagged reflector solution."""
+    kwargs = dict(tol_energy=1e-12, max_iter_energy=500, max_iter_angular=500)
+    solver_1 = SolverData(num_threads=1, **kwargs)
+    solver_n = SolverData(
+        num_threads=max(N_CPUS, 3),
+        parallel=parallel,
+        reflector=ReflectorUpdate.WAVES,
+        **kwargs,
+    )
+
+    mat_data, sources, geo, quadrature = _multigroup_problem_1d(
+        n_cells=40, n_angles=8, n_groups=4
+    )
+    geo.bc_x = [1, 0]
+    flux_1 = fixed_source_1d(mat_data, sources, geo, quadrature, solver_1)
+    flux_n = fixed_source_1d(mat_data, sources, geo, quadrature, solver_n)
+    assert np.allclose(flux_1, flux_n, atol=1e-9), "1D reflector waves differ"
+
+    mat_data, sources, geo, quadrature = _multigroup_problem_2d(
+        n_cells=16, n_angles=4, n_groups=4
+    )
+    for bc_x, bc_y in [([1, 0], [1, 0]), ([0, 1], [1, 1])]:
+        geo.bc_x = bc_x
+        geo.bc_y = bc_y
+        flux_1 = fixed_source_2d(mat_data, sources, geo, quadrature, solver_1)
+        flux_n = fixed_source_2d(mat_data, sources, geo, quadrature, solver_n)
+        assert np.allclose(flux_1, flux_n, atol=1e-9), (
+            f"2D reflector waves differ for bc_x={bc_x}, bc_y={bc_y} "
+            f"(max_diff={np.abs(flux_1 - flux_n).max():.2e})"
+        )
+
+
+@pytest.mark.skipif(N_CPUS < 2, reason="Speedup test requires at least 2 CPUs")
+@pytest.mark.skipif(
+    _UNDER_XDIST, reason="Speedup tests unreliable under pytest-xdist (-n auto)"
+)
+@pytest.mark.parametrize("n_threads", [2, 4, 8])
+def test_multigroup_2d_group_scaling(n_threads):
+    """GROUP mode outpaces ANGLE mode when groups >> angles.
+
+    The group prange runs without the GIL, so each thread sweeps its own
+    groups concurrently.  With S2 (4 ordinates) the ANGLE prange has at most
+    four angles to share out, while GROUP mode spreads 64 groups across all
+    threads.
+    """
+    if n_threads > N_CPUS:
+        pytest.skip(f"Requires {n_threads} CPUs")
+
+    N_GROUPS = 64
+    mat_data, sources, geo, quadrature = _multigroup_problem_2d(
+        n_cells=60, n_angles=2, n_groups=N_GROUPS
+    )
+    solver_angle = SolverData(
+        num_threads=n_threads, parallel=ParallelType.ANGLE, tol_energy=1e-8
+    )
+    solver_group = SolverData(
+        num_threads=n_threads, parallel=ParallelType.GROUP, tol_energy=1e-8
+    )
+
+    # Warm up
+    fixed_source_2d(mat_data, sources, geo, quadrature, solver_angle)
+    fixed_source_2d(mat_data, sources, geo, quadrature, solver_group)
+
+    def _tmin(solver, reps=3):
+        best = float("inf")
+        for _ in range(reps):
+            t0 = time.perf_counter()
+            fixed_source_2d(mat_data, sources, geo, quadrature, solver)
+            best = min(best, time.perf_counter() - t0)
+        return best
+
+    t_angle = _tmin(solver_angle)
+    t_group = _tmin(solver_group)
+
+    speedup = t_angle / t_group
+    assert speedup >= 1.2, (
+        f"GROUP speedup over ANGLE {speedup:.2f}× is below 1.2× threshold "
+        f"(angle={t_angle:.3f}s, group={t_group:.3f}s, threads={n_threads})"
+    )
+
+
+########################################################################
+# Spatial (wavefront) parallelism - correctness and strong scaling
+########################################################################
+
+
+def _c5g7_problem_2d(cells, n_angles):
+    """One-group fixed-source problem on the C5G7 medium map.
+
+    Seven materials with made-up cross sections and a uniform source; only
+    the geometry and the mesh size matter for the sweep timing.
+    """
+    medium_map = mesh2d.c5g7(cells_x=cells, cells_y=cells)
+    delta = np.repeat(64.26 / cells, cells)
+    xs_total = np.array([[1.0], [0.6], [0.7], [0.7], [0.7], [1.1], [1.1]])
+
+    mat_data = MaterialData(
+        total=xs_total,
+        scatter=0.5 * xs_total[:, :, None],
+        fission=np.zeros((7, 1, 1)),
+    )
+    sources = SourceData(
+        external=np.ones((cells, cells, 1, 1)),
+        boundary_x=np.zeros((2, cells, 1, 1)),
+        boundary_y=np.zeros((2, cells, 1, 1)),
+    )
+    geo = GeometryData(
+        medium_map=medium_map,
+        delta_x=delta,
+        delta_y=delta,
+        geometry=ants.datatypes.Geometry.SLAB2D,
+    )
+    quadrature = ants.angular_xy(n_angles)
+    return mat_data, sources, geo, quadrature
+
+
+@pytest.mark.smoke
+@pytest.mark.parametrize("parallel", [ParallelType.SPACE, ParallelType.SPACE_ANGLE])
+@pytest.mark.parametrize("spatial", SPATIAL)
+def test_2d_space_correctness(parallel, spatial):
+    """Wavefront sweep matches the angle-parallel sweep with reflectors."""
+    mat_data, sources, geo, quadrature, _, _, _ = problems2d.manufactured_ss_03(40, 4)
+    geo.space_disc = spatial
+    geo.bc_x = [1, 0]
+    geo.bc_y = [0, 1]
+
+    solver_1 = _solver_1t()
+    solver_n = SolverData(num_threads=max(N_CPUS, 3), parallel=parallel)
+
+    flux_1 = fixed_source_2d(mat_data, sources, geo, quadrature, solver_1)
+    flux_n = fixed_source_2d(mat_data, sources, geo, quadrature, solver_n)
+
+    assert np.allclose(flux_1, flux_n, atol=1e-12), (
+        f"2D {parallel.name} flux differs from serial "
+        f"(max_diff={np.abs(flux_1 - flux_n).max():.2e})"
+    )
+
+
+@pytest.mark.skipif(N_CPUS < 2, reason="Speedup test requires at least 2 CPUs")
+@pytest.mark.skipif(
+    _UNDER_XDIST, reason="Speedup tests unreliable under pytest-xdist (-n auto)"
+)
+@pytest.mark.parametrize("parallel", [ParallelType.SPACE, ParallelType.SPACE_ANGLE])
+@pytest.mark.parametrize("n_threads", [2, 4, 8, 16, 32])
+def test_2d_space_scaling(parallel, n_threads):
+    """Strong scaling of the wavefront sweep on the 306 x 306 C5G7 mesh.
+
+    With S4 there are only 16 ordinates (four per quadrant), so angle
+    parallelism alone cannot use more than a handful of threads.
+    """
+    if n_threads > N_CPUS:
+        pytest.skip(f"Requires {n_threads} CPUs")
+
+    mat_data, sources, geo, quadrature = _c5g7_problem_2d(306, 4)
+    kwargs = dict(max_iter_angular=10, tol_angular=0.0)
+    solver_1 = SolverData(num_threads=1, **kwargs)
+    solver_n = SolverData(num_threads=n_threads, parallel=parallel, **kwargs)
+
+    # Warm up
+    fixed_source_2d(mat_data, sources, geo, quadrature, solver_1)
+    fixed_source_2d(mat_data, sources, geo, quadrature, solver_n)
+
+    def _tmin(solver, reps=3):
+        best = float("inf")
+        for _ in range(reps):
+            t0 = time.perf_counter()
+            fixed_source_2d(mat_data, sources, geo, quadrature, solver)
+            best = min(best, time.perf_counter() - t0)
+        return best
+
+    t_serial = _tmin(solver_1)
+    t_parallel = _tmin(solver_n)
+
+    # Pipeline fill and drain cost about half the diagonals
+    speedup = t_serial / t_parallel
+    threshold = 0.35 * n_threads
+    assert speedup >= threshold, (
+        f"{parallel.name} speedup {speedup:.2f}× is below {threshold:.2f}× "
+        f"(serial={t_serial:.3f}s, parallel={t_parallel:.3f}s, threads={n_threads})"
+    )
+
+
 ########################################################################
 # Energy grid - requires ENERGY_GRID_NPZ secret
 ########################################################################
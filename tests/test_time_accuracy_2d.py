@@ -15,6 +15,7 @@ import numpy as np
 import pytest
 
 from ants import timed2d
+from ants.datatypes import TimeSource
 from ants.utils import manufactured_2d as mms
 from ants.utils import pytools as tools
 from tests import problems2d
@@ -182,6 +183,30 @@ def test_crank_nicolson_02():
         assert 2 - accuracy < atol, "Accuracy: " + str(accuracy)
 
 
+@pytest.mark.slab2d
+@pytest.mark.cn
+def test_crank_nicolson_lazy_sources():
+    steps = 10
+    edges_t = np.linspace(0, 10.0, steps + 1)
+    mat_data, sources, geometry, quadrature, solver, time_data = (
+        problems2d.manufactured_td_01(40, 4, edges_t, 1.0, temporal=2)
+    )
+    dense = timed2d.time_dependent(
+        mat_data, sources, geometry, quadrature, solver, time_data
+    )
+
+    # One step of each source in memory at a time
+    external = sources.external
+    sources.external = lambda qq: external[qq]
+    for name in ("boundary_x", "boundary_y"):
+        boundary = getattr(sources, name)
+        setattr(sources, name, TimeSource.separable(boundary[0], np.ones(steps)))
+    lazy = timed2d.time_dependent(
+        mat_data, sources, geometry, quadrature, solver, time_data
+    )
+    assert np.array_equal(lazy, dense), "Lazy sources change the flux"
+
+
 @pytest.mark.smoke
 @pytest.mark.slab2d
 @pytest.mark.bdf2
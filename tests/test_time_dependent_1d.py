@@ -9,14 +9,15 @@
 #
 ########################################################################
 
+import logging
 import os
 import tempfile
 
 import numpy as np
 import pytest
 
-from ants import fixed1d, timed1d
-from ants.datatypes import TimeDependentData
+from ants import boundary1d, fixed1d, timed1d
+from ants.datatypes import MultigroupSolver, TimeDependentData, TimeSource
 from tests import problems1d as prob
 
 
@@ -44,6 +45,123 @@ def test_reed_bdf1(boundary):
     assert np.isclose(fixed_flux[:, 0], timed_flux[:, 0]).all(), "Incorrect Flux"
 
 
+@pytest.mark.slab1d
+@pytest.mark.bdf1
+@pytest.mark.parametrize(("boundary"), [[0, 0], [1, 0]])
+def test_reed_bdf1_krylov(boundary):
+    mat_data, sources, geometry, quadrature, solver = prob.reeds(boundary)
+    solver.mg_solver = MultigroupSolver.KRYLOV
+    fixed_flux = fixed1d.fixed_source(mat_data, sources, geometry, quadrature, solver)
+
+    time_data = TimeDependentData(steps=100, dt=1.0, time_disc=1)
+    sources.external = sources.external[None, ...].copy()
+    sources.boundary_x = sources.boundary_x[None, ...].copy()
+    sources.initial_flux = np.zeros(
+        (geometry.delta_x.size, quadrature.angle_x.size, mat_data.total.shape[1])
+    )
+    timed_flux = timed1d.time_dependent(
+        mat_data, sources, geometry, quadrature, solver, time_data
+    )
+    assert np.isclose(fixed_flux[:, 0], timed_flux[:, 0]).all(), "Incorrect Flux"
+
+
+@pytest.mark.slab1d
+@pytest.mark.bdf1
+def test_thermal_upscatter_dmd_recycle(caplog):
+    caplog.set_level(logging.INFO, logger="ants.multi_group_1d")
+    fluxes = []
+    snapshots = []
+    for recycle in (False, True):
+        mat_data, sources, geometry, quadrature, solver = prob.thermal_upscatter(
+            100, 4
+        )
+        mat_data.velocity = np.ones(mat_data.total.shape[1])
+        solver.mg_solver = MultigroupSolver.DMD
+        solver.dmd_recycle = recycle
+        time_data = TimeDependentData(steps=10, dt=1.0, time_disc=1)
+        sources.external = sources.external[None, ...].copy()
+        sources.boundary_x = sources.boundary_x[None, ...].copy()
+        sources.initial_flux = np.zeros(
+            (geometry.delta_x.size, quadrature.angle_x.size, mat_data.total.shape[1])
+        )
+        caplog.clear()
+        fluxes.append(
+            timed1d.time_dependent(
+                mat_data, sources, geometry, quadrature, solver, time_data
+            )
+        )
+        snapshots.append(
+            [rec.args[0] for rec in caplog.records if rec.msg.startswith("DMD")]
+        )
+    assert np.isclose(fluxes[1], fluxes[0], rtol=1e-5).all(), "Incorrect Flux"
+    # Only the time steps after the first have snapshots to reuse
+    assert snapshots[1][0] == snapshots[0][0]
+    assert sum(snapshots[1][1:]) < sum(snapshots[0][1:]), str(snapshots)
+
+
+@pytest.mark.slab1d
+@pytest.mark.bdf2
+def test_reed_bdf2_repeated_boundary():
+    # A boundary repeated for every step is expanded each step, a
+    # broadcast boundary only once
+    mat_data, sources, geometry, quadrature, solver = prob.reeds([0, 0])
+    time_data = TimeDependentData(steps=20, dt=1.0, time_disc=3)
+    sources.external = sources.external[None, ...].copy()
+    sources.initial_flux = np.zeros(
+        (geometry.delta_x.size, quadrature.angle_x.size, mat_data.total.shape[1])
+    )
+    boundary_x = np.zeros((2, 1, 1))
+    boundary_x[0] = 1.0
+    fluxes = []
+    for steps in (1, time_data.steps):
+        sources.boundary_x = np.repeat(boundary_x[None, ...], steps, axis=0)
+        fluxes.append(
+            timed1d.time_dependent(
+                mat_data, sources, geometry, quadrature, solver, time_data
+            )
+        )
+    assert np.array_equal(fluxes[0], fluxes[1]), "Incorrect Flux"
+
+
+@pytest.mark.slab1d
+@pytest.mark.trbdf2
+def test_reed_tr_bdf2_lazy_sources():
+    mat_data, sources, geometry, quadrature, solver = prob.reeds([0, 0])
+    time_data = TimeDependentData(steps=20, dt=1.0, time_disc=4)
+    sources.initial_flux = np.zeros(
+        (geometry.delta_x.size + 1, quadrature.angle_x.size, mat_data.total.shape[1])
+    )
+    # Source ramped up over the time steps and gamma steps
+    profile = np.linspace(0.0, 1.0, 2 * time_data.steps + 1)
+    external = sources.external
+    sources.external = profile[:, None, None, None] * external[None, ...]
+    sources.boundary_x = sources.boundary_x[None, ...].copy()
+    dense = timed1d.time_dependent(
+        mat_data, sources, geometry, quadrature, solver, time_data
+    )
+
+    sources.external = TimeSource.separable(external, profile)
+    boundary_x = sources.boundary_x[0]
+    sources.boundary_x = lambda qq: boundary_x
+    lazy = timed1d.time_dependent(
+        mat_data, sources, geometry, quadrature, solver, time_data
+    )
+    assert np.array_equal(lazy, dense), "Lazy sources change the flux"
+
+
+@pytest.mark.slab1d
+@pytest.mark.time_dependent
+def test_decay_02_lazy_boundary():
+    edges_t = np.linspace(0, 1e-6, 41)
+    boundary_x = np.zeros((2, 1, 4))
+    boundary_x[0, 0, 2] = 1.0
+    dense = boundary1d.time_dependence_decay_02(boundary_x, edges_t)
+    lazy = boundary1d.time_dependence_decay_02(boundary_x, edges_t, lazy=True)
+    assert lazy.shape == dense.shape
+    for tt in range(edges_t.size - 1):
+        assert np.array_equal(lazy[tt], dense[tt])
+
+
 @pytest.mark.slab1d
 @pytest.mark.bdf2
 @pytest.mark.parametrize(("boundary"), [[0, 0], [1, 0], [0, 1]])